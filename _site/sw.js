@@ -1,29 +1,57 @@
 // Service Worker för SWEREF 99 TM PWA
 // Hanterar offline-caching av alla nödvändiga resurser
 
-const CACHE_VERSION = '30';
-const CACHE_NAME = `sweref99-${CACHE_VERSION}`;
+// Precache-manifestet genereras av scripts/build.mjs med en revision per resurs.
+// Webbläsaren jämför även importerade skript vid uppdateringskontrollen, så en ändrad
+// resurs ger en ny version av service workern utan att den här filen behöver ändras.
+importScripts('/precache-manifest.js');
+
+const PRECACHE_MANIFEST = self.__PRECACHE_MANIFEST;
+const PRECACHE_PREFIX = 'sweref99-';
+const CACHE_NAME = `${PRECACHE_PREFIX}${PRECACHE_MANIFEST.version}`;
+
+// Resurser som laddas lat cachas separat och behålls mellan versioner.
+// Byt namn på cachen om någon av dem ändras under samma URL.
+const RUNTIME_CACHE_NAME = 'sweref99-runtime-1';
+
+// Varje precache sparar sitt eget manifest under den här nyckeln, så att nästa
+// version kan se vilka resurser som redan finns med rätt revision
+const MANIFEST_CACHE_KEY = '/__precache-manifest.json';
+
+// Antal resurser som hämtas samtidigt vid installation
+const PRECACHE_CONCURRENCY = 4;
 
 // Alla resurser som behövs för att appen ska fungera offline
-const ASSETS_TO_CACHE = [
-	'/',
-	'/index.html',
-	'/om.html',
-	'/stil.css',
-	'/pico.min.css',
-	'/script.js',
-	'/proj4.js',
-	'/app.webmanifest',
-	'/favicon.ico',
-	'/icon-192.png',
-	'/icon-512.png',
-	'/apple-touch-icon.png',
-	'/images/splash-iphone.png',
-	'/images/splash-iphone-plus.png',
-	'/images/splash-iphone-se.png',
-	'/images/splash-iphone-landscape.png'
+const ASSETS_TO_CACHE = PRECACHE_MANIFEST.entries.map((entry) => entry.url);
+
+// Resurser som bygget även publicerar gzip-komprimerade (URL + '.gz'). De lagras
+// komprimerade i cachen och packas upp med DecompressionStream när de används.
+const COMPRESSED_PATHS = new Set(typeof DecompressionStream === 'function' ? PRECACHE_MANIFEST.compressed ?? [] : []);
+const COMPRESSED_SUFFIX = '.gz';
+const STORED_ENCODING_HEADER = 'X-Stored-Encoding';
+const CONTENT_TYPES = {
+	'.js': 'text/javascript; charset=utf-8',
+	'.css': 'text/css; charset=utf-8'
+};
+
+// Index över precachen i minnet: sökväg → revision.
+// En träff slås upp direkt i precachen i stället för att söka igenom alla cachar.
+const PRECACHE_INDEX = new Map(PRECACHE_MANIFEST.entries.map(({ url, revision }) => [url, revision]));
+
+// HTML-sidor som hålls aktuella med stale-while-revalidate
+const HTML_PATHS = new Set(['/', '/index.html', '/om.html']);
+
+// Moduler med innehållshash i namnet (t.ex. geodesy.3f2a9c1e.js) ändras aldrig
+const IMMUTABLE_ASSET_PATTERN = /\.[0-9a-f]{8}\.js$/;
+
+// Resurser som laddas lat av appen och cachas först när de hämtats
+const RUNTIME_CACHED_PATHS = new Set([
+	'/data/nkg-velocity.bin',
+	'/proj4.js'
+]);
+const RUNTIME_CACHED_PREFIXES = [
+	'/data/geoid/'
 ];
-const PRECACHED_ASSET_PATHS = new Set(ASSETS_TO_CACHE);
 
 function createTextResponse(message, status) {
 	return new Response(message, {
@@ -35,23 +63,30 @@ function createTextResponse(message, status) {
 	});
 }
 
-function shouldHandleRequest(request) {
-	if (request.method !== 'GET') {
-		return false;
-	}
+function shouldHandleRequest(request, url) {
+	return request.method === 'GET' && (url.protocol === 'http:' || url.protocol === 'https:');
+}
 
-	const url = new URL(request.url);
-	return url.protocol === 'http:' || url.protocol === 'https:';
+// Cachar som öppnats av den här service workern; varje cache öppnas en gång per livstid
+const openCaches = new Map();
+
+function openCache(cacheName) {
+	let cache = openCaches.get(cacheName);
+	if (cache === undefined) {
+		cache = caches.open(cacheName);
+		openCaches.set(cacheName, cache);
+	}
+	return cache;
 }
 
-function shouldCacheResponse(request) {
-	const url = new URL(request.url);
-	return url.origin === self.location.origin && PRECACHED_ASSET_PATHS.has(url.pathname);
+function isRuntimeCachedPath(pathname) {
+	return RUNTIME_CACHED_PATHS.has(pathname) ||
+		RUNTIME_CACHED_PREFIXES.some((prefix) => pathname.startsWith(prefix));
 }
 
 async function getOfflineFallback(request) {
-	if (request.headers.get('accept')?.includes('text/html')) {
-		const fallbackResponse = await caches.match('/index.html');
+	if (request.mode === 'navigate' || request.headers.get('accept')?.includes('text/html')) {
+		const fallbackResponse = await (await openCache(CACHE_NAME)).match('/index.html');
 		if (fallbackResponse) {
 			return fallbackResponse;
 		}
@@ -60,44 +95,238 @@ async function getOfflineFallback(request) {
 	return createTextResponse('Offline och resurs saknas i cache', 503);
 }
 
-async function cacheResponse(request, response) {
-	if (!response.ok || !shouldCacheResponse(request)) {
-		return response;
-	}
-
+async function putInCache(cacheName, key, response) {
 	try {
-		const cache = await caches.open(CACHE_NAME);
-		await cache.put(request, response.clone());
+		const cache = await openCache(cacheName);
+		await cache.put(key, response);
 	} catch (error) {
 		console.warn('ServiceWorker: Kunde inte cacha resurs:', error);
 	}
+}
+
+// Hämtar en resurs för att lagra den i cachen, som gzip om bygget skapat en komprimerad variant
+async function fetchForCache(pathname, request, init) {
+	if (!COMPRESSED_PATHS.has(pathname)) {
+		return fetch(request, init);
+	}
+
+	const response = await fetch(`${pathname}${COMPRESSED_SUFFIX}`, init);
+	if (!response.ok) {
+		return response;
+	}
 
-	return response;
+	// Svaret får alltid resursens egen Content-Type och inte .gz-filens (t.ex. application/gzip),
+	// som skulle underkännas av webbläsarens MIME-kontroll för moduler
+	const extension = pathname.slice(pathname.lastIndexOf('.'));
+	const headers = { 'Content-Type': CONTENT_TYPES[extension] ?? 'application/octet-stream' };
+	// Om servern själv angett Content-Encoding har webbläsaren redan packat upp innehållet
+	if (!response.headers.has('Content-Encoding')) {
+		headers[STORED_ENCODING_HEADER] = 'gzip';
+	}
+	return new Response(response.body, { headers });
 }
 
-async function handleRequest(request) {
-	const cachedResponse = await caches.match(request);
+// Packar upp ett svar som lagrats komprimerat i cachen
+function decodeStoredResponse(response) {
+	if (response?.headers.get(STORED_ENCODING_HEADER) !== 'gzip') {
+		return response;
+	}
+
+	const headers = new Headers(response.headers);
+	headers.delete(STORED_ENCODING_HEADER);
+	return new Response(response.body.pipeThrough(new DecompressionStream('gzip')), {
+		status: response.status,
+		statusText: response.statusText,
+		headers
+	});
+}
+
+// Svaret från navigeringsförhämtningen om det finns, annars en vanlig hämtning.
+// Förhämtningen startar parallellt med att service workern vaknar.
+async function fetchFromNetwork(event) {
+	const preloadResponse = await event.preloadResponse;
+	return preloadResponse ?? fetch(event.request);
+}
+
+// HTML-sidor: svara direkt från cachen och uppdatera den i bakgrunden,
+// så att nästa besök får sidan som publicerats sedan dess
+async function staleWhileRevalidate(event, url, cacheName) {
+	const cacheKey = url.pathname;
+	const revalidation = fetchFromNetwork(event)
+		.then(async (response) => {
+			if (response.ok) {
+				await putInCache(cacheName, cacheKey, response.clone());
+			}
+			return response;
+		});
+
+	const cachedResponse = await (await openCache(cacheName)).match(cacheKey);
 	if (cachedResponse) {
+		event.waitUntil(revalidation.catch((error) => {
+			console.warn('ServiceWorker: Kunde inte uppdatera sida:', error);
+		}));
 		return cachedResponse;
 	}
 
 	try {
-		const response = await fetch(request);
-		return cacheResponse(request, response);
+		return await revalidation;
 	} catch (error) {
 		console.error('ServiceWorker: Fetch misslyckades:', error);
-		return getOfflineFallback(request);
+		return getOfflineFallback(event.request);
 	}
 }
 
-// Install event - cacha alla resurser
+// Precachade, innehållshashade och lat laddade resurser ändras inte under samma
+// URL (eller får en ny revision), så cachen räcker när den har dem
+async function cacheFirst(event, url, cacheName) {
+	// Precachade resurser lagras under sökvägen, så frågesträngar påverkar inte träffen
+	const cacheKey = PRECACHE_INDEX.has(url.pathname) ? url.pathname : event.request;
+	const cachedResponse = await (await openCache(cacheName)).match(cacheKey);
+	if (cachedResponse) {
+		return decodeStoredResponse(cachedResponse);
+	}
+
+	try {
+		const response = await fetchForCache(url.pathname, event.request);
+		if (response.ok) {
+			await putInCache(cacheName, cacheKey, response.clone());
+		}
+		return decodeStoredResponse(response);
+	} catch (error) {
+		console.error('ServiceWorker: Fetch misslyckades:', error);
+		return getOfflineFallback(event.request);
+	}
+}
+
+// Allt annat hämtas från nätet och cachas inte
+async function networkOnly(event) {
+	try {
+		return await fetchFromNetwork(event);
+	} catch (error) {
+		console.error('ServiceWorker: Fetch misslyckades:', error);
+		return getOfflineFallback(event.request);
+	}
+}
+
+// Strategi per typ av resurs; den första som matchar används, annars networkOnly.
+// Resurser från andra ursprung matchar aldrig.
+const ROUTES = [
+	{
+		matches: (url) => HTML_PATHS.has(url.pathname),
+		strategy: staleWhileRevalidate,
+		cacheName: CACHE_NAME
+	},
+	{
+		matches: (url) => PRECACHE_INDEX.has(url.pathname) || IMMUTABLE_ASSET_PATTERN.test(url.pathname),
+		strategy: cacheFirst,
+		cacheName: CACHE_NAME
+	},
+	{
+		matches: (url) => isRuntimeCachedPath(url.pathname),
+		strategy: cacheFirst,
+		cacheName: RUNTIME_CACHE_NAME
+	}
+];
+
+function handleRequest(event, url) {
+	const route = url.origin === self.location.origin ?
+		ROUTES.find((candidate) => candidate.matches(url)) :
+		undefined;
+
+	return route ?
+		route.strategy(event, url, route.cacheName) :
+		networkOnly(event);
+}
+
+// Kör uppgifterna med högst `limit` samtidigt och avbryter vid första fel
+async function runWithConcurrency(items, limit, task) {
+	let nextIndex = 0;
+	const runners = Array.from({ length: Math.min(limit, items.length) }, async () => {
+		while (nextIndex < items.length) {
+			await task(items[nextIndex++]);
+		}
+	});
+	await Promise.all(runners);
+}
+
+// Hittar resurser med samma revision i tidigare precachar
+// Returnerar en Map från URL till cachen som har resursen med rätt revision.
+async function findReusableEntries(cacheNames) {
+	const reusable = new Map();
+
+	for (const cacheName of cacheNames) {
+		const cache = await caches.open(cacheName);
+		const manifestResponse = await cache.match(MANIFEST_CACHE_KEY);
+		if (!manifestResponse) {
+			continue;
+		}
+
+		const { entries } = await manifestResponse.json();
+		for (const { url, revision } of entries) {
+			if (!reusable.has(url) && PRECACHE_INDEX.get(url) === revision) {
+				reusable.set(url, cache);
+			}
+		}
+	}
+
+	return reusable;
+}
+
+// Installerar precachen för den här versionen, eller ingenting om den redan är komplett
+async function installPrecache() {
+	// En service worker som ändrats utan att resurserna ändrats har samma precache
+	if (await caches.has(CACHE_NAME) && await (await caches.open(CACHE_NAME)).match(MANIFEST_CACHE_KEY)) {
+		return;
+	}
+
+	try {
+		await fillPrecache();
+	} catch (error) {
+		// En ofullständig precache får aldrig ersätta den som används
+		await caches.delete(CACHE_NAME);
+		throw error;
+	}
+}
+
+// Bygger den nya precachen: oförändrade resurser kopieras från tidigare versioner och
+// bara ändrade hämtas från nätet. Den gamla cachen används tills den nya är komplett.
+async function fillPrecache() {
+	const previousCacheNames = (await caches.keys())
+		.filter((cacheName) => cacheName.startsWith(PRECACHE_PREFIX) &&
+			cacheName !== CACHE_NAME && cacheName !== RUNTIME_CACHE_NAME);
+	const reusable = await findReusableEntries(previousCacheNames);
+	const cache = await caches.open(CACHE_NAME);
+	let fetchedCount = 0;
+
+	await runWithConcurrency(PRECACHE_MANIFEST.entries, PRECACHE_CONCURRENCY, async ({ url }) => {
+		// En hashad modul som redan hämtats vid körning är samma fil oavsett cache
+		const previousResponse = await reusable.get(url)?.match(url) ??
+			(IMMUTABLE_ASSET_PATTERN.test(url) ? await caches.match(url) : undefined);
+		if (previousResponse) {
+			await cache.put(url, previousResponse);
+			return;
+		}
+
+		// Förbi HTTP-cachen, så att en ny revision aldrig ersätts av en gammal kopia
+		const response = await fetchForCache(url, url, { cache: 'reload' });
+		if (!response.ok) {
+			throw new Error(`${url}: HTTP ${response.status}`);
+		}
+		await cache.put(url, response);
+		fetchedCount++;
+	});
+
+	// Manifestet skrivs sist och markerar att precachen är komplett
+	await cache.put(MANIFEST_CACHE_KEY, new Response(JSON.stringify(PRECACHE_MANIFEST), {
+		headers: { 'Content-Type': 'application/json' }
+	}));
+	console.log(`ServiceWorker: Hämtade ${fetchedCount} av ${PRECACHE_MANIFEST.entries.length} resurser`);
+}
+
+// Install event - cacha ändrade resurser
 self.addEventListener('install', (event) => {
 	event.waitUntil(
-		caches.open(CACHE_NAME)
-			.then((cache) => {
-				console.log('ServiceWorker: Cachar resurser');
-				return cache.addAll(ASSETS_TO_CACHE);
-			})
+		installPrecache()
 			.then(() => {
 				// Aktivera den nya service workern direkt
 				return self.skipWaiting();
@@ -109,20 +338,24 @@ self.addEventListener('install', (event) => {
 	);
 });
 
-// Activate event - rensa gamla cachar
+// Activate event - byt till den nya precachen och rensa gamla
 self.addEventListener('activate', (event) => {
 	event.waitUntil(
 		caches.keys()
 			.then((cacheNames) => {
 				return Promise.all(
 					cacheNames
-						.filter((cacheName) => cacheName !== CACHE_NAME)
+						.filter((cacheName) => cacheName !== CACHE_NAME && cacheName !== RUNTIME_CACHE_NAME)
 						.map((cacheName) => {
 							console.log('ServiceWorker: Tar bort gammal cache:', cacheName);
 							return caches.delete(cacheName);
 						})
 				);
 			})
+			.then(() => {
+				// Navigeringar hämtas parallellt med att service workern startar
+				return self.registration.navigationPreload?.enable();
+			})
 			.then(() => {
 				// Ta över alla öppna sidor direkt
 				return self.clients.claim();
@@ -133,14 +366,15 @@ self.addEventListener('activate', (event) => {
 	);
 });
 
-// Fetch event - svara från cache först, fallback till nätverk
+// Fetch event - svara enligt strategin för resursens route
 self.addEventListener('fetch', (event) => {
-	if (!shouldHandleRequest(event.request)) {
+	const url = new URL(event.request.url);
+	if (!shouldHandleRequest(event.request, url)) {
 		return;
 	}
 
 	event.respondWith(
-		handleRequest(event.request)
+		handleRequest(event, url)
 			.catch((error) => {
 				console.error('ServiceWorker: Cache match misslyckades:', error);
 				return createTextResponse('Cache-fel', 500);
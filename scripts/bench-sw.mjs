@@ -0,0 +1,199 @@
+// Mikrobenchmark för service workerns fetch-hantering
+//
+// Kör sw.js i en isolerad kontext med en Cache Storage i minnet och mäter fetch-händelser
+// för precachade resurser, cachade geoidrutor och geoidrutor som hämtas och cachas, samt
+// precachade moduler och CSS lagrade okomprimerade jämfört med gzip-komprimerade.
+// Varje öppnad eller genomsökt cache kostar ett varv i händelseloopen, som en förenklad
+// modell av att Cache Storage i webbläsaren ligger i en annan process. Antalet
+// Cache Storage-operationer per händelse redovisas också, eftersom det är det som
+// väger tyngst i en riktig webbläsare.
+//
+// Användning: node scripts/bench-sw.mjs [sökväg till sw.js] [antal händelser]
+
+import { readFileSync } from 'node:fs';
+import { performance } from 'node:perf_hooks';
+import { fileURLToPath } from 'node:url';
+import vm from 'node:vm';
+import { gzipSync } from 'node:zlib';
+
+const ORIGIN = 'https://sweref99.nu';
+const DEFAULT_SW_PATH = fileURLToPath(new URL('../_site/sw.js', import.meta.url));
+const WARMUP_EVENTS = 1000;
+
+// Samma sorts resurser som den publicerade precachen, plus geoidrutor i körningscachen
+const MANIFEST = {
+	version: 'bench',
+	entries: [
+		'/', '/index.html', '/om.html', '/stil.css', '/pico.min.css', '/app.webmanifest',
+		'/favicon.ico', '/icon-192.png', '/icon-512.png', '/apple-touch-icon.png',
+		'/images/splash-iphone.png', '/images/splash-iphone-plus.png',
+		'/images/splash-iphone-se.png', '/images/splash-iphone-landscape.png',
+		'/format.0a1b2c3d.js', '/geodesy.1a2b3c4d.js', '/script.2a3b4c5d.js',
+		'/transform-pipeline.3a4b5c6d.js', '/transform-protocol.4a5b6c7d.js', '/transform-worker.5a6b7c8d.js'
+	].map((url, index) => ({ url, revision: index.toString(16).padStart(8, '0') })),
+	compressed: []
+};
+const RUNTIME_TILES = Array.from({ length: 64 }, (_, index) => `/data/geoid/tile-${index}.bin`);
+const PRECACHED_PATHS = MANIFEST.entries.map((entry) => entry.url).filter((url) => !url.endsWith('.html') && url !== '/');
+const COMPRESSIBLE_PATHS = PRECACHED_PATHS.filter((url) => /\.(js|css)$/.test(url));
+
+// Moduler och CSS får ett innehåll i samma storlek som de byggda filerna (cirka 20 kB),
+// så att uppackningen med DecompressionStream kostar lika mycket som i appen
+const ASSET_BODY_BYTES = 20000;
+
+const storageRoundTrip = () => new Promise((resolve) => setImmediate(resolve));
+
+function createAssetBody(source) {
+	return source.repeat(Math.ceil(ASSET_BODY_BYTES / source.length)).slice(0, ASSET_BODY_BYTES);
+}
+
+// Svar från "nätet": moduler och CSS med realistiskt innehåll, .gz-varianter komprimerade
+function createNetworkResponse(path, assetBody) {
+	if (path.endsWith('.gz')) {
+		return new Response(gzipSync(assetBody), { headers: { 'Content-Type': 'application/gzip' } });
+	}
+	return new Response(/\.(js|css)$/.test(path) ? assetBody : `body of ${path}`);
+}
+
+function createCacheStorage(counters) {
+	const stores = new Map();
+	const keyOf = (request) => new URL(typeof request === 'string' ? request : request.url, ORIGIN).pathname;
+	const toResponse = (entry) => new Response(entry.body, { headers: entry.headers });
+	const createCache = (entries) => ({
+		async match(request) {
+			counters.operations++;
+			await storageRoundTrip();
+			const entry = entries.get(keyOf(request));
+			return entry === undefined ? undefined : toResponse(entry);
+		},
+		async put(request, response) {
+			counters.operations++;
+			await storageRoundTrip();
+			entries.set(keyOf(request), { body: await response.arrayBuffer(), headers: [...response.headers] });
+		}
+	});
+
+	return {
+		async open(name) {
+			counters.operations++;
+			await storageRoundTrip();
+			if (!stores.has(name)) {
+				stores.set(name, new Map());
+			}
+			return createCache(stores.get(name));
+		},
+		async match(request) {
+			// Som i webbläsaren söks cacharna igenom i den ordning de skapades
+			for (const entries of stores.values()) {
+				counters.operations++;
+				await storageRoundTrip();
+				const entry = entries.get(keyOf(request));
+				if (entry !== undefined) {
+					return toResponse(entry);
+				}
+			}
+			return undefined;
+		},
+		async has(name) {
+			return stores.has(name);
+		},
+		async keys() {
+			return [...stores.keys()];
+		},
+		async delete(name) {
+			return stores.delete(name);
+		}
+	};
+}
+
+async function loadServiceWorker(source, counters, manifest) {
+	const listeners = {};
+	const assetBody = createAssetBody(source);
+	const self = {
+		__PRECACHE_MANIFEST: manifest,
+		location: { origin: ORIGIN },
+		registration: {},
+		clients: { claim: async () => {} },
+		skipWaiting: async () => {},
+		addEventListener: (type, listener) => {
+			listeners[type] = listener;
+		}
+	};
+	const caches = createCacheStorage(counters);
+	const context = vm.createContext({
+		self,
+		caches,
+		fetch: async (request) => createNetworkResponse(new URL(typeof request === 'string' ? request : request.url, ORIGIN).pathname, assetBody),
+		importScripts: () => {},
+		console: { log: () => {}, warn: () => {}, error: console.error },
+		Request,
+		Response,
+		Headers,
+		URL,
+		DecompressionStream
+	});
+	vm.runInContext(source, context);
+
+	const dispatchLifecycle = async (type) => {
+		let pending = Promise.resolve();
+		listeners[type]({ waitUntil: (promise) => { pending = promise; } });
+		await pending;
+	};
+	await dispatchLifecycle('install');
+	await dispatchLifecycle('activate');
+
+	const fetchListener = listeners.fetch;
+	for (const tile of RUNTIME_TILES) {
+		await dispatchFetch(fetchListener, tile);
+	}
+	return fetchListener;
+}
+
+async function dispatchFetch(fetchListener, path) {
+	let response = null;
+	fetchListener({
+		request: new Request(`${ORIGIN}${path}`),
+		preloadResponse: Promise.resolve(undefined),
+		respondWith: (promise) => { response = promise; },
+		waitUntil: () => {}
+	});
+	await (await response).arrayBuffer();
+}
+
+async function measure(fetchListener, counters, label, paths, eventCount) {
+	counters.operations = 0;
+	const start = performance.now();
+	for (let i = 0; i < eventCount; i++) {
+		await dispatchFetch(fetchListener, paths(i));
+	}
+	const elapsedMs = performance.now() - start;
+
+	console.log(`  ${label}: ${(elapsedMs * 1000 / eventCount).toFixed(2)} µs per händelse, ` +
+		`${(counters.operations / eventCount).toFixed(2)} Cache Storage-operationer`);
+}
+
+async function runBenchmark(swPath, eventCount) {
+	const source = readFileSync(swPath, 'utf8');
+	const counters = { operations: 0 };
+	const fetchListener = await loadServiceWorker(source, counters, MANIFEST);
+
+	for (let i = 0; i < WARMUP_EVENTS; i++) {
+		await dispatchFetch(fetchListener, PRECACHED_PATHS[i % PRECACHED_PATHS.length]);
+	}
+
+	console.log(`${swPath}: ${eventCount} fetch-händelser per fall`);
+	await measure(fetchListener, counters, 'Precachad träff', (i) => PRECACHED_PATHS[i % PRECACHED_PATHS.length], eventCount);
+	await measure(fetchListener, counters, 'Geoidruta i cachen', (i) => RUNTIME_TILES[i % RUNTIME_TILES.length], eventCount);
+	await measure(fetchListener, counters, 'Geoidruta hämtas och cachas', (i) => `/data/geoid/new-${i}.bin`, eventCount);
+
+	// Samma moduler och CSS, lagrade gzip-komprimerade som i bygget. Skillnaden per händelse
+	// är det som uppackningen lägger till innan sidan kan ritas från cachen.
+	const compressedCounters = { operations: 0 };
+	const compressedListener = await loadServiceWorker(source, compressedCounters, { ...MANIFEST, compressed: COMPRESSIBLE_PATHS });
+	const assetPath = (i) => COMPRESSIBLE_PATHS[i % COMPRESSIBLE_PATHS.length];
+	await measure(fetchListener, counters, 'Modul eller CSS, lagrad okomprimerad', assetPath, eventCount);
+	await measure(compressedListener, compressedCounters, 'Modul eller CSS, lagrad med gzip', assetPath, eventCount);
+}
+
+const [swPath = DEFAULT_SW_PATH, eventCount = '5000'] = process.argv.slice(2);
+await runBenchmark(swPath, Number(eventCount));
@@ -0,0 +1,426 @@
+// Produktionsbygge för sweref99.nu
+//
+// Körs efter tsc (se Makefile). Utan flaggor kopieras _site/ till dist/, där de kompilerade
+// modulerna minifieras och får innehållshashade filnamn, HTML-sidornas skriptreferenser
+// skrivs om, JavaScript och CSS får gzip-komprimerade varianter (.gz) och service workerns
+// precache-manifest genereras med en revision per fil.
+// Med --manifest-only skrivs bara _site/precache-manifest.js för lokal utveckling.
+//
+// Använder bara Node:s inbyggda moduler, så bygget kräver inga fler beroenden.
+
+import { createHash } from 'node:crypto';
+import { cpSync, existsSync, readFileSync, readdirSync, rmSync, writeFileSync } from 'node:fs';
+import { join } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { constants as zlibConstants, gzipSync } from 'node:zlib';
+
+const ROOT_DIR = fileURLToPath(new URL('..', import.meta.url));
+const SOURCE_DIR = join(ROOT_DIR, 'src');
+const SITE_DIR = join(ROOT_DIR, '_site');
+const DIST_DIR = join(ROOT_DIR, 'dist');
+const MANIFEST_FILE = 'precache-manifest.js';
+const HASH_LENGTH = 8;
+
+const HTML_PAGES = ['index.html', 'om.html'];
+
+// Statiska resurser som precachas utöver de kompilerade modulerna
+const PRECACHED_FILES = [
+	'index.html',
+	'om.html',
+	'stil.css',
+	'pico.min.css',
+	'app.webmanifest',
+	'favicon.ico',
+	'icon-192.png',
+	'icon-512.png',
+	'apple-touch-icon.png',
+	'images/splash-iphone.png',
+	'images/splash-iphone-plus.png',
+	'images/splash-iphone-se.png',
+	'images/splash-iphone-landscape.png'
+];
+
+// Sidor som också nås via en annan URL
+const URL_ALIASES = { 'index.html': ['/'] };
+
+// Källkartor och utvecklingsmanifestet kopieras inte till dist/
+const EXCLUDED_FROM_DIST = /\.js\.map$|^precache-manifest\.js$/;
+
+// Resurser som service workern lagrar gzip-komprimerade och packar upp med DecompressionStream.
+// sw.js och manifestet läses med importScripts() förbi service workern och komprimeras inte.
+const COMPRESSIBLE_FILE = /\.(js|css)$/;
+const UNCOMPRESSED_FILES = new Set(['sw.js', MANIFEST_FILE]);
+const COMPRESSED_SUFFIX = '.gz';
+
+function contentHash(content) {
+	return createHash('sha256').update(content).digest('hex').slice(0, HASH_LENGTH);
+}
+
+// ============================================================================
+// MINIFIERING
+// ============================================================================
+
+const IDENTIFIER_CHAR = /[\w$\u0080-￿]/;
+const PUNCTUATORS = [
+	'>>>=', '...', '===', '!==', '**=', '<<=', '>>=', '>>>', '&&=', '||=', '??=',
+	'=>', '==', '!=', '<=', '>=', '&&', '||', '??', '?.', '++', '--', '+=', '-=', '*=', '/=', '%=',
+	'&=', '|=', '^=', '<<', '>>', '**'
+];
+// Radbrytningar efter eller före dessa tecken kan aldrig påverka semikoloninsättningen
+const NEWLINE_FREE_AFTER = new Set(['{', '(', '[', ',', ';']);
+const NEWLINE_FREE_BEFORE = new Set(['}', ')', ']', ',', ';']);
+// Nyckelord efter vilka ett snedstreck inleder ett reguljärt uttryck
+const REGEX_PREFIX_KEYWORDS = new Set([
+	'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw', 'case', 'do', 'else', 'yield', 'await'
+]);
+
+/**
+ * Delar upp JavaScript i token (whitespace och kommentarer hoppas över)
+ * Varje token vet om den föregicks av en radbrytning, så att minifieringen kan
+ * behålla radbrytningar och aldrig ändra betydelse via automatisk semikoloninsättning.
+ */
+function tokenize(source) {
+	const tokens = [];
+	// Stapel med klammerdjup för varje öppen ${ … } i en mall-literal
+	const templateDepths = [];
+	let i = 0;
+	let newlineBefore = false;
+
+	const push = (type, start) => {
+		tokens.push({ type, text: source.slice(start, i), newlineBefore });
+		newlineBefore = false;
+	};
+
+	const scanTemplate = (start) => {
+		// i står efter ` eller }
+		while (i < source.length) {
+			const char = source[i];
+			if (char === '\\') {
+				i += 2;
+			} else if (char === '`') {
+				i++;
+				push('template', start);
+				return;
+			} else if (char === '$' && source[i + 1] === '{') {
+				i += 2;
+				push('template', start);
+				templateDepths.push(0);
+				return;
+			} else {
+				i++;
+			}
+		}
+		throw new Error('Oavslutad mall-literal');
+	};
+
+	const isRegexAllowed = () => {
+		const previous = tokens[tokens.length - 1];
+		if (previous === undefined) {
+			return true;
+		}
+		if (previous.type === 'word') {
+			return REGEX_PREFIX_KEYWORDS.has(previous.text);
+		}
+		if (previous.type === 'punctuator') {
+			return !(previous.text === ')' || previous.text === ']' || previous.text === '}');
+		}
+		return false;
+	};
+
+	while (i < source.length) {
+		const char = source[i];
+		const start = i;
+
+		if (char === '\n') {
+			newlineBefore = true;
+			i++;
+		} else if (/\s/.test(char)) {
+			i++;
+		} else if (char === '/' && source[i + 1] === '/') {
+			while (i < source.length && source[i] !== '\n') i++;
+		} else if (char === '/' && source[i + 1] === '*') {
+			const end = source.indexOf('*/', i + 2);
+			if (end === -1) throw new Error('Oavslutad kommentar');
+			if (source.slice(i, end).includes('\n')) newlineBefore = true;
+			i = end + 2;
+		} else if (char === '"' || char === "'") {
+			i++;
+			while (source[i] !== char) {
+				if (i >= source.length) throw new Error('Oavslutad sträng');
+				i += source[i] === '\\' ? 2 : 1;
+			}
+			i++;
+			push('string', start);
+		} else if (char === '`') {
+			i++;
+			scanTemplate(start);
+		} else if (char === '}' && templateDepths.length > 0 && templateDepths[templateDepths.length - 1] === 0) {
+			templateDepths.pop();
+			i++;
+			scanTemplate(start);
+		} else if (char === '/' && isRegexAllowed()) {
+			let inClass = false;
+			i++;
+			while (source[i] !== '/' || inClass) {
+				if (i >= source.length || source[i] === '\n') throw new Error('Oavslutat reguljärt uttryck');
+				if (source[i] === '\\') i++;
+				else if (source[i] === '[') inClass = true;
+				else if (source[i] === ']') inClass = false;
+				i++;
+			}
+			i++;
+			while (i < source.length && IDENTIFIER_CHAR.test(source[i])) i++;
+			push('regex', start);
+		} else if (IDENTIFIER_CHAR.test(char) || (char === '.' && /\d/.test(source[i + 1] ?? ''))) {
+			// Identifierare, nyckelord och tal (inklusive exponent som 1e-6)
+			while (i < source.length) {
+				if (IDENTIFIER_CHAR.test(source[i]) || (source[i] === '.' && /\d/.test(source[start]))) {
+					i++;
+				} else if ((source[i] === '+' || source[i] === '-') && /\d/.test(source[start]) && /[eE]/.test(source[i - 1]) && !/^0[xX]/.test(source.slice(start, i))) {
+					i++;
+				} else {
+					break;
+				}
+			}
+			push('word', start);
+		} else {
+			const punctuator = PUNCTUATORS.find((candidate) => source.startsWith(candidate, i)) ?? char;
+			i += punctuator.length;
+			if (templateDepths.length > 0) {
+				if (punctuator === '{') templateDepths[templateDepths.length - 1]++;
+				else if (punctuator === '}') templateDepths[templateDepths.length - 1]--;
+			}
+			push('punctuator', start);
+		}
+	}
+
+	return tokens;
+}
+
+/**
+ * Behövs ett mellanslag mellan två token för att de inte ska flyta ihop?
+ */
+function needsSpace(previous, next) {
+	const last = previous.text[previous.text.length - 1];
+	const first = next.text[0];
+	if (IDENTIFIER_CHAR.test(last) && IDENTIFIER_CHAR.test(first)) {
+		return true;
+	}
+	// a + +b, a - -b, a / /re/ och tal följt av punkt
+	return (last === '+' && first === '+') || (last === '-' && first === '-') ||
+		(last === '/' && (first === '/' || first === '*')) ||
+		(previous.type === 'word' && /^\d+$/.test(previous.text) && first === '.');
+}
+
+/**
+ * Kan radbrytningen mellan två token tas bort utan att betydelsen ändras?
+ */
+function isNewlineRedundant(previous, next) {
+	return (previous.type === 'punctuator' && NEWLINE_FREE_AFTER.has(previous.text)) ||
+		(next.type === 'punctuator' && NEWLINE_FREE_BEFORE.has(next.text));
+}
+
+/**
+ * Minifierar kompilerad JavaScript genom att ta bort kommentarer, indrag och onödiga mellanslag
+ * Övriga radbrytningar mellan satser behålls, så semikoloninsättningen påverkas aldrig.
+ * Namn förkortas inte; det kräver en riktig minifierare som inte ingår i beroendena.
+ *
+ * @param rewriteString - Anropas för varje sträng-literal och kan byta ut den (t.ex. modulsökvägar)
+ */
+export function minifyJavaScript(source, rewriteString = (text) => text) {
+	let output = '';
+	let previous = null;
+	for (const token of tokenize(source)) {
+		const text = token.type === 'string' ? rewriteString(token.text) : token.text;
+		if (previous !== null) {
+			if (token.newlineBefore && !isNewlineRedundant(previous, token)) {
+				output += '\n';
+			} else if (needsSpace(previous, { ...token, text })) {
+				output += ' ';
+			}
+		}
+		output += text;
+		previous = { ...token, text };
+	}
+	return `${output}\n`;
+}
+
+// ============================================================================
+// MODULER OCH HASHNING
+// ============================================================================
+
+/**
+ * Namnen på modulerna som tsc kompilerar från src/
+ */
+function getModuleNames() {
+	return readdirSync(SOURCE_DIR)
+		.filter((name) => name.endsWith('.ts') && !name.endsWith('.d.ts'))
+		.map((name) => name.replace(/\.ts$/, '.js'))
+		.sort();
+}
+
+/**
+ * Modulsökväg i en sträng-literal, t.ex. './format.js' eller '/transform-worker.js'
+ */
+function getReferencedModule(literal, moduleNames) {
+	const match = /^(["'])(\.?\/)([\w-]+\.js)\1$/.exec(literal);
+	return match !== null && moduleNames.has(match[3]) ? match : null;
+}
+
+/**
+ * Minifierar och hashar modulerna i beroendeordning
+ * En moduls hash omfattar de hashade namnen på modulerna den refererar till, så en ändring
+ * i en modul ger nya namn för allt som beror på den och inget annat.
+ *
+ * @returns Map från ursprungligt modulnamn till { fileName, content }
+ */
+function buildModules(moduleNames) {
+	const nameSet = new Set(moduleNames);
+	const sources = new Map(moduleNames.map((name) => [name, readFileSync(join(SITE_DIR, name), 'utf8')]));
+	const built = new Map();
+	const inProgress = new Set();
+
+	const build = (name) => {
+		if (built.has(name)) {
+			return built.get(name);
+		}
+		if (inProgress.has(name)) {
+			throw new Error(`Cirkulärt modulberoende via ${name}`);
+		}
+		inProgress.add(name);
+
+		const content = minifyJavaScript(sources.get(name), (literal) => {
+			const match = getReferencedModule(literal, nameSet);
+			if (match === null) {
+				return literal;
+			}
+			const [, quote, prefix, referenced] = match;
+			return `${quote}${prefix}${build(referenced).fileName}${quote}`;
+		});
+		const fileName = name.replace(/\.js$/, `.${contentHash(content)}.js`);
+		const result = { fileName, content };
+
+		inProgress.delete(name);
+		built.set(name, result);
+		return result;
+	};
+
+	moduleNames.forEach(build);
+	return built;
+}
+
+// ============================================================================
+// PRECACHE-MANIFEST
+// ============================================================================
+
+/**
+ * Skriver precache-manifestet som service workern läser med importScripts()
+ * Revisionen är innehållets hash, och versionen är en hash över alla revisioner.
+ */
+function writePrecacheManifest(directory, files, compressed = []) {
+	const entries = [];
+	for (const file of files) {
+		const path = join(directory, file);
+		if (!existsSync(path)) {
+			console.warn(`Saknas och precachas inte: ${file}`);
+			continue;
+		}
+		const revision = contentHash(readFileSync(path));
+		for (const url of [...(URL_ALIASES[file] ?? []), `/${file}`]) {
+			entries.push({ url, revision });
+		}
+	}
+
+	const version = contentHash(JSON.stringify({ entries, compressed }));
+	const manifest = { version, entries, compressed };
+	writeFileSync(
+		join(directory, MANIFEST_FILE),
+		`// Genererad av scripts/build.mjs – redigera inte\nself.__PRECACHE_MANIFEST = ${JSON.stringify(manifest, null, '\t')};\n`
+	);
+	console.log(`${MANIFEST_FILE}: ${entries.length} resurser, version ${version}`);
+}
+
+/**
+ * Skriver en gzip-komprimerad variant bredvid varje JavaScript- och CSS-fil i dist/
+ * Brotli packas inte upp av DecompressionStream i alla webbläsare och används därför inte.
+ *
+ * @returns URL:er till resurserna som har en komprimerad variant
+ */
+function writeCompressedVariants() {
+	const compressed = [];
+	let originalBytes = 0;
+	let compressedBytes = 0;
+
+	for (const file of readdirSync(DIST_DIR, { recursive: true })) {
+		const relative = file.split('\\').join('/');
+		if (!COMPRESSIBLE_FILE.test(relative) || UNCOMPRESSED_FILES.has(relative)) {
+			continue;
+		}
+
+		const content = readFileSync(join(DIST_DIR, relative));
+		const gzipped = gzipSync(content, { level: zlibConstants.Z_BEST_COMPRESSION });
+		if (gzipped.length >= content.length) {
+			continue;
+		}
+
+		writeFileSync(join(DIST_DIR, `${relative}${COMPRESSED_SUFFIX}`), gzipped);
+		compressed.push(`/${relative}`);
+		originalBytes += content.length;
+		compressedBytes += gzipped.length;
+	}
+
+	console.log(`Komprimerat i cachen: ${originalBytes} → ${compressedBytes} byte (${compressed.length} filer)`);
+	return compressed.sort();
+}
+
+function buildProduction() {
+	const moduleNames = getModuleNames();
+	const modules = buildModules(moduleNames);
+
+	rmSync(DIST_DIR, { recursive: true, force: true });
+	cpSync(SITE_DIR, DIST_DIR, {
+		recursive: true,
+		filter: (path) => {
+			const relative = path.slice(SITE_DIR.length + 1);
+			return !EXCLUDED_FROM_DIST.test(relative) && !moduleNames.includes(relative);
+		}
+	});
+
+	let originalBytes = 0;
+	let minifiedBytes = 0;
+	modules.forEach(({ fileName, content }, name) => {
+		writeFileSync(join(DIST_DIR, fileName), content);
+		originalBytes += readFileSync(join(SITE_DIR, name)).length;
+		minifiedBytes += Buffer.byteLength(content);
+	});
+	console.log(`Moduler: ${originalBytes} → ${minifiedBytes} byte`);
+
+	// Skriptreferenser i HTML-sidorna pekar på de hashade namnen
+	for (const page of HTML_PAGES) {
+		const path = join(DIST_DIR, page);
+		const html = readFileSync(path, 'utf8').replace(/(<script\b[^>]*\bsrc=")\/?([\w-]+\.js)(")/g, (tag, before, name, after) => {
+			const module = modules.get(name);
+			return module === undefined ? tag : `${before}${module.fileName}${after}`;
+		});
+		writeFileSync(path, html);
+	}
+
+	const missing = PRECACHED_FILES.filter((file) => !existsSync(join(DIST_DIR, file)));
+	if (missing.length > 0) {
+		throw new Error(`Resurser saknas i dist/: ${missing.join(', ')}`);
+	}
+	const compressed = writeCompressedVariants();
+	writePrecacheManifest(DIST_DIR, [...PRECACHED_FILES, ...Array.from(modules.values(), (module) => module.fileName)], compressed);
+}
+
+function buildDevelopmentManifest() {
+	writePrecacheManifest(SITE_DIR, [...PRECACHED_FILES, ...getModuleNames()]);
+}
+
+if (process.argv[1] === fileURLToPath(import.meta.url)) {
+	if (process.argv.includes('--manifest-only')) {
+		buildDevelopmentManifest();
+	} else {
+		buildProduction();
+	}
+}
@@ -0,0 +1,240 @@
+// Skapar binära rutnätsfiler i _site/data/ från publicerade modeller
+//
+// Läser en punktlista i textformat med en nod per rad: latitud, longitud och värden i
+// decimalgrader, separerade med blanksteg eller kommatecken. Tomma rader och rader som
+// börjar med # hoppas över. Noderna ska ligga i ett regelbundet rutnät i valfri ordning.
+//
+//   velocity: latitud longitud nord öst, horisontell hastighet för ETRS89/SWEREF 99
+//             relativt ITRF i mm/år (t.ex. härledd från NKG_RF17vel)
+//             → nkg-velocity.bin
+//   geoid:    latitud longitud N, geoidhöjd över GRS80 i meter (t.ex. SWEN17_RH2000)
+//             → geoid/swen17-<lat>-<lon>.bin, en fil per 1°×1°-ruta som täcks helt,
+//             med rutans norra och östra kantnoder
+//
+// Filformatet beskrivs vid GRID_FILE_HEADER_BYTES i src/geodesy.ts.
+//
+// Användning: node scripts/make-grids.mjs velocity|geoid <indatafil> [utdatakatalog]
+
+import { mkdirSync, readFileSync, writeFileSync } from 'node:fs';
+import { join } from 'node:path';
+import { fileURLToPath } from 'node:url';
+
+const DEFAULT_OUTPUT_DIR = fileURLToPath(new URL('../_site/data', import.meta.url));
+const GRID_FILE_HEADER_BYTES = 40;
+const MAX_NODES_PER_AXIS = 0xffff;
+
+// Avvikelse från rutnätet (i andelar av ett steg) som tolereras i indata med avrundade koordinater
+const NODE_TOLERANCE = 1e-3;
+
+const MODELS = {
+	velocity: {
+		magic: 0x4e4b4756, // "NKGV"
+		valuesPerNode: 2,
+		scale: 0.001, // mm/år → m/år
+		write: writeVelocityGrid
+	},
+	geoid: {
+		magic: 0x47454f49, // "GEOI"
+		valuesPerNode: 1,
+		scale: 1,
+		write: writeGeoidTiles
+	}
+};
+
+// ============================================================================
+// INLÄSNING
+// ============================================================================
+
+/**
+ * Läser punktlistan till separata kolumner
+ */
+function readNodes(path, valuesPerNode) {
+	const latitudes = [];
+	const longitudes = [];
+	const values = [];
+
+	readFileSync(path, 'utf8').split(/\r?\n/).forEach((line, index) => {
+		const trimmed = line.trim();
+		if (trimmed === '' || trimmed.startsWith('#')) {
+			return;
+		}
+		const fields = trimmed.split(/[\s,;]+/).map(Number);
+		if (fields.length < 2 + valuesPerNode || fields.slice(0, 2 + valuesPerNode).some((field) => !Number.isFinite(field))) {
+			throw new Error(`${path}:${index + 1}: förväntade latitud, longitud och ${valuesPerNode} värden`);
+		}
+		latitudes.push(fields[0]);
+		longitudes.push(fields[1]);
+		values.push(...fields.slice(2, 2 + valuesPerNode));
+	});
+
+	if (latitudes.length === 0) {
+		throw new Error(`${path}: inga noder`);
+	}
+	return { latitudes, longitudes, values };
+}
+
+/**
+ * Minsta avstånd mellan olika koordinatvärden, dvs. rutnätets steg längs en axel
+ */
+function gridStep(coordinates) {
+	const sorted = [...new Set(coordinates)].sort((a, b) => a - b);
+	let step = Infinity;
+	for (let i = 1; i < sorted.length; i++) {
+		step = Math.min(step, sorted[i] - sorted[i - 1]);
+	}
+	return { min: sorted[0], max: sorted[sorted.length - 1], step };
+}
+
+/**
+ * Index längs en axel för en koordinat som ska ligga på rutnätet
+ */
+function nodeIndex(value, min, step) {
+	const position = (value - min) / step;
+	const index = Math.round(position);
+	if (Math.abs(position - index) > NODE_TOLERANCE) {
+		throw new Error(`${value} ligger inte på rutnätet (start ${min}, steg ${step})`);
+	}
+	return index;
+}
+
+/**
+ * Ordnar noderna i ett rutnät med rader från söder och kolumner från väster
+ * Värden som saknas blir NaN.
+ */
+function buildGrid(nodes, valuesPerNode, scale) {
+	const latitude = gridStep(nodes.latitudes);
+	const longitude = gridStep(nodes.longitudes);
+	if (!Number.isFinite(latitude.step) || !Number.isFinite(longitude.step)) {
+		throw new Error('Rutnätet måste ha minst två noder längs varje axel');
+	}
+
+	const rows = nodeIndex(latitude.max, latitude.min, latitude.step) + 1;
+	const columns = nodeIndex(longitude.max, longitude.min, longitude.step) + 1;
+	if (rows > MAX_NODES_PER_AXIS || columns > MAX_NODES_PER_AXIS) {
+		throw new Error(`Rutnätet är för stort: ${rows} × ${columns} noder`);
+	}
+
+	const values = new Float32Array(rows * columns * valuesPerNode).fill(Number.NaN);
+	nodes.latitudes.forEach((lat, node) => {
+		const row = nodeIndex(lat, latitude.min, latitude.step);
+		const column = nodeIndex(nodes.longitudes[node], longitude.min, longitude.step);
+		for (let k = 0; k < valuesPerNode; k++) {
+			values[(row * columns + column) * valuesPerNode + k] = nodes.values[node * valuesPerNode + k] * scale;
+		}
+	});
+
+	return {
+		minLatitude: latitude.min,
+		minLongitude: longitude.min,
+		latitudeStep: latitude.step,
+		longitudeStep: longitude.step,
+		rows,
+		columns,
+		valuesPerNode,
+		values
+	};
+}
+
+// ============================================================================
+// SKRIVNING
+// ============================================================================
+
+/**
+ * Kodar ett rutnät i det binära filformatet
+ */
+function encodeGrid(grid, magic) {
+	const buffer = new ArrayBuffer(GRID_FILE_HEADER_BYTES + grid.values.length * 4);
+	const view = new DataView(buffer);
+	view.setUint32(0, magic, false);
+	view.setUint16(4, grid.rows, true);
+	view.setUint16(6, grid.columns, true);
+	view.setFloat64(8, grid.minLatitude, true);
+	view.setFloat64(16, grid.minLongitude, true);
+	view.setFloat64(24, grid.latitudeStep, true);
+	view.setFloat64(32, grid.longitudeStep, true);
+	grid.values.forEach((value, index) => {
+		view.setFloat32(GRID_FILE_HEADER_BYTES + index * 4, value, true);
+	});
+	return new Uint8Array(buffer);
+}
+
+function writeVelocityGrid(grid, magic, outputDir) {
+	if (grid.values.some(Number.isNaN)) {
+		throw new Error('Hastighetsmodellen saknar noder; rutnätet måste vara fullständigt');
+	}
+	const path = join(outputDir, 'nkg-velocity.bin');
+	writeFileSync(path, encodeGrid(grid, magic));
+	console.log(`${path}: ${grid.rows} × ${grid.columns} noder`);
+}
+
+/**
+ * Antal rutnätssteg per grad; geoidrutorna kräver att en grad är ett helt antal steg
+ */
+function stepsPerDegree(step) {
+	const steps = Math.round(1 / step);
+	if (steps < 1 || Math.abs(steps * step - 1) > NODE_TOLERANCE * step) {
+		throw new Error(`Steget ${step}° delar inte en grad jämnt`);
+	}
+	return steps;
+}
+
+function writeGeoidTiles(grid, magic, outputDir) {
+	const latitudeSteps = stepsPerDegree(grid.latitudeStep);
+	const longitudeSteps = stepsPerDegree(grid.longitudeStep);
+	// Marginal för avrundning i indata, så att en ruta som slutar på sista noden kommer med
+	const maxLatitude = grid.minLatitude + (grid.rows - 1 + NODE_TOLERANCE) * grid.latitudeStep;
+	const maxLongitude = grid.minLongitude + (grid.columns - 1 + NODE_TOLERANCE) * grid.longitudeStep;
+	const tileDir = join(outputDir, 'geoid');
+	mkdirSync(tileDir, { recursive: true });
+
+	let written = 0;
+	let skipped = 0;
+	for (let lat = Math.ceil(grid.minLatitude); lat + 1 <= maxLatitude; lat++) {
+		for (let lon = Math.ceil(grid.minLongitude); lon + 1 <= maxLongitude; lon++) {
+			const firstRow = nodeIndex(lat, grid.minLatitude, grid.latitudeStep);
+			const firstColumn = nodeIndex(lon, grid.minLongitude, grid.longitudeStep);
+			const rows = latitudeSteps + 1;
+			const columns = longitudeSteps + 1;
+			const values = new Float32Array(rows * columns);
+			for (let row = 0; row < rows; row++) {
+				const start = (firstRow + row) * grid.columns + firstColumn;
+				values.set(grid.values.subarray(start, start + columns), row * columns);
+			}
+
+			// Rutor som bara delvis täcks av modellen (t.ex. till havs) utelämnas
+			if (values.some(Number.isNaN)) {
+				skipped++;
+				continue;
+			}
+
+			const tile = {
+				minLatitude: lat,
+				minLongitude: lon,
+				latitudeStep: 1 / latitudeSteps,
+				longitudeStep: 1 / longitudeSteps,
+				rows,
+				columns,
+				valuesPerNode: 1,
+				values
+			};
+			writeFileSync(join(tileDir, `swen17-${lat}-${lon}.bin`), encodeGrid(tile, magic));
+			written++;
+		}
+	}
+	console.log(`${tileDir}: ${written} rutor, ${skipped} ofullständiga rutor utelämnade`);
+}
+
+// ============================================================================
+// HUVUDPROGRAM
+// ============================================================================
+
+const [modelName, inputPath, outputDir = DEFAULT_OUTPUT_DIR] = process.argv.slice(2);
+const model = MODELS[modelName];
+if (model === undefined || inputPath === undefined) {
+	console.error(`Användning: node scripts/make-grids.mjs ${Object.keys(MODELS).join('|')} <indatafil> [utdatakatalog]`);
+	process.exit(1);
+}
+
+mkdirSync(outputDir, { recursive: true });
+const nodes = readNodes(inputPath, model.valuesPerNode);
+model.write(buildGrid(nodes, model.valuesPerNode, model.scale), model.magic, outputDir);
@@ -0,0 +1,17 @@
+// Formatering av koordinater och höjd för visning, delad av huvudtråden och transformeringsworkern.
+
+export const NON_BREAKING_SPACE = '\u00A0';
+export const NOT_AVAILABLE_TEXT = 'Ej\u00A0tillgängligt';
+const DECIMAL_SEPARATOR_PATTERN = /\./g;
+
+export function formatProjectedCoordinate(prefix: 'N' | 'E', value: number, spacing: 1 | 2): string {
+	return `${prefix}${NON_BREAKING_SPACE.repeat(spacing)}${Math.round(value)}`;
+}
+
+export function formatHeight(value: number): string {
+	return `H${NON_BREAKING_SPACE.repeat(2)}${Math.round(value)}${NON_BREAKING_SPACE}m`;
+}
+
+export function formatWgs84Coordinate(prefix: 'N' | 'E', value: number): string {
+	return `${prefix}${NON_BREAKING_SPACE}${value.toString().replace(DECIMAL_SEPARATOR_PATTERN, ",")}°`;
+}
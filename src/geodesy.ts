@@ -0,0 +1,1470 @@
+// Geodetiska beräkningar: SWEREF 99 TM-projektion, driftkorrigering, RH 2000-höjd och Sverigetest.
+// Modulen rör inte DOM eller localStorage och körs i transformeringsworkern (se transform-worker.ts).
+
+import { DEFAULT_TRANSFORM_ENGINE } from './transform-protocol.js';
+
+// ============================================================================
+// TYPE DEFINITIONS AND INTERFACES
+// ============================================================================
+
+declare const proj4: any;
+
+/**
+ * Represents coordinates in the SWEREF 99 TM coordinate system
+ */
+export interface SwerefCoordinates {
+	northing: number;
+	easting: number;
+}
+
+/**
+ * Represents the correction needed for ITRF to ETRS89 continental drift
+ */
+export interface Itrf2Etrs89Correction {
+	dn: number; // North correction in meters
+	de: number; // East correction in meters
+}
+
+/**
+ * Continental drift rate split into north and east components
+ */
+interface DriftRate {
+	north: number; // Meters per millisecond
+	east: number; // Meters per millisecond
+}
+
+/**
+ * Input for batch transformation: interleaved [lat0, lon0, lat1, lon1, ...]
+ * or struct-of-arrays with separate latitude and longitude arrays
+ */
+export type Wgs84BatchInput =
+	| { layout: 'interleaved'; latLon: Float64Array }
+	| { layout: 'separate'; latitudes: Float64Array; longitudes: Float64Array };
+
+/**
+ * Input for inverse batch transformation: interleaved [n0, e0, n1, e1, ...]
+ * or struct-of-arrays with separate northing and easting arrays
+ */
+export type SwerefBatchInput =
+	| { layout: 'interleaved'; northEast: Float64Array }
+	| { layout: 'separate'; northings: Float64Array; eastings: Float64Array };
+
+/**
+ * Transformation engines for WGS84 -> SWEREF 99 TM
+ * 'native' uses the built-in Gauss-Krüger implementation, 'proj4' uses PROJ4JS as reference
+ */
+export type TransformEngine = 'native' | 'proj4';
+
+/**
+ * Precomputed constants for the Gauss-Krüger (Krüger n-series) projection
+ */
+interface KrugerCoefficients {
+	eccentricity: number;
+	scaledRectifyingRadius: number; // k0 * A in meters
+	alpha: Float64Array; // Forward series coefficients α1..α6
+	beta: Float64Array; // Inverse series coefficients β1..β6
+	delta: Float64Array; // Conformal -> geodetic latitude coefficients δ1..δ6
+}
+
+/**
+ * Regular latitude/longitude grid decoded from a binary grid file
+ * (velocity model or geoid tile)
+ */
+interface BinaryGrid {
+	minLatitude: number;
+	minLongitude: number;
+	latitudeStep: number;
+	longitudeStep: number;
+	rows: number;
+	columns: number;
+	valuesPerNode: number;
+	values: Float32Array; // valuesPerNode values per node, row by row from south-west
+}
+
+/**
+ * Uniform grid index over a polygon (see buildPolygonGridIndex)
+ * Each cell is inside, outside or on the boundary. Boundary cells are resolved
+ * with an exact crossing test against the edges that overlap the cell's row.
+ */
+interface PolygonGridIndex {
+	minLatitude: number;
+	minLongitude: number;
+	cellSize: number;
+	rows: number;
+	columns: number;
+	cells: Uint8Array;
+	rowEdgeOffsets: Uint32Array;
+	rowEdges: Uint16Array;
+	vertices: Float64Array;
+}
+
+/**
+ * Diagnostics for the projection cache (see getTransformCacheStats)
+ */
+export interface TransformCacheStats {
+	hits: number;
+	misses: number;
+	size: number;
+}
+
+/**
+ * Represents coordinates in WGS84 decimal degrees
+ */
+export interface Wgs84Coordinates {
+	latitude: number;
+	longitude: number;
+}
+
+// ============================================================================
+// CONFIGURATION CONSTANTS
+// ============================================================================
+
+/**
+ * Geographic bounds for Sweden
+ * Bounding box of SWEDEN_BORDER_POLYGON, used as a cheap first test before the polygon
+ */
+export const SWEDEN_BOUNDS = {
+	MIN_LATITUDE: 55,
+	MAX_LATITUDE: 69.1,
+	MIN_LONGITUDE: 10.9,
+	MAX_LONGITUDE: 24.2
+} as const;
+
+/**
+ * Simplified outline of Swedish territory including the territorial sea
+ * Flat list of [latitude, longitude] pairs in decimal degrees, clockwise from Treriksröset.
+ * Sea boundaries follow the outer limit of the territorial sea or the median line
+ * towards Denmark, Åland and Finland. Accuracy is a few kilometres, which is enough
+ * to warn about positions outside Sweden.
+ * 
+ * @see SWEREF99-DEFINITION.md - Section "Sweden Border Test"
+ */
+const SWEDEN_BORDER_POLYGON: readonly number[] = [
+	// Riksgränsen mot Norge, från Treriksröset söderut
+	69.06, 20.55,
+	68.90, 20.20,
+	68.62, 19.95,
+	68.50, 19.00,
+	68.43, 18.12,
+	68.10, 18.05,
+	67.95, 17.30,
+	67.55, 16.35,
+	67.20, 16.40,
+	66.90, 16.05,
+	66.50, 15.50,
+	66.15, 15.00,
+	65.80, 14.55,
+	65.45, 14.45,
+	65.10, 14.30,
+	64.85, 13.70,
+	64.50, 14.10,
+	64.10, 13.30,
+	63.75, 12.45,
+	63.30, 12.10,
+	63.00, 12.05,
+	62.60, 12.10,
+	62.05, 12.15,
+	61.55, 12.45,
+	61.00, 12.35,
+	60.90, 12.25,
+	60.50, 12.55,
+	60.10, 12.45,
+	59.85, 11.85,
+	59.45, 11.75,
+	59.12, 11.45,
+	59.05, 11.10,
+	// Territorialhavet längs västkusten, Öresund och sydkusten
+	58.95, 10.90,
+	58.30, 11.05,
+	57.70, 11.45,
+	57.20, 11.75,
+	56.70, 12.15,
+	56.35, 12.35,
+	56.12, 12.50,
+	56.04, 12.66,
+	55.90, 12.73,
+	55.70, 12.85,
+	55.55, 12.87,
+	55.40, 12.72,
+	55.25, 12.75,
+	55.10, 13.20,
+	55.10, 14.00,
+	55.30, 14.45,
+	55.45, 14.75,
+	55.45, 15.30,
+	55.55, 15.50,
+	55.85, 16.10,
+	// Östersjön runt Öland och Gotland
+	56.20, 16.55,
+	56.60, 16.95,
+	57.00, 17.25,
+	57.40, 17.30,
+	56.85, 18.05,
+	56.85, 18.30,
+	57.20, 19.00,
+	57.70, 19.20,
+	58.00, 19.45,
+	58.45, 19.45,
+	58.80, 19.20,
+	59.30, 19.35,
+	59.80, 19.45,
+	// Ålands hav, Bottenhavet och Bottenviken (mittlinjen mot Finland)
+	60.30, 19.13,
+	60.60, 19.55,
+	61.30, 19.60,
+	62.20, 20.00,
+	62.90, 20.30,
+	63.30, 20.75,
+	63.55, 20.95,
+	63.90, 21.20,
+	64.40, 21.90,
+	64.90, 22.40,
+	65.30, 23.20,
+	65.60, 23.80,
+	// Riksgränsen mot Finland längs Torne- och Muonioälven
+	65.75, 24.17,
+	65.86, 24.15,
+	66.00, 23.92,
+	66.40, 23.68,
+	66.80, 23.90,
+	67.20, 23.60,
+	67.60, 23.55,
+	67.95, 23.65,
+	68.20, 23.15,
+	68.44, 22.52,
+	68.70, 21.70,
+	68.90, 21.00
+];
+
+/**
+ * Cell size of the Sweden border grid index (degrees)
+ * About 3 000 cells, most of which are entirely inside or outside the polygon.
+ */
+const SWEDEN_BORDER_CELL_SIZE = 0.25;
+
+const POLYGON_CELL_OUTSIDE = 0;
+const POLYGON_CELL_INSIDE = 1;
+const POLYGON_CELL_BOUNDARY = 2;
+
+/**
+ * ETRS89 and SWEREF 99 epoch constants
+ * Used for calculating continental drift correction
+ */
+const ETRS89_EPOCH: number = 1989.0;
+const SWEREF99_EPOCH: number = 1999.5;
+
+/**
+ * ETRS89 epoch as a Unix timestamp (ms) and length of a Julian year (ms)
+ * Used to evaluate the drift correction directly from GeolocationPosition.timestamp.
+ * Using the Julian year instead of calendar years changes the result by less than 0.1 mm.
+ */
+const ETRS89_EPOCH_MS: number = Date.UTC(ETRS89_EPOCH, 0, 1);
+const MILLISECONDS_PER_YEAR: number = 365.25 * 24 * 60 * 60 * 1000;
+
+/**
+ * European plate velocity parameters
+ * 
+ * The European tectonic plate moves approximately 2.5 cm/year relative to ITRF
+ * in a northeast direction (approximately 25° from north). This causes a 
+ * time-dependent difference between WGS84 (realized via ITRF) and SWEREF 99
+ * (ETRS89 fixed at epoch 1999.5).
+ * 
+ * These values are used to calculate drift correction between the moving ITRF
+ * frame (used by GPS/WGS84) and the fixed ETRS89 frame (used by SWEREF 99).
+ * 
+ * Values verified against:
+ * - EUREF Technical Notes on European plate motion
+ * - Lantmäteriet technical documentation on SWEREF 99
+ * 
+ * @see SWEREF99-DEFINITION.md - Section "Continental Drift Correction"
+ * @see http://www.euref.eu/ - European Reference Frame
+ */
+const PLATE_VELOCITY = {
+	METERS_PER_YEAR: 0.025, // 2.5 cm/år
+	AZIMUTH_DEGREES: 25 // grader från norr, öster är positiv
+} as const;
+
+/**
+ * Binary grid file layout (little-endian), shared by the velocity model and geoid tiles:
+ * - bytes 0-3: magic identifying the model
+ * - bytes 4-5: uint16 number of rows (latitude), bytes 6-7: uint16 number of columns (longitude)
+ * - bytes 8-39: float64 min latitude, min longitude, latitude step, longitude step (degrees)
+ * - bytes 40-: float32 values per node, rows from south, columns from west
+ */
+const GRID_FILE_HEADER_BYTES = 40;
+
+/**
+ * Gridded velocity model (NKG-style) used instead of PLATE_VELOCITY where available
+ * Two values per node: [north, east] velocity in m/year.
+ * 
+ * @see SWEREF99-DEFINITION.md - Section "Gridded Velocity Model"
+ */
+const VELOCITY_GRID_URL = '/data/nkg-velocity.bin';
+const VELOCITY_GRID_MAGIC = 0x4e4b4756; // "NKGV"
+
+/**
+ * Minimum time before a grid file that failed with a network or server error is requested again
+ * A missing (404) or malformed file is not requested again during the session.
+ */
+const GRID_RETRY_DELAY_MS = 60000;
+
+/**
+ * Geoid model (SWEN17_RH2000-style) for RH 2000 normal heights, split into 1°×1° tiles
+ * One value per node: geoid height above the GRS80 ellipsoid in meters. Each tile
+ * includes its north and east edge nodes so interpolation never needs a neighbouring tile.
+ * Tile files are named after their south-west corner, e.g. /data/geoid/swen17-59-18.bin.
+ * 
+ * @see SWEREF99-DEFINITION.md - Section "RH 2000 Heights"
+ */
+const GEOID_TILE_URL_PREFIX = '/data/geoid/swen17-';
+const GEOID_TILE_MAGIC = 0x47454f49; // "GEOI"
+const GEOID_TILE_CACHE_SIZE = 4;
+
+const WGS84_PROJECTION = 'EPSG:4326';
+const SWEREF99_PROJECTION = 'EPSG:3006';
+const SWEREF99_TM_PROJ_DEFINITION = '+proj=utm +zone=33 +ellps=GRS80 +towgs84=0,0,0,0,0,0,0 +units=m +no_defs +type=crs';
+
+/**
+ * PROJ4JS (UMD build), loaded on demand for the 'proj4' reference engine only
+ * It registers itself as the global proj4 in both the worker and the main thread.
+ */
+const PROJ4_SCRIPT_URL = '/proj4.js';
+
+/**
+ * GRS80 ellipsoid parameters
+ * @see SWEREF99-DEFINITION.md - Section "Native Gauss-Krüger Engine"
+ */
+const GRS80_ELLIPSOID = {
+	SEMI_MAJOR_AXIS: 6378137,
+	FLATTENING: 1 / 298.257222101
+} as const;
+
+/**
+ * SWEREF 99 TM projection parameters (EPSG:3006, identical to UTM zone 33)
+ */
+const SWEREF99_TM_PARAMETERS = {
+	CENTRAL_MERIDIAN_DEGREES: 15,
+	SCALE_FACTOR: 0.9996,
+	FALSE_NORTHING: 0,
+	FALSE_EASTING: 500000
+} as const;
+
+const DEGREES_TO_RADIANS = Math.PI / 180;
+
+/**
+ * Cache in front of the SWEREF 99 TM projection
+ * Each entry holds the projection and its derivatives at the node of a 0.001° cell (about
+ * 110 × 55 m in Sweden), and positions in the cell are projected linearly from the node.
+ * The linearization error is about 0.1 mm, far below the whole metres shown by
+ * formatProjectedCoordinate. Cells this size keep a stationary device with metres of
+ * GNSS jitter, and mostly a walking one, within cached cells.
+ */
+const TRANSFORM_CACHE_SIZE = 16;
+const TRANSFORM_CACHE_CELLS_PER_DEGREE = 1000;
+
+/**
+ * Layout of the numeric cache key: cell row above cell column, both offset to be
+ * non-negative, so every cell has its own exact integer key
+ */
+const TRANSFORM_CACHE_LATITUDE_OFFSET = 90 * TRANSFORM_CACHE_CELLS_PER_DEGREE;
+const TRANSFORM_CACHE_LONGITUDE_OFFSET = 180 * TRANSFORM_CACHE_CELLS_PER_DEGREE;
+const TRANSFORM_CACHE_LONGITUDE_STEPS = 2 * TRANSFORM_CACHE_LONGITUDE_OFFSET + 1;
+
+// ============================================================================
+// UTILITY FUNCTIONS
+// ============================================================================
+
+export function isValidLatitude(latitude: number): boolean {
+	return Number.isFinite(latitude) && latitude >= -90 && latitude <= 90;
+}
+
+export function isValidLongitude(longitude: number): boolean {
+	return Number.isFinite(longitude) && longitude >= -180 && longitude <= 180;
+}
+
+function formatCoordinateValue(value: number): number | string {
+	return Number.isFinite(value) ? value : 'ogiltigt';
+}
+
+/**
+ * Crossing-number test for a point using only the edges that overlap one grid row
+ * A horizontal line through the point can only cross edges that overlap its row,
+ * so the result is the same as testing every edge of the polygon.
+ */
+function isInsidePolygonRow(index: PolygonGridIndex, row: number, lat: number, lon: number): boolean {
+	const vertices = index.vertices;
+	const vertexCount = vertices.length / 2;
+	let inside = false;
+
+	for (let k = index.rowEdgeOffsets[row]; k < index.rowEdgeOffsets[row + 1]; k++) {
+		const i = index.rowEdges[k];
+		const j = i + 1 === vertexCount ? 0 : i + 1;
+		const lat1 = vertices[2 * i];
+		const lat2 = vertices[2 * j];
+		if ((lat1 > lat) !== (lat2 > lat)) {
+			const lon1 = vertices[2 * i + 1];
+			const crossingLon = lon1 + ((lat - lat1) * (vertices[2 * j + 1] - lon1)) / (lat2 - lat1);
+			if (lon < crossingLon) {
+				inside = !inside;
+			}
+		}
+	}
+	return inside;
+}
+
+/**
+ * Precompile a polygon into a uniform grid index
+ * 
+ * Every edge is clipped to each grid row it overlaps, and the cells it passes
+ * through are marked as boundary cells. The remaining cells lie entirely inside
+ * or outside the polygon and are classified once from their centre point.
+ * 
+ * @param vertices - Flat list of [latitude, longitude] pairs (implicitly closed)
+ * @param cellSize - Cell size in degrees
+ * @returns Grid index for isInsidePolygonIndex()
+ */
+function buildPolygonGridIndex(vertices: readonly number[], cellSize: number): PolygonGridIndex {
+	const coordinates = Float64Array.from(vertices);
+	const vertexCount = coordinates.length / 2;
+
+	let minLatitude = Infinity;
+	let maxLatitude = -Infinity;
+	let minLongitude = Infinity;
+	let maxLongitude = -Infinity;
+	for (let i = 0; i < vertexCount; i++) {
+		minLatitude = Math.min(minLatitude, coordinates[2 * i]);
+		maxLatitude = Math.max(maxLatitude, coordinates[2 * i]);
+		minLongitude = Math.min(minLongitude, coordinates[2 * i + 1]);
+		maxLongitude = Math.max(maxLongitude, coordinates[2 * i + 1]);
+	}
+
+	const rows = Math.max(1, Math.ceil((maxLatitude - minLatitude) / cellSize));
+	const columns = Math.max(1, Math.ceil((maxLongitude - minLongitude) / cellSize));
+	const cells = new Uint8Array(rows * columns);
+	const rowEdgeOffsets = new Uint32Array(rows + 1);
+	const rowEdgeList: number[] = [];
+
+	for (let row = 0; row < rows; row++) {
+		const southLatitude = minLatitude + row * cellSize;
+		const northLatitude = southLatitude + cellSize;
+		rowEdgeOffsets[row] = rowEdgeList.length;
+
+		for (let i = 0; i < vertexCount; i++) {
+			const j = i + 1 === vertexCount ? 0 : i + 1;
+			const lat1 = coordinates[2 * i];
+			const lon1 = coordinates[2 * i + 1];
+			const lat2 = coordinates[2 * j];
+			const lon2 = coordinates[2 * j + 1];
+			if (Math.max(lat1, lat2) < southLatitude || Math.min(lat1, lat2) > northLatitude) {
+				continue;
+			}
+			rowEdgeList.push(i);
+
+			// Longitude span of the part of the edge that lies within the row
+			let westLongitude = Math.min(lon1, lon2);
+			let eastLongitude = Math.max(lon1, lon2);
+			if (lat1 !== lat2) {
+				const t1 = Math.min(1, Math.max(0, (southLatitude - lat1) / (lat2 - lat1)));
+				const t2 = Math.min(1, Math.max(0, (northLatitude - lat1) / (lat2 - lat1)));
+				const clippedLon1 = lon1 + t1 * (lon2 - lon1);
+				const clippedLon2 = lon1 + t2 * (lon2 - lon1);
+				westLongitude = Math.min(clippedLon1, clippedLon2);
+				eastLongitude = Math.max(clippedLon1, clippedLon2);
+			}
+
+			const firstColumn = Math.max(0, Math.floor((westLongitude - minLongitude) / cellSize));
+			const lastColumn = Math.min(columns - 1, Math.floor((eastLongitude - minLongitude) / cellSize));
+			for (let column = firstColumn; column <= lastColumn; column++) {
+				cells[row * columns + column] = POLYGON_CELL_BOUNDARY;
+			}
+		}
+	}
+	rowEdgeOffsets[rows] = rowEdgeList.length;
+
+	const index: PolygonGridIndex = {
+		minLatitude,
+		minLongitude,
+		cellSize,
+		rows,
+		columns,
+		cells,
+		rowEdgeOffsets,
+		rowEdges: Uint16Array.from(rowEdgeList),
+		vertices: coordinates
+	};
+
+	for (let row = 0; row < rows; row++) {
+		const centreLatitude = minLatitude + (row + 0.5) * cellSize;
+		for (let column = 0; column < columns; column++) {
+			if (cells[row * columns + column] !== POLYGON_CELL_BOUNDARY) {
+				const centreLongitude = minLongitude + (column + 0.5) * cellSize;
+				cells[row * columns + column] = isInsidePolygonRow(index, row, centreLatitude, centreLongitude)
+					? POLYGON_CELL_INSIDE
+					: POLYGON_CELL_OUTSIDE;
+			}
+		}
+	}
+
+	return index;
+}
+
+/**
+ * Test whether a point lies inside an indexed polygon
+ * O(1) for cells entirely inside or outside; exact edge tests only in boundary cells.
+ */
+function isInsidePolygonIndex(index: PolygonGridIndex, lat: number, lon: number): boolean {
+	const row = Math.floor((lat - index.minLatitude) / index.cellSize);
+	const column = Math.floor((lon - index.minLongitude) / index.cellSize);
+	if (row < 0 || row >= index.rows || column < 0 || column >= index.columns) {
+		return false;
+	}
+
+	const cell = index.cells[row * index.columns + column];
+	if (cell !== POLYGON_CELL_BOUNDARY) {
+		return cell === POLYGON_CELL_INSIDE;
+	}
+	return isInsidePolygonRow(index, row, lat, lon);
+}
+
+const swedenBorderIndex: PolygonGridIndex = buildPolygonGridIndex(SWEDEN_BORDER_POLYGON, SWEDEN_BORDER_CELL_SIZE);
+
+export function isWithinSwedenBounds(latitude: number, longitude: number): boolean {
+	return (
+		latitude >= SWEDEN_BOUNDS.MIN_LATITUDE &&
+		latitude <= SWEDEN_BOUNDS.MAX_LATITUDE &&
+		longitude >= SWEDEN_BOUNDS.MIN_LONGITUDE &&
+		longitude <= SWEDEN_BOUNDS.MAX_LONGITUDE
+	);
+}
+
+/**
+ * Checks if a position is within Swedish territory
+ * @param latitude - Latitude in WGS84 decimal degrees
+ * @param longitude - Longitude in WGS84 decimal degrees
+ * @returns true if position is inside the simplified border polygon of Sweden
+ */
+export function isInSweden(latitude: number, longitude: number): boolean {
+	if (!isValidLatitude(latitude) || !isValidLongitude(longitude)) {
+		return false;
+	}
+
+	return isWithinSwedenBounds(latitude, longitude) && isInsidePolygonIndex(swedenBorderIndex, latitude, longitude);
+}
+
+/**
+ * Beräkna driftens hastighet i nord- och östled en gång vid appstart
+ * 
+ * Modellen är linjär i tiden, så korrigeringen för en given epok blir en
+ * multiplikation per komponent utan Date- eller trigonometrianrop per position.
+ * 
+ * @returns Drift rate in meters per millisecond
+ */
+function calculateDriftRate(): DriftRate {
+	const azimuthRad: number = (PLATE_VELOCITY.AZIMUTH_DEGREES * Math.PI) / 180;
+	const metersPerMs: number = PLATE_VELOCITY.METERS_PER_YEAR / MILLISECONDS_PER_YEAR;
+	return {
+		north: metersPerMs * Math.cos(azimuthRad),
+		east: metersPerMs * Math.sin(azimuthRad)
+	};
+}
+
+const driftRate: DriftRate = calculateDriftRate();
+
+// Hastighetsmodellen laddas lat efter första positionen; till dess används PLATE_VELOCITY
+let velocityGrid: BinaryGrid | null = null;
+let isVelocityGridRequested = false;
+let velocityGridRetryTime = 0;
+// Återanvänd buffert för driftens hastighet [nord, öst] i m/ms
+const driftRateScratch = new Float64Array(2);
+
+/**
+ * Parses a binary grid file (see GRID_FILE_HEADER_BYTES for the layout)
+ * @param buffer - Raw grid file contents
+ * @param magic - Expected magic number for the model
+ * @param valuesPerNode - Number of float32 values stored per grid node
+ * @returns Decoded grid, or null if the data is malformed
+ */
+function parseBinaryGrid(buffer: ArrayBuffer, magic: number, valuesPerNode: number): BinaryGrid | null {
+	if (buffer.byteLength < GRID_FILE_HEADER_BYTES) {
+		return null;
+	}
+
+	const view = new DataView(buffer);
+	if (view.getUint32(0, false) !== magic) {
+		return null;
+	}
+
+	const rows = view.getUint16(4, true);
+	const columns = view.getUint16(6, true);
+	const latitudeStep = view.getFloat64(24, true);
+	const longitudeStep = view.getFloat64(32, true);
+	const valueCount = rows * columns * valuesPerNode;
+
+	if (rows < 2 || columns < 2 || !(latitudeStep > 0) || !(longitudeStep > 0) ||
+		buffer.byteLength < GRID_FILE_HEADER_BYTES + valueCount * 4) {
+		return null;
+	}
+
+	return {
+		minLatitude: view.getFloat64(8, true),
+		minLongitude: view.getFloat64(16, true),
+		latitudeStep,
+		longitudeStep,
+		rows,
+		columns,
+		valuesPerNode,
+		// Float32Array-vyn kräver little-endian-plattform, vilket gäller alla webbläsare i praktiken
+		values: new Float32Array(buffer, GRID_FILE_HEADER_BYTES, valueCount)
+	};
+}
+
+/**
+ * Samples a binary grid with bilinear interpolation
+ * 
+ * @param grid - Decoded grid
+ * @param lat - Latitude in decimal degrees
+ * @param lon - Longitude in decimal degrees
+ * @param out - Receives grid.valuesPerNode interpolated values
+ * @returns false if the position is outside the grid
+ */
+function sampleBinaryGrid(grid: BinaryGrid, lat: number, lon: number, out: Float64Array): boolean {
+	const y = (lat - grid.minLatitude) / grid.latitudeStep;
+	const x = (lon - grid.minLongitude) / grid.longitudeStep;
+	if (!(y >= 0 && y <= grid.rows - 1 && x >= 0 && x <= grid.columns - 1)) {
+		return false;
+	}
+
+	// Håll cellindex inom nätet så att punkter på nord-/östkanten använder sista cellen
+	const row = Math.min(Math.floor(y), grid.rows - 2);
+	const column = Math.min(Math.floor(x), grid.columns - 2);
+	const fy = y - row;
+	const fx = x - column;
+	const stride = grid.valuesPerNode;
+	const v = grid.values;
+	const i00 = stride * (row * grid.columns + column);
+	const i01 = i00 + stride;
+	const i10 = i00 + stride * grid.columns;
+	const i11 = i10 + stride;
+
+	const w00 = (1 - fx) * (1 - fy);
+	const w01 = fx * (1 - fy);
+	const w10 = (1 - fx) * fy;
+	const w11 = fx * fy;
+
+	for (let k = 0; k < stride; k++) {
+		out[k] = w00 * v[i00 + k] + w01 * v[i01 + k] + w10 * v[i10 + k] + w11 * v[i11 + k];
+	}
+	return true;
+}
+
+/**
+ * Writes the drift rate [north, east] in m/ms at a position into out
+ * Uses the velocity grid when it is loaded and covers the position, otherwise PLATE_VELOCITY.
+ */
+function sampleDriftRate(lat: number, lon: number, out: Float64Array): void {
+	if (velocityGrid !== null && sampleBinaryGrid(velocityGrid, lat, lon, out)) {
+		out[0] /= MILLISECONDS_PER_YEAR;
+		out[1] /= MILLISECONDS_PER_YEAR;
+		return;
+	}
+
+	out[0] = driftRate.north;
+	out[1] = driftRate.east;
+}
+
+/**
+ * Fetches and parses a binary grid file
+ * 
+ * @returns Decoded grid, or null if the file does not exist or is malformed. Rejects on
+ * network and server errors, which may be temporary (e.g. offline).
+ */
+function fetchBinaryGrid(url: string, magic: number, valuesPerNode: number): Promise<BinaryGrid | null> {
+	return fetch(url).then((response) => {
+		if (response.status === 404) {
+			return null;
+		}
+		if (!response.ok) {
+			throw new Error(`HTTP ${response.status}`);
+		}
+		return response.arrayBuffer().then((buffer) => {
+			const grid = parseBinaryGrid(buffer, magic, valuesPerNode);
+			if (grid === null) {
+				console.warn(`${url} har ogiltigt format`);
+			}
+			return grid;
+		});
+	});
+}
+
+/**
+ * Starts loading the velocity grid in the background
+ * 
+ * Called after each position has been transformed so that the download never delays
+ * the first fix. A missing or invalid grid keeps PLATE_VELOCITY for the session; after
+ * a network error the grid is requested again once GRID_RETRY_DELAY_MS has passed.
+ */
+export function loadVelocityGrid(): void {
+	if (isVelocityGridRequested || typeof fetch !== 'function' || Date.now() < velocityGridRetryTime) {
+		return;
+	}
+	isVelocityGridRequested = true;
+
+	fetchBinaryGrid(VELOCITY_GRID_URL, VELOCITY_GRID_MAGIC, 2)
+		.then((grid) => {
+			velocityGrid = grid;
+		})
+		.catch((error) => {
+			isVelocityGridRequested = false;
+			velocityGridRetryTime = Date.now() + GRID_RETRY_DELAY_MS;
+			console.warn('Hastighetsmodellen kunde inte laddas, försöker igen senare:', error);
+		});
+}
+
+/**
+ * Beräkna tidskorrigering för ITRF/ETRS89-drift
+ * 
+ * WGS84 (realiserat via ITRF) och SWEREF 99 (ETRS89 epoch 1999.5) 
+ * skiljer sig med tiden pga. kontinentaldrift i Europa.
+ * Korrigeringen beräknas för observationens egen epok, så att en app som
+ * står öppen länge eller importerade punkter inte får en inaktuell förskjutning.
+ * Med en position används samma hastighet som wgs84_to_sweref99tm, dvs.
+ * hastighetsmodellen när den är laddad.
+ * 
+ * @param timestamp - Observation epoch as Unix timestamp in ms (default: now)
+ * @param lat - Latitude in WGS84 decimal degrees (optional, omit for the uniform PLATE_VELOCITY)
+ * @param lon - Longitude in WGS84 decimal degrees (optional, omit for the uniform PLATE_VELOCITY)
+ * @returns Correction values for northing and easting in meters
+ */
+export function calculateItrf2Etrs89Correction(timestamp: number = Date.now(), lat?: number, lon?: number): Itrf2Etrs89Correction {
+	// Tid sedan ETRS89 fixerades
+	const elapsedMs: number = timestamp - ETRS89_EPOCH_MS;
+
+	if (lat === undefined || lon === undefined) {
+		driftRateScratch[0] = driftRate.north;
+		driftRateScratch[1] = driftRate.east;
+	} else {
+		sampleDriftRate(lat, lon, driftRateScratch);
+	}
+
+	// Total förskjutning sedan ETRS89 epoch
+	return {
+		dn: driftRateScratch[0] * elapsedMs,
+		de: driftRateScratch[1] * elapsedMs
+	};
+}
+
+// Senast använda geoidrutor, äldst först (Map behåller insättningsordning)
+const geoidTileCache = new Map<number, BinaryGrid>();
+const pendingGeoidTiles = new Set<number>();
+const unavailableGeoidTiles = new Set<number>();
+// Rutor som misslyckats med nätverks- eller serverfel: tidigaste tid för nästa försök
+const geoidTileRetryTimes = new Map<number, number>();
+const geoidScratch = new Float64Array(1);
+
+/**
+ * Numeric key for the 1°×1° geoid tile containing a position (no string allocation per fix)
+ */
+function getGeoidTileKey(lat: number, lon: number): number {
+	return (Math.floor(lat) + 90) * 360 + (Math.floor(lon) + 180);
+}
+
+/**
+ * Stores a decoded geoid tile and evicts the least recently used tiles
+ */
+function storeGeoidTile(key: number, tile: BinaryGrid): void {
+	geoidTileCache.delete(key);
+	geoidTileCache.set(key, tile);
+	while (geoidTileCache.size > GEOID_TILE_CACHE_SIZE) {
+		const oldestKey = geoidTileCache.keys().next().value as number;
+		geoidTileCache.delete(oldestKey);
+	}
+}
+
+/**
+ * Starts loading the geoid tile containing a position
+ * 
+ * A missing (404) or malformed tile is not requested again during the session; after a
+ * network error the tile is requested again once GRID_RETRY_DELAY_MS has passed.
+ * The service worker keeps fetched tiles for offline use.
+ */
+function loadGeoidTile(lat: number, lon: number): void {
+	const key = getGeoidTileKey(lat, lon);
+	if (pendingGeoidTiles.has(key) || unavailableGeoidTiles.has(key) || typeof fetch !== 'function' ||
+		Date.now() < (geoidTileRetryTimes.get(key) ?? 0)) {
+		return;
+	}
+	pendingGeoidTiles.add(key);
+
+	fetchBinaryGrid(`${GEOID_TILE_URL_PREFIX}${Math.floor(lat)}-${Math.floor(lon)}.bin`, GEOID_TILE_MAGIC, 1)
+		.then((tile) => {
+			geoidTileRetryTimes.delete(key);
+			if (tile === null) {
+				unavailableGeoidTiles.add(key);
+				return;
+			}
+			storeGeoidTile(key, tile);
+		})
+		.catch((error) => {
+			geoidTileRetryTimes.set(key, Date.now() + GRID_RETRY_DELAY_MS);
+			console.warn('Geoidruta kunde inte laddas, försöker igen senare:', error);
+		})
+		.finally(() => {
+			pendingGeoidTiles.delete(key);
+		});
+}
+
+/**
+ * Beräkna normalhöjd i RH 2000 från ellipsoidisk höjd
+ * 
+ * H = h - N, där N är geoidhöjden från geoidmodellen. Om rutan för positionen
+ * inte är laddad startas nedladdningen och NaN returneras tills den finns.
+ * 
+ * @param lat - Latitude in decimal degrees
+ * @param lon - Longitude in decimal degrees
+ * @param ellipsoidalHeight - Height above the ellipsoid in meters (position.coords.altitude)
+ * @returns RH 2000 normal height in meters, or NaN if unavailable
+ */
+export function calculateRh2000Height(lat: number, lon: number, ellipsoidalHeight: number): number {
+	if (!Number.isFinite(ellipsoidalHeight) || !isValidLatitude(lat) || !isValidLongitude(lon)) {
+		return Number.NaN;
+	}
+
+	const key = getGeoidTileKey(lat, lon);
+	const tile = geoidTileCache.get(key);
+	if (tile === undefined) {
+		loadGeoidTile(lat, lon);
+		return Number.NaN;
+	}
+
+	// Markera rutan som senast använd
+	geoidTileCache.delete(key);
+	geoidTileCache.set(key, tile);
+
+	if (!sampleBinaryGrid(tile, lat, lon, geoidScratch)) {
+		return Number.NaN;
+	}
+	return ellipsoidalHeight - geoidScratch[0];
+}
+
+let isSwerefProjectionDefined = false;
+let isProj4Requested = false;
+
+/**
+ * Starts loading PROJ4JS in the background (only once)
+ * 
+ * The native engine does not use PROJ4JS, so the default path never downloads it.
+ * The service worker caches it at runtime once it has been fetched.
+ */
+function loadProj4(): void {
+	if (isProj4Requested) {
+		return;
+	}
+	isProj4Requested = true;
+
+	import(PROJ4_SCRIPT_URL).catch((error) => {
+		console.warn('PROJ4JS kunde inte laddas, referensmotorn är inte tillgänglig:', error);
+	});
+}
+
+/**
+ * Ensures the SWEREF 99 projection definition is registered before transforms run.
+ * Starts loading PROJ4JS on first use; until it has loaded no transform is possible.
+ * @returns true when proj4 is ready to transform coordinates
+ */
+function ensureSwerefProjection(): boolean {
+	if (typeof proj4 === 'undefined') {
+		loadProj4();
+		return false;
+	}
+
+	if (isSwerefProjectionDefined) {
+		return true;
+	}
+
+	try {
+		const definitionExists = proj4.defs(SWEREF99_PROJECTION);
+		if (!definitionExists) {
+			proj4.defs(SWEREF99_PROJECTION, SWEREF99_TM_PROJ_DEFINITION);
+		}
+
+		isSwerefProjectionDefined = true;
+		return true;
+	} catch (error) {
+		console.warn('SWEREF 99-projektion kunde inte registreras:', error);
+		return false;
+	}
+}
+
+/**
+ * Beräkna koefficienterna för Krügers n-serier (6:e ordningen) en gång
+ *
+ * Serierna är desamma som PROJ (etmerc) och Lantmäteriets formler för
+ * Gauss-Krügers projektion använder, vilket ger överensstämmelse med proj4
+ * på under millimeternivå inom hela Sverige. Både framåt- och inversserierna
+ * beräknas här så att inverstransformationen kostar ungefär lika mycket.
+ *
+ * @see Karney, C. F. F. (2011), "Transverse Mercator with an accuracy of a few nanometers"
+ * @returns Precomputed coefficients for the GRS80 ellipsoid and SWEREF 99 TM scale factor
+ */
+function calculateKrugerCoefficients(): KrugerCoefficients {
+	const f = GRS80_ELLIPSOID.FLATTENING;
+	const n = f / (2 - f);
+	const n2 = n * n;
+	const n3 = n2 * n;
+	const n4 = n3 * n;
+	const n5 = n4 * n;
+	const n6 = n5 * n;
+
+	// Rektifierande radie A
+	const rectifyingRadius = (GRS80_ELLIPSOID.SEMI_MAJOR_AXIS / (1 + n)) * (1 + n2 / 4 + n4 / 64 + n6 / 256);
+
+	const alpha = new Float64Array([
+		n / 2 - (2 * n2) / 3 + (5 * n3) / 16 + (41 * n4) / 180 - (127 * n5) / 288 + (7891 * n6) / 37800,
+		(13 * n2) / 48 - (3 * n3) / 5 + (557 * n4) / 1440 + (281 * n5) / 630 - (1983433 * n6) / 1935360,
+		(61 * n3) / 240 - (103 * n4) / 140 + (15061 * n5) / 26880 + (167603 * n6) / 181440,
+		(49561 * n4) / 161280 - (179 * n5) / 168 + (6601661 * n6) / 7257600,
+		(34729 * n5) / 80640 - (3418889 * n6) / 1995840,
+		(212378941 * n6) / 319334400
+	]);
+
+	const beta = new Float64Array([
+		n / 2 - (2 * n2) / 3 + (37 * n3) / 96 - n4 / 360 - (81 * n5) / 512 + (96199 * n6) / 604800,
+		n2 / 48 + n3 / 15 - (437 * n4) / 1440 + (46 * n5) / 105 - (1118711 * n6) / 3870720,
+		(17 * n3) / 480 - (37 * n4) / 840 - (209 * n5) / 4480 + (5569 * n6) / 90720,
+		(4397 * n4) / 161280 - (11 * n5) / 504 - (830251 * n6) / 7257600,
+		(4583 * n5) / 161280 - (108847 * n6) / 3991680,
+		(20648693 * n6) / 638668800
+	]);
+
+	// Konform latitud -> geodetisk latitud utan iteration
+	const delta = new Float64Array([
+		2 * n - (2 * n2) / 3 - 2 * n3 + (116 * n4) / 45 + (26 * n5) / 45 - (2854 * n6) / 675,
+		(7 * n2) / 3 - (8 * n3) / 5 - (227 * n4) / 45 + (2704 * n5) / 315 + (2323 * n6) / 945,
+		(56 * n3) / 15 - (136 * n4) / 35 - (1262 * n5) / 105 + (73814 * n6) / 2835,
+		(4279 * n4) / 630 - (332 * n5) / 35 - (399572 * n6) / 14175,
+		(4174 * n5) / 315 - (144838 * n6) / 6237,
+		(601676 * n6) / 22275
+	]);
+
+	return {
+		eccentricity: Math.sqrt(f * (2 - f)),
+		scaledRectifyingRadius: SWEREF99_TM_PARAMETERS.SCALE_FACTOR * rectifyingRadius,
+		alpha,
+		beta,
+		delta
+	};
+}
+
+// Beräkna koefficienterna en gång vid appstart
+const krugerCoefficients: KrugerCoefficients = calculateKrugerCoefficients();
+const centralMeridianRadians: number = SWEREF99_TM_PARAMETERS.CENTRAL_MERIDIAN_DEGREES * DEGREES_TO_RADIANS;
+// Återanvänd buffert för [northing, easting] så att projektionen inte allokerar per anrop
+const projectionScratch = new Float64Array(2);
+
+/**
+ * Projects geodetic coordinates to SWEREF 99 TM using the Krüger n-series
+ *
+ * Writes the result into a caller-supplied buffer so the hot path does not allocate.
+ * No drift correction is applied here.
+ *
+ * @param lat - Latitude in decimal degrees (GRS80/ETRS89)
+ * @param lon - Longitude in decimal degrees (GRS80/ETRS89)
+ * @param out - Output buffer receiving northing at out[offset] and easting at out[offset + 1]
+ * @param offset - Index of the northing slot in the output buffer
+ */
+function projectGaussKruger(lat: number, lon: number, out: Float64Array, offset: number): void {
+	const { eccentricity, scaledRectifyingRadius, alpha } = krugerCoefficients;
+	const phi = lat * DEGREES_TO_RADIANS;
+	const lambda = lon * DEGREES_TO_RADIANS - centralMeridianRadians;
+
+	// Konform latitud uttryckt som tan(χ)
+	const sinPhi = Math.sin(phi);
+	const tau = Math.sinh(Math.atanh(sinPhi) - eccentricity * Math.atanh(eccentricity * sinPhi));
+	const xiPrime = Math.atan2(tau, Math.cos(lambda));
+	const etaPrime = Math.atanh(Math.sin(lambda) / Math.sqrt(1 + tau * tau));
+
+	// Multipelvinklar via additionssatser istället för sin/cos/sinh/cosh per term
+	const sin2Xi = Math.sin(2 * xiPrime);
+	const cos2Xi = Math.cos(2 * xiPrime);
+	const sinh2Eta = Math.sinh(2 * etaPrime);
+	const cosh2Eta = Math.cosh(2 * etaPrime);
+
+	let sinJ = sin2Xi;
+	let cosJ = cos2Xi;
+	let sinhJ = sinh2Eta;
+	let coshJ = cosh2Eta;
+	let xi = xiPrime;
+	let eta = etaPrime;
+
+	for (let j = 0; j < alpha.length; j++) {
+		xi += alpha[j] * sinJ * coshJ;
+		eta += alpha[j] * cosJ * sinhJ;
+
+		const nextSin = sinJ * cos2Xi + cosJ * sin2Xi;
+		cosJ = cosJ * cos2Xi - sinJ * sin2Xi;
+		sinJ = nextSin;
+		const nextSinh = sinhJ * cosh2Eta + coshJ * sinh2Eta;
+		coshJ = coshJ * cosh2Eta + sinhJ * sinh2Eta;
+		sinhJ = nextSinh;
+	}
+
+	out[offset] = scaledRectifyingRadius * xi + SWEREF99_TM_PARAMETERS.FALSE_NORTHING;
+	out[offset + 1] = scaledRectifyingRadius * eta + SWEREF99_TM_PARAMETERS.FALSE_EASTING;
+}
+
+/**
+ * Unprojects SWEREF 99 TM coordinates to geodetic coordinates using the inverse Krüger n-series
+ *
+ * Writes the result into a caller-supplied buffer so the hot path does not allocate.
+ * No drift correction is removed here.
+ *
+ * @param northing - Northing in meters
+ * @param easting - Easting in meters
+ * @param out - Output buffer receiving latitude at out[offset] and longitude at out[offset + 1]
+ * @param offset - Index of the latitude slot in the output buffer
+ */
+function unprojectGaussKruger(northing: number, easting: number, out: Float64Array, offset: number): void {
+	const { scaledRectifyingRadius, beta, delta } = krugerCoefficients;
+	const xiPrime = (northing - SWEREF99_TM_PARAMETERS.FALSE_NORTHING) / scaledRectifyingRadius;
+	const etaPrime = (easting - SWEREF99_TM_PARAMETERS.FALSE_EASTING) / scaledRectifyingRadius;
+
+	const sin2Xi = Math.sin(2 * xiPrime);
+	const cos2Xi = Math.cos(2 * xiPrime);
+	const sinh2Eta = Math.sinh(2 * etaPrime);
+	const cosh2Eta = Math.cosh(2 * etaPrime);
+
+	let sinJ = sin2Xi;
+	let cosJ = cos2Xi;
+	let sinhJ = sinh2Eta;
+	let coshJ = cosh2Eta;
+	let xi = xiPrime;
+	let eta = etaPrime;
+
+	for (let j = 0; j < beta.length; j++) {
+		xi -= beta[j] * sinJ * coshJ;
+		eta -= beta[j] * cosJ * sinhJ;
+
+		const nextSin = sinJ * cos2Xi + cosJ * sin2Xi;
+		cosJ = cosJ * cos2Xi - sinJ * sin2Xi;
+		sinJ = nextSin;
+		const nextSinh = sinhJ * cosh2Eta + coshJ * sinh2Eta;
+		coshJ = coshJ * cosh2Eta + sinhJ * sinh2Eta;
+		sinhJ = nextSinh;
+	}
+
+	// Konform latitud, sedan geodetisk latitud via δ-serien
+	const chi = Math.asin(Math.sin(xi) / Math.cosh(eta));
+	const sin2Chi = Math.sin(2 * chi);
+	const cos2Chi = Math.cos(2 * chi);
+	let sinK = sin2Chi;
+	let cosK = cos2Chi;
+	let phi = chi;
+
+	for (let j = 0; j < delta.length; j++) {
+		phi += delta[j] * sinK;
+
+		const nextSin = sinK * cos2Chi + cosK * sin2Chi;
+		cosK = cosK * cos2Chi - sinK * sin2Chi;
+		sinK = nextSin;
+	}
+
+	const lambda = Math.atan2(Math.sinh(eta), Math.cos(xi));
+	out[offset] = phi / DEGREES_TO_RADIANS;
+	out[offset + 1] = (lambda + centralMeridianRadians) / DEGREES_TO_RADIANS;
+}
+
+let transformEngine: TransformEngine = DEFAULT_TRANSFORM_ENGINE;
+
+/**
+ * Selects the transformation engine used by wgs84_to_sweref99tm
+ * 'proj4' is kept as a reference path for verifying the native engine.
+ *
+ * @param engine - Engine to use
+ */
+export function setTransformEngine(engine: TransformEngine): void {
+	transformEngine = engine;
+	clearTransformCache();
+	if (engine === 'proj4') {
+		loadProj4();
+	}
+}
+
+/**
+ * Projects WGS84 coordinates with PROJ4JS (reference/fallback path)
+ * @returns true when the projection succeeded and projectionScratch holds the result
+ */
+function projectWithProj4(lat: number, lon: number): boolean {
+	if (!ensureSwerefProjection()) {
+		return false;
+	}
+
+	// Input: [longitude, latitude] in WGS84 (EPSG:4326)
+	// Output: [easting, northing] in SWEREF 99 TM (EPSG:3006)
+	const result = proj4(WGS84_PROJECTION, SWEREF99_PROJECTION, [lon, lat]);
+	projectionScratch[0] = result[1];
+	projectionScratch[1] = result[0];
+	return true;
+}
+
+/**
+ * Projects WGS84 coordinates with the selected engine
+ * The native engine falls back to PROJ4JS if its result is not finite.
+ * @returns true when the projection succeeded and projectionScratch holds the result
+ */
+function projectWithEngine(lat: number, lon: number): boolean {
+	if (transformEngine === 'native') {
+		projectGaussKruger(lat, lon, projectionScratch, 0);
+		if (Number.isFinite(projectionScratch[0]) && Number.isFinite(projectionScratch[1])) {
+			return true;
+		}
+		console.warn('Native SWEREF 99 TM-projektion gav ogiltigt resultat, försöker med proj4');
+	}
+	return projectWithProj4(lat, lon);
+}
+
+// Projektionscache: nyckel -> [N, E, dN/dlat, dN/dlon, dE/dlat, dE/dlon] i cellens nod,
+// före driftkorrigering och med derivator per grad, i LRU-ordning
+const transformCache = new Map<number, Float64Array>();
+let transformCacheHits = 0;
+let transformCacheMisses = 0;
+
+/**
+ * Numeric key for a cache cell (no string allocation per fix)
+ */
+function getTransformCacheKey(latIndex: number, lonIndex: number): number {
+	return (latIndex + TRANSFORM_CACHE_LATITUDE_OFFSET) * TRANSFORM_CACHE_LONGITUDE_STEPS + lonIndex + TRANSFORM_CACHE_LONGITUDE_OFFSET;
+}
+
+/**
+ * Projects the node of a cache cell and one cell north and east of it
+ * @returns Cache entry, or null if the engine fails at any of the three points
+ */
+function projectCacheCell(latIndex: number, lonIndex: number): Float64Array | null {
+	const lat = latIndex / TRANSFORM_CACHE_CELLS_PER_DEGREE;
+	const lon = lonIndex / TRANSFORM_CACHE_CELLS_PER_DEGREE;
+	const step = 1 / TRANSFORM_CACHE_CELLS_PER_DEGREE;
+
+	if (!projectWithEngine(lat + step, lon)) {
+		return null;
+	}
+	const northOfNodeN = projectionScratch[0];
+	const northOfNodeE = projectionScratch[1];
+	if (!projectWithEngine(lat, lon + step)) {
+		return null;
+	}
+	const eastOfNodeN = projectionScratch[0];
+	const eastOfNodeE = projectionScratch[1];
+	if (!projectWithEngine(lat, lon)) {
+		return null;
+	}
+	const nodeN = projectionScratch[0];
+	const nodeE = projectionScratch[1];
+
+	return Float64Array.of(
+		nodeN,
+		nodeE,
+		(northOfNodeN - nodeN) * TRANSFORM_CACHE_CELLS_PER_DEGREE,
+		(eastOfNodeN - nodeN) * TRANSFORM_CACHE_CELLS_PER_DEGREE,
+		(northOfNodeE - nodeE) * TRANSFORM_CACHE_CELLS_PER_DEGREE,
+		(eastOfNodeE - nodeE) * TRANSFORM_CACHE_CELLS_PER_DEGREE
+	);
+}
+
+/**
+ * Projects WGS84 coordinates linearly from the cached cell containing them
+ * A miss projects the cell first, so the result does not depend on the cache state.
+ * The drift correction depends on the observation epoch and is applied by the caller.
+ * @returns true when projectionScratch holds the result
+ */
+function projectWithCache(lat: number, lon: number): boolean {
+	const latIndex = Math.round(lat * TRANSFORM_CACHE_CELLS_PER_DEGREE);
+	const lonIndex = Math.round(lon * TRANSFORM_CACHE_CELLS_PER_DEGREE);
+	const key = getTransformCacheKey(latIndex, lonIndex);
+	let cell = transformCache.get(key);
+	if (cell !== undefined) {
+		// Markera posten som senast använd
+		transformCache.delete(key);
+		transformCache.set(key, cell);
+		transformCacheHits++;
+	} else {
+		transformCacheMisses++;
+		const projected = projectCacheCell(latIndex, lonIndex);
+		if (projected === null) {
+			// T.ex. vid polen eller datumgränsen: projicera positionen direkt utan cache
+			return projectWithEngine(lat, lon);
+		}
+		cell = projected;
+		transformCache.set(key, cell);
+		while (transformCache.size > TRANSFORM_CACHE_SIZE) {
+			const oldestKey = transformCache.keys().next().value as number;
+			transformCache.delete(oldestKey);
+		}
+	}
+
+	const dLat = lat - latIndex / TRANSFORM_CACHE_CELLS_PER_DEGREE;
+	const dLon = lon - lonIndex / TRANSFORM_CACHE_CELLS_PER_DEGREE;
+	projectionScratch[0] = cell[0] + cell[2] * dLat + cell[3] * dLon;
+	projectionScratch[1] = cell[1] + cell[4] * dLat + cell[5] * dLon;
+	return true;
+}
+
+export function clearTransformCache(): void {
+	transformCache.clear();
+}
+
+/**
+ * Hit/miss counters for the projection cache, for diagnostics from the console
+ */
+export function getTransformCacheStats(): TransformCacheStats {
+	return { hits: transformCacheHits, misses: transformCacheMisses, size: transformCache.size };
+}
+
+/**
+ * Transforms WGS84 coordinates to SWEREF 99 TM
+ * 
+ * SWEREF 99 TM (EPSG:3006) is the Swedish national coordinate reference system
+ * based on ETRS89 at epoch 1999.5. It uses a Transverse Mercator projection
+ * covering all of Sweden with a single zone (UTM zone 33, central meridian 15°E).
+ * 
+ * The default 'native' engine evaluates the Krüger n-series directly; the 'proj4'
+ * engine is kept as a reference path and is also used if the native result is not finite.
+ * Positions in recently used 0.001° cells are projected linearly from a small LRU cache
+ * (see TRANSFORM_CACHE_CELLS_PER_DEGREE), so a stationary device does no projection work.
+ * 
+ * @param lat - Latitude in WGS84 decimal degrees
+ * @param lon - Longitude in WGS84 decimal degrees
+ * @param timestamp - Observation epoch as Unix timestamp in ms, e.g. position.timestamp (default: now)
+ * @returns SWEREF 99 TM coordinates with ITRF/ETRS89 drift correction applied
+ * 
+ * @see SWEREF99-DEFINITION.md for complete verification and references
+ * @see https://epsg.io/3006 - Official EPSG registry entry
+ * @see https://www.lantmateriet.se - Lantmäteriet (Swedish mapping authority)
+ */
+export function wgs84_to_sweref99tm(lat: number, lon: number, timestamp: number = Date.now()): SwerefCoordinates {
+	try {
+		if (!isValidLatitude(lat) || !isValidLongitude(lon)) {
+			const displayLatitude = formatCoordinateValue(lat);
+			const displayLongitude = formatCoordinateValue(lon);
+			console.warn(`Avböjer ogiltig koordinattransformation för lat=${displayLatitude}, lon=${displayLongitude}`);
+			return { northing: Number.NaN, easting: Number.NaN };
+		}
+
+		// WGS84 behandlas som ETRS89 vid projektionen (jfr +towgs84=0,0,0,0,0,0,0);
+		// skillnaden mellan ramarna hanteras av driftkorrigeringen nedan.
+		// See SWEREF99-DEFINITION.md for the PROJ definition used by the proj4 engine.
+		if (!projectWithCache(lat, lon)) {
+			return { northing: Number.NaN, easting: Number.NaN };
+		}
+
+		let northing: number = projectionScratch[0];
+		let easting: number = projectionScratch[1];
+
+		// Applicera tidskorrigering för ITRF->ETRS89 drift
+		// Detta kompenserar för att WGS84 (ITRF-realisering) och SWEREF 99 (ETRS89)
+		// skiljer sig åt och att skillnaden ökar med tiden
+		const elapsedMs = timestamp - ETRS89_EPOCH_MS;
+		sampleDriftRate(lat, lon, driftRateScratch);
+		northing += driftRateScratch[0] * elapsedMs;
+		easting += driftRateScratch[1] * elapsedMs;
+
+		// Validate the result
+		if (!Number.isFinite(northing) || !Number.isFinite(easting)) {
+			console.warn(`Invalid coordinate transformation result for lat=${lat}, lon=${lon}:`, { northing, easting });
+			return { northing: 0, easting: 0 };
+		}
+
+		return { northing, easting };
+	} catch (error) {
+		console.error("Error in coordinate transformation:", error);
+		return { northing: 0, easting: 0 };
+	}
+}
+
+/**
+ * Number of points described by a batch input
+ */
+function getBatchPointCount(input: Wgs84BatchInput | SwerefBatchInput): number {
+	if (input.layout === 'interleaved') {
+		const values = 'latLon' in input ? input.latLon : input.northEast;
+		return values.length >> 1;
+	}
+	return 'latitudes' in input
+		? Math.min(input.latitudes.length, input.longitudes.length)
+		: Math.min(input.northings.length, input.eastings.length);
+}
+
+/**
+ * Verifies that output buffer and bitmask can hold a batch of the given size
+ */
+function assertBatchCapacity(count: number, out: Float64Array, invalidMask: Uint32Array): void {
+	if (out.length < count * 2) {
+		throw new RangeError(`Utdatabufferten rymmer ${out.length >> 1} punkter, behöver ${count}`);
+	}
+	if (invalidMask.length < (count + 31) >>> 5) {
+		throw new RangeError(`Felmasken rymmer ${invalidMask.length * 32} punkter, behöver ${count}`);
+	}
+}
+
+/**
+ * Allocates a bitmask with one bit per point for batch transformations
+ * @param count - Number of points in the batch
+ */
+export function createBatchInvalidMask(count: number): Uint32Array {
+	return new Uint32Array((count + 31) >>> 5);
+}
+
+/**
+ * Checks whether a point was marked invalid by a batch transformation
+ */
+export function isBatchPointInvalid(invalidMask: Uint32Array, index: number): boolean {
+	return (invalidMask[index >>> 5] & (1 << (index & 31))) !== 0;
+}
+
+/**
+ * Transforms many WGS84 points to SWEREF 99 TM in one call
+ * 
+ * Intended for track logs and imported survey files. Uses the native Gauss-Krüger
+ * engine with no per-point allocation, logging or proj4 lookup. The drift correction
+ * is evaluated at the batch epoch, per point when the velocity grid is loaded.
+ * Invalid points are written as NaN and flagged in invalidMask (bit i set = point i
+ * invalid) instead of being reported with console.warn.
+ * 
+ * @param input - Interleaved or struct-of-arrays WGS84 coordinates in decimal degrees
+ * @param out - Output buffer receiving interleaved [northing, easting] pairs (length >= 2 * count)
+ * @param invalidMask - Bitmask from createBatchInvalidMask(count); cleared before use
+ * @param timestamp - Observation epoch of the batch as Unix timestamp in ms (default: now)
+ * @returns Number of invalid points
+ */
+export function wgs84_to_sweref99tm_batch(input: Wgs84BatchInput, out: Float64Array, invalidMask: Uint32Array, timestamp: number = Date.now()): number {
+	const count = getBatchPointCount(input);
+	assertBatchCapacity(count, out, invalidMask);
+
+	invalidMask.fill(0);
+	const elapsedMs = timestamp - ETRS89_EPOCH_MS;
+	const dn = driftRate.north * elapsedMs;
+	const de = driftRate.east * elapsedMs;
+	const interleaved = input.layout === 'interleaved' ? input.latLon : null;
+	const latitudes = input.layout === 'separate' ? input.latitudes : null;
+	const longitudes = input.layout === 'separate' ? input.longitudes : null;
+	let invalidCount = 0;
+
+	for (let i = 0; i < count; i++) {
+		const lat = interleaved ? interleaved[2 * i] : latitudes![i];
+		const lon = interleaved ? interleaved[2 * i + 1] : longitudes![i];
+		const offset = 2 * i;
+
+		if (isValidLatitude(lat) && isValidLongitude(lon)) {
+			projectGaussKruger(lat, lon, out, offset);
+			if (velocityGrid === null) {
+				out[offset] += dn;
+				out[offset + 1] += de;
+			} else {
+				sampleDriftRate(lat, lon, driftRateScratch);
+				out[offset] += driftRateScratch[0] * elapsedMs;
+				out[offset + 1] += driftRateScratch[1] * elapsedMs;
+			}
+			if (Number.isFinite(out[offset]) && Number.isFinite(out[offset + 1])) {
+				continue;
+			}
+		}
+
+		out[offset] = Number.NaN;
+		out[offset + 1] = Number.NaN;
+		invalidMask[i >>> 5] |= 1 << (i & 31);
+		invalidCount++;
+	}
+
+	return invalidCount;
+}
+
+/**
+ * Removes the drift correction and unprojects SWEREF 99 TM coordinates
+ * 
+ * With a velocity grid loaded the drift rate depends on position, so the point is
+ * first unprojected without correction to find where to sample the grid.
+ */
+function unprojectWithDriftRemoved(northing: number, easting: number, elapsedMs: number, out: Float64Array, offset: number): void {
+	if (velocityGrid === null) {
+		unprojectGaussKruger(northing - driftRate.north * elapsedMs, easting - driftRate.east * elapsedMs, out, offset);
+		return;
+	}
+
+	unprojectGaussKruger(northing, easting, out, offset);
+	sampleDriftRate(out[offset], out[offset + 1], driftRateScratch);
+	unprojectGaussKruger(northing - driftRateScratch[0] * elapsedMs, easting - driftRateScratch[1] * elapsedMs, out, offset);
+}
+
+/**
+ * Transforms SWEREF 99 TM coordinates to WGS84
+ * 
+ * Inverse of wgs84_to_sweref99tm: the ITRF/ETRS89 drift correction is removed before
+ * the inverse Krüger series is evaluated, so a round trip returns the original position.
+ * Always uses the native engine (no proj4 lookup).
+ * 
+ * @param northing - SWEREF 99 TM northing in meters
+ * @param easting - SWEREF 99 TM easting in meters
+ * @param timestamp - Epoch of the coordinates as Unix timestamp in ms (default: now)
+ * @returns WGS84 coordinates in decimal degrees, or NaN values for invalid input
+ */
+export function sweref99tm_to_wgs84(northing: number, easting: number, timestamp: number = Date.now()): Wgs84Coordinates {
+	if (!Number.isFinite(northing) || !Number.isFinite(easting)) {
+		console.warn(`Avböjer ogiltig inverstransformation för N=${formatCoordinateValue(northing)}, E=${formatCoordinateValue(easting)}`);
+		return { latitude: Number.NaN, longitude: Number.NaN };
+	}
+
+	unprojectWithDriftRemoved(northing, easting, timestamp - ETRS89_EPOCH_MS, projectionScratch, 0);
+	const latitude = projectionScratch[0];
+	const longitude = projectionScratch[1];
+
+	if (!isValidLatitude(latitude) || !isValidLongitude(longitude)) {
+		console.warn(`Invalid inverse transformation result for N=${northing}, E=${easting}:`, { latitude, longitude });
+		return { latitude: Number.NaN, longitude: Number.NaN };
+	}
+
+	return { latitude, longitude };
+}
+
+/**
+ * Transforms many SWEREF 99 TM points to WGS84 in one call
+ * 
+ * Batch counterpart of sweref99tm_to_wgs84 with the same conventions as
+ * wgs84_to_sweref99tm_batch: no per-point allocation, drift evaluated at the batch epoch,
+ * invalid points written as NaN and flagged in invalidMask.
+ * 
+ * @param input - Interleaved or struct-of-arrays SWEREF 99 TM coordinates in meters
+ * @param out - Output buffer receiving interleaved [latitude, longitude] pairs (length >= 2 * count)
+ * @param invalidMask - Bitmask from createBatchInvalidMask(count); cleared before use
+ * @param timestamp - Epoch of the batch as Unix timestamp in ms (default: now)
+ * @returns Number of invalid points
+ */
+export function sweref99tm_to_wgs84_batch(input: SwerefBatchInput, out: Float64Array, invalidMask: Uint32Array, timestamp: number = Date.now()): number {
+	const count = getBatchPointCount(input);
+	assertBatchCapacity(count, out, invalidMask);
+
+	invalidMask.fill(0);
+	const elapsedMs = timestamp - ETRS89_EPOCH_MS;
+	const interleaved = input.layout === 'interleaved' ? input.northEast : null;
+	const northings = input.layout === 'separate' ? input.northings : null;
+	const eastings = input.layout === 'separate' ? input.eastings : null;
+	let invalidCount = 0;
+
+	for (let i = 0; i < count; i++) {
+		const northing = interleaved ? interleaved[2 * i] : northings![i];
+		const easting = interleaved ? interleaved[2 * i + 1] : eastings![i];
+		const offset = 2 * i;
+
+		if (Number.isFinite(northing) && Number.isFinite(easting)) {
+			unprojectWithDriftRemoved(northing, easting, elapsedMs, out, offset);
+			if (isValidLatitude(out[offset]) && isValidLongitude(out[offset + 1])) {
+				continue;
+			}
+		}
+
+		out[offset] = Number.NaN;
+		out[offset + 1] = Number.NaN;
+		invalidMask[i >>> 5] |= 1 << (i & 31);
+		invalidCount++;
+	}
+
+	return invalidCount;
+}
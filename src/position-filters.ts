@@ -0,0 +1,381 @@
+// Filtrering och skattning av positioner: grindning av orimliga positioner före
+// transformationen, samt Kalmanfilter med konstant hastighet och viktat medelvärde för
+// inmätning i SWEREF 99 TM-planet. Beror inte på DOM.
+
+// ============================================================================
+// TYPE DEFINITIONS AND INTERFACES
+// ============================================================================
+
+/**
+ * Why the gate rejected a fix: not newer than the last accepted fix, implying an impossible
+ * speed, or too far from where the device can plausibly be given both accuracies
+ */
+export type FixRejection = 'time' | 'velocity' | 'innovation';
+
+// ============================================================================
+// CONFIGURATION CONSTANTS
+// ============================================================================
+
+/**
+ * Ratio between coords.accuracy and the standard deviation per axis
+ * The Geolocation API reports accuracy at 95 % confidence. For a circular 2D normal
+ * distribution the 95 % radius is sqrt(chi²₂(0.95)) ≈ 2.45 standard deviations.
+ */
+export const ACCURACY_TO_SIGMA = 2.4477;
+
+const EARTH_RADIUS_METERS = 6371000;
+
+/**
+ * Implied speed (m/s) above which a fix is rejected, after allowing for both accuracies
+ * About 320 km/h, faster than any train, so only position jumps are caught.
+ */
+const GATE_MAX_SPEED_MS = 90;
+
+/**
+ * Acceleration (m/s²) allowed on top of the previous speed when predicting how far the
+ * device can have moved since the last accepted fix
+ */
+const GATE_MAX_ACCELERATION = 3;
+
+/**
+ * Squared distance beyond the predicted travel, normalized by both fixes' variance, above
+ * which a fix is rejected. chi²₂(0.9999): honest fixes are rejected about once per 10 000.
+ */
+const GATE_INNOVATION_THRESHOLD = 18.42;
+
+/**
+ * After this many consecutive rejections the gate accepts the next fix and starts over from
+ * it, in case the earlier accepted fix was the wrong one
+ */
+const GATE_MAX_CONSECUTIVE_REJECTIONS = 5;
+
+/**
+ * Layout of the gate state: last accepted fix (latitude, longitude, accuracy, timestamp;
+ * timestamp NaN when empty), its speed (NaN when unknown) and the number of consecutive
+ * rejections
+ */
+export const GATE_STATE_LENGTH = 6;
+const GATE_LATITUDE = 0;
+const GATE_LONGITUDE = 1;
+const GATE_ACCURACY = 2;
+const GATE_TIMESTAMP = 3;
+const GATE_SPEED = 4;
+const GATE_CONSECUTIVE_REJECTIONS = 5;
+
+/**
+ * Spectral density of the white acceleration noise (m²/s³)
+ * The velocity may drift by about 0.3 m/s per second, enough to follow walking, stopping
+ * and turning while cutting the spread of stationary jitter by about 40 % (white noise).
+ */
+const KALMAN_ACCELERATION_NOISE = 0.1;
+
+/**
+ * Velocity variance of a new filter ((m/s)²), i.e. up to ~5 m/s in either direction
+ */
+const KALMAN_INITIAL_VELOCITY_VARIANCE = 25;
+
+/**
+ * Longer gaps between fixes restart the filter from the next fix
+ */
+const KALMAN_MAX_GAP_MS = 300000;
+
+/**
+ * Layout of the Kalman state: per axis [position, velocity, P₀₀, P₀₁, P₁₁], north then east,
+ * followed by the timestamp of the last fix (NaN when the filter is empty)
+ */
+export const KALMAN_STATE_LENGTH = 11;
+export const KALMAN_NORTH = 0;
+export const KALMAN_EAST = 5;
+export const KALMAN_POSITION = 0;
+export const KALMAN_VELOCITY = 1;
+const KALMAN_POSITION_VARIANCE = 2;
+const KALMAN_COVARIANCE = 3;
+const KALMAN_VELOCITY_VARIANCE = 4;
+const KALMAN_TIMESTAMP = 10;
+
+// ============================================================================
+// UTILITY FUNCTIONS
+// ============================================================================
+
+/**
+ * Approximate distance between two nearby WGS84 positions (equirectangular, metres)
+ * Accurate to well below GNSS noise for the distances the stationary detection compares.
+ */
+export function approximateDistanceMeters(latitude1: number, longitude1: number, latitude2: number, longitude2: number): number {
+	const toRadians = Math.PI / 180;
+	const dNorth = (latitude2 - latitude1) * toRadians;
+	const dEast = (longitude2 - longitude1) * toRadians * Math.cos((latitude1 + latitude2) / 2 * toRadians);
+	return EARTH_RADIUS_METERS * Math.hypot(dNorth, dEast);
+}
+
+// ============================================================================
+// OUTLIER GATE
+// ============================================================================
+
+export function createGateState(): Float64Array {
+	const state = new Float64Array(GATE_STATE_LENGTH);
+	resetGateState(state);
+	return state;
+}
+
+export function resetGateState(state: Float64Array): void {
+	state.fill(0);
+	state[GATE_TIMESTAMP] = Number.NaN;
+}
+
+/**
+ * Checks a WGS84 fix against the last accepted one before it is transformed
+ *
+ * Rejects fixes that are not newer than the last accepted fix, that imply a speed above
+ * GATE_MAX_SPEED_MS beyond both accuracies, or whose distance beyond the predicted travel
+ * (previous speed plus GATE_MAX_ACCELERATION) is implausible given both accuracies. The
+ * last test needs a known speed, so it is skipped right after the first fix.
+ * Accepted fixes become the new reference; the state is updated in place. After
+ * GATE_MAX_CONSECUTIVE_REJECTIONS rejections of any kind in a row the next fix is accepted
+ * as a new reference, so a device clock stepped backwards cannot stall the gate.
+ *
+ * @param accuracy - coords.accuracy of the fix (95 % radius in meters)
+ * @param speed - coords.speed of the fix, or null
+ * @param timestamp - position.timestamp in ms
+ * @returns Reason for rejecting the fix, or null if it is accepted
+ */
+export function gatePositionFix(
+	state: Float64Array,
+	latitude: number,
+	longitude: number,
+	accuracy: number,
+	speed: number | null,
+	timestamp: number
+): FixRejection | null {
+	const elapsedMs = timestamp - state[GATE_TIMESTAMP];
+	let rejection: FixRejection | null = null;
+	let impliedSpeed = 0;
+
+	if (!Number.isNaN(elapsedMs)) {
+		if (elapsedMs <= 0) {
+			rejection = 'time';
+		} else {
+			const dt = elapsedMs / 1000;
+			const distance = approximateDistanceMeters(state[GATE_LATITUDE], state[GATE_LONGITUDE], latitude, longitude);
+			const previousSigma = state[GATE_ACCURACY] / ACCURACY_TO_SIGMA;
+			const sigma = accuracy / ACCURACY_TO_SIGMA;
+			const excess = distance - state[GATE_SPEED] * dt - GATE_MAX_ACCELERATION * dt * dt / 2;
+			// Farten räknas bara på förflyttningen utöver den sammanlagda noggrannheten, annars ger
+			// brus eller en grov föregående position en hög fart som stänger av innovationstestet
+			impliedSpeed = Math.max(0, distance - Math.hypot(state[GATE_ACCURACY], accuracy)) / dt;
+
+			if ((distance - state[GATE_ACCURACY] - accuracy) / dt > GATE_MAX_SPEED_MS) {
+				rejection = 'velocity';
+			} else if (excess > 0 && excess * excess > GATE_INNOVATION_THRESHOLD * (previousSigma * previousSigma + sigma * sigma)) {
+				rejection = 'innovation';
+			}
+		}
+
+		if (rejection !== null && state[GATE_CONSECUTIVE_REJECTIONS] < GATE_MAX_CONSECUTIVE_REJECTIONS) {
+			state[GATE_CONSECUTIVE_REJECTIONS]++;
+			return rejection;
+		}
+	}
+
+	// Farten är okänd efter första positionen och efter en omstart, tills nästa position
+	// accepteras; då prövas bara den implicita hastigheten
+	state[GATE_SPEED] = rejection === null && !Number.isNaN(elapsedMs) ? Math.max(speed ?? 0, impliedSpeed) : speed ?? Number.NaN;
+	state[GATE_LATITUDE] = latitude;
+	state[GATE_LONGITUDE] = longitude;
+	state[GATE_ACCURACY] = accuracy;
+	state[GATE_TIMESTAMP] = timestamp;
+	state[GATE_CONSECUTIVE_REJECTIONS] = 0;
+	return null;
+}
+
+// ============================================================================
+// KALMAN FILTER
+// ============================================================================
+
+export function createKalmanState(): Float64Array {
+	const state = new Float64Array(KALMAN_STATE_LENGTH);
+	resetKalmanState(state);
+	return state;
+}
+
+export function resetKalmanState(state: Float64Array): void {
+	state.fill(0);
+	state[KALMAN_TIMESTAMP] = Number.NaN;
+}
+
+/**
+ * Starts one axis at a measurement with unknown velocity
+ */
+function initializeAxis(state: Float64Array, axis: number, measurement: number, variance: number): void {
+	state[axis + KALMAN_POSITION] = measurement;
+	state[axis + KALMAN_VELOCITY] = 0;
+	state[axis + KALMAN_POSITION_VARIANCE] = variance;
+	state[axis + KALMAN_COVARIANCE] = 0;
+	state[axis + KALMAN_VELOCITY_VARIANCE] = KALMAN_INITIAL_VELOCITY_VARIANCE;
+}
+
+/**
+ * Predicts one axis dt seconds ahead and corrects it with a measurement
+ * Constant-velocity model with white acceleration noise; the axes are independent
+ * because the measurement noise is circular.
+ */
+function updateAxis(state: Float64Array, axis: number, measurement: number, variance: number, dt: number): void {
+	const q = KALMAN_ACCELERATION_NOISE;
+	let p00 = state[axis + KALMAN_POSITION_VARIANCE];
+	let p01 = state[axis + KALMAN_COVARIANCE];
+	let p11 = state[axis + KALMAN_VELOCITY_VARIANCE];
+
+	// Prediktion: x = F x, P = F P Fᵀ + Q
+	const position = state[axis + KALMAN_POSITION] + state[axis + KALMAN_VELOCITY] * dt;
+	p00 += dt * (2 * p01 + dt * p11) + q * dt * dt * dt / 3;
+	p01 += dt * p11 + q * dt * dt / 2;
+	p11 += q * dt;
+
+	// Korrigering med H = [1 0]
+	const innovationVariance = p00 + variance;
+	const gainPosition = p00 / innovationVariance;
+	const gainVelocity = p01 / innovationVariance;
+	const innovation = measurement - position;
+
+	state[axis + KALMAN_POSITION] = position + gainPosition * innovation;
+	state[axis + KALMAN_VELOCITY] += gainVelocity * innovation;
+	state[axis + KALMAN_POSITION_VARIANCE] = (1 - gainPosition) * p00;
+	state[axis + KALMAN_COVARIANCE] = (1 - gainPosition) * p01;
+	state[axis + KALMAN_VELOCITY_VARIANCE] = p11 - gainVelocity * p01;
+}
+
+/**
+ * Updates the filter in place with a fix in SWEREF 99 TM metres
+ *
+ * A fix that is not newer than the previous one is used without prediction. After a gap
+ * longer than KALMAN_MAX_GAP_MS the filter starts over from the fix.
+ *
+ * @param accuracy - coords.accuracy of the fix (95 % radius in meters)
+ * @param timestamp - position.timestamp in ms
+ */
+export function updateKalmanState(state: Float64Array, northing: number, easting: number, accuracy: number, timestamp: number): void {
+	const sigma = Math.max(accuracy, 0.1) / ACCURACY_TO_SIGMA;
+	const variance = sigma * sigma;
+	const elapsedMs = timestamp - state[KALMAN_TIMESTAMP];
+
+	if (!(elapsedMs <= KALMAN_MAX_GAP_MS)) {
+		initializeAxis(state, KALMAN_NORTH, northing, variance);
+		initializeAxis(state, KALMAN_EAST, easting, variance);
+		state[KALMAN_TIMESTAMP] = timestamp;
+		return;
+	}
+
+	const dt = Math.max(elapsedMs, 0) / 1000;
+	updateAxis(state, KALMAN_NORTH, northing, variance, dt);
+	updateAxis(state, KALMAN_EAST, easting, variance, dt);
+	state[KALMAN_TIMESTAMP] = Math.max(timestamp, state[KALMAN_TIMESTAMP]);
+}
+
+/**
+ * Uncertainty of the smoothed position on the same 95 % scale as coords.accuracy
+ */
+export function kalmanAccuracy(state: Float64Array): number {
+	const meanVariance = (state[KALMAN_NORTH + KALMAN_POSITION_VARIANCE] + state[KALMAN_EAST + KALMAN_POSITION_VARIANCE]) / 2;
+	return ACCURACY_TO_SIGMA * Math.sqrt(meanVariance);
+}
+
+// ============================================================================
+// POINT AVERAGING
+// ============================================================================
+
+/**
+ * Squared normalized distance above which a fix is rejected when averaging
+ * chi²₂(0.999): a fix agreeing with the mean is rejected about once per thousand.
+ */
+const AVERAGE_OUTLIER_THRESHOLD = 13.82;
+
+/**
+ * Number of accepted fixes before outliers are rejected, so the first fixes can set the mean
+ */
+const AVERAGE_MIN_SAMPLES_FOR_REJECTION = 5;
+
+/**
+ * After this many consecutive rejections the mean starts over from the next fix, since the
+ * device has most likely been moved to a new point (e.g. the next boundary stone)
+ */
+const AVERAGE_MAX_CONSECUTIVE_REJECTIONS = 10;
+
+/**
+ * Layout of the averaging state: total weight, weighted mean and sum of squared deviations
+ * per axis (West's weighted variant of Welford's algorithm), then the accepted and rejected
+ * counts and the number of consecutive rejections
+ */
+export const AVERAGE_STATE_LENGTH = 8;
+const AVERAGE_WEIGHT = 0;
+export const AVERAGE_NORTH = 1;
+export const AVERAGE_EAST = 2;
+const AVERAGE_M2_NORTH = 3;
+const AVERAGE_M2_EAST = 4;
+export const AVERAGE_COUNT = 5;
+export const AVERAGE_REJECTED = 6;
+const AVERAGE_CONSECUTIVE_REJECTIONS = 7;
+
+export function createAverageState(): Float64Array {
+	return new Float64Array(AVERAGE_STATE_LENGTH);
+}
+
+export function resetAverageState(state: Float64Array): void {
+	state.fill(0);
+}
+
+/**
+ * Weighted spread of the accepted fixes around the mean (meters, per axis)
+ */
+export function averageStandardDeviation(state: Float64Array): number {
+	if (state[AVERAGE_WEIGHT] === 0) {
+		return Number.NaN;
+	}
+	return Math.sqrt((state[AVERAGE_M2_NORTH] + state[AVERAGE_M2_EAST]) / (2 * state[AVERAGE_WEIGHT]));
+}
+
+/**
+ * Adds a fix in SWEREF 99 TM metres to the running weighted mean
+ *
+ * Each fix is weighted by 1/accuracy². Once the mean is established, a fix whose distance
+ * from the mean is implausible given its own noise and the spread so far is rejected. After
+ * AVERAGE_MAX_CONSECUTIVE_REJECTIONS rejections in a row the mean starts over from the next
+ * outlying fix, so moving to a new point without stopping does not freeze the mean.
+ *
+ * @param accuracy - coords.accuracy of the fix (95 % radius in meters)
+ * @returns false if the fix was rejected as an outlier (true also when the mean starts over)
+ */
+export function addAverageSample(state: Float64Array, northing: number, easting: number, accuracy: number): boolean {
+	const sigma = Math.max(accuracy, 0.1) / ACCURACY_TO_SIGMA;
+	let deltaNorth = northing - state[AVERAGE_NORTH];
+	let deltaEast = easting - state[AVERAGE_EAST];
+
+	if (state[AVERAGE_COUNT] >= AVERAGE_MIN_SAMPLES_FOR_REJECTION) {
+		const spread = averageStandardDeviation(state);
+		const normalizedDistance = (deltaNorth * deltaNorth + deltaEast * deltaEast) / (sigma * sigma + spread * spread);
+		if (normalizedDistance > AVERAGE_OUTLIER_THRESHOLD) {
+			if (state[AVERAGE_CONSECUTIVE_REJECTIONS] < AVERAGE_MAX_CONSECUTIVE_REJECTIONS) {
+				state[AVERAGE_CONSECUTIVE_REJECTIONS]++;
+				state[AVERAGE_REJECTED]++;
+				return false;
+			}
+
+			// Börja om från den här positionen men behåll antalet förkastade
+			const rejected = state[AVERAGE_REJECTED];
+			state.fill(0);
+			state[AVERAGE_REJECTED] = rejected;
+			deltaNorth = northing;
+			deltaEast = easting;
+		}
+	}
+
+	const weight = 1 / (sigma * sigma);
+	state[AVERAGE_WEIGHT] += weight;
+	const ratio = weight / state[AVERAGE_WEIGHT];
+	state[AVERAGE_NORTH] += ratio * deltaNorth;
+	state[AVERAGE_EAST] += ratio * deltaEast;
+	state[AVERAGE_M2_NORTH] += weight * deltaNorth * (northing - state[AVERAGE_NORTH]);
+	state[AVERAGE_M2_EAST] += weight * deltaEast * (easting - state[AVERAGE_EAST]);
+	state[AVERAGE_COUNT]++;
+	state[AVERAGE_CONSECUTIVE_REJECTIONS] = 0;
+	return true;
+}
@@ -0,0 +1,183 @@
+// Strömmande positionspipeline: varje position skickas genom en kedja av steg (till exempel
+// filtrering, transformation, utjämning, ritning och lagring). Stegen kan slås av och på var
+// för sig och tidmäts. Modulen beror inte på DOM och används av huvudtråden.
+
+// ============================================================================
+// TYPE DEFINITIONS AND INTERFACES
+// ============================================================================
+
+/**
+ * Result of a stage: the sample to pass on, null to drop the fix, or a promise of either
+ */
+export type PositionStageResult<T> = T | null | Promise<T | null>;
+
+/**
+ * One step of the position stream
+ */
+export interface PositionStage<T> {
+	readonly name: string;
+	enabled: boolean;
+	process(sample: T): PositionStageResult<T>;
+}
+
+/**
+ * Counters and timing for one stage
+ * Time for an asynchronous stage includes waiting for its promise (e.g. the worker round trip).
+ */
+export interface PositionStageStats {
+	name: string;
+	enabled: boolean;
+	processed: number;
+	dropped: number;
+	totalMs: number;
+	maxMs: number;
+}
+
+export interface PositionStreamStats {
+	stages: PositionStageStats[];
+	completed: number;
+	superseded: number;
+}
+
+// ============================================================================
+// POSITION STREAM
+// ============================================================================
+
+/**
+ * PositionStream - kör positioner genom en kedja av steg, en position i taget
+ *
+ * Synkrona steg körs direkt i push. När ett asynkront steg arbetar väntar högst en ny
+ * position; en position som hinner ersättas av en nyare räknas som överspelad och
+ * bearbetas aldrig. Ett långsamt steg ger alltså färre men alltid aktuella positioner
+ * i stället för en växande kö.
+ */
+export class PositionStream<T> {
+	private readonly stages: PositionStage<T>[];
+	private readonly stats: PositionStageStats[];
+	private readonly now: () => number;
+	private pending: T | null = null;
+	private busy = false;
+	private generation = 0;
+	private completed = 0;
+	private superseded = 0;
+
+	constructor(stages: PositionStage<T>[], now: () => number = () => performance.now()) {
+		this.stages = stages;
+		this.now = now;
+		this.stats = stages.map((stage) => ({
+			name: stage.name,
+			enabled: stage.enabled,
+			processed: 0,
+			dropped: 0,
+			totalMs: 0,
+			maxMs: 0
+		}));
+	}
+
+	/**
+	 * Feeds a new fix into the stream
+	 */
+	push(sample: T): void {
+		if (this.busy) {
+			if (this.pending !== null) {
+				this.superseded++;
+			}
+			this.pending = sample;
+			return;
+		}
+		this.busy = true;
+		this.runFrom(0, sample, this.generation);
+	}
+
+	/**
+	 * Drops the waiting fix and ignores the result of the fix in progress
+	 */
+	reset(): void {
+		this.generation++;
+		this.pending = null;
+		this.busy = false;
+	}
+
+	/**
+	 * Enables or disables a stage by name
+	 * @returns false if there is no stage with that name
+	 */
+	setEnabled(name: string, enabled: boolean): boolean {
+		const stage = this.stages.find((candidate) => candidate.name === name);
+		if (stage === undefined) {
+			return false;
+		}
+		stage.enabled = enabled;
+		return true;
+	}
+
+	getStats(): PositionStreamStats {
+		return {
+			stages: this.stats.map((stats, index) => ({ ...stats, enabled: this.stages[index].enabled })),
+			completed: this.completed,
+			superseded: this.superseded
+		};
+	}
+
+	private runFrom(startIndex: number, sample: T | null, generation: number): void {
+		let current = sample;
+		for (let index = startIndex; current !== null && index < this.stages.length; index++) {
+			const stage = this.stages[index];
+			if (!stage.enabled) {
+				continue;
+			}
+
+			const start = this.now();
+			let result: PositionStageResult<T>;
+			try {
+				result = stage.process(current);
+			} catch (error) {
+				console.error(`Positionssteget ${stage.name} misslyckades:`, error);
+				result = null;
+			}
+
+			if (result instanceof Promise) {
+				result.catch((error) => {
+					console.error(`Positionssteget ${stage.name} misslyckades:`, error);
+					return null;
+				}).then((value) => {
+					if (generation !== this.generation) {
+						return;
+					}
+					this.record(index, start, value);
+					this.runFrom(index + 1, value, generation);
+				});
+				return;
+			}
+
+			this.record(index, start, result);
+			current = result;
+		}
+
+		if (current !== null) {
+			this.completed++;
+		}
+		this.runNext();
+	}
+
+	private record(index: number, start: number, result: T | null): void {
+		const stats = this.stats[index];
+		const elapsedMs = this.now() - start;
+		stats.processed++;
+		stats.totalMs += elapsedMs;
+		stats.maxMs = Math.max(stats.maxMs, elapsedMs);
+		if (result === null) {
+			stats.dropped++;
+		}
+	}
+
+	private runNext(): void {
+		const next = this.pending;
+		this.pending = null;
+		if (next === null) {
+			this.busy = false;
+			return;
+		}
+		this.runFrom(0, next, this.generation);
+	}
+}
@@ -1,44 +1,185 @@
+// Huvudtråden: geolokalisering, notiser och DOM-uppdateringar. Koordinattransformationen
+// sker i transformeringsworkern (transform-worker.ts), som skickar tillbaka färdiga strängar.
+
+import { NON_BREAKING_SPACE, formatProjectedCoordinate } from './format.js';
+import type { TransformCacheStats, TransformEngine } from './geodesy.js';
+import {
+	AVERAGE_COUNT,
+	AVERAGE_EAST,
+	AVERAGE_NORTH,
+	KALMAN_EAST,
+	KALMAN_NORTH,
+	KALMAN_POSITION,
+	KALMAN_VELOCITY,
+	addAverageSample,
+	approximateDistanceMeters,
+	averageStandardDeviation,
+	createAverageState,
+	createGateState,
+	createKalmanState,
+	gatePositionFix,
+	kalmanAccuracy,
+	resetAverageState,
+	resetGateState,
+	resetKalmanState,
+	updateKalmanState,
+	type FixRejection
+} from './position-filters.js';
+import { PositionStream, type PositionStage, type PositionStreamStats } from './position-stream.js';
+import {
+	DEFAULT_TRANSFORM_ENGINE,
+	TRANSFORM_ENGINES,
+	packPositionFix,
+	type FormattedPosition,
+	type PositionResponse,
+	type TransformRequest,
+	type TransformResponse
+} from './transform-protocol.js';
+
 // ============================================================================
 // TYPE DEFINITIONS AND INTERFACES
 // ============================================================================
 
-declare const proj4: any;
+/**
+ * Speed unit types for display
+ */
+type SpeedUnit = 'm/s' | 'km/h' | 'mph';
+
+/**
+ * Progress of a positioning session: no fix yet, a quick coarse fix shown, or the
+ * high-accuracy watch has taken over
+ */
+type AcquisitionPhase = 'waiting' | 'coarse' | 'precise';
+
+interface AcquisitionState {
+	phase: AcquisitionPhase;
+	coarseAccuracy: number;
+	coarseShownAt: number;
+}
+
+/**
+ * Geolocation watch mode: full GNSS accuracy, or relaxed options while stationary
+ */
+type GeolocationMode = 'precise' | 'relaxed';
+
+/**
+ * Stationary detection for the adaptive geolocation options
+ * The anchor is the first accurate fix of the current stationary period.
+ */
+interface GeolocationPowerState {
+	mode: GeolocationMode;
+	stationarySince: number | null;
+	anchorLatitude: number;
+	anchorLongitude: number;
+	anchorAccuracy: number;
+}
+
+/**
+ * The parts of a fix the adaptive geolocation options look at
+ */
+interface PowerRelevantFix {
+	latitude: number;
+	longitude: number;
+	accuracy: number;
+	speed: number | null;
+	timestamp: number;
+}
+
+/**
+ * Logged watch restart, for tuning the adaptive geolocation options from the console
+ */
+interface WatchRestartLogEntry {
+	time: number;
+	mode: GeolocationMode;
+	reason: string;
+}
+
+/**
+ * How positions are shown: every fix as it arrives, smoothed by the Kalman filter, or
+ * the weighted mean of all fixes for surveying a point
+ */
+type PositionMode = 'live' | 'smoothed' | 'average';
 
 /**
- * Represents coordinates in the SWEREF 99 TM coordinate system
+ * One fix on its way through the position stream
+ * formatted, northing and easting are filled in by the transform stage; the smoothing
+ * and averaging stages replace the SWEREF 99 values (and accuracy, speed or spread) with
+ * their estimate. averageCount is 0 unless the averaging stage ran.
  */
-interface SwerefCoordinates {
+interface PositionSample {
+	position: GeolocationPosition;
+	formatted: FormattedPosition | null;
 	northing: number;
 	easting: number;
+	accuracy: number;
+	speed: number | null;
+	averageCount: number;
+	averageSpread: number;
 }
 
 /**
- * Represents the correction needed for ITRF to ETRS89 continental drift
+ * Role of this tab in the shared geolocation watch
+ * The leader holds the Web Lock, runs the watch and the transform and broadcasts each
+ * rendered position; followers wait for the lock and render the broadcast positions.
  */
-interface Itrf2Etrs89Correction {
-	dn: number; // North correction in meters
-	de: number; // East correction in meters
+type GeolocationRole = 'stopped' | 'leader' | 'follower';
+
+/**
+ * Transformed position broadcast by the leader tab
+ * averageCount and averageSpread are copied from the sample, so that followers show the
+ * spread of an averaged position instead of the accuracy of the last fix.
+ */
+interface SharedPositionMessage {
+	type: 'position';
+	position: FormattedPosition;
+	accuracy: number;
+	speed: number | null;
+	timestamp: number;
+	averageCount: number;
+	averageSpread: number;
 }
 
 /**
- * Speed unit types for display
+ * Minimal Battery Status API (not in the TypeScript DOM library)
  */
-type SpeedUnit = 'm/s' | 'km/h' | 'mph';
+interface BatteryManager extends EventTarget {
+	readonly charging: boolean;
+}
 
-// ============================================================================
-// CONFIGURATION CONSTANTS
-// ============================================================================
+/**
+ * Last rendered position, shown in a "stale" style on the next launch until a live fix arrives
+ * An averaged position keeps its spread and count (averageCount is 0 otherwise), since the
+ * accuracy of the last fix does not describe the mean.
+ */
+interface LastKnownPosition {
+	position: FormattedPosition;
+	accuracy: number;
+	timestamp: number;
+	averageCount: number;
+	averageSpread: number;
+}
 
 /**
- * Geographic bounds for Sweden
- * Used to validate if coordinates are within Swedish territory
+ * Console API for diagnostics and engine selection, e.g. sweref99.setTransformEngine('proj4')
  */
-const SWEDEN_BOUNDS = {
-	MIN_LATITUDE: 55,
-	MAX_LATITUDE: 69,
-	MIN_LONGITUDE: 10,
-	MAX_LONGITUDE: 24
-} as const;
+interface Sweref99DebugApi {
+	getTransformCacheStats(): Promise<TransformCacheStats>;
+	setTransformEngine(engine: TransformEngine): void;
+	getWatchRestarts(): WatchRestartLogEntry[];
+	getPipelineStats(): PositionStreamStats;
+	setPipelineStage(name: string, enabled: boolean): void;
+	getRejectedFixes(): Record<FixRejection, number>;
+}
+
+declare global {
+	interface Window {
+		sweref99?: Sweref99DebugApi;
+	}
+}
+
+// ============================================================================
+// CONFIGURATION CONSTANTS
+// ============================================================================
 
 /**
  * Position accuracy threshold (meters)
@@ -67,44 +208,59 @@ const SPEED_THRESHOLD_MS: number = 1.4;
 const SPINNER_DELAY_MS: number = 5000;
 
 /**
- * ETRS89 and SWEREF 99 epoch constants
- * Used for calculating continental drift correction
+ * Geolocation API options
  */
-const ETRS89_EPOCH: number = 1989.0;
-const SWEREF99_EPOCH: number = 1999.5;
+const GEOLOCATION_OPTIONS = {
+	enableHighAccuracy: true,
+	maximumAge: 20000,
+	timeout: 28000,
+} as const;
 
 /**
- * European plate velocity parameters
- * 
- * The European tectonic plate moves approximately 2.5 cm/year relative to ITRF
- * in a northeast direction (approximately 25° from north). This causes a 
- * time-dependent difference between WGS84 (realized via ITRF) and SWEREF 99
- * (ETRS89 fixed at epoch 1999.5).
- * 
- * These values are used to calculate drift correction between the moving ITRF
- * frame (used by GPS/WGS84) and the fixed ETRS89 frame (used by SWEREF 99).
- * 
- * Values verified against:
- * - EUREF Technical Notes on European plate motion
- * - Lantmäteriet technical documentation on SWEREF 99
- * 
- * @see SWEREF99-DEFINITION.md - Section "Continental Drift Correction"
- * @see http://www.euref.eu/ - European Reference Frame
+ * Options for the quick coarse fix requested alongside the high-accuracy watch
+ * Network/cell positioning and a recently cached position answer in well under a second,
+ * while a cold GNSS fix can take tens of seconds.
  */
-const PLATE_VELOCITY = {
-	METERS_PER_YEAR: 0.025, // 2.5 cm/år
-	AZIMUTH_DEGREES: 25 // grader från norr, öster är positiv
+const COARSE_GEOLOCATION_OPTIONS = {
+	enableHighAccuracy: false,
+	maximumAge: 300000,
+	timeout: 10000
 } as const;
 
 /**
- * Geolocation API options
+ * How long a coarse fix is kept while the watch only reports worse accuracy (milliseconds)
+ * Indoors GNSS may never beat Wi-Fi positioning; after this the watch is shown anyway.
  */
-const GEOLOCATION_OPTIONS = {
-	enableHighAccuracy: true,
-	maximumAge: 20000,
-	timeout: 28000,
+const COARSE_FIX_HOLD_MS = 15000;
+
+/**
+ * Geolocation options while the device is stationary with a good fix history
+ * Lets the browser use network positioning and older fixes instead of keeping GNSS active.
+ */
+const RELAXED_GEOLOCATION_OPTIONS = {
+	enableHighAccuracy: false,
+	maximumAge: 60000,
+	timeout: 60000
 } as const;
 
+/**
+ * How long the device must stay within accuracy of one spot, with every fix at or below
+ * ACCURACY_THRESHOLD_METERS and slower than SPEED_THRESHOLD_MS, before the watch is relaxed
+ * (milliseconds)
+ */
+const STATIONARY_RELAX_AFTER_MS = 120000;
+
+/**
+ * Number of watch restarts kept for sweref99.getWatchRestarts()
+ */
+const WATCH_RESTART_LOG_LENGTH = 50;
+
+/**
+ * Web Lock held by the tab that runs the geolocation watch, and the channel it broadcasts on
+ */
+const GEOLOCATION_LEADER_LOCK = 'sweref99-geolocation-leader';
+const POSITION_CHANNEL_NAME = 'sweref99-position';
+
 /**
  * Geolocation test options for restore operations
  */
@@ -119,9 +275,12 @@ const GEOLOCATION_TEST_OPTIONS = {
 const UI_TEXT = {
 	ERROR_NO_POSITION: "Fel: Ingen position tillgänglig. Kontrollera inställningarna för platstjänster i operativsystem och webbläsare!",
 	ERROR_NO_POSITION_TITLE: "Positioneringsfel",
-	NOT_AVAILABLE: 'Ej\u00A0tillgängligt',
 	WARNING_NOT_IN_SWEDEN: "Varning: SWEREF 99 är bara användbart i Sverige.",
 	WARNING_NOT_IN_SWEDEN_TITLE: "Position utanför Sverige",
+	POSITION_MODE_TITLE: "Visningsläge",
+	POSITION_MODE_LIVE: "Varje position visas som den kommer från enheten.",
+	POSITION_MODE_SMOOTHED: "Utjämnad position: SWEREF 99-koordinaterna och farten skattas med ett Kalmanfilter och noggrannheten visar filtrets osäkerhet.",
+	POSITION_MODE_AVERAGE: "Medelvärde: stå still. SWEREF 99-koordinaterna visar det viktade medelvärdet av positionerna sedan läget valdes, σ deras spridning och n antalet. Avvikande positioner tas inte med.",
 	HELP_URL: "https://sweref99.nu/om.html"
 } as const;
 
@@ -151,47 +310,41 @@ const SPEED_UNIT_ORDER: SpeedUnit[] = ['m/s', 'km/h', 'mph'];
  * LocalStorage key for speed unit preference
  */
 const SPEED_UNIT_STORAGE_KEY = 'sweref99-speed-unit';
-const NON_BREAKING_SPACE = '\u00A0';
-const DECIMAL_SEPARATOR_PATTERN = /\./g;
 const SPEED_UNIT_PATTERN = /(m\/s|km\/h|mph)$/u;
-const WGS84_PROJECTION = 'EPSG:4326';
-const SWEREF99_PROJECTION = 'EPSG:3006';
-const SWEREF99_TM_PROJ_DEFINITION = '+proj=utm +zone=33 +ellps=GRS80 +towgs84=0,0,0,0,0,0,0 +units=m +no_defs +type=crs';
 
-// ============================================================================
-// UTILITY FUNCTIONS
-// ============================================================================
+/**
+ * Position modes in the order they are cycled by tapping the accuracy, and the key they are saved under
+ */
+const POSITION_MODE_ORDER: PositionMode[] = ['live', 'smoothed', 'average'];
+const POSITION_MODE_STORAGE_KEY = 'sweref99-position-mode';
 
 /**
- * Checks if a position is within Swedish territory
- * @param pos - GeolocationPosition to check
- * @returns true if position is within Sweden's approximate bounds
+ * LocalStorage key for overriding DEFAULT_TRANSFORM_ENGINE
  */
-function isValidLatitude(latitude: number): boolean {
-	return Number.isFinite(latitude) && latitude >= -90 && latitude <= 90;
-}
+const TRANSFORM_ENGINE_STORAGE_KEY = 'sweref99-transform-engine';
 
-function isValidLongitude(longitude: number): boolean {
-	return Number.isFinite(longitude) && longitude >= -180 && longitude <= 180;
-}
+/**
+ * LocalStorage key for the last rendered position
+ * Stored as a compact JSON array, see serializeLastKnownPosition.
+ */
+const LAST_POSITION_STORAGE_KEY = 'sweref99-last-position';
 
-function formatCoordinateValue(value: number): number | string {
-	return Number.isFinite(value) ? value : 'ogiltigt';
-}
+/**
+ * Minimum time between writes of the last position to localStorage
+ * localStorage is synchronous, so the position is not written for every fix. The newest
+ * position is always written when the page is hidden or unloaded.
+ */
+const LAST_POSITION_STORE_INTERVAL_MS = 30000;
 
-function isInSweden(pos: GeolocationPosition): boolean {
-	const { latitude, longitude } = pos.coords;
-	if (!isValidLatitude(latitude) || !isValidLongitude(longitude)) {
-		return false;
-	}
+/**
+ * Transform worker (module worker) and the pipeline module it runs
+ * The pipeline is imported directly on the main thread if the worker cannot start.
+ */
+const TRANSFORM_WORKER_URL = '/transform-worker.js';
 
-	return (
-		latitude >= SWEDEN_BOUNDS.MIN_LATITUDE &&
-		latitude <= SWEDEN_BOUNDS.MAX_LATITUDE &&
-		longitude >= SWEDEN_BOUNDS.MIN_LONGITUDE &&
-		longitude <= SWEDEN_BOUNDS.MAX_LONGITUDE
-	);
-}
+// ============================================================================
+// UTILITY FUNCTIONS
+// ============================================================================
 
 /**
  * Convert speed from m/s to the specified unit
@@ -203,24 +356,10 @@ function convertSpeed(speedMs: number, unit: SpeedUnit): number {
 	return speedMs * SPEED_CONVERSION[unit];
 }
 
-function setElementText(element: HTMLElement | null, text: string): void {
-	if (element) {
-		element.textContent = text;
-	}
-}
-
 function formatValueWithUnit(value: number | string, unit: SpeedUnit): string {
 	return `${value}${NON_BREAKING_SPACE}${unit}`;
 }
 
-function formatProjectedCoordinate(prefix: 'N' | 'E', value: number, spacing: 1 | 2): string {
-	return `${prefix}${NON_BREAKING_SPACE.repeat(spacing)}${Math.round(value)}`;
-}
-
-function formatWgs84Coordinate(prefix: 'N' | 'E', value: number): string {
-	return `${prefix}${NON_BREAKING_SPACE}${value.toString().replace(DECIMAL_SEPARATOR_PATTERN, ",")}°`;
-}
-
 function isShareSupported(): boolean {
 	return typeof navigator !== 'undefined' && typeof navigator.share === 'function';
 }
@@ -271,6 +410,14 @@ function getSavedSpeedUnit(): SpeedUnit {
 	return 'm/s';
 }
 
+function getSavedPositionMode(): PositionMode {
+	const saved = getStoredItem(POSITION_MODE_STORAGE_KEY);
+	if (saved && POSITION_MODE_ORDER.includes(saved as PositionMode)) {
+		return saved as PositionMode;
+	}
+	return 'live';
+}
+
 /**
  * Save the speed unit preference to localStorage
  * @param unit - Speed unit to save
@@ -280,143 +427,68 @@ function saveSpeedUnit(unit: SpeedUnit): void {
 }
 
 /**
- * Beräkna tidskorrigering för ITRF/ETRS89-drift
- * 
- * WGS84 (realiserat via ITRF) och SWEREF 99 (ETRS89 epoch 1999.5) 
- * skiljer sig med tiden pga. kontinentaldrift i Europa.
- * Denna beräkning görs en gång vid appstart.
- * 
- * @returns Correction values for northing and easting in meters
- */
-function calculateItrf2Etrs89Correction(): Itrf2Etrs89Correction {
-	// Beräkna aktuellt år (decimalår)
-	const now = new Date();
-	const yearStart = new Date(now.getFullYear(), 0, 1);
-	const yearEnd = new Date(now.getFullYear() + 1, 0, 1);
-	const yearFraction: number = (now.getTime() - yearStart.getTime()) / (yearEnd.getTime() - yearStart.getTime());
-	const currentEpoch: number = now.getFullYear() + yearFraction;
-	
-	// Tid sedan ETRS89 fixerades
-	const yearsSinceEtrs89: number = currentEpoch - ETRS89_EPOCH;
-	
-	// Konvertera till nord- och östkomponenter
-	const azimuthRad: number = (PLATE_VELOCITY.AZIMUTH_DEGREES * Math.PI) / 180;
-	const northVelocity: number = PLATE_VELOCITY.METERS_PER_YEAR * Math.cos(azimuthRad);
-	const eastVelocity: number = PLATE_VELOCITY.METERS_PER_YEAR * Math.sin(azimuthRad);
-	
-	// Total förskjutning sedan ETRS89 epoch
-	const totalNorthShift: number = northVelocity * yearsSinceEtrs89;
-	const totalEastShift: number = eastVelocity * yearsSinceEtrs89;
-	
-	return {
-		dn: totalNorthShift,
-		de: totalEastShift
-	};
+ * Get the saved transformation engine from localStorage
+ * @returns Saved engine or DEFAULT_TRANSFORM_ENGINE
+ */
+function getSavedTransformEngine(): TransformEngine {
+	const saved = getStoredItem(TRANSFORM_ENGINE_STORAGE_KEY);
+	if (saved && TRANSFORM_ENGINES.includes(saved as TransformEngine)) {
+		return saved as TransformEngine;
+	}
+	return DEFAULT_TRANSFORM_ENGINE;
 }
 
-// Beräkna korrigeringen en gång vid appstart
-const itrf2Etrs89Correction: Itrf2Etrs89Correction = calculateItrf2Etrs89Correction();
-let isSwerefProjectionDefined = false;
-
 /**
- * Ensures the SWEREF 99 projection definition is registered before transforms run.
- * @returns true when proj4 is ready to transform coordinates
+ * Serializes a position as [swerefN, swerefE, wgs84N, wgs84E, height, accuracy, timestamp],
+ * followed by averageCount and averageSpread for an averaged position
  */
-function ensureSwerefProjection(): boolean {
-	if (typeof proj4 === 'undefined') {
-		console.warn("SWEREF 99 transformation not available - ensure proj4.js loads before script.js");
-		return false;
-	}
-
-	if (isSwerefProjectionDefined) {
-		return true;
-	}
-
-	try {
-		const definitionExists = proj4.defs(SWEREF99_PROJECTION);
-		if (!definitionExists) {
-			proj4.defs(SWEREF99_PROJECTION, SWEREF99_TM_PROJ_DEFINITION);
-		}
-
-		isSwerefProjectionDefined = true;
-		return true;
-	} catch (error) {
-		console.warn('SWEREF 99-projektion kunde inte registreras:', error);
-		return false;
+function serializeLastKnownPosition({ position, accuracy, timestamp, averageCount, averageSpread }: LastKnownPosition): string {
+	const values: (string | number)[] = [
+		position.swerefN,
+		position.swerefE,
+		position.wgs84N,
+		position.wgs84E,
+		position.height,
+		accuracy,
+		timestamp
+	];
+	if (averageCount > 0) {
+		values.push(averageCount, averageSpread);
 	}
+	return JSON.stringify(values);
 }
 
 /**
- * Transforms WGS84 coordinates to SWEREF 99 TM using PROJ4JS
- * 
- * SWEREF 99 TM (EPSG:3006) is the Swedish national coordinate reference system
- * based on ETRS89 at epoch 1999.5. It uses a Transverse Mercator projection
- * covering all of Sweden with a single zone (UTM zone 33, central meridian 15°E).
- * 
- * @param lat - Latitude in WGS84 decimal degrees
- * @param lon - Longitude in WGS84 decimal degrees
- * @returns SWEREF 99 TM coordinates with ITRF/ETRS89 drift correction applied
- * 
- * @see SWEREF99-DEFINITION.md for complete verification and references
- * @see https://epsg.io/3006 - Official EPSG registry entry
- * @see https://www.lantmateriet.se - Lantmäteriet (Swedish mapping authority)
+ * Parses a stored position, or returns null if it is missing or malformed
  */
-function wgs84_to_sweref99tm(lat: number, lon: number): SwerefCoordinates {
+function parseLastKnownPosition(json: string | null): LastKnownPosition | null {
+	if (!json) {
+		return null;
+	}
+
 	try {
-		if (!isValidLatitude(lat) || !isValidLongitude(lon)) {
-			const displayLatitude = formatCoordinateValue(lat);
-			const displayLongitude = formatCoordinateValue(lon);
-			console.warn(`Avböjer ogiltig koordinattransformation för lat=${displayLatitude}, lon=${displayLongitude}`);
-			return { northing: Number.NaN, easting: Number.NaN };
+		const values: unknown = JSON.parse(json);
+		if (!Array.isArray(values) || (values.length !== 7 && values.length !== 9)) {
+			return null;
 		}
-
-		if (!ensureSwerefProjection()) {
-			return { northing: Number.NaN, easting: Number.NaN };
+		const [swerefN, swerefE, wgs84N, wgs84E, height, accuracy, timestamp, averageCount = 0, averageSpread = Number.NaN] = values;
+		if (![swerefN, swerefE, wgs84N, wgs84E, height].every((value) => typeof value === 'string') ||
+			!Number.isFinite(accuracy) || !Number.isFinite(timestamp)) {
+			return null;
 		}
-
-		// WGS84 is built-in as 'EPSG:4326'
-		// 
-		// SWEREF 99 TM (EPSG:3006) PROJ Definition
-		// =========================================
-		// This definition has been verified against official sources:
-		// - EPSG Registry (https://epsg.io/3006)
-		// - Lantmäteriet official documentation
-		// - SpatialReference.org (https://spatialreference.org/ref/epsg/3006/)
-		// 
-		// Parameter breakdown:
-		// +proj=utm          : Universal Transverse Mercator projection
-		// +zone=33           : UTM zone 33 (central meridian 15°E, covers Sweden)
-		// +ellps=GRS80       : Geodetic Reference System 1980 ellipsoid
-		// +towgs84=0,0,0,... : Zero transformation (ETRS89 ≈ WGS84 at epoch level)
-		// +units=m           : Coordinates in meters
-		// +no_defs           : Don't use proj_def.dat defaults
-		// +type=crs          : Modern PROJ convention for CRS definition
-		// 
-		// See SWEREF99-DEFINITION.md for complete verification documentation
-		// Transform coordinates using proj4
-		// Input: [longitude, latitude] in WGS84 (EPSG:4326)
-		// Output: [easting, northing] in SWEREF 99 TM (EPSG:3006)
-		const result = proj4(WGS84_PROJECTION, SWEREF99_PROJECTION, [lon, lat]);
-
-		let easting: number = result[0];
-		let northing: number = result[1];
-
-		// Applicera tidskorrigering för ITRF->ETRS89 drift
-		// Detta kompenserar för att WGS84 (ITRF-realisering) och SWEREF 99 (ETRS89)
-		// skiljer sig åt och att skillnaden ökar med tiden
-		northing += itrf2Etrs89Correction.dn;
-		easting += itrf2Etrs89Correction.de;
-
-		// Validate the result
-		if (!Number.isFinite(northing) || !Number.isFinite(easting)) {
-			console.warn(`Invalid coordinate transformation result for lat=${lat}, lon=${lon}:`, { northing, easting });
-			return { northing: 0, easting: 0 };
+		if (values.length === 9 && (!Number.isInteger(averageCount) || averageCount < 1 || !Number.isFinite(averageSpread))) {
+			return null;
 		}
-
-		return { northing, easting };
+		return {
+			position: { swerefN, swerefE, wgs84N, wgs84E, height, showNotInSwedenWarning: false },
+			accuracy,
+			timestamp,
+			averageCount,
+			averageSpread
+		};
 	} catch (error) {
-		console.error("Error in coordinate transformation:", error);
-		return { northing: 0, easting: 0 };
+		console.warn('Failed to parse last known position:', error);
+		return null;
 	}
 }
 
@@ -425,6 +497,7 @@ function wgs84_to_sweref99tm(lat: number, lon: number): SwerefCoordinates {
 // ============================================================================
 
 const speed = document.getElementById("speed");
+const uncert = document.getElementById("uncert");
 const posbtn = document.getElementById("pos-btn");
 const sharebtn = document.getElementById("share-btn");
 const stopbtn = document.getElementById("stop-btn");
@@ -435,6 +508,9 @@ const notificationTitle = document.getElementById("notification-title") as HTMLE
 const notificationCountdown = document.getElementById("notification-countdown") as SVGCircleElement | null;
 // Only one notification timer should be active at a time.
 let notificationTimeout: number | null = null;
+let notificationCountdownAnimation: Animation | null = null;
+// Omkretsen för countdown-cirkeln, samma som stroke-dasharray i stil.css
+const NOTIFICATION_COUNTDOWN_LENGTH = 56.55;
 
 // Skapa tidsstämpelformatterare en gång för återanvändning
 const timeFormatter: Intl.DateTimeFormat = new Intl.DateTimeFormat('sv-SE', {
@@ -461,11 +537,6 @@ function showNotification(message: string, duration: number = NOTIFICATION_DURAT
 		return;
 	}
 
-	// Stäng eventuellt öppet dialog först
-	if (notificationDialog.open) {
-		notificationDialog.close();
-	}
-
 	// Sätt rubrik om angiven
 	if (title && notificationHeader && notificationTitle) {
 		notificationTitle.textContent = title;
@@ -474,15 +545,19 @@ function showNotification(message: string, duration: number = NOTIFICATION_DURAT
 		notificationHeader.hidden = true;
 	}
 
-	// Sätt meddelande och visa dialog
+	// Sätt meddelande och visa dialog (ett redan öppet dialog återanvänds)
 	notificationContent.textContent = message;
-	// Starta om countdown-animationen
-	if (notificationCountdown) {
-		notificationCountdown.style.animation = 'none';
-		void notificationCountdown.getBoundingClientRect(); // Tvinga reflow för att återställa animationen
-		notificationCountdown.style.animation = `countdown-shrink ${duration / 1000}s linear forwards`;
+	// Starta om countdown-animationen utan att tvinga fram en reflow
+	if (notificationCountdown && typeof notificationCountdown.animate === 'function') {
+		notificationCountdownAnimation?.cancel();
+		notificationCountdownAnimation = notificationCountdown.animate(
+			[{ strokeDashoffset: 0 }, { strokeDashoffset: NOTIFICATION_COUNTDOWN_LENGTH }],
+			{ duration, easing: 'linear', fill: 'forwards' }
+		);
+	}
+	if (!notificationDialog.open) {
+		notificationDialog.showModal();
 	}
-	notificationDialog.showModal();
 	
 	// Dölj automatiskt efter angiven tid
 	if (notificationTimeout !== null) {
@@ -518,6 +593,96 @@ function handleNotificationBackdropClick(event: MouseEvent): void {
 // UI HELPER CLASS
 // ============================================================================
 
+/**
+ * RenderBatcher - samlar text- och klassändringar och skriver bara skillnader till DOM
+ * 
+ * Håller en skuggkopia av senast renderad text och klasstatus per element.
+ * Ändringar köas och genomförs i en enda flush per bildruta via requestAnimationFrame,
+ * så positioner som kommer tätare än skärmens uppdatering ger bara en målning.
+ * Oförändrade värden skrivs aldrig, vilket undviker onödiga uppläsningar i
+ * aria-live-regioner och omräkning av stilar.
+ */
+class RenderBatcher {
+	private renderedText = new Map<HTMLElement, string>();
+	private pendingText = new Map<HTMLElement, string>();
+	private renderedClasses = new Map<HTMLElement, Map<string, boolean>>();
+	private pendingClasses = new Map<HTMLElement, Map<string, boolean>>();
+	private frameHandle: number | null = null;
+
+	/**
+	 * Queues the text content of an element
+	 */
+	setText(element: HTMLElement | null, text: string): void {
+		if (!element) return;
+		this.pendingText.set(element, text);
+		this.scheduleFlush();
+	}
+
+	/**
+	 * Queues adding or removing a class on an element
+	 */
+	toggleClass(element: HTMLElement | null, className: string, enabled: boolean): void {
+		if (!element) return;
+		let classes = this.pendingClasses.get(element);
+		if (!classes) {
+			classes = new Map<string, boolean>();
+			this.pendingClasses.set(element, classes);
+		}
+		classes.set(className, enabled);
+		this.scheduleFlush();
+	}
+
+	/**
+	 * Gets the text an element shows after the next flush
+	 */
+	getText(element: HTMLElement | null): string {
+		if (!element) return '';
+		return this.pendingText.get(element) ?? this.renderedText.get(element) ?? element.textContent ?? '';
+	}
+
+	/**
+	 * Commits queued changes that differ from the rendered state
+	 */
+	flush(): void {
+		if (this.frameHandle !== null) {
+			cancelAnimationFrame(this.frameHandle);
+			this.frameHandle = null;
+		}
+
+		this.pendingText.forEach((text, element) => {
+			if (this.renderedText.get(element) !== text) {
+				element.textContent = text;
+				this.renderedText.set(element, text);
+			}
+		});
+		this.pendingText.clear();
+
+		this.pendingClasses.forEach((classes, element) => {
+			const rendered = this.renderedClasses.get(element) ?? new Map<string, boolean>();
+			this.renderedClasses.set(element, rendered);
+			classes.forEach((enabled, className) => {
+				if (rendered.get(className) !== enabled) {
+					element.classList.toggle(className, enabled);
+					rendered.set(className, enabled);
+				}
+			});
+		});
+		this.pendingClasses.clear();
+	}
+
+	private scheduleFlush(): void {
+		if (this.frameHandle !== null) return;
+		if (typeof requestAnimationFrame !== 'function') {
+			this.flush();
+			return;
+		}
+		this.frameHandle = requestAnimationFrame(() => {
+			this.frameHandle = null;
+			this.flush();
+		});
+	}
+}
+
 /**
  * UIHelper - centraliserar all DOM-manipulation och UI-state management
  * 
@@ -548,6 +713,7 @@ class UIHelper {
 		timestamp: HTMLElement | null;
 		swerefn: HTMLElement | null;
 		swerefe: HTMLElement | null;
+		rh2000h: HTMLElement | null;
 		wgs84n: HTMLElement | null;
 		wgs84e: HTMLElement | null;
 		posbtn: HTMLElement | null;
@@ -555,6 +721,7 @@ class UIHelper {
 		stopbtn: HTMLElement | null;
 	};
 	private currentSpeedUnit: SpeedUnit;
+	private renderer = new RenderBatcher();
 
 	constructor() {
 		this.elements = {
@@ -563,6 +730,7 @@ class UIHelper {
 			timestamp: document.getElementById("timestamp"),
 			swerefn: document.getElementById("sweref-n"),
 			swerefe: document.getElementById("sweref-e"),
+			rh2000h: document.getElementById("rh2000-h"),
 			wgs84n: document.getElementById("wgs84-n"),
 			wgs84e: document.getElementById("wgs84-e"),
 			posbtn: document.getElementById("pos-btn"),
@@ -579,12 +747,8 @@ class UIHelper {
 		const { uncert } = this.elements;
 		if (!uncert) return;
 
-		setElementText(uncert, `±${Math.round(accuracy)}${NON_BREAKING_SPACE}m`);
-		if (accuracy > threshold) {
-			uncert.classList.add("outofrange");
-		} else {
-			uncert.classList.remove("outofrange");
-		}
+		this.renderer.setText(uncert, `±${Math.round(accuracy)}${NON_BREAKING_SPACE}m`);
+		this.renderer.toggleClass(uncert, "outofrange", accuracy > threshold);
 	}
 
 	/**
@@ -597,16 +761,11 @@ class UIHelper {
 		if (speed !== null) {
 			const convertedSpeed = convertSpeed(speed, this.currentSpeedUnit);
 			const speedValue = Math.round(convertedSpeed);
-			setElementText(speedEl, formatValueWithUnit(speedValue, this.currentSpeedUnit));
-		} else {
-			setElementText(speedEl, formatValueWithUnit('?', this.currentSpeedUnit));
-		}
-		
-		if (speed !== null && speed > threshold) {
-			speedEl.classList.add("outofrange");
+			this.renderer.setText(speedEl, formatValueWithUnit(speedValue, this.currentSpeedUnit));
 		} else {
-			speedEl.classList.remove("outofrange");
+			this.renderer.setText(speedEl, formatValueWithUnit('?', this.currentSpeedUnit));
 		}
+		this.renderer.toggleClass(speedEl, "outofrange", speed !== null && speed > threshold);
 	}
 
 	/**
@@ -633,40 +792,73 @@ class UIHelper {
 		if (!timestampEl) return;
 
 		const date = new Date(timestamp);
-		setElementText(timestampEl, timeFormatter.format(date));
+		this.renderer.setText(timestampEl, timeFormatter.format(date));
 	}
 
 	/**
-	 * Updates coordinate displays for both SWEREF 99 and WGS84
+	 * Updates SWEREF 99, WGS84 and RH 2000 displays with strings formatted by the transform pipeline
 	 */
-	updateCoordinates(sweref: SwerefCoordinates, lat: number, lon: number): void {
-		const { swerefn, swerefe, wgs84n, wgs84e } = this.elements;
+	updatePosition(position: FormattedPosition): void {
+		const { swerefn, swerefe, wgs84n, wgs84e, rh2000h } = this.elements;
+		this.renderer.setText(swerefn, position.swerefN);
+		this.renderer.setText(swerefe, position.swerefE);
+		this.renderer.setText(wgs84n, position.wgs84N);
+		this.renderer.setText(wgs84e, position.wgs84E);
+		this.renderer.setText(rh2000h, position.height);
+		this.renderer.toggleClass(rh2000h, "unavailable", position.height === '');
+	}
 
-		if (!Number.isFinite(sweref.northing) || !Number.isFinite(sweref.easting)) {
-			console.warn("SWEREF 99 coordinates unavailable for position:", { lat, lon });
-			setElementText(swerefn, UI_TEXT.NOT_AVAILABLE);
-			setElementText(swerefe, UI_TEXT.NOT_AVAILABLE);
+	/**
+	 * Shows a position from an earlier session, marked as stale until setStale(false)
+	 */
+	showLastKnownPosition(snapshot: LastKnownPosition, threshold: number): void {
+		this.updatePosition(snapshot.position);
+		if (snapshot.averageCount > 0) {
+			this.updateAverage(snapshot.averageSpread, snapshot.averageCount);
 		} else {
-			setElementText(swerefn, formatProjectedCoordinate('N', sweref.northing, 1));
-			setElementText(swerefe, formatProjectedCoordinate('E', sweref.easting, 2));
+			this.updateAccuracy(snapshot.accuracy, threshold);
 		}
+		this.updateTimestamp(snapshot.timestamp);
+		this.setStale(true);
+	}
+
+	/**
+	 * Marks the position, accuracy and timestamp as stale (from an earlier session) or live
+	 */
+	setStale(isStale: boolean): void {
+		const { uncert, timestamp, swerefn, swerefe, rh2000h, wgs84n, wgs84e } = this.elements;
+		[uncert, timestamp, swerefn, swerefe, rh2000h, wgs84n, wgs84e].forEach((element) => {
+			this.renderer.toggleClass(element, "stale", isStale);
+		});
+	}
+
+	/**
+	 * Marks the accuracy and SWEREF 99 coordinates as estimated by the smoothing or averaging stage
+	 */
+	setSmoothed(isSmoothed: boolean): void {
+		const { uncert, swerefn, swerefe } = this.elements;
+		[uncert, swerefn, swerefe].forEach((element) => {
+			this.renderer.toggleClass(element, "smoothed", isSmoothed);
+		});
+	}
+
+	/**
+	 * Shows the spread and number of averaged fixes instead of the accuracy
+	 */
+	updateAverage(standardDeviation: number, count: number): void {
+		const { uncert } = this.elements;
+		if (!uncert) return;
 
-		setElementText(wgs84n, formatWgs84Coordinate('N', lat));
-		setElementText(wgs84e, formatWgs84Coordinate('E', lon));
+		const spread = standardDeviation.toFixed(1).replace(".", ",");
+		this.renderer.setText(uncert, `σ${NON_BREAKING_SPACE}${spread}${NON_BREAKING_SPACE}m${NON_BREAKING_SPACE}n=${count}`);
+		this.renderer.toggleClass(uncert, "outofrange", false);
 	}
 
 	/**
 	 * Sets loading state (shows/hides spinner)
 	 */
 	setLoadingState(isLoading: boolean): void {
-		const { timestamp } = this.elements;
-		if (!timestamp) return;
-
-		if (isLoading) {
-			timestamp.classList.add("loading");
-		} else {
-			timestamp.classList.remove("loading");
-		}
+		this.renderer.toggleClass(this.elements.timestamp, "loading", isLoading);
 	}
 
 	/**
@@ -703,16 +895,13 @@ class UIHelper {
 		this.setLoadingState(false);
 		this.setButtonState('stopped', false);
 		this.resetSpeedDisplay();
-		const { timestamp } = this.elements;
-		setElementText(timestamp, "--:--:--");
+		this.renderer.setText(this.elements.timestamp, "--:--:--");
 	}
 
 	resetSpeedDisplay(): void {
 		const { speed } = this.elements;
-		if (!speed) return;
-
-		setElementText(speed, formatValueWithUnit('–', this.currentSpeedUnit));
-		speed.classList.remove("outofrange");
+		this.renderer.setText(speed, formatValueWithUnit('–', this.currentSpeedUnit));
+		this.renderer.toggleClass(speed, "outofrange", false);
 	}
 
 	/**
@@ -721,11 +910,9 @@ class UIHelper {
 	 */
 	updateSpeedDisplayUnit(): void {
 		const { speed } = this.elements;
-		if (speed) {
-			const currentText = speed.textContent ?? '';
-			if (SPEED_UNIT_PATTERN.test(currentText)) {
-				setElementText(speed, currentText.replace(SPEED_UNIT_PATTERN, this.currentSpeedUnit));
-			}
+		const currentText = this.renderer.getText(speed);
+		if (SPEED_UNIT_PATTERN.test(currentText)) {
+			this.renderer.setText(speed, currentText.replace(SPEED_UNIT_PATTERN, this.currentSpeedUnit));
 		}
 	}
 
@@ -735,8 +922,8 @@ class UIHelper {
 	 */
 	getShareText(): string {
 		const { swerefn, swerefe } = this.elements;
-		const nText = swerefn?.textContent ?? '';
-		const eText = swerefe?.textContent ?? '';
+		const nText = this.renderer.getText(swerefn);
+		const eText = this.renderer.getText(swerefe);
 		// Remove the extra space after "E" that's used for alignment
 		const eTextNormalized = eText.replace(/^E[\s\u00A0]{2}/u, 'E ');
 		return `${nText} ${eTextNormalized} (SWEREF 99 TM)`;
@@ -769,6 +956,33 @@ let watchID: number | null = null;
 let spinnerTimeout: number | null = null;
 let hasReceivedPosition: boolean = false;
 let currentSpeed: number | null = null;
+const acquisitionState: AcquisitionState = { phase: 'waiting', coarseAccuracy: Infinity, coarseShownAt: 0 };
+
+/**
+ * Decides whether a coarse fix is shown: only before any other fix of the session
+ */
+function acceptCoarseFix(state: AcquisitionState, accuracy: number, now: number): boolean {
+	if (state.phase !== 'waiting') {
+		return false;
+	}
+	state.phase = 'coarse';
+	state.coarseAccuracy = accuracy;
+	state.coarseShownAt = now;
+	return true;
+}
+
+/**
+ * Decides whether a fix from the high-accuracy watch is shown
+ * While a coarse fix is shown, a watch fix must be at least as accurate, unless the
+ * coarse fix has been shown for COARSE_FIX_HOLD_MS. After that every watch fix is shown.
+ */
+function acceptWatchFix(state: AcquisitionState, accuracy: number, now: number): boolean {
+	if (state.phase === 'coarse' && accuracy > state.coarseAccuracy && now - state.coarseShownAt < COARSE_FIX_HOLD_MS) {
+		return false;
+	}
+	state.phase = 'precise';
+	return true;
+}
 
 /**
  * Clears the spinner timeout if it exists
@@ -793,17 +1007,32 @@ function startSpinnerTimeout(): void {
 	}, SPINNER_DELAY_MS);
 }
 
-function startGeolocationWatch(onError: PositionErrorCallback): void {
+/**
+ * Starts the high-accuracy watch together with a quick coarse fix
+ * The coarse fix is shown while the watch converges, see acceptWatchFix.
+ *
+ * @param initialPosition - Position already obtained (restore), used instead of requesting a coarse fix
+ */
+function startGeolocationWatch(onError: PositionErrorCallback, initialPosition?: GeolocationPosition): void {
 	if (watchID !== null) {
 		return;
 	}
 
+	acquisitionState.phase = 'waiting';
+	watchErrorHandler = onError;
 	watchID = navigator.geolocation.watchPosition(
 		handlePositionSuccess,
 		onError,
 		GEOLOCATION_OPTIONS
 	);
 	startSpinnerTimeout();
+
+	if (initialPosition !== undefined) {
+		handleCoarsePosition(initialPosition);
+	} else {
+		// Fel ignoreras; watchPosition rapporterar själv om positionering inte fungerar
+		navigator.geolocation.getCurrentPosition(handleCoarsePosition, () => {}, COARSE_GEOLOCATION_OPTIONS);
+	}
 }
 
 /**
@@ -814,39 +1043,726 @@ function stopGeolocationWatch(): void {
 		navigator.geolocation.clearWatch(watchID);
 		watchID = null;
 	}
+	resetPowerState(powerState);
+	positionStream.reset();
+	resetGateState(gateState);
+	resetKalmanState(kalmanState);
 	clearSpinnerTimeout();
 	uiHelper.setLoadingState(false);
+	postTransformRequest({ type: 'reset' });
 }
 
 // ============================================================================
-// GEOLOCATION HANDLERS
+// ADAPTIVE GEOLOCATION OPTIONS
 // ============================================================================
 
+let watchErrorHandler: PositionErrorCallback = handlePositionError;
+let isCharging = false;
+const powerState: GeolocationPowerState = {
+	mode: 'precise',
+	stationarySince: null,
+	anchorLatitude: 0,
+	anchorLongitude: 0,
+	anchorAccuracy: 0
+};
+const watchRestartLog: WatchRestartLogEntry[] = [];
+
+function resetPowerState(state: GeolocationPowerState): void {
+	state.mode = 'precise';
+	state.stationarySince = null;
+}
+
 /**
- * Position success handler
- * Called when a new position is received from the Geolocation API
+ * Decides which geolocation mode the next fixes should use
+ *
+ * Relaxed once the device has been stationary for STATIONARY_RELAX_AFTER_MS: slower than
+ * SPEED_THRESHOLD_MS, every fix accurate to ACCURACY_THRESHOLD_METERS and within the
+ * combined accuracy of the anchor fix. Precise again on movement or while charging.
+ * Updates the stationary tracking in place; the caller applies the returned mode.
  */
-function handlePositionSuccess(position: GeolocationPosition): void {
-	if (watchID === null) {
+function evaluateGeolocationMode(state: GeolocationPowerState, fix: PowerRelevantFix, charging: boolean): GeolocationMode {
+	const hasMoved = state.stationarySince !== null &&
+		approximateDistanceMeters(state.anchorLatitude, state.anchorLongitude, fix.latitude, fix.longitude) >
+		fix.accuracy + state.anchorAccuracy;
+	const isMoving = (fix.speed !== null && fix.speed > SPEED_THRESHOLD_MS) || hasMoved;
+
+	if (charging || isMoving) {
+		state.stationarySince = null;
+		return 'precise';
+	}
+	if (state.mode === 'relaxed') {
+		return 'relaxed';
+	}
+	if (fix.accuracy > ACCURACY_THRESHOLD_METERS) {
+		// Stillastående räknas bara med bra fixar; börja om när noggrannheten blir bra igen
+		state.stationarySince = null;
+		return 'precise';
+	}
+	if (state.stationarySince === null) {
+		state.stationarySince = fix.timestamp;
+		state.anchorLatitude = fix.latitude;
+		state.anchorLongitude = fix.longitude;
+		state.anchorAccuracy = fix.accuracy;
+	}
+	return fix.timestamp - state.stationarySince >= STATIONARY_RELAX_AFTER_MS ? 'relaxed' : 'precise';
+}
+
+/**
+ * Restarts the watch with the options for the given mode and logs the restart
+ */
+function applyGeolocationMode(mode: GeolocationMode, reason: string): void {
+	if (watchID === null || mode === powerState.mode) {
 		return;
 	}
-	
+
+	powerState.mode = mode;
+	navigator.geolocation.clearWatch(watchID);
+	watchID = navigator.geolocation.watchPosition(
+		handlePositionSuccess,
+		watchErrorHandler,
+		mode === 'relaxed' ? RELAXED_GEOLOCATION_OPTIONS : GEOLOCATION_OPTIONS
+	);
+
+	watchRestartLog.push({ time: Date.now(), mode, reason });
+	if (watchRestartLog.length > WATCH_RESTART_LOG_LENGTH) {
+		watchRestartLog.shift();
+	}
+	console.log(`Positionering: ${mode === 'relaxed' ? 'sparläge' : 'full noggrannhet'} (${reason})`);
+}
+
+function adaptGeolocationOptions(position: GeolocationPosition): void {
+	const { latitude, longitude, accuracy, speed } = position.coords;
+	const mode = evaluateGeolocationMode(powerState, { latitude, longitude, accuracy, speed, timestamp: position.timestamp }, isCharging);
+	applyGeolocationMode(mode, mode === 'relaxed' ? 'stillastående' : 'rörelse');
+}
+
+/**
+ * Follows the charging state through the Battery Status API, where available
+ * While charging there is no reason to save power, so the watch is kept precise.
+ */
+function monitorChargingState(): void {
+	const getBattery = (navigator as Navigator & { getBattery?: () => Promise<BatteryManager> }).getBattery;
+	if (typeof getBattery !== 'function') {
+		return;
+	}
+
+	getBattery.call(navigator).then((battery) => {
+		isCharging = battery.charging;
+		battery.addEventListener('chargingchange', () => {
+			isCharging = battery.charging;
+			if (isCharging) {
+				powerState.stationarySince = null;
+				applyGeolocationMode('precise', 'laddning');
+			}
+		});
+	}).catch((error) => {
+		console.warn('Batteristatus är inte tillgänglig:', error);
+	});
+}
+
+// ============================================================================
+// SHARED GEOLOCATION WATCH ACROSS TABS
+// ============================================================================
+
+let geolocationRole: GeolocationRole = 'stopped';
+let positionChannel: BroadcastChannel | null = null;
+let leadershipRequest: AbortController | null = null;
+let releaseLeadership: (() => void) | null = null;
+let positioningErrorHandler: PositionErrorCallback = handlePositionError;
+
+function isTabCoordinationSupported(): boolean {
+	return typeof BroadcastChannel === 'function' && typeof navigator.locks?.request === 'function';
+}
+
+/**
+ * Starts positioning in this tab
+ * With Web Locks and BroadcastChannel only one tab or window runs the watch; the others
+ * follow its broadcast positions and take over when it is closed, stopped or hidden.
+ *
+ * @param initialPosition - Position already obtained (restore), shown if this tab leads
+ */
+function startPositioning(onError: PositionErrorCallback, initialPosition?: GeolocationPosition): void {
+	if (geolocationRole !== 'stopped') {
+		return;
+	}
+
+	positioningErrorHandler = onError;
+	if (!isTabCoordinationSupported()) {
+		geolocationRole = 'leader';
+		startGeolocationWatch(onError, initialPosition);
+		return;
+	}
+
+	geolocationRole = 'follower';
+	startSpinnerTimeout();
+	requestLeadership(initialPosition);
+}
+
+/**
+ * Waits for the leader lock and runs the watch while holding it
+ */
+function requestLeadership(initialPosition?: GeolocationPosition): void {
+	const request = new AbortController();
+	leadershipRequest = request;
+
+	navigator.locks.request(GEOLOCATION_LEADER_LOCK, { signal: request.signal }, () => {
+		leadershipRequest = null;
+		// En dold flik släpper låset direkt och ställer sig i kön igen när den visas
+		if (geolocationRole !== 'follower' || document.hidden) {
+			return;
+		}
+
+		geolocationRole = 'leader';
+		startGeolocationWatch(positioningErrorHandler, initialPosition);
+		// Låset hålls tills releaseLeadership anropas eller fliken stängs
+		return new Promise<void>((resolve) => {
+			releaseLeadership = resolve;
+		});
+	}).catch((error) => {
+		if (!(error instanceof DOMException && error.name === 'AbortError')) {
+			console.warn('Kunde inte samordna positionering mellan flikar:', error);
+		}
+	});
+}
+
+/**
+ * Stops the watch if this tab leads and releases the lock to the next waiting tab
+ */
+function stepDownAsLeader(): void {
+	if (geolocationRole === 'leader') {
+		stopGeolocationWatch();
+	}
+	releaseLeadership?.();
+	releaseLeadership = null;
+}
+
+/**
+ * Stops positioning in this tab, as leader or follower
+ */
+function stopPositioning(): void {
+	leadershipRequest?.abort();
+	leadershipRequest = null;
+	releaseLeadership?.();
+	releaseLeadership = null;
+	geolocationRole = 'stopped';
+	stopGeolocationWatch();
+	// Medelvärdet överlever att fliken döljs men inte att positioneringen stoppas
+	resetAverageState(averageState);
+	saveLastKnownPosition();
+}
+
+/**
+ * Lets only visible tabs run or wait for the watch
+ * A hidden leader hands the lock to the next waiting tab and a hidden follower leaves the
+ * queue. Both queue again when visible, so a tab opened later never waits behind a hidden one.
+ */
+function updateLeadershipForVisibility(): void {
+	if (geolocationRole === 'stopped' || !isTabCoordinationSupported()) {
+		return;
+	}
+
+	if (document.hidden) {
+		leadershipRequest?.abort();
+		leadershipRequest = null;
+		stepDownAsLeader();
+		geolocationRole = 'follower';
+	} else if (geolocationRole === 'follower' && leadershipRequest === null) {
+		requestLeadership();
+	}
+}
+
+function broadcastPosition(position: FormattedPosition, sample: PositionSample): void {
+	if (positionChannel === null || geolocationRole !== 'leader') {
+		return;
+	}
+
+	const message: SharedPositionMessage = {
+		type: 'position',
+		position,
+		accuracy: sample.accuracy,
+		speed: sample.speed,
+		timestamp: sample.position.timestamp,
+		averageCount: sample.averageCount,
+		averageSpread: sample.averageSpread
+	};
+	positionChannel.postMessage(message);
+}
+
+/**
+ * Checks a message from the position channel, which may come from another version of the app
+ */
+function isSharedPositionMessage(data: unknown): data is SharedPositionMessage {
+	if (typeof data !== 'object' || data === null) {
+		return false;
+	}
+	const message = data as Partial<SharedPositionMessage>;
+	const position = message.position;
+	return message.type === 'position' &&
+		typeof position === 'object' && position !== null &&
+		[position.swerefN, position.swerefE, position.wgs84N, position.wgs84E, position.height]
+			.every((value) => typeof value === 'string') &&
+		typeof position.showNotInSwedenWarning === 'boolean' &&
+		Number.isFinite(message.accuracy) &&
+		(message.speed === null || Number.isFinite(message.speed)) &&
+		Number.isFinite(message.timestamp) &&
+		typeof message.averageCount === 'number' && Number.isInteger(message.averageCount) && message.averageCount >= 0 &&
+		(message.averageCount === 0 || Number.isFinite(message.averageSpread));
+}
+
+/**
+ * Renders a position broadcast by the leader tab, if this tab follows, and remembers it
+ * as the last known position like the store stage does in the leader
+ */
+function handleSharedPosition(event: MessageEvent): void {
+	const message: unknown = event.data;
+	if (geolocationRole !== 'follower' || !isSharedPositionMessage(message)) {
+		return;
+	}
+
 	clearSpinnerTimeout();
 	uiHelper.setLoadingState(false);
-	
-	if (!isInSweden(position)) {
+	if (message.position.showNotInSwedenWarning) {
 		showNotification(UI_TEXT.WARNING_NOT_IN_SWEDEN, NOTIFICATION_DURATION.DEFAULT, UI_TEXT.WARNING_NOT_IN_SWEDEN_TITLE);
 	}
-	
-	uiHelper.updateAccuracy(position.coords.accuracy, ACCURACY_THRESHOLD_METERS);
-	currentSpeed = position.coords.speed;
+	uiHelper.updatePosition(message.position);
+	uiHelper.setStale(false);
+	if (message.averageCount > 0) {
+		uiHelper.updateAverage(message.averageSpread, message.averageCount);
+	} else {
+		uiHelper.updateAccuracy(message.accuracy, ACCURACY_THRESHOLD_METERS);
+	}
+	currentSpeed = message.speed;
 	uiHelper.updateSpeed(currentSpeed, SPEED_THRESHOLD_MS);
-	uiHelper.updateTimestamp(position.timestamp);
-
-	const sweref = wgs84_to_sweref99tm(position.coords.latitude, position.coords.longitude);
-	uiHelper.updateCoordinates(sweref, position.coords.latitude, position.coords.longitude);
+	uiHelper.updateTimestamp(message.timestamp);
 	hasReceivedPosition = true;
 	uiHelper.setButtonState('active');
+	// Sparas även här, så att en flik som stängs som följare visar positionen vid nästa start
+	rememberLastKnownPosition({
+		position: message.position,
+		accuracy: message.accuracy,
+		timestamp: message.timestamp,
+		averageCount: message.averageCount,
+		averageSpread: message.averageSpread
+	});
+}
+
+function startPositionChannel(): void {
+	if (!isTabCoordinationSupported()) {
+		return;
+	}
+	positionChannel = new BroadcastChannel(POSITION_CHANNEL_NAME);
+	positionChannel.addEventListener('message', handleSharedPosition);
+}
+
+// ============================================================================
+// TRANSFORM WORKER
+// ============================================================================
+
+let transformWorker: Worker | null = null;
+// Reservväg i huvudtråden, satt när workern inte kunde startas
+let mainThreadTransform: Promise<(request: TransformRequest) => TransformResponse | null> | null = null;
+// Förfrågningar som skickats till workern, i ordning, med det som väntar på svaret
+const pendingTransforms: Array<{ resolve: (response: PositionResponse) => void; reject: (error: unknown) => void }> = [];
+const pendingStatsRequests: Array<{ resolve: (stats: TransformCacheStats) => void; reject: (error: unknown) => void }> = [];
+
+/**
+ * Starts the transform worker and sends it the saved engine
+ * Falls back to running the pipeline on the main thread if module workers are unavailable.
+ */
+function startTransformWorker(): void {
+	if (typeof Worker !== 'function') {
+		useMainThreadTransform();
+		return;
+	}
+
+	try {
+		transformWorker = new Worker(TRANSFORM_WORKER_URL, { type: 'module' });
+	} catch (error) {
+		console.warn('Transformeringsworkern kunde inte skapas, räknar i huvudtråden:', error);
+		useMainThreadTransform();
+		return;
+	}
+
+	transformWorker.addEventListener('message', (event: MessageEvent<TransformResponse>) => {
+		handleTransformResponse(event.data);
+	});
+	transformWorker.addEventListener('error', (event: ErrorEvent) => {
+		event.preventDefault();
+		console.warn('Transformeringsworkern kunde inte startas, räknar i huvudtråden:', event.message);
+		transformWorker?.terminate();
+		transformWorker = null;
+		rejectPendingTransformRequests(new Error(`Transformeringsworkern misslyckades: ${event.message}`));
+		useMainThreadTransform();
+	});
+	postTransformRequest({ type: 'configure', engine: getSavedTransformEngine() });
+}
+
+/**
+ * Loads the transform pipeline on the main thread (only once)
+ * The engine is sent again since the configuration posted to a failed worker is lost.
+ */
+function useMainThreadTransform(): void {
+	if (mainThreadTransform !== null) {
+		return;
+	}
+
+	mainThreadTransform = import('./transform-pipeline.js').then((pipeline) => pipeline.handleTransformRequest);
+	mainThreadTransform.catch((error) => {
+		console.error('Koordinattransformationen kunde inte laddas:', error);
+	});
+
+	postTransformRequest({ type: 'configure', engine: getSavedTransformEngine() });
+}
+
+/**
+ * Rejects and forgets every request waiting for an answer that will never come
+ * Called when the worker fails, or the main-thread pipeline could not be loaded.
+ */
+function rejectPendingTransformRequests(error: unknown): void {
+	const transforms = pendingTransforms.splice(0);
+	const statsRequests = pendingStatsRequests.splice(0);
+	transforms.forEach(({ reject }) => reject(error));
+	statsRequests.forEach(({ reject }) => reject(error));
+}
+
+/**
+ * Sends a request to the worker, or to the main-thread pipeline in request order
+ */
+function postTransformRequest(request: TransformRequest, transfer: Transferable[] = []): void {
+	if (transformWorker !== null) {
+		transformWorker.postMessage(request, transfer);
+		return;
+	}
+
+	mainThreadTransform?.then((handleRequest) => {
+		const response = handleRequest(request);
+		if (response !== null) {
+			handleTransformResponse(response);
+		}
+	}).catch((error) => {
+		// Felet har redan loggats i useMainThreadTransform
+		rejectPendingTransformRequests(error);
+	});
+}
+
+/**
+ * Packs a position into a Float64Array and transfers its buffer to the pipeline
+ */
+function postPosition(position: GeolocationPosition): void {
+	const { latitude, longitude, altitude } = position.coords;
+	const fix = packPositionFix(latitude, longitude, altitude, position.timestamp);
+	postTransformRequest({ type: 'position', fix }, [fix.buffer]);
+}
+
+/**
+ * Transforms a position in the pipeline and resolves with the formatted strings and metres
+ * The pipeline answers position requests in order, so responses are matched first in, first out.
+ */
+function transformPosition(position: GeolocationPosition): Promise<PositionResponse> {
+	return new Promise((resolve, reject) => {
+		pendingTransforms.push({ resolve, reject });
+		postPosition(position);
+	});
+}
+
+function handleTransformResponse(response: TransformResponse): void {
+	if (response.type === 'stats') {
+		pendingStatsRequests.shift()?.resolve(response.stats);
+		return;
+	}
+	pendingTransforms.shift()?.resolve(response);
+}
+
+/**
+ * Hit/miss counters for the projection cache in the worker, for diagnostics from the console
+ */
+function requestTransformCacheStats(): Promise<TransformCacheStats> {
+	return new Promise((resolve, reject) => {
+		pendingStatsRequests.push({ resolve, reject });
+		postTransformRequest({ type: 'stats' });
+	});
+}
+
+/**
+ * Selects and saves the transformation engine
+ * 'proj4' is kept as a reference path for verifying the native engine.
+ */
+function selectTransformEngine(engine: TransformEngine): void {
+	if (!TRANSFORM_ENGINES.includes(engine)) {
+		console.warn(`Okänd transformationsmotor: ${engine}`);
+		return;
+	}
+	setStoredItem(TRANSFORM_ENGINE_STORAGE_KEY, engine);
+	postTransformRequest({ type: 'configure', engine });
+}
+
+// ============================================================================
+// GEOLOCATION HANDLERS
+// ============================================================================
+
+/**
+ * Position success handler
+ * Called when a new position is received from the high-accuracy watch
+ */
+function handlePositionSuccess(position: GeolocationPosition): void {
+	if (watchID === null || !acceptWatchFix(acquisitionState, position.coords.accuracy, Date.now())) {
+		return;
+	}
+	positionStream.push(createPositionSample(position));
+}
+
+/**
+ * Coarse position handler
+ * Shows the quick low-accuracy fix if the watch has not delivered anything yet
+ */
+function handleCoarsePosition(position: GeolocationPosition): void {
+	if (watchID === null || !acceptCoarseFix(acquisitionState, position.coords.accuracy, Date.now())) {
+		return;
+	}
+	positionStream.push(createPositionSample(position));
+}
+
+// ============================================================================
+// POSITION STREAM STAGES
+// ============================================================================
+
+let positionMode: PositionMode = getSavedPositionMode();
+const gateState = createGateState();
+const rejectedFixes: Record<FixRejection, number> = { time: 0, velocity: 0, innovation: 0 };
+const kalmanState = createKalmanState();
+const averageState = createAverageState();
+
+function createPositionSample(position: GeolocationPosition): PositionSample {
+	return {
+		position,
+		formatted: null,
+		northing: Number.NaN,
+		easting: Number.NaN,
+		accuracy: position.coords.accuracy,
+		speed: position.coords.speed,
+		averageCount: 0,
+		averageSpread: Number.NaN
+	};
+}
+
+/**
+ * Drops physically implausible fixes (position jumps, multipath) before they are transformed,
+ * so they are never rendered, stored or shared. Rejections are counted by reason.
+ */
+const gateStage: PositionStage<PositionSample> = {
+	name: 'gate',
+	enabled: true,
+	process: (sample) => {
+		const { coords, timestamp } = sample.position;
+		const rejection = gatePositionFix(gateState, coords.latitude, coords.longitude, coords.accuracy, coords.speed, timestamp);
+		if (rejection === null) {
+			return sample;
+		}
+		rejectedFixes[rejection]++;
+		return null;
+	}
+};
+
+/**
+ * Relaxes or tightens the geolocation watch, only for fixes the gate has accepted
+ */
+const adaptStage: PositionStage<PositionSample> = {
+	name: 'adapt',
+	enabled: true,
+	process: (sample) => {
+		adaptGeolocationOptions(sample.position);
+		return sample;
+	}
+};
+
+/**
+ * Sweden check, projection and height, computed in the transform worker
+ */
+const transformStage: PositionStage<PositionSample> = {
+	name: 'transform',
+	enabled: true,
+	process: async (sample) => {
+		const response = await transformPosition(sample.position);
+		sample.formatted = response.position;
+		sample.northing = response.northing;
+		sample.easting = response.easting;
+		return sample;
+	}
+};
+
+/**
+ * Constant-velocity Kalman filter in SWEREF 99 TM metres, enabled in the 'smoothed' mode
+ * The filter state is a fixed Float64Array updated in place, see position-filters.ts.
+ */
+const smoothStage: PositionStage<PositionSample> = {
+	name: 'smooth',
+	enabled: false,
+	process: (sample) => {
+		const { formatted, position } = sample;
+		if (formatted === null || !Number.isFinite(sample.northing) || !Number.isFinite(sample.easting)) {
+			return sample;
+		}
+
+		updateKalmanState(kalmanState, sample.northing, sample.easting, position.coords.accuracy, position.timestamp);
+		sample.northing = kalmanState[KALMAN_NORTH + KALMAN_POSITION];
+		sample.easting = kalmanState[KALMAN_EAST + KALMAN_POSITION];
+		sample.accuracy = kalmanAccuracy(kalmanState);
+		sample.speed = Math.hypot(kalmanState[KALMAN_NORTH + KALMAN_VELOCITY], kalmanState[KALMAN_EAST + KALMAN_VELOCITY]);
+		formatted.swerefN = formatProjectedCoordinate('N', sample.northing, 1);
+		formatted.swerefE = formatProjectedCoordinate('E', sample.easting, 2);
+		return sample;
+	}
+};
+
+/**
+ * Weighted running mean in SWEREF 99 TM metres, enabled in the 'average' mode
+ * Uses constant memory however long the survey runs, see addAverageSample.
+ */
+const averageStage: PositionStage<PositionSample> = {
+	name: 'average',
+	enabled: false,
+	process: (sample) => {
+		const { formatted, position } = sample;
+		if (formatted === null || !Number.isFinite(sample.northing) || !Number.isFinite(sample.easting)) {
+			return sample;
+		}
+
+		addAverageSample(averageState, sample.northing, sample.easting, position.coords.accuracy);
+		if (averageState[AVERAGE_COUNT] === 0) {
+			return sample;
+		}
+		sample.northing = averageState[AVERAGE_NORTH];
+		sample.easting = averageState[AVERAGE_EAST];
+		sample.averageCount = averageState[AVERAGE_COUNT];
+		sample.averageSpread = averageStandardDeviation(averageState);
+		formatted.swerefN = formatProjectedCoordinate('N', sample.northing, 1);
+		formatted.swerefE = formatProjectedCoordinate('E', sample.easting, 2);
+		return sample;
+	}
+};
+
+/**
+ * Writes coordinates, accuracy, speed and timestamp to the page
+ */
+const renderStage: PositionStage<PositionSample> = {
+	name: 'render',
+	enabled: true,
+	process: (sample) => {
+		const { position, formatted } = sample;
+		clearSpinnerTimeout();
+		uiHelper.setLoadingState(false);
+
+		if (formatted !== null) {
+			if (formatted.showNotInSwedenWarning) {
+				showNotification(UI_TEXT.WARNING_NOT_IN_SWEDEN, NOTIFICATION_DURATION.DEFAULT, UI_TEXT.WARNING_NOT_IN_SWEDEN_TITLE);
+			}
+			uiHelper.updatePosition(formatted);
+			uiHelper.setStale(false);
+		}
+		if (sample.averageCount > 0) {
+			uiHelper.updateAverage(sample.averageSpread, sample.averageCount);
+		} else {
+			uiHelper.updateAccuracy(sample.accuracy, ACCURACY_THRESHOLD_METERS);
+		}
+		currentSpeed = sample.speed;
+		uiHelper.updateSpeed(currentSpeed, SPEED_THRESHOLD_MS);
+		uiHelper.updateTimestamp(position.timestamp);
+		hasReceivedPosition = true;
+		uiHelper.setButtonState('active');
+		return sample;
+	}
+};
+
+// Senast ritade position som ännu inte sparats, och när positionen senast sparades
+let unsavedLastPosition: LastKnownPosition | null = null;
+let lastPositionSavedAt = Number.NEGATIVE_INFINITY;
+
+/**
+ * Writes the newest rendered position to localStorage, if it has not been saved yet
+ */
+function saveLastKnownPosition(): void {
+	if (unsavedLastPosition === null) {
+		return;
+	}
+	setStoredItem(LAST_POSITION_STORAGE_KEY, serializeLastKnownPosition(unsavedLastPosition));
+	unsavedLastPosition = null;
+	lastPositionSavedAt = Date.now();
+}
+
+/**
+ * Remembers the newest rendered position; saves it at once if the last save is older than
+ * LAST_POSITION_STORE_INTERVAL_MS, otherwise when the page is hidden or unloaded
+ */
+function rememberLastKnownPosition(snapshot: LastKnownPosition): void {
+	unsavedLastPosition = snapshot;
+	if (Date.now() - lastPositionSavedAt >= LAST_POSITION_STORE_INTERVAL_MS) {
+		saveLastKnownPosition();
+	}
+}
+
+function saveLastKnownPositionIfHidden(): void {
+	if (document.hidden) {
+		saveLastKnownPosition();
+	}
+}
+
+/**
+ * Saves the rendered position for the next launch and shares it with follower tabs
+ */
+const storeStage: PositionStage<PositionSample> = {
+	name: 'store',
+	enabled: true,
+	process: (sample) => {
+		const { position, formatted } = sample;
+		if (formatted !== null) {
+			broadcastPosition(formatted, sample);
+			rememberLastKnownPosition({
+				position: formatted,
+				accuracy: sample.accuracy,
+				timestamp: position.timestamp,
+				averageCount: sample.averageCount,
+				averageSpread: sample.averageSpread
+			});
+		}
+		return sample;
+	}
+};
+
+/**
+ * Fixes from the leader's watch flow through these stages in order.
+ * While the transform is busy only the newest fix waits, older ones are dropped as superseded.
+ */
+const positionStream = new PositionStream<PositionSample>([gateStage, adaptStage, transformStage, smoothStage, averageStage, renderStage, storeStage]);
+
+/**
+ * Switches between showing every fix, the smoothed estimate and the running mean
+ * The filter and the mean start over so old fixes are never mixed with new ones.
+ */
+function applyPositionMode(mode: PositionMode): void {
+	positionMode = mode;
+	resetKalmanState(kalmanState);
+	resetAverageState(averageState);
+	positionStream.setEnabled('smooth', mode === 'smoothed');
+	positionStream.setEnabled('average', mode === 'average');
+	uiHelper.setSmoothed(mode !== 'live');
+}
+
+function cyclePositionMode(): void {
+	const nextMode = POSITION_MODE_ORDER[(POSITION_MODE_ORDER.indexOf(positionMode) + 1) % POSITION_MODE_ORDER.length];
+	setStoredItem(POSITION_MODE_STORAGE_KEY, nextMode);
+	applyPositionMode(nextMode);
+	const descriptions: Record<PositionMode, string> = {
+		live: UI_TEXT.POSITION_MODE_LIVE,
+		smoothed: UI_TEXT.POSITION_MODE_SMOOTHED,
+		average: UI_TEXT.POSITION_MODE_AVERAGE
+	};
+	showNotification(descriptions[nextMode], NOTIFICATION_DURATION.DEFAULT, UI_TEXT.POSITION_MODE_TITLE);
+}
+
+function setPipelineStage(name: string, enabled: boolean): void {
+	if (!positionStream.setEnabled(name, enabled)) {
+		console.warn(`Okänt positionssteg: ${name}`);
+	}
 }
 
 /**
@@ -867,7 +1783,7 @@ function handlePositionError(): void {
  */
 function handlePositionRestoreError(): void {
 	console.log("Positioning restore failed, resetting to stopped state");
-	stopGeolocationWatch();
+	stopPositioning();
 	uiHelper.resetUI();
 }
 
@@ -888,16 +1804,16 @@ function posInit(event: Event): void {
 		}
 		// Test geolocation with a quick position request before starting watch
 		navigator.geolocation.getCurrentPosition(
-			() => {
-				// Geolocation is available, proceed with watch
-				startGeolocationWatch(handlePositionRestoreError);
+			(position) => {
+				// Geolocation is available, proceed with watch and show the test position meanwhile
+				startPositioning(handlePositionRestoreError, position);
 			},
 			handlePositionRestoreError,
 			GEOLOCATION_TEST_OPTIONS
 		);
 	} else {
 		// Regular positioning start
-		startGeolocationWatch(handlePositionError);
+		startPositioning(handlePositionError);
 	}
 }
 
@@ -913,11 +1829,11 @@ function handleVisibilityChange(): void {
 	if (!document.hidden && uiHelper.isUIInconsistent()) {
 		// UI state is inconsistent - reset to stopped state
 		console.log("Detected inconsistent positioning state after navigation, resetting...");
-		stopGeolocationWatch();
+		stopPositioning();
 		uiHelper.resetUI();
 	} else if (!document.hidden && uiHelper.isPositioningUIActive()) {
-		// UI indicates positioning should be active, check if watchID is valid
-		if (watchID === null) {
+		// UI indicates positioning should be active, check if this tab still leads or follows
+		if (geolocationRole === 'stopped') {
 			console.log("Positioning was active but watch was lost, restarting...");
 			posInit(new Event("restore"));
 		}
@@ -1052,7 +1968,7 @@ function initializeEventListeners(): void {
 	
 	// Stop button
 	stopbtn?.addEventListener("click", () => {
-		stopGeolocationWatch();
+		stopPositioning();
 		uiHelper.setButtonState('stopped', hasReceivedPosition);
 		uiHelper.resetSpeedDisplay();
 	});
@@ -1062,6 +1978,9 @@ function initializeEventListeners(): void {
 		uiHelper.cycleSpeedUnit(currentSpeed, SPEED_THRESHOLD_MS);
 	});
 
+	// Position mode cycling
+	uncert?.addEventListener("click", cyclePositionMode);
+
 	// Share button
 	sharebtn?.addEventListener("click", async () => {
 		if (!isShareSupported()) {
@@ -1090,6 +2009,9 @@ function initializeEventListeners(): void {
 
 	// Page visibility changes (including back/forward navigation)
 	document.addEventListener("visibilitychange", handleVisibilityChange);
+	document.addEventListener("visibilitychange", updateLeadershipForVisibility);
+	document.addEventListener("visibilitychange", saveLastKnownPositionIfHidden);
+	window.addEventListener("pagehide", saveLastKnownPosition);
 	
 	// Pageshow event for back/forward navigation in some browsers
 	window.addEventListener("pageshow", (event) => {
@@ -1122,6 +2044,20 @@ function initializeEventListeners(): void {
 	}
 }
 
+// Start the transform worker before the first position can arrive
+startTransformWorker();
+window.sweref99 = {
+	getTransformCacheStats: requestTransformCacheStats,
+	setTransformEngine: selectTransformEngine,
+	getWatchRestarts: () => watchRestartLog.slice(),
+	getPipelineStats: () => positionStream.getStats(),
+	setPipelineStage,
+	getRejectedFixes: () => ({ ...rejectedFixes })
+};
+monitorChargingState();
+startPositionChannel();
+applyPositionMode(positionMode);
+
 // Initialize the application
 initializeEventListeners();
 
@@ -1130,3 +2066,10 @@ initializeDetailsStatePersistence();
 
 // Update speed display to show saved unit preference
 uiHelper.updateSpeedDisplayUnit();
+
+// Visa senast kända position direkt, tills en ny position har räknats fram
+const lastKnownPosition = parseLastKnownPosition(getStoredItem(LAST_POSITION_STORAGE_KEY));
+if (lastKnownPosition !== null) {
+	uiHelper.showLastKnownPosition(lastKnownPosition, ACCURACY_THRESHOLD_METERS);
+}
+
@@ -0,0 +1,161 @@
+// Positionspipeline: tar emot en packad position och returnerar färdigformaterade strängar.
+// Körs i transformeringsworkern, eller i huvudtråden om workern inte kan startas.
+
+import {
+	calculateRh2000Height,
+	getTransformCacheStats,
+	isInSweden,
+	loadVelocityGrid,
+	setTransformEngine,
+	wgs84_to_sweref99tm
+} from './geodesy.js';
+import {
+	NOT_AVAILABLE_TEXT,
+	formatHeight,
+	formatProjectedCoordinate,
+	formatWgs84Coordinate
+} from './format.js';
+import {
+	FIX_ALTITUDE,
+	FIX_LATITUDE,
+	FIX_LONGITUDE,
+	FIX_TIMESTAMP,
+	TRANSFORM_ENGINES,
+	type PositionResponse,
+	type TransformRequest,
+	type TransformResponse
+} from './transform-protocol.js';
+
+// ============================================================================
+// TYPE DEFINITIONS AND INTERFACES
+// ============================================================================
+
+/**
+ * Whether the latest positions are in Sweden, with hysteresis (see updateSwedenPresence)
+ */
+export type SwedenPresence = 'unknown' | 'inside' | 'outside';
+
+export interface SwedenPresenceState {
+	presence: SwedenPresence;
+	pendingFixes: number;
+}
+
+// ============================================================================
+// CONFIGURATION CONSTANTS
+// ============================================================================
+
+/**
+ * Number of consecutive fixes on the other side of the border before the
+ * inside/outside state changes. Keeps GPS noise near the border from
+ * repeating the "not in Sweden" warning.
+ */
+const SWEDEN_PRESENCE_HYSTERESIS_FIXES = 3;
+
+// ============================================================================
+// PIPELINE STATE
+// ============================================================================
+
+const swedenPresenceState: SwedenPresenceState = { presence: 'unknown', pendingFixes: 0 };
+
+// ============================================================================
+// PIPELINE FUNCTIONS
+// ============================================================================
+
+/**
+ * Track whether positions are inside Sweden and report inside → outside transitions
+ *
+ * The first fix sets the state directly. After that the state only changes once
+ * SWEDEN_PRESENCE_HYSTERESIS_FIXES consecutive fixes agree on the other side.
+ *
+ * @param state - Presence state, updated in place
+ * @param isInside - Whether the latest fix is inside Sweden
+ * @returns true if the "not in Sweden" warning should be shown for this fix
+ */
+export function updateSwedenPresence(state: SwedenPresenceState, isInside: boolean): boolean {
+	const observed: SwedenPresence = isInside ? 'inside' : 'outside';
+	if (state.presence === 'unknown') {
+		state.presence = observed;
+		state.pendingFixes = 0;
+		return observed === 'outside';
+	}
+
+	if (observed === state.presence) {
+		state.pendingFixes = 0;
+		return false;
+	}
+
+	state.pendingFixes++;
+	if (state.pendingFixes < SWEDEN_PRESENCE_HYSTERESIS_FIXES) {
+		return false;
+	}
+	state.presence = observed;
+	state.pendingFixes = 0;
+	return observed === 'outside';
+}
+
+/**
+ * Transforms a packed fix and formats every value shown for a position
+ *
+ * Runs the Sweden check, projection with drift correction and RH 2000 height, then
+ * starts loading the velocity grid so the download never delays the first fix.
+ */
+function processPositionFix(fix: Float64Array): PositionResponse {
+	const latitude = fix[FIX_LATITUDE];
+	const longitude = fix[FIX_LONGITUDE];
+	const altitude = fix[FIX_ALTITUDE];
+
+	const showNotInSwedenWarning = updateSwedenPresence(swedenPresenceState, isInSweden(latitude, longitude));
+	const sweref = wgs84_to_sweref99tm(latitude, longitude, fix[FIX_TIMESTAMP]);
+	const height = calculateRh2000Height(latitude, longitude, altitude);
+
+	let swerefN: string = NOT_AVAILABLE_TEXT;
+	let swerefE: string = NOT_AVAILABLE_TEXT;
+	if (Number.isFinite(sweref.northing) && Number.isFinite(sweref.easting)) {
+		swerefN = formatProjectedCoordinate('N', sweref.northing, 1);
+		swerefE = formatProjectedCoordinate('E', sweref.easting, 2);
+	} else {
+		console.warn("SWEREF 99 coordinates unavailable for position:", { lat: latitude, lon: longitude });
+	}
+
+	loadVelocityGrid();
+
+	return {
+		type: 'position',
+		position: {
+			swerefN,
+			swerefE,
+			wgs84N: formatWgs84Coordinate('N', latitude),
+			wgs84E: formatWgs84Coordinate('E', longitude),
+			height: Number.isFinite(height) ? formatHeight(height) : '',
+			showNotInSwedenWarning
+		},
+		northing: sweref.northing,
+		easting: sweref.easting
+	};
+}
+
+/**
+ * Handles one request from the main thread
+ * Shared by the worker and the main-thread fallback so both behave identically.
+ *
+ * @returns Response to post back, or null if the request has none
+ */
+export function handleTransformRequest(request: TransformRequest): TransformResponse | null {
+	switch (request.type) {
+		case 'position':
+			return processPositionFix(request.fix);
+		case 'configure':
+			if (TRANSFORM_ENGINES.includes(request.engine)) {
+				setTransformEngine(request.engine);
+			} else {
+				console.warn(`Okänd transformationsmotor: ${request.engine}`);
+			}
+			return null;
+		case 'reset':
+			swedenPresenceState.presence = 'unknown';
+			swedenPresenceState.pendingFixes = 0;
+			return null;
+		case 'stats':
+			return { type: 'stats', stats: getTransformCacheStats() };
+	}
+}
@@ -0,0 +1,79 @@
+// Meddelanden mellan huvudtråden och transformeringsworkern. Modulen är liten och beror bara
+// på typer från geodesy.ts, så huvudtråden kan importera den utan att ladda beräkningskoden.
+
+import type { TransformCacheStats, TransformEngine } from './geodesy.js';
+
+// ============================================================================
+// TYPE DEFINITIONS AND INTERFACES
+// ============================================================================
+
+/**
+ * Display strings for one position, ready to be written to the DOM
+ */
+export interface FormattedPosition {
+	swerefN: string;
+	swerefE: string;
+	wgs84N: string;
+	wgs84E: string;
+	/** RH 2000 height, or an empty string until the device reports altitude and the geoid tile has loaded */
+	height: string;
+	showNotInSwedenWarning: boolean;
+}
+
+/**
+ * Messages from the main thread to the transform pipeline
+ * 'position' carries a fix from packPositionFix; its buffer is transferred, not copied.
+ */
+export type TransformRequest =
+	| { type: 'position'; fix: Float64Array }
+	| { type: 'configure'; engine: TransformEngine }
+	| { type: 'reset' }
+	| { type: 'stats' };
+
+/**
+ * Messages from the transform pipeline back to the main thread
+ * 'position' also carries the SWEREF 99 TM metres (NaN if unavailable) for the smoothing stages.
+ */
+export type TransformResponse =
+	| { type: 'position'; position: FormattedPosition; northing: number; easting: number }
+	| { type: 'stats'; stats: TransformCacheStats };
+
+export type PositionResponse = Extract<TransformResponse, { type: 'position' }>;
+
+// ============================================================================
+// CONFIGURATION CONSTANTS
+// ============================================================================
+
+/**
+ * Default transformation engine and the engines that can be selected
+ */
+export const DEFAULT_TRANSFORM_ENGINE: TransformEngine = 'native';
+export const TRANSFORM_ENGINES: readonly TransformEngine[] = ['native', 'proj4'];
+
+/**
+ * Layout of a packed position fix: [latitude, longitude, altitude, timestamp]
+ * Altitude is NaN when the device does not report one.
+ */
+export const POSITION_FIX_LENGTH = 4;
+export const FIX_LATITUDE = 0;
+export const FIX_LONGITUDE = 1;
+export const FIX_ALTITUDE = 2;
+export const FIX_TIMESTAMP = 3;
+
+// ============================================================================
+// UTILITY FUNCTIONS
+// ============================================================================
+
+/**
+ * Packs a position into a fix for a 'position' request
+ * @param altitude - Ellipsoidal height in meters, or null if unavailable
+ * @param timestamp - Observation epoch as Unix timestamp in ms (position.timestamp)
+ */
+export function packPositionFix(latitude: number, longitude: number, altitude: number | null, timestamp: number): Float64Array {
+	const fix = new Float64Array(POSITION_FIX_LENGTH);
+	fix[FIX_LATITUDE] = latitude;
+	fix[FIX_LONGITUDE] = longitude;
+	fix[FIX_ALTITUDE] = altitude === null ? Number.NaN : altitude;
+	fix[FIX_TIMESTAMP] = timestamp;
+	return fix;
+}
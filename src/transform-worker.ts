@@ -0,0 +1,12 @@
+// Transformeringsworker (modulworker): all geodetisk beräkning sker här så att
+// huvudtråden bara uppdaterar DOM. Se TransformRequest/TransformResponse i transform-protocol.ts.
+
+import { handleTransformRequest } from './transform-pipeline.js';
+import type { TransformRequest } from './transform-protocol.js';
+
+self.addEventListener('message', (event: MessageEvent<TransformRequest>) => {
+	const response = handleTransformRequest(event.data);
+	if (response !== null) {
+		self.postMessage(response);
+	}
+});
@@ -0,0 +1,192 @@
+/**
+ * Unit tests for the adaptive geolocation options
+ *
+ * Tests cover:
+ * - Approximate distance between nearby positions
+ * - Relaxing the watch after a stationary period with accurate fixes
+ * - Tightening again on movement (speed or displacement) and while charging
+ */
+
+/**
+ * Adaptive geolocation functions from script.ts - redefined here for testing
+ *
+ * NOTE: These are duplicated from src/script.ts (approximateDistanceMeters from
+ * src/position-filters.ts) rather than imported.
+ * See tests/README.md for more details.
+ */
+type GeolocationMode = 'precise' | 'relaxed';
+
+interface GeolocationPowerState {
+	mode: GeolocationMode;
+	stationarySince: number | null;
+	anchorLatitude: number;
+	anchorLongitude: number;
+	anchorAccuracy: number;
+}
+
+interface PowerRelevantFix {
+	latitude: number;
+	longitude: number;
+	accuracy: number;
+	speed: number | null;
+	timestamp: number;
+}
+
+const ACCURACY_THRESHOLD_METERS = 5;
+const SPEED_THRESHOLD_MS = 1.4;
+const STATIONARY_RELAX_AFTER_MS = 120000;
+const EARTH_RADIUS_METERS = 6371000;
+
+function approximateDistanceMeters(latitude1: number, longitude1: number, latitude2: number, longitude2: number): number {
+	const toRadians = Math.PI / 180;
+	const dNorth = (latitude2 - latitude1) * toRadians;
+	const dEast = (longitude2 - longitude1) * toRadians * Math.cos((latitude1 + latitude2) / 2 * toRadians);
+	return EARTH_RADIUS_METERS * Math.hypot(dNorth, dEast);
+}
+
+function evaluateGeolocationMode(state: GeolocationPowerState, fix: PowerRelevantFix, charging: boolean): GeolocationMode {
+	const hasMoved = state.stationarySince !== null &&
+		approximateDistanceMeters(state.anchorLatitude, state.anchorLongitude, fix.latitude, fix.longitude) >
+		fix.accuracy + state.anchorAccuracy;
+	const isMoving = (fix.speed !== null && fix.speed > SPEED_THRESHOLD_MS) || hasMoved;
+
+	if (charging || isMoving) {
+		state.stationarySince = null;
+		return 'precise';
+	}
+	if (state.mode === 'relaxed') {
+		return 'relaxed';
+	}
+	if (fix.accuracy > ACCURACY_THRESHOLD_METERS) {
+		state.stationarySince = null;
+		return 'precise';
+	}
+	if (state.stationarySince === null) {
+		state.stationarySince = fix.timestamp;
+		state.anchorLatitude = fix.latitude;
+		state.anchorLongitude = fix.longitude;
+		state.anchorAccuracy = fix.accuracy;
+	}
+	return fix.timestamp - state.stationarySince >= STATIONARY_RELAX_AFTER_MS ? 'relaxed' : 'precise';
+}
+
+const STOCKHOLM = { latitude: 59.3293, longitude: 18.0686 };
+// About one metre north in degrees of latitude
+const ONE_METER_LATITUDE = 1 / 111195;
+
+function createState(): GeolocationPowerState {
+	return { mode: 'precise', stationarySince: null, anchorLatitude: 0, anchorLongitude: 0, anchorAccuracy: 0 };
+}
+
+function stationaryFix(timestamp: number, overrides: Partial<PowerRelevantFix> = {}): PowerRelevantFix {
+	return { ...STOCKHOLM, accuracy: 3, speed: 0, timestamp, ...overrides };
+}
+
+/**
+ * Feeds fixes once per second and applies the returned mode like applyGeolocationMode does
+ */
+function feed(state: GeolocationPowerState, fixes: PowerRelevantFix[], charging = false): GeolocationMode {
+	let mode: GeolocationMode = state.mode;
+	fixes.forEach((fix) => {
+		mode = evaluateGeolocationMode(state, fix, charging);
+		state.mode = mode;
+	});
+	return mode;
+}
+
+function stationaryFixes(fromMs: number, toMs: number, overrides: Partial<PowerRelevantFix> = {}): PowerRelevantFix[] {
+	const fixes: PowerRelevantFix[] = [];
+	for (let t = fromMs; t <= toMs; t += 1000) {
+		fixes.push(stationaryFix(t, overrides));
+	}
+	return fixes;
+}
+
+describe('approximateDistanceMeters Function', () => {
+	test('is zero for the same position', () => {
+		expect(approximateDistanceMeters(59.3, 18.0, 59.3, 18.0)).toBe(0);
+	});
+
+	test('measures 100 m north within a centimetre', () => {
+		const distance = approximateDistanceMeters(59.3, 18.0, 59.3 + 100 * ONE_METER_LATITUDE, 18.0);
+		expect(distance).toBeCloseTo(100, 1);
+	});
+
+	test('shrinks east-west distances with latitude', () => {
+		const atEquator = approximateDistanceMeters(0, 18.0, 0, 18.001);
+		const inKiruna = approximateDistanceMeters(67.85, 18.0, 67.85, 18.001);
+		expect(inKiruna / atEquator).toBeCloseTo(Math.cos(67.85 * Math.PI / 180), 3);
+	});
+});
+
+describe('evaluateGeolocationMode Function', () => {
+	test('stays precise during the first two minutes of standing still', () => {
+		const state = createState();
+		expect(feed(state, stationaryFixes(0, STATIONARY_RELAX_AFTER_MS - 1000))).toBe('precise');
+	});
+
+	test('relaxes after two minutes of accurate stationary fixes', () => {
+		const state = createState();
+		expect(feed(state, stationaryFixes(0, STATIONARY_RELAX_AFTER_MS))).toBe('relaxed');
+	});
+
+	test('tolerates jitter within the fix accuracy', () => {
+		const state = createState();
+		const fixes = stationaryFixes(0, STATIONARY_RELAX_AFTER_MS).map((fix, index) => ({
+			...fix,
+			latitude: fix.latitude + (index % 2 === 0 ? 2 : -2) * ONE_METER_LATITUDE
+		}));
+		expect(feed(state, fixes)).toBe('relaxed');
+	});
+
+	test('does not count inaccurate fixes as stationary', () => {
+		const state = createState();
+		expect(feed(state, stationaryFixes(0, STATIONARY_RELAX_AFTER_MS, { accuracy: 12 }))).toBe('precise');
+		expect(state.stationarySince).toBeNull();
+	});
+
+	test('restarts the stationary period after an inaccurate fix', () => {
+		const state = createState();
+		feed(state, stationaryFixes(0, 60000));
+		feed(state, [stationaryFix(61000, { accuracy: 15 })]);
+		expect(feed(state, stationaryFixes(62000, 62000 + STATIONARY_RELAX_AFTER_MS - 1000))).toBe('precise');
+	});
+
+	test('never relaxes while charging', () => {
+		const state = createState();
+		expect(feed(state, stationaryFixes(0, 2 * STATIONARY_RELAX_AFTER_MS), true)).toBe('precise');
+	});
+
+	test('tightens when reported speed exceeds the walking threshold', () => {
+		const state = createState();
+		feed(state, stationaryFixes(0, STATIONARY_RELAX_AFTER_MS));
+		expect(feed(state, [stationaryFix(STATIONARY_RELAX_AFTER_MS + 1000, { speed: 2.5, accuracy: 25 })])).toBe('precise');
+	});
+
+	test('tightens when a relaxed fix moves beyond the combined accuracy', () => {
+		const state = createState();
+		feed(state, stationaryFixes(0, STATIONARY_RELAX_AFTER_MS));
+		const moved = stationaryFix(STATIONARY_RELAX_AFTER_MS + 1000, {
+			speed: null,
+			accuracy: 30,
+			latitude: STOCKHOLM.latitude + 60 * ONE_METER_LATITUDE
+		});
+		expect(feed(state, [moved])).toBe('precise');
+	});
+
+	test('stays relaxed for coarse fixes within their accuracy', () => {
+		const state = createState();
+		feed(state, stationaryFixes(0, STATIONARY_RELAX_AFTER_MS));
+		const coarse = stationaryFix(STATIONARY_RELAX_AFTER_MS + 1000, {
+			speed: null,
+			accuracy: 40,
+			latitude: STOCKHOLM.latitude + 25 * ONE_METER_LATITUDE
+		});
+		expect(feed(state, [coarse])).toBe('relaxed');
+	});
+
+	test('treats a missing speed as not moving', () => {
+		const state = createState();
+		expect(feed(state, stationaryFixes(0, STATIONARY_RELAX_AFTER_MS, { speed: null }))).toBe('relaxed');
+	});
+});
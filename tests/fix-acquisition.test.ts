@@ -0,0 +1,113 @@
+/**
+ * Unit tests for progressive fix acquisition
+ *
+ * Tests cover:
+ * - A quick coarse fix is shown only before any other fix of the session
+ * - The high-accuracy watch takes over once it is at least as accurate
+ * - The watch takes over anyway when the coarse fix has been held too long
+ */
+
+/**
+ * Acquisition functions from script.ts - redefined here for testing
+ *
+ * NOTE: These are duplicated from src/script.ts rather than imported.
+ * See tests/README.md for more details.
+ */
+type AcquisitionPhase = 'waiting' | 'coarse' | 'precise';
+
+interface AcquisitionState {
+	phase: AcquisitionPhase;
+	coarseAccuracy: number;
+	coarseShownAt: number;
+}
+
+const COARSE_FIX_HOLD_MS = 15000;
+
+function acceptCoarseFix(state: AcquisitionState, accuracy: number, now: number): boolean {
+	if (state.phase !== 'waiting') {
+		return false;
+	}
+	state.phase = 'coarse';
+	state.coarseAccuracy = accuracy;
+	state.coarseShownAt = now;
+	return true;
+}
+
+function acceptWatchFix(state: AcquisitionState, accuracy: number, now: number): boolean {
+	if (state.phase === 'coarse' && accuracy > state.coarseAccuracy && now - state.coarseShownAt < COARSE_FIX_HOLD_MS) {
+		return false;
+	}
+	state.phase = 'precise';
+	return true;
+}
+
+function createState(): AcquisitionState {
+	return { phase: 'waiting', coarseAccuracy: Infinity, coarseShownAt: 0 };
+}
+
+describe('acceptCoarseFix Function', () => {
+	test('shows the coarse fix when nothing has been shown yet', () => {
+		const state = createState();
+		expect(acceptCoarseFix(state, 40, 1000)).toBe(true);
+		expect(state.phase).toBe('coarse');
+		expect(state.coarseAccuracy).toBe(40);
+	});
+
+	test('ignores a coarse fix that arrives after the watch', () => {
+		const state = createState();
+		acceptWatchFix(state, 5, 1000);
+		expect(acceptCoarseFix(state, 40, 1200)).toBe(false);
+		expect(state.phase).toBe('precise');
+	});
+
+	test('shows only one coarse fix per session', () => {
+		const state = createState();
+		acceptCoarseFix(state, 40, 1000);
+		expect(acceptCoarseFix(state, 20, 1200)).toBe(false);
+		expect(state.coarseAccuracy).toBe(40);
+	});
+});
+
+describe('acceptWatchFix Function', () => {
+	test('shows the first watch fix when no coarse fix is shown', () => {
+		const state = createState();
+		expect(acceptWatchFix(state, 60, 1000)).toBe(true);
+		expect(state.phase).toBe('precise');
+	});
+
+	test('keeps the coarse fix while the watch is less accurate', () => {
+		const state = createState();
+		acceptCoarseFix(state, 20, 1000);
+		expect(acceptWatchFix(state, 65, 2000)).toBe(false);
+		expect(state.phase).toBe('coarse');
+	});
+
+	test('switches over as soon as the watch is at least as accurate', () => {
+		const state = createState();
+		acceptCoarseFix(state, 20, 1000);
+		acceptWatchFix(state, 65, 2000);
+		expect(acceptWatchFix(state, 20, 3000)).toBe(true);
+		expect(state.phase).toBe('precise');
+	});
+
+	test('switches over after the hold time even if the watch is less accurate', () => {
+		const state = createState();
+		acceptCoarseFix(state, 15, 1000);
+		expect(acceptWatchFix(state, 30, 1000 + COARSE_FIX_HOLD_MS)).toBe(true);
+	});
+
+	test('shows every later watch fix, also less accurate ones', () => {
+		const state = createState();
+		acceptCoarseFix(state, 20, 1000);
+		acceptWatchFix(state, 8, 2000);
+		expect(acceptWatchFix(state, 50, 3000)).toBe(true);
+	});
+
+	test('a new session starts in the waiting phase again', () => {
+		const state = createState();
+		acceptCoarseFix(state, 20, 1000);
+		acceptWatchFix(state, 8, 2000);
+		state.phase = 'waiting';
+		expect(acceptCoarseFix(state, 30, 5000)).toBe(true);
+	});
+});
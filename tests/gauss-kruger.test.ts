@@ -0,0 +1,1140 @@
+/**
+ * Unit tests for the native Gauss-Krüger (SWEREF 99 TM) projection engine
+ *
+ * Tests cover:
+ * - Precomputed Krüger n-series coefficients for GRS80
+ * - Forward projection against reference values for Swedish locations
+ * - Agreement with an independent transverse Mercator formulation (Snyder)
+ * - Projection symmetry and central meridian properties
+ * - Allocation-free output buffer handling
+ * - Batch transformation over Float64Array input with invalid-point bitmask
+ * - Inverse transformation (scalar and batch) with drift correction removed
+ * - Per-point drift from a loaded velocity grid in the batch and inverse transforms
+ * - LRU cache of linearized 0.001° cells in front of the projection: accuracy and hit rate
+ */
+
+/**
+ * Constants from geodesy.ts - redefined here for testing
+ *
+ * NOTE: These constants and functions are duplicated from src/geodesy.ts rather
+ * than imported. See tests/README.md for more details.
+ */
+const GRS80_ELLIPSOID = {
+	SEMI_MAJOR_AXIS: 6378137,
+	FLATTENING: 1 / 298.257222101
+} as const;
+
+const SWEREF99_TM_PARAMETERS = {
+	CENTRAL_MERIDIAN_DEGREES: 15,
+	SCALE_FACTOR: 0.9996,
+	FALSE_NORTHING: 0,
+	FALSE_EASTING: 500000
+} as const;
+
+const DEGREES_TO_RADIANS = Math.PI / 180;
+
+interface KrugerCoefficients {
+	eccentricity: number;
+	scaledRectifyingRadius: number;
+	alpha: Float64Array;
+	beta: Float64Array;
+	delta: Float64Array;
+}
+
+function calculateKrugerCoefficients(): KrugerCoefficients {
+	const f = GRS80_ELLIPSOID.FLATTENING;
+	const n = f / (2 - f);
+	const n2 = n * n;
+	const n3 = n2 * n;
+	const n4 = n3 * n;
+	const n5 = n4 * n;
+	const n6 = n5 * n;
+
+	// Rektifierande radie A
+	const rectifyingRadius = (GRS80_ELLIPSOID.SEMI_MAJOR_AXIS / (1 + n)) * (1 + n2 / 4 + n4 / 64 + n6 / 256);
+
+	const alpha = new Float64Array([
+		n / 2 - (2 * n2) / 3 + (5 * n3) / 16 + (41 * n4) / 180 - (127 * n5) / 288 + (7891 * n6) / 37800,
+		(13 * n2) / 48 - (3 * n3) / 5 + (557 * n4) / 1440 + (281 * n5) / 630 - (1983433 * n6) / 1935360,
+		(61 * n3) / 240 - (103 * n4) / 140 + (15061 * n5) / 26880 + (167603 * n6) / 181440,
+		(49561 * n4) / 161280 - (179 * n5) / 168 + (6601661 * n6) / 7257600,
+		(34729 * n5) / 80640 - (3418889 * n6) / 1995840,
+		(212378941 * n6) / 319334400
+	]);
+
+	const beta = new Float64Array([
+		n / 2 - (2 * n2) / 3 + (37 * n3) / 96 - n4 / 360 - (81 * n5) / 512 + (96199 * n6) / 604800,
+		n2 / 48 + n3 / 15 - (437 * n4) / 1440 + (46 * n5) / 105 - (1118711 * n6) / 3870720,
+		(17 * n3) / 480 - (37 * n4) / 840 - (209 * n5) / 4480 + (5569 * n6) / 90720,
+		(4397 * n4) / 161280 - (11 * n5) / 504 - (830251 * n6) / 7257600,
+		(4583 * n5) / 161280 - (108847 * n6) / 3991680,
+		(20648693 * n6) / 638668800
+	]);
+
+	// Konform latitud -> geodetisk latitud utan iteration
+	const delta = new Float64Array([
+		2 * n - (2 * n2) / 3 - 2 * n3 + (116 * n4) / 45 + (26 * n5) / 45 - (2854 * n6) / 675,
+		(7 * n2) / 3 - (8 * n3) / 5 - (227 * n4) / 45 + (2704 * n5) / 315 + (2323 * n6) / 945,
+		(56 * n3) / 15 - (136 * n4) / 35 - (1262 * n5) / 105 + (73814 * n6) / 2835,
+		(4279 * n4) / 630 - (332 * n5) / 35 - (399572 * n6) / 14175,
+		(4174 * n5) / 315 - (144838 * n6) / 6237,
+		(601676 * n6) / 22275
+	]);
+
+	return {
+		eccentricity: Math.sqrt(f * (2 - f)),
+		scaledRectifyingRadius: SWEREF99_TM_PARAMETERS.SCALE_FACTOR * rectifyingRadius,
+		alpha,
+		beta,
+		delta
+	};
+}
+
+const krugerCoefficients = calculateKrugerCoefficients();
+const centralMeridianRadians = SWEREF99_TM_PARAMETERS.CENTRAL_MERIDIAN_DEGREES * DEGREES_TO_RADIANS;
+
+function projectGaussKruger(lat: number, lon: number, out: Float64Array, offset: number): void {
+	const { eccentricity, scaledRectifyingRadius, alpha } = krugerCoefficients;
+	const phi = lat * DEGREES_TO_RADIANS;
+	const lambda = lon * DEGREES_TO_RADIANS - centralMeridianRadians;
+
+	const sinPhi = Math.sin(phi);
+	const tau = Math.sinh(Math.atanh(sinPhi) - eccentricity * Math.atanh(eccentricity * sinPhi));
+	const xiPrime = Math.atan2(tau, Math.cos(lambda));
+	const etaPrime = Math.atanh(Math.sin(lambda) / Math.sqrt(1 + tau * tau));
+
+	const sin2Xi = Math.sin(2 * xiPrime);
+	const cos2Xi = Math.cos(2 * xiPrime);
+	const sinh2Eta = Math.sinh(2 * etaPrime);
+	const cosh2Eta = Math.cosh(2 * etaPrime);
+
+	let sinJ = sin2Xi;
+	let cosJ = cos2Xi;
+	let sinhJ = sinh2Eta;
+	let coshJ = cosh2Eta;
+	let xi = xiPrime;
+	let eta = etaPrime;
+
+	for (let j = 0; j < alpha.length; j++) {
+		xi += alpha[j] * sinJ * coshJ;
+		eta += alpha[j] * cosJ * sinhJ;
+
+		const nextSin = sinJ * cos2Xi + cosJ * sin2Xi;
+		cosJ = cosJ * cos2Xi - sinJ * sin2Xi;
+		sinJ = nextSin;
+		const nextSinh = sinhJ * cosh2Eta + coshJ * sinh2Eta;
+		coshJ = coshJ * cosh2Eta + sinhJ * sinh2Eta;
+		sinhJ = nextSinh;
+	}
+
+	out[offset] = scaledRectifyingRadius * xi + SWEREF99_TM_PARAMETERS.FALSE_NORTHING;
+	out[offset + 1] = scaledRectifyingRadius * eta + SWEREF99_TM_PARAMETERS.FALSE_EASTING;
+}
+
+function unprojectGaussKruger(northing: number, easting: number, out: Float64Array, offset: number): void {
+	const { scaledRectifyingRadius, beta, delta } = krugerCoefficients;
+	const xiPrime = (northing - SWEREF99_TM_PARAMETERS.FALSE_NORTHING) / scaledRectifyingRadius;
+	const etaPrime = (easting - SWEREF99_TM_PARAMETERS.FALSE_EASTING) / scaledRectifyingRadius;
+
+	const sin2Xi = Math.sin(2 * xiPrime);
+	const cos2Xi = Math.cos(2 * xiPrime);
+	const sinh2Eta = Math.sinh(2 * etaPrime);
+	const cosh2Eta = Math.cosh(2 * etaPrime);
+
+	let sinJ = sin2Xi;
+	let cosJ = cos2Xi;
+	let sinhJ = sinh2Eta;
+	let coshJ = cosh2Eta;
+	let xi = xiPrime;
+	let eta = etaPrime;
+
+	for (let j = 0; j < beta.length; j++) {
+		xi -= beta[j] * sinJ * coshJ;
+		eta -= beta[j] * cosJ * sinhJ;
+
+		const nextSin = sinJ * cos2Xi + cosJ * sin2Xi;
+		cosJ = cosJ * cos2Xi - sinJ * sin2Xi;
+		sinJ = nextSin;
+		const nextSinh = sinhJ * cosh2Eta + coshJ * sinh2Eta;
+		coshJ = coshJ * cosh2Eta + sinhJ * sinh2Eta;
+		sinhJ = nextSinh;
+	}
+
+	const chi = Math.asin(Math.sin(xi) / Math.cosh(eta));
+	const sin2Chi = Math.sin(2 * chi);
+	const cos2Chi = Math.cos(2 * chi);
+	let sinK = sin2Chi;
+	let cosK = cos2Chi;
+	let phi = chi;
+
+	for (let j = 0; j < delta.length; j++) {
+		phi += delta[j] * sinK;
+
+		const nextSin = sinK * cos2Chi + cosK * sin2Chi;
+		cosK = cosK * cos2Chi - sinK * sin2Chi;
+		sinK = nextSin;
+	}
+
+	const lambda = Math.atan2(Math.sinh(eta), Math.cos(xi));
+	out[offset] = phi / DEGREES_TO_RADIANS;
+	out[offset + 1] = (lambda + centralMeridianRadians) / DEGREES_TO_RADIANS;
+}
+
+type Wgs84BatchInput =
+	| { layout: 'interleaved'; latLon: Float64Array }
+	| { layout: 'separate'; latitudes: Float64Array; longitudes: Float64Array };
+
+type SwerefBatchInput =
+	| { layout: 'interleaved'; northEast: Float64Array }
+	| { layout: 'separate'; northings: Float64Array; eastings: Float64Array };
+
+interface Wgs84Coordinates {
+	latitude: number;
+	longitude: number;
+}
+
+const ETRS89_EPOCH_MS = Date.UTC(1989, 0, 1);
+const MILLISECONDS_PER_YEAR = 365.25 * 24 * 60 * 60 * 1000;
+const driftRate = {
+	north: (0.025 / MILLISECONDS_PER_YEAR) * Math.cos((25 * Math.PI) / 180),
+	east: (0.025 / MILLISECONDS_PER_YEAR) * Math.sin((25 * Math.PI) / 180)
+};
+
+// Fixed observation epoch so that batch results are deterministic in tests
+const TEST_EPOCH_MS = Date.UTC(2025, 6, 1);
+const itrf2Etrs89Correction = {
+	dn: driftRate.north * (TEST_EPOCH_MS - ETRS89_EPOCH_MS),
+	de: driftRate.east * (TEST_EPOCH_MS - ETRS89_EPOCH_MS)
+};
+const projectionScratch = new Float64Array(2);
+const driftRateScratch = new Float64Array(2);
+
+interface BinaryGrid {
+	minLatitude: number;
+	minLongitude: number;
+	latitudeStep: number;
+	longitudeStep: number;
+	rows: number;
+	columns: number;
+	valuesPerNode: number;
+	values: Float32Array;
+}
+
+// Loaded by loadVelocityGrid in geodesy.ts; set directly by the tests that need a grid
+let velocityGrid: BinaryGrid | null = null;
+
+type TransformEngine = 'native' | 'proj4';
+
+interface TransformCacheStats {
+	hits: number;
+	misses: number;
+	size: number;
+}
+
+const TRANSFORM_CACHE_SIZE = 16;
+const TRANSFORM_CACHE_CELLS_PER_DEGREE = 1000;
+const TRANSFORM_CACHE_LATITUDE_OFFSET = 90 * TRANSFORM_CACHE_CELLS_PER_DEGREE;
+const TRANSFORM_CACHE_LONGITUDE_OFFSET = 180 * TRANSFORM_CACHE_CELLS_PER_DEGREE;
+const TRANSFORM_CACHE_LONGITUDE_STEPS = 2 * TRANSFORM_CACHE_LONGITUDE_OFFSET + 1;
+let transformEngine: TransformEngine = 'native';
+
+// PROJ4JS is not loaded in these tests; the fallback path reports failure
+let proj4Calls = 0;
+function projectWithProj4(_lat: number, _lon: number): boolean {
+	proj4Calls++;
+	return false;
+}
+
+function projectWithEngine(lat: number, lon: number): boolean {
+	if (transformEngine === 'native') {
+		projectGaussKruger(lat, lon, projectionScratch, 0);
+		if (Number.isFinite(projectionScratch[0]) && Number.isFinite(projectionScratch[1])) {
+			return true;
+		}
+		console.warn('Native SWEREF 99 TM-projektion gav ogiltigt resultat, försöker med proj4');
+	}
+	return projectWithProj4(lat, lon);
+}
+
+const transformCache = new Map<number, Float64Array>();
+let transformCacheHits = 0;
+let transformCacheMisses = 0;
+
+function getTransformCacheKey(latIndex: number, lonIndex: number): number {
+	return (latIndex + TRANSFORM_CACHE_LATITUDE_OFFSET) * TRANSFORM_CACHE_LONGITUDE_STEPS + lonIndex + TRANSFORM_CACHE_LONGITUDE_OFFSET;
+}
+
+function projectCacheCell(latIndex: number, lonIndex: number): Float64Array | null {
+	const lat = latIndex / TRANSFORM_CACHE_CELLS_PER_DEGREE;
+	const lon = lonIndex / TRANSFORM_CACHE_CELLS_PER_DEGREE;
+	const step = 1 / TRANSFORM_CACHE_CELLS_PER_DEGREE;
+
+	if (!projectWithEngine(lat + step, lon)) {
+		return null;
+	}
+	const northOfNodeN = projectionScratch[0];
+	const northOfNodeE = projectionScratch[1];
+	if (!projectWithEngine(lat, lon + step)) {
+		return null;
+	}
+	const eastOfNodeN = projectionScratch[0];
+	const eastOfNodeE = projectionScratch[1];
+	if (!projectWithEngine(lat, lon)) {
+		return null;
+	}
+	const nodeN = projectionScratch[0];
+	const nodeE = projectionScratch[1];
+
+	return Float64Array.of(
+		nodeN,
+		nodeE,
+		(northOfNodeN - nodeN) * TRANSFORM_CACHE_CELLS_PER_DEGREE,
+		(eastOfNodeN - nodeN) * TRANSFORM_CACHE_CELLS_PER_DEGREE,
+		(northOfNodeE - nodeE) * TRANSFORM_CACHE_CELLS_PER_DEGREE,
+		(eastOfNodeE - nodeE) * TRANSFORM_CACHE_CELLS_PER_DEGREE
+	);
+}
+
+function projectWithCache(lat: number, lon: number): boolean {
+	const latIndex = Math.round(lat * TRANSFORM_CACHE_CELLS_PER_DEGREE);
+	const lonIndex = Math.round(lon * TRANSFORM_CACHE_CELLS_PER_DEGREE);
+	const key = getTransformCacheKey(latIndex, lonIndex);
+	let cell = transformCache.get(key);
+	if (cell !== undefined) {
+		transformCache.delete(key);
+		transformCache.set(key, cell);
+		transformCacheHits++;
+	} else {
+		transformCacheMisses++;
+		const projected = projectCacheCell(latIndex, lonIndex);
+		if (projected === null) {
+			return projectWithEngine(lat, lon);
+		}
+		cell = projected;
+		transformCache.set(key, cell);
+		while (transformCache.size > TRANSFORM_CACHE_SIZE) {
+			const oldestKey = transformCache.keys().next().value as number;
+			transformCache.delete(oldestKey);
+		}
+	}
+
+	const dLat = lat - latIndex / TRANSFORM_CACHE_CELLS_PER_DEGREE;
+	const dLon = lon - lonIndex / TRANSFORM_CACHE_CELLS_PER_DEGREE;
+	projectionScratch[0] = cell[0] + cell[2] * dLat + cell[3] * dLon;
+	projectionScratch[1] = cell[1] + cell[4] * dLat + cell[5] * dLon;
+	return true;
+}
+
+/**
+ * Cache key of the cell containing lat/lon
+ */
+function cacheKeyAt(lat: number, lon: number): number {
+	return getTransformCacheKey(Math.round(lat * TRANSFORM_CACHE_CELLS_PER_DEGREE), Math.round(lon * TRANSFORM_CACHE_CELLS_PER_DEGREE));
+}
+
+function clearTransformCache(): void {
+	transformCache.clear();
+}
+
+function getTransformCacheStats(): TransformCacheStats {
+	return { hits: transformCacheHits, misses: transformCacheMisses, size: transformCache.size };
+}
+
+function formatCoordinateValue(value: number): number | string {
+	return Number.isFinite(value) ? value : 'ogiltigt';
+}
+
+function isValidLatitude(latitude: number): boolean {
+	return Number.isFinite(latitude) && latitude >= -90 && latitude <= 90;
+}
+
+function isValidLongitude(longitude: number): boolean {
+	return Number.isFinite(longitude) && longitude >= -180 && longitude <= 180;
+}
+
+function getBatchPointCount(input: Wgs84BatchInput | SwerefBatchInput): number {
+	if (input.layout === 'interleaved') {
+		const values = 'latLon' in input ? input.latLon : input.northEast;
+		return values.length >> 1;
+	}
+	return 'latitudes' in input
+		? Math.min(input.latitudes.length, input.longitudes.length)
+		: Math.min(input.northings.length, input.eastings.length);
+}
+
+function assertBatchCapacity(count: number, out: Float64Array, invalidMask: Uint32Array): void {
+	if (out.length < count * 2) {
+		throw new RangeError(`Utdatabufferten rymmer ${out.length >> 1} punkter, behöver ${count}`);
+	}
+	if (invalidMask.length < (count + 31) >>> 5) {
+		throw new RangeError(`Felmasken rymmer ${invalidMask.length * 32} punkter, behöver ${count}`);
+	}
+}
+
+function createBatchInvalidMask(count: number): Uint32Array {
+	return new Uint32Array((count + 31) >>> 5);
+}
+
+function isBatchPointInvalid(invalidMask: Uint32Array, index: number): boolean {
+	return (invalidMask[index >>> 5] & (1 << (index & 31))) !== 0;
+}
+
+function sampleBinaryGrid(grid: BinaryGrid, lat: number, lon: number, out: Float64Array): boolean {
+	const y = (lat - grid.minLatitude) / grid.latitudeStep;
+	const x = (lon - grid.minLongitude) / grid.longitudeStep;
+	if (!(y >= 0 && y <= grid.rows - 1 && x >= 0 && x <= grid.columns - 1)) {
+		return false;
+	}
+
+	const row = Math.min(Math.floor(y), grid.rows - 2);
+	const column = Math.min(Math.floor(x), grid.columns - 2);
+	const fy = y - row;
+	const fx = x - column;
+	const stride = grid.valuesPerNode;
+	const v = grid.values;
+	const i00 = stride * (row * grid.columns + column);
+	const i01 = i00 + stride;
+	const i10 = i00 + stride * grid.columns;
+	const i11 = i10 + stride;
+
+	const w00 = (1 - fx) * (1 - fy);
+	const w01 = fx * (1 - fy);
+	const w10 = (1 - fx) * fy;
+	const w11 = fx * fy;
+
+	for (let k = 0; k < stride; k++) {
+		out[k] = w00 * v[i00 + k] + w01 * v[i01 + k] + w10 * v[i10 + k] + w11 * v[i11 + k];
+	}
+	return true;
+}
+
+function sampleDriftRate(lat: number, lon: number, out: Float64Array): void {
+	if (velocityGrid !== null && sampleBinaryGrid(velocityGrid, lat, lon, out)) {
+		out[0] /= MILLISECONDS_PER_YEAR;
+		out[1] /= MILLISECONDS_PER_YEAR;
+		return;
+	}
+
+	out[0] = driftRate.north;
+	out[1] = driftRate.east;
+}
+
+function wgs84_to_sweref99tm_batch(input: Wgs84BatchInput, out: Float64Array, invalidMask: Uint32Array, timestamp: number = Date.now()): number {
+	const count = getBatchPointCount(input);
+	assertBatchCapacity(count, out, invalidMask);
+
+	invalidMask.fill(0);
+	const elapsedMs = timestamp - ETRS89_EPOCH_MS;
+	const dn = driftRate.north * elapsedMs;
+	const de = driftRate.east * elapsedMs;
+	const interleaved = input.layout === 'interleaved' ? input.latLon : null;
+	const latitudes = input.layout === 'separate' ? input.latitudes : null;
+	const longitudes = input.layout === 'separate' ? input.longitudes : null;
+	let invalidCount = 0;
+
+	for (let i = 0; i < count; i++) {
+		const lat = interleaved ? interleaved[2 * i] : latitudes![i];
+		const lon = interleaved ? interleaved[2 * i + 1] : longitudes![i];
+		const offset = 2 * i;
+
+		if (isValidLatitude(lat) && isValidLongitude(lon)) {
+			projectGaussKruger(lat, lon, out, offset);
+			if (velocityGrid === null) {
+				out[offset] += dn;
+				out[offset + 1] += de;
+			} else {
+				sampleDriftRate(lat, lon, driftRateScratch);
+				out[offset] += driftRateScratch[0] * elapsedMs;
+				out[offset + 1] += driftRateScratch[1] * elapsedMs;
+			}
+			if (Number.isFinite(out[offset]) && Number.isFinite(out[offset + 1])) {
+				continue;
+			}
+		}
+
+		out[offset] = Number.NaN;
+		out[offset + 1] = Number.NaN;
+		invalidMask[i >>> 5] |= 1 << (i & 31);
+		invalidCount++;
+	}
+
+	return invalidCount;
+}
+
+function unprojectWithDriftRemoved(northing: number, easting: number, elapsedMs: number, out: Float64Array, offset: number): void {
+	if (velocityGrid === null) {
+		unprojectGaussKruger(northing - driftRate.north * elapsedMs, easting - driftRate.east * elapsedMs, out, offset);
+		return;
+	}
+
+	unprojectGaussKruger(northing, easting, out, offset);
+	sampleDriftRate(out[offset], out[offset + 1], driftRateScratch);
+	unprojectGaussKruger(northing - driftRateScratch[0] * elapsedMs, easting - driftRateScratch[1] * elapsedMs, out, offset);
+}
+
+function sweref99tm_to_wgs84(northing: number, easting: number, timestamp: number = Date.now()): Wgs84Coordinates {
+	if (!Number.isFinite(northing) || !Number.isFinite(easting)) {
+		console.warn(`Avböjer ogiltig inverstransformation för N=${formatCoordinateValue(northing)}, E=${formatCoordinateValue(easting)}`);
+		return { latitude: Number.NaN, longitude: Number.NaN };
+	}
+
+	unprojectWithDriftRemoved(northing, easting, timestamp - ETRS89_EPOCH_MS, projectionScratch, 0);
+	const latitude = projectionScratch[0];
+	const longitude = projectionScratch[1];
+
+	if (!isValidLatitude(latitude) || !isValidLongitude(longitude)) {
+		console.warn(`Invalid inverse transformation result for N=${northing}, E=${easting}:`, { latitude, longitude });
+		return { latitude: Number.NaN, longitude: Number.NaN };
+	}
+
+	return { latitude, longitude };
+}
+
+function sweref99tm_to_wgs84_batch(input: SwerefBatchInput, out: Float64Array, invalidMask: Uint32Array, timestamp: number = Date.now()): number {
+	const count = getBatchPointCount(input);
+	assertBatchCapacity(count, out, invalidMask);
+
+	invalidMask.fill(0);
+	const elapsedMs = timestamp - ETRS89_EPOCH_MS;
+	const interleaved = input.layout === 'interleaved' ? input.northEast : null;
+	const northings = input.layout === 'separate' ? input.northings : null;
+	const eastings = input.layout === 'separate' ? input.eastings : null;
+	let invalidCount = 0;
+
+	for (let i = 0; i < count; i++) {
+		const northing = interleaved ? interleaved[2 * i] : northings![i];
+		const easting = interleaved ? interleaved[2 * i + 1] : eastings![i];
+		const offset = 2 * i;
+
+		if (Number.isFinite(northing) && Number.isFinite(easting)) {
+			unprojectWithDriftRemoved(northing, easting, elapsedMs, out, offset);
+			if (isValidLatitude(out[offset]) && isValidLongitude(out[offset + 1])) {
+				continue;
+			}
+		}
+
+		out[offset] = Number.NaN;
+		out[offset + 1] = Number.NaN;
+		invalidMask[i >>> 5] |= 1 << (i & 31);
+		invalidCount++;
+	}
+
+	return invalidCount;
+}
+
+/**
+ * Independent transverse Mercator formulation (Snyder, USGS Professional Paper 1395)
+ * Accurate to about a millimetre within a few degrees of the central meridian.
+ */
+function projectSnyder(lat: number, lon: number): [number, number] {
+	const a = GRS80_ELLIPSOID.SEMI_MAJOR_AXIS;
+	const f = GRS80_ELLIPSOID.FLATTENING;
+	const k0 = SWEREF99_TM_PARAMETERS.SCALE_FACTOR;
+	const e2 = f * (2 - f);
+	const ep2 = e2 / (1 - e2);
+	const phi = lat * DEGREES_TO_RADIANS;
+	const lambda = lon * DEGREES_TO_RADIANS - centralMeridianRadians;
+
+	const N = a / Math.sqrt(1 - e2 * Math.sin(phi) ** 2);
+	const T = Math.tan(phi) ** 2;
+	const C = ep2 * Math.cos(phi) ** 2;
+	const A = lambda * Math.cos(phi);
+	const M = a * (
+		(1 - e2 / 4 - (3 * e2 ** 2) / 64 - (5 * e2 ** 3) / 256) * phi -
+		((3 * e2) / 8 + (3 * e2 ** 2) / 32 + (45 * e2 ** 3) / 1024) * Math.sin(2 * phi) +
+		((15 * e2 ** 2) / 256 + (45 * e2 ** 3) / 1024) * Math.sin(4 * phi) -
+		((35 * e2 ** 3) / 3072) * Math.sin(6 * phi)
+	);
+
+	const easting = k0 * N * (A + ((1 - T + C) * A ** 3) / 6 + ((5 - 18 * T + T * T + 72 * C - 58 * ep2) * A ** 5) / 120) + 500000;
+	const northing = k0 * (M + N * Math.tan(phi) * (
+		(A * A) / 2 +
+		((5 - T + 9 * C + 4 * C * C) * A ** 4) / 24 +
+		((61 - 58 * T + T * T + 600 * C - 330 * ep2) * A ** 6) / 720
+	));
+	return [northing, easting];
+}
+
+function project(lat: number, lon: number): [number, number] {
+	const out = new Float64Array(2);
+	projectGaussKruger(lat, lon, out, 0);
+	return [out[0], out[1]];
+}
+
+describe('Krüger coefficients', () => {
+	test('should have six forward coefficients', () => {
+		expect(krugerCoefficients.alpha.length).toBe(6);
+	});
+
+	test('should match the leading terms of the first coefficient', () => {
+		const f = GRS80_ELLIPSOID.FLATTENING;
+		const n = f / (2 - f);
+		expect(krugerCoefficients.alpha[0]).toBeCloseTo(n / 2 - (2 * n * n) / 3 + (5 * n * n * n) / 16, 10);
+	});
+
+	test('should have rapidly decreasing coefficients', () => {
+		for (let j = 1; j < krugerCoefficients.alpha.length; j++) {
+			expect(Math.abs(krugerCoefficients.alpha[j])).toBeLessThan(Math.abs(krugerCoefficients.alpha[j - 1]));
+		}
+	});
+
+	test('should have GRS80 eccentricity', () => {
+		expect(krugerCoefficients.eccentricity).toBeCloseTo(0.0818191910428, 12);
+	});
+
+	test('should scale the rectifying radius by 0.9996', () => {
+		expect(krugerCoefficients.scaledRectifyingRadius).toBeCloseTo(0.9996 * 6367449.1458, 2);
+	});
+});
+
+describe('projectGaussKruger Function', () => {
+	describe('reference values', () => {
+		const referencePoints: Array<[string, number, number, number, number]> = [
+			['Stockholm', 59.33, 18.07, 6580824.5756, 674647.8821],
+			['Malmö', 55.60, 13.00, 6163377.1163, 373988.3716],
+			['Kiruna', 67.86, 20.23, 7536553.5308, 719740.6557],
+			['Göteborg', 57.71, 11.97, 6400460.6720, 319489.5554]
+		];
+
+		test.each(referencePoints)('should project %s to sub-millimetre precision', (_name, lat, lon, northing, easting) => {
+			const [n, e] = project(lat, lon);
+			expect(Math.abs(n - northing)).toBeLessThan(0.001);
+			expect(Math.abs(e - easting)).toBeLessThan(0.001);
+		});
+	});
+
+	describe('agreement with independent formulation', () => {
+		test.each([
+			[55.6, 13.0],
+			[59.33, 16.5],
+			[63.0, 14.0],
+			[68.0, 17.5]
+		])('should agree with Snyder series within 2 mm at (%f, %f)', (lat, lon) => {
+			const [n, e] = project(lat, lon);
+			const [sn, se] = projectSnyder(lat, lon);
+			expect(Math.abs(n - sn)).toBeLessThan(0.002);
+			expect(Math.abs(e - se)).toBeLessThan(0.002);
+		});
+	});
+
+	describe('projection properties', () => {
+		test('should give false easting on the central meridian', () => {
+			const [, easting] = project(62, 15);
+			expect(easting).toBeCloseTo(500000, 6);
+		});
+
+		test('should give zero northing on the equator', () => {
+			const [northing] = project(0, 15);
+			expect(northing).toBeCloseTo(0, 6);
+		});
+
+		test('should be symmetric around the central meridian', () => {
+			const [westN, westE] = project(60, 12);
+			const [eastN, eastE] = project(60, 18);
+			expect(westN).toBeCloseTo(eastN, 6);
+			expect(westE - 500000).toBeCloseTo(-(eastE - 500000), 6);
+		});
+
+		test('should increase northing with latitude', () => {
+			const [southN] = project(58, 15);
+			const [northN] = project(59, 15);
+			expect(northN).toBeGreaterThan(southN);
+		});
+	});
+
+	describe('output buffer handling', () => {
+		test('should write to the given offset without touching other slots', () => {
+			const out = new Float64Array(6).fill(-1);
+			projectGaussKruger(59.33, 18.07, out, 2);
+			expect(out[0]).toBe(-1);
+			expect(out[1]).toBe(-1);
+			expect(out[2]).toBeCloseTo(6580824.5756, 3);
+			expect(out[3]).toBeCloseTo(674647.8821, 3);
+			expect(out[4]).toBe(-1);
+			expect(out[5]).toBe(-1);
+		});
+
+		test('should produce identical results on repeated calls', () => {
+			const first = project(64.75, 20.95);
+			const second = project(64.75, 20.95);
+			expect(first).toEqual(second);
+		});
+	});
+});
+
+describe('wgs84_to_sweref99tm_batch Function', () => {
+	test('should match the scalar projection plus drift correction (interleaved)', () => {
+		const input = new Float64Array([59.33, 18.07, 55.60, 13.00, 67.86, 20.23]);
+		const out = new Float64Array(6);
+		const mask = createBatchInvalidMask(3);
+
+		const invalid = wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon: input }, out, mask, TEST_EPOCH_MS);
+
+		expect(invalid).toBe(0);
+		for (let i = 0; i < 3; i++) {
+			const [n, e] = project(input[2 * i], input[2 * i + 1]);
+			expect(out[2 * i]).toBe(n + itrf2Etrs89Correction.dn);
+			expect(out[2 * i + 1]).toBe(e + itrf2Etrs89Correction.de);
+		}
+	});
+
+	test('should give identical results for interleaved and separate layouts', () => {
+		const latitudes = new Float64Array([57.71, 63.83, 65.58]);
+		const longitudes = new Float64Array([11.97, 20.26, 22.15]);
+		const interleaved = new Float64Array([57.71, 11.97, 63.83, 20.26, 65.58, 22.15]);
+		const outSeparate = new Float64Array(6);
+		const outInterleaved = new Float64Array(6);
+
+		wgs84_to_sweref99tm_batch({ layout: 'separate', latitudes, longitudes }, outSeparate, createBatchInvalidMask(3), TEST_EPOCH_MS);
+		wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon: interleaved }, outInterleaved, createBatchInvalidMask(3), TEST_EPOCH_MS);
+
+		expect(Array.from(outSeparate)).toEqual(Array.from(outInterleaved));
+	});
+
+	test('should flag invalid points in the bitmask and write NaN', () => {
+		const latitudes = new Float64Array([59.33, Number.NaN, 95, 60]);
+		const longitudes = new Float64Array([18.07, 15, 15, Number.POSITIVE_INFINITY]);
+		const out = new Float64Array(8);
+		const mask = createBatchInvalidMask(4);
+
+		const invalid = wgs84_to_sweref99tm_batch({ layout: 'separate', latitudes, longitudes }, out, mask, TEST_EPOCH_MS);
+
+		expect(invalid).toBe(3);
+		expect(isBatchPointInvalid(mask, 0)).toBe(false);
+		expect(isBatchPointInvalid(mask, 1)).toBe(true);
+		expect(isBatchPointInvalid(mask, 2)).toBe(true);
+		expect(isBatchPointInvalid(mask, 3)).toBe(true);
+		expect(Number.isNaN(out[2])).toBe(true);
+		expect(Number.isNaN(out[3])).toBe(true);
+		expect(Number.isFinite(out[0])).toBe(true);
+	});
+
+	test('should handle bitmasks spanning several words', () => {
+		const count = 70;
+		const input = new Float64Array(count * 2);
+		for (let i = 0; i < count; i++) {
+			input[2 * i] = i === 40 || i === 65 ? Number.NaN : 60 + i * 0.01;
+			input[2 * i + 1] = 15;
+		}
+		const mask = createBatchInvalidMask(count);
+
+		const invalid = wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon: input }, new Float64Array(count * 2), mask, TEST_EPOCH_MS);
+
+		expect(mask.length).toBe(3);
+		expect(invalid).toBe(2);
+		expect(isBatchPointInvalid(mask, 40)).toBe(true);
+		expect(isBatchPointInvalid(mask, 65)).toBe(true);
+		expect(isBatchPointInvalid(mask, 39)).toBe(false);
+	});
+
+	test('should clear a reused bitmask', () => {
+		const mask = createBatchInvalidMask(2);
+		mask[0] = 0xffffffff;
+
+		wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon: new Float64Array([60, 15, 61, 16]) }, new Float64Array(4), mask, TEST_EPOCH_MS);
+
+		expect(mask[0]).toBe(0);
+	});
+
+	test('should reject an output buffer that is too small', () => {
+		const input = new Float64Array([60, 15, 61, 16]);
+		expect(() => wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon: input }, new Float64Array(3), createBatchInvalidMask(2), TEST_EPOCH_MS)).toThrow(RangeError);
+	});
+
+	test('should handle an empty batch', () => {
+		const invalid = wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon: new Float64Array(0) }, new Float64Array(0), createBatchInvalidMask(0), TEST_EPOCH_MS);
+		expect(invalid).toBe(0);
+	});
+});
+
+describe('unprojectGaussKruger Function', () => {
+	test('should invert the forward projection to nanometre level across Sweden', () => {
+		const out = new Float64Array(2);
+		let maxError = 0;
+		for (let lat = 55; lat <= 69.5; lat += 0.5) {
+			for (let lon = 10; lon <= 24.5; lon += 0.5) {
+				const [northing, easting] = project(lat, lon);
+				unprojectGaussKruger(northing, easting, out, 0);
+				maxError = Math.max(maxError, Math.abs(out[0] - lat), Math.abs(out[1] - lon));
+			}
+		}
+		// 1e-11 degrees is about a micrometre on the ground
+		expect(maxError).toBeLessThan(1e-11);
+	});
+
+	test('should give the central meridian for the false easting', () => {
+		const out = new Float64Array(2);
+		unprojectGaussKruger(7000000, 500000, out, 0);
+		expect(out[1]).toBeCloseTo(15, 12);
+	});
+
+	test('should give the reference position for Stockholm', () => {
+		const out = new Float64Array(2);
+		unprojectGaussKruger(6580824.5756, 674647.8821, out, 0);
+		expect(out[0]).toBeCloseTo(59.33, 8);
+		expect(out[1]).toBeCloseTo(18.07, 8);
+	});
+});
+
+describe('sweref99tm_to_wgs84 Function', () => {
+	test('should remove the drift correction applied by the forward transform', () => {
+		const [northing, easting] = project(63.83, 20.26);
+		const result = sweref99tm_to_wgs84(northing + itrf2Etrs89Correction.dn, easting + itrf2Etrs89Correction.de, TEST_EPOCH_MS);
+		expect(result.latitude).toBeCloseTo(63.83, 10);
+		expect(result.longitude).toBeCloseTo(20.26, 10);
+	});
+
+	test('should return NaN for non-finite input', () => {
+		const warnSpy = jest.spyOn(console, 'warn').mockImplementation(() => {});
+		const result = sweref99tm_to_wgs84(Number.NaN, 500000);
+		expect(Number.isNaN(result.latitude)).toBe(true);
+		expect(Number.isNaN(result.longitude)).toBe(true);
+		expect(warnSpy).toHaveBeenCalled();
+		warnSpy.mockRestore();
+	});
+});
+
+describe('sweref99tm_to_wgs84_batch Function', () => {
+	test('should round-trip a forward batch', () => {
+		const latLon = new Float64Array([59.33, 18.07, 55.60, 13.00, 67.86, 20.23, 57.71, 11.97]);
+		const projected = new Float64Array(8);
+		const result = new Float64Array(8);
+		const mask = createBatchInvalidMask(4);
+
+		wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon }, projected, mask, TEST_EPOCH_MS);
+		const invalid = sweref99tm_to_wgs84_batch({ layout: 'interleaved', northEast: projected }, result, mask, TEST_EPOCH_MS);
+
+		expect(invalid).toBe(0);
+		for (let i = 0; i < latLon.length; i++) {
+			expect(result[i]).toBeCloseTo(latLon[i], 10);
+		}
+	});
+
+	test('should match the scalar inverse (separate layout)', () => {
+		const northings = new Float64Array([6580825.3, 7536554.2]);
+		const eastings = new Float64Array([674648.2, 719741.0]);
+		const out = new Float64Array(4);
+
+		sweref99tm_to_wgs84_batch({ layout: 'separate', northings, eastings }, out, createBatchInvalidMask(2), TEST_EPOCH_MS);
+
+		for (let i = 0; i < 2; i++) {
+			const scalar = sweref99tm_to_wgs84(northings[i], eastings[i], TEST_EPOCH_MS);
+			expect(out[2 * i]).toBe(scalar.latitude);
+			expect(out[2 * i + 1]).toBe(scalar.longitude);
+		}
+	});
+
+	test('should flag non-finite points', () => {
+		const northEast = new Float64Array([6580825, 674648, Number.NaN, 500000]);
+		const out = new Float64Array(4);
+		const mask = createBatchInvalidMask(2);
+
+		const invalid = sweref99tm_to_wgs84_batch({ layout: 'interleaved', northEast }, out, mask, TEST_EPOCH_MS);
+
+		expect(invalid).toBe(1);
+		expect(isBatchPointInvalid(mask, 0)).toBe(false);
+		expect(isBatchPointInvalid(mask, 1)).toBe(true);
+		expect(Number.isNaN(out[2])).toBe(true);
+	});
+});
+
+/**
+ * Velocity grid over 55-70° N, 10-25° E in m/year, one node per degree
+ */
+function buildVelocityGrid(velocityAt: (lat: number, lon: number) => [number, number]): BinaryGrid {
+	const rows = 16;
+	const columns = 16;
+	const values = new Float32Array(rows * columns * 2);
+	for (let row = 0; row < rows; row++) {
+		for (let column = 0; column < columns; column++) {
+			const [north, east] = velocityAt(55 + row, 10 + column);
+			values[2 * (row * columns + column)] = north;
+			values[2 * (row * columns + column) + 1] = east;
+		}
+	}
+	return { minLatitude: 55, minLongitude: 10, latitudeStep: 1, longitudeStep: 1, rows, columns, valuesPerNode: 2, values };
+}
+
+// Faster in the north than the uniform plate velocity (about 23 mm/year north), slower in the south
+const gradientVelocity = (lat: number, lon: number): [number, number] => [
+	0.010 + 0.002 * (lat - 55),
+	0.015 - 0.001 * (lon - 10)
+];
+
+describe('Drift from the velocity grid', () => {
+	const elapsedYears = (TEST_EPOCH_MS - ETRS89_EPOCH_MS) / MILLISECONDS_PER_YEAR;
+	const latLon = new Float64Array([59.33, 18.07, 55.60, 13.00, 67.86, 20.23]);
+
+	beforeEach(() => {
+		velocityGrid = buildVelocityGrid(gradientVelocity);
+	});
+
+	afterEach(() => {
+		velocityGrid = null;
+	});
+
+	test('should apply the per-point grid drift in the forward batch', () => {
+		const out = new Float64Array(6);
+		wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon }, out, createBatchInvalidMask(3), TEST_EPOCH_MS);
+
+		for (let i = 0; i < 3; i++) {
+			const [n, e] = project(latLon[2 * i], latLon[2 * i + 1]);
+			const [north, east] = gradientVelocity(latLon[2 * i], latLon[2 * i + 1]);
+			expect(out[2 * i]).toBeCloseTo(n + north * elapsedYears, 4);
+			expect(out[2 * i + 1]).toBeCloseTo(e + east * elapsedYears, 4);
+		}
+	});
+
+	test('should differ from the uniform drift by decimetres in the north', () => {
+		const withGrid = new Float64Array(6);
+		const uniform = new Float64Array(6);
+		wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon }, withGrid, createBatchInvalidMask(3), TEST_EPOCH_MS);
+		velocityGrid = null;
+		wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon }, uniform, createBatchInvalidMask(3), TEST_EPOCH_MS);
+
+		// Kiruna: (35.7 - 22.7) mm/year over 36.5 years
+		expect(withGrid[4] - uniform[4]).toBeGreaterThan(0.4);
+		expect(withGrid[0] - uniform[0]).toBeLessThan(-0.1);
+	});
+
+	test('should fall back to the uniform drift outside the grid', () => {
+		const out = new Float64Array(2);
+		wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon: new Float64Array([54.5, 13]) }, out, createBatchInvalidMask(1), TEST_EPOCH_MS);
+		const [n, e] = project(54.5, 13);
+		expect(out[0]).toBe(n + itrf2Etrs89Correction.dn);
+		expect(out[1]).toBe(e + itrf2Etrs89Correction.de);
+	});
+
+	test('should remove the grid drift in the inverse batch', () => {
+		const projected = new Float64Array(6);
+		const result = new Float64Array(6);
+		wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon }, projected, createBatchInvalidMask(3), TEST_EPOCH_MS);
+		sweref99tm_to_wgs84_batch({ layout: 'interleaved', northEast: projected }, result, createBatchInvalidMask(3), TEST_EPOCH_MS);
+
+		for (let i = 0; i < latLon.length; i++) {
+			expect(result[i]).toBeCloseTo(latLon[i], 9);
+		}
+	});
+
+	test('should match the scalar inverse with the grid loaded', () => {
+		const projected = new Float64Array(6);
+		const result = new Float64Array(6);
+		wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon }, projected, createBatchInvalidMask(3), TEST_EPOCH_MS);
+		sweref99tm_to_wgs84_batch({ layout: 'interleaved', northEast: projected }, result, createBatchInvalidMask(3), TEST_EPOCH_MS);
+
+		for (let i = 0; i < 3; i++) {
+			const scalar = sweref99tm_to_wgs84(projected[2 * i], projected[2 * i + 1], TEST_EPOCH_MS);
+			expect(result[2 * i]).toBe(scalar.latitude);
+			expect(result[2 * i + 1]).toBe(scalar.longitude);
+		}
+	});
+
+	test('should not round-trip with the uniform inverse when the grid drift differs', () => {
+		const projected = new Float64Array(6);
+		wgs84_to_sweref99tm_batch({ layout: 'interleaved', latLon }, projected, createBatchInvalidMask(3), TEST_EPOCH_MS);
+		velocityGrid = null;
+		const result = sweref99tm_to_wgs84(projected[4], projected[5], TEST_EPOCH_MS);
+
+		// 0.47 m north is about 4e-6 degrees of latitude
+		expect(Math.abs(result.latitude - latLon[4])).toBeGreaterThan(3e-6);
+	});
+});
+
+describe('Projection cache', () => {
+	beforeEach(() => {
+		clearTransformCache();
+		transformCacheHits = 0;
+		transformCacheMisses = 0;
+		transformEngine = 'native';
+		proj4Calls = 0;
+	});
+
+	test('should serve a repeated position from the cache', () => {
+		expect(projectWithCache(59.33, 18.07)).toBe(true);
+		const first = Array.from(projectionScratch);
+		projectionScratch.fill(0);
+
+		expect(projectWithCache(59.33, 18.07)).toBe(true);
+		expect(Array.from(projectionScratch)).toEqual(first);
+		expect(getTransformCacheStats()).toEqual({ hits: 1, misses: 1, size: 1 });
+	});
+
+	test('should serve positions in the same cell from the cache', () => {
+		projectWithCache(59.33, 18.07);
+		projectWithCache(59.3303, 18.0696);
+		expect(getTransformCacheStats().hits).toBe(1);
+	});
+
+	test('should stay within a millimetre of the direct projection across Sweden', () => {
+		const exact = new Float64Array(2);
+		let maxError = 0;
+		for (let lat = 55.2; lat < 69.1; lat += 0.1537) {
+			for (let lon = 10.9; lon < 24.2; lon += 0.1913) {
+				projectWithCache(lat, lon);
+				projectGaussKruger(lat, lon, exact, 0);
+				maxError = Math.max(maxError, Math.abs(projectionScratch[0] - exact[0]), Math.abs(projectionScratch[1] - exact[1]));
+			}
+		}
+		expect(maxError).toBeLessThan(1e-3);
+	});
+
+	test('should give the same result on a hit as on a miss', () => {
+		projectWithCache(63.8251, 20.2637);
+		const miss = Array.from(projectionScratch);
+		projectWithCache(63.8249, 20.2641);
+		projectWithCache(63.8251, 20.2637);
+		expect(Array.from(projectionScratch)).toEqual(miss);
+		expect(getTransformCacheStats().hits).toBe(2);
+	});
+
+	test('should hit for nearly every fix of a stationary device with metres of jitter', () => {
+		// Near a cell corner, so the jitter spreads over four cells
+		for (let i = 0; i < 300; i++) {
+			projectWithCache(59.3305 + 3 * Math.sin(i * 2.3) / 111195, 18.0705 + 3 * Math.cos(i * 1.7) / 56500);
+		}
+		expect(getTransformCacheStats().hits).toBeGreaterThanOrEqual(296);
+	});
+
+	test('should miss in the neighbouring cell', () => {
+		projectWithCache(59.33, 18.07);
+		projectWithCache(59.331, 18.07);
+		expect(getTransformCacheStats()).toEqual({ hits: 0, misses: 2, size: 2 });
+	});
+
+	test('should evict the least recently used entry', () => {
+		for (let i = 0; i < TRANSFORM_CACHE_SIZE; i++) {
+			projectWithCache(59 + i * 0.001, 18);
+		}
+		// Touch the oldest entry so the second oldest is evicted instead
+		projectWithCache(59, 18);
+		projectWithCache(60, 18);
+
+		expect(getTransformCacheStats().size).toBe(TRANSFORM_CACHE_SIZE);
+		expect(transformCache.has(cacheKeyAt(59, 18))).toBe(true);
+		expect(transformCache.has(cacheKeyAt(59.001, 18))).toBe(false);
+	});
+
+	test('should use exact integer keys that differ for neighbouring cells', () => {
+		const key = cacheKeyAt(69.06, 24.16);
+		expect(Number.isSafeInteger(key)).toBe(true);
+		expect(Number.isSafeInteger(cacheKeyAt(-90, -180))).toBe(true);
+		expect(Number.isSafeInteger(cacheKeyAt(90, 180))).toBe(true);
+		expect(cacheKeyAt(69.06, 24.161)).toBe(key + 1);
+		expect(cacheKeyAt(69.061, 24.16)).toBe(key + TRANSFORM_CACHE_LONGITUDE_STEPS);
+	});
+
+	test('should give every cell its own key', () => {
+		expect(cacheKeyAt(-90, 180)).toBeLessThan(cacheKeyAt(-89.999, -180));
+		expect(cacheKeyAt(89.999, 180)).toBeLessThan(cacheKeyAt(90, -180));
+		expect(cacheKeyAt(-90, -180)).toBe(0);
+	});
+
+	test('should not cache failed projections', () => {
+		transformEngine = 'proj4';
+		expect(projectWithCache(59.33, 18.07)).toBe(false);
+		expect(projectWithCache(59.33, 18.07)).toBe(false);
+		// One failed projection of the cell, then the position itself
+		expect(proj4Calls).toBe(4);
+		expect(getTransformCacheStats()).toEqual({ hits: 0, misses: 2, size: 0 });
+	});
+
+	test('should give the direct projection at a cell node', () => {
+		const expected = new Float64Array(2);
+		projectGaussKruger(67.86, 20.23, expected, 0);
+		projectWithCache(67.86, 20.23);
+		expect(projectionScratch[0]).toBe(expected[0]);
+		expect(projectionScratch[1]).toBe(expected[1]);
+	});
+});
+
+describe('On-demand PROJ4JS loading', () => {
+	// ensureSwerefProjection and loadProj4 from geodesy.ts, with the global proj4 and
+	// the dynamic import() replaced by stand-ins
+	let proj4Global: { defs: (name: string, definition?: string) => unknown } | undefined;
+	let proj4Imports = 0;
+	let isProj4Requested = false;
+	let isSwerefProjectionDefined = false;
+	let lazyEngine: TransformEngine = 'native';
+
+	function importProj4Script(): Promise<void> {
+		proj4Imports++;
+		return Promise.resolve();
+	}
+
+	function loadProj4(): void {
+		if (isProj4Requested) {
+			return;
+		}
+		isProj4Requested = true;
+		importProj4Script().catch(() => undefined);
+	}
+
+	function ensureSwerefProjection(): boolean {
+		if (proj4Global === undefined) {
+			loadProj4();
+			return false;
+		}
+		if (!isSwerefProjectionDefined) {
+			proj4Global.defs('EPSG:3006', '+proj=utm +zone=33');
+			isSwerefProjectionDefined = true;
+		}
+		return true;
+	}
+
+	function setLazyEngine(engine: TransformEngine): void {
+		lazyEngine = engine;
+		if (engine === 'proj4') {
+			loadProj4();
+		}
+	}
+
+	function projectLazily(lat: number, lon: number): boolean {
+		if (lazyEngine === 'native') {
+			projectGaussKruger(lat, lon, projectionScratch, 0);
+			if (Number.isFinite(projectionScratch[0]) && Number.isFinite(projectionScratch[1])) {
+				return true;
+			}
+		}
+		return ensureSwerefProjection();
+	}
+
+	beforeEach(() => {
+		proj4Global = undefined;
+		proj4Imports = 0;
+		isProj4Requested = false;
+		isSwerefProjectionDefined = false;
+		lazyEngine = 'native';
+	});
+
+	test('should never load PROJ4JS on the native path', () => {
+		for (let i = 0; i < 10; i++) {
+			expect(projectLazily(59.33 + i * 0.01, 18.07)).toBe(true);
+		}
+		expect(proj4Imports).toBe(0);
+	});
+
+	test('should start loading PROJ4JS when the proj4 engine is selected', () => {
+		setLazyEngine('proj4');
+		expect(proj4Imports).toBe(1);
+	});
+
+	test('should report failure until PROJ4JS has loaded, then succeed', () => {
+		setLazyEngine('proj4');
+		expect(projectLazily(59.33, 18.07)).toBe(false);
+		proj4Global = { defs: () => undefined };
+		expect(projectLazily(59.33, 18.07)).toBe(true);
+	});
+
+	test('should load PROJ4JS only once', () => {
+		setLazyEngine('proj4');
+		projectLazily(59.33, 18.07);
+		projectLazily(59.34, 18.07);
+		setLazyEngine('proj4');
+		expect(proj4Imports).toBe(1);
+	});
+
+	test('should load PROJ4JS when the native result is not finite', () => {
+		expect(projectLazily(Number.NaN, 18.07)).toBe(false);
+		expect(proj4Imports).toBe(1);
+	});
+});
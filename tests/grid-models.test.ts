@@ -0,0 +1,665 @@
+/**
+ * Unit tests for the binary grid models (NKG-style velocity grid and geoid tiles)
+ *
+ * Tests cover:
+ * - Parsing of the binary grid format and rejection of malformed data
+ * - Bilinear interpolation at nodes, cell centres and grid edges
+ * - Fallback to the uniform PLATE_VELOCITY vector outside the velocity grid
+ * - ITRF/ETRS89 correction from the velocity grid for a position, uniform without one
+ * - Loading the velocity grid: missing files are not requested again, network errors are retried
+ * - RH 2000 height from geoid tiles and the bounded LRU tile cache
+ * - Loading geoid tiles: missing tiles are not requested again, network errors are retried
+ */
+
+/**
+ * Constants and functions from geodesy.ts - redefined here for testing
+ *
+ * NOTE: These are duplicated from src/geodesy.ts rather than imported.
+ * See tests/README.md for more details.
+ */
+interface BinaryGrid {
+	minLatitude: number;
+	minLongitude: number;
+	latitudeStep: number;
+	longitudeStep: number;
+	rows: number;
+	columns: number;
+	valuesPerNode: number;
+	values: Float32Array;
+}
+
+const GRID_FILE_HEADER_BYTES = 40;
+const VELOCITY_GRID_MAGIC = 0x4e4b4756;
+const GEOID_TILE_MAGIC = 0x47454f49;
+const GEOID_TILE_CACHE_SIZE = 4;
+const GRID_RETRY_DELAY_MS = 60000;
+const VELOCITY_GRID_URL = '/data/nkg-velocity.bin';
+const MILLISECONDS_PER_YEAR = 365.25 * 24 * 60 * 60 * 1000;
+const driftRate = {
+	north: (0.025 / MILLISECONDS_PER_YEAR) * Math.cos((25 * Math.PI) / 180),
+	east: (0.025 / MILLISECONDS_PER_YEAR) * Math.sin((25 * Math.PI) / 180)
+};
+
+const ETRS89_EPOCH_MS = Date.UTC(1989, 0, 1);
+const driftRateScratch = new Float64Array(2);
+
+interface Itrf2Etrs89Correction {
+	dn: number;
+	de: number;
+}
+
+let velocityGrid: BinaryGrid | null = null;
+let isVelocityGridRequested = false;
+let velocityGridRetryTime = 0;
+const geoidTileCache = new Map<number, BinaryGrid>();
+const pendingGeoidTiles = new Set<number>();
+const unavailableGeoidTiles = new Set<number>();
+const geoidTileRetryTimes = new Map<number, number>();
+const geoidScratch = new Float64Array(1);
+const GEOID_TILE_URL_PREFIX = '/data/geoid/swen17-';
+
+function isValidLatitude(latitude: number): boolean {
+	return Number.isFinite(latitude) && latitude >= -90 && latitude <= 90;
+}
+
+function isValidLongitude(longitude: number): boolean {
+	return Number.isFinite(longitude) && longitude >= -180 && longitude <= 180;
+}
+
+function parseBinaryGrid(buffer: ArrayBuffer, magic: number, valuesPerNode: number): BinaryGrid | null {
+	if (buffer.byteLength < GRID_FILE_HEADER_BYTES) {
+		return null;
+	}
+
+	const view = new DataView(buffer);
+	if (view.getUint32(0, false) !== magic) {
+		return null;
+	}
+
+	const rows = view.getUint16(4, true);
+	const columns = view.getUint16(6, true);
+	const latitudeStep = view.getFloat64(24, true);
+	const longitudeStep = view.getFloat64(32, true);
+	const valueCount = rows * columns * valuesPerNode;
+
+	if (rows < 2 || columns < 2 || !(latitudeStep > 0) || !(longitudeStep > 0) ||
+		buffer.byteLength < GRID_FILE_HEADER_BYTES + valueCount * 4) {
+		return null;
+	}
+
+	return {
+		minLatitude: view.getFloat64(8, true),
+		minLongitude: view.getFloat64(16, true),
+		latitudeStep,
+		longitudeStep,
+		rows,
+		columns,
+		valuesPerNode,
+		values: new Float32Array(buffer, GRID_FILE_HEADER_BYTES, valueCount)
+	};
+}
+
+function sampleBinaryGrid(grid: BinaryGrid, lat: number, lon: number, out: Float64Array): boolean {
+	const y = (lat - grid.minLatitude) / grid.latitudeStep;
+	const x = (lon - grid.minLongitude) / grid.longitudeStep;
+	if (!(y >= 0 && y <= grid.rows - 1 && x >= 0 && x <= grid.columns - 1)) {
+		return false;
+	}
+
+	const row = Math.min(Math.floor(y), grid.rows - 2);
+	const column = Math.min(Math.floor(x), grid.columns - 2);
+	const fy = y - row;
+	const fx = x - column;
+	const stride = grid.valuesPerNode;
+	const v = grid.values;
+	const i00 = stride * (row * grid.columns + column);
+	const i01 = i00 + stride;
+	const i10 = i00 + stride * grid.columns;
+	const i11 = i10 + stride;
+
+	const w00 = (1 - fx) * (1 - fy);
+	const w01 = fx * (1 - fy);
+	const w10 = (1 - fx) * fy;
+	const w11 = fx * fy;
+
+	for (let k = 0; k < stride; k++) {
+		out[k] = w00 * v[i00 + k] + w01 * v[i01 + k] + w10 * v[i10 + k] + w11 * v[i11 + k];
+	}
+	return true;
+}
+
+function sampleDriftRate(lat: number, lon: number, out: Float64Array): void {
+	if (velocityGrid !== null && sampleBinaryGrid(velocityGrid, lat, lon, out)) {
+		out[0] /= MILLISECONDS_PER_YEAR;
+		out[1] /= MILLISECONDS_PER_YEAR;
+		return;
+	}
+
+	out[0] = driftRate.north;
+	out[1] = driftRate.east;
+}
+
+function calculateItrf2Etrs89Correction(timestamp: number = Date.now(), lat?: number, lon?: number): Itrf2Etrs89Correction {
+	const elapsedMs: number = timestamp - ETRS89_EPOCH_MS;
+
+	if (lat === undefined || lon === undefined) {
+		driftRateScratch[0] = driftRate.north;
+		driftRateScratch[1] = driftRate.east;
+	} else {
+		sampleDriftRate(lat, lon, driftRateScratch);
+	}
+
+	return {
+		dn: driftRateScratch[0] * elapsedMs,
+		de: driftRateScratch[1] * elapsedMs
+	};
+}
+
+function fetchBinaryGrid(url: string, magic: number, valuesPerNode: number): Promise<BinaryGrid | null> {
+	return fetch(url).then((response) => {
+		if (response.status === 404) {
+			return null;
+		}
+		if (!response.ok) {
+			throw new Error(`HTTP ${response.status}`);
+		}
+		return response.arrayBuffer().then((buffer) => {
+			const grid = parseBinaryGrid(buffer, magic, valuesPerNode);
+			if (grid === null) {
+				console.warn(`${url} har ogiltigt format`);
+			}
+			return grid;
+		});
+	});
+}
+
+function loadVelocityGrid(): void {
+	if (isVelocityGridRequested || typeof fetch !== 'function' || Date.now() < velocityGridRetryTime) {
+		return;
+	}
+	isVelocityGridRequested = true;
+
+	fetchBinaryGrid(VELOCITY_GRID_URL, VELOCITY_GRID_MAGIC, 2)
+		.then((grid) => {
+			velocityGrid = grid;
+		})
+		.catch((error) => {
+			isVelocityGridRequested = false;
+			velocityGridRetryTime = Date.now() + GRID_RETRY_DELAY_MS;
+			console.warn('Hastighetsmodellen kunde inte laddas, försöker igen senare:', error);
+		});
+}
+
+function getGeoidTileKey(lat: number, lon: number): number {
+	return (Math.floor(lat) + 90) * 360 + (Math.floor(lon) + 180);
+}
+
+function storeGeoidTile(key: number, tile: BinaryGrid): void {
+	geoidTileCache.delete(key);
+	geoidTileCache.set(key, tile);
+	while (geoidTileCache.size > GEOID_TILE_CACHE_SIZE) {
+		const oldestKey = geoidTileCache.keys().next().value as number;
+		geoidTileCache.delete(oldestKey);
+	}
+}
+
+function loadGeoidTile(lat: number, lon: number): void {
+	const key = getGeoidTileKey(lat, lon);
+	if (pendingGeoidTiles.has(key) || unavailableGeoidTiles.has(key) || typeof fetch !== 'function' ||
+		Date.now() < (geoidTileRetryTimes.get(key) ?? 0)) {
+		return;
+	}
+	pendingGeoidTiles.add(key);
+
+	fetchBinaryGrid(`${GEOID_TILE_URL_PREFIX}${Math.floor(lat)}-${Math.floor(lon)}.bin`, GEOID_TILE_MAGIC, 1)
+		.then((tile) => {
+			geoidTileRetryTimes.delete(key);
+			if (tile === null) {
+				unavailableGeoidTiles.add(key);
+				return;
+			}
+			storeGeoidTile(key, tile);
+		})
+		.catch((error) => {
+			geoidTileRetryTimes.set(key, Date.now() + GRID_RETRY_DELAY_MS);
+			console.warn('Geoidruta kunde inte laddas, försöker igen senare:', error);
+		})
+		.finally(() => {
+			pendingGeoidTiles.delete(key);
+		});
+}
+
+function calculateRh2000Height(lat: number, lon: number, ellipsoidalHeight: number): number {
+	if (!Number.isFinite(ellipsoidalHeight) || !isValidLatitude(lat) || !isValidLongitude(lon)) {
+		return Number.NaN;
+	}
+
+	const key = getGeoidTileKey(lat, lon);
+	const tile = geoidTileCache.get(key);
+	if (tile === undefined) {
+		loadGeoidTile(lat, lon);
+		return Number.NaN;
+	}
+
+	geoidTileCache.delete(key);
+	geoidTileCache.set(key, tile);
+
+	if (!sampleBinaryGrid(tile, lat, lon, geoidScratch)) {
+		return Number.NaN;
+	}
+	return ellipsoidalHeight - geoidScratch[0];
+}
+
+/**
+ * Builds a binary grid file where each node's velocity is a linear function of position
+ */
+function buildGridBuffer(
+	rows: number,
+	columns: number,
+	minLatitude: number,
+	minLongitude: number,
+	step: number,
+	velocityAt: (lat: number, lon: number) => [number, number]
+): ArrayBuffer {
+	const buffer = new ArrayBuffer(GRID_FILE_HEADER_BYTES + rows * columns * 8);
+	const view = new DataView(buffer);
+	view.setUint32(0, VELOCITY_GRID_MAGIC, false);
+	view.setUint16(4, rows, true);
+	view.setUint16(6, columns, true);
+	view.setFloat64(8, minLatitude, true);
+	view.setFloat64(16, minLongitude, true);
+	view.setFloat64(24, step, true);
+	view.setFloat64(32, step, true);
+
+	for (let row = 0; row < rows; row++) {
+		for (let column = 0; column < columns; column++) {
+			const [north, east] = velocityAt(minLatitude + row * step, minLongitude + column * step);
+			const offset = GRID_FILE_HEADER_BYTES + (row * columns + column) * 8;
+			view.setFloat32(offset, north, true);
+			view.setFloat32(offset + 4, east, true);
+		}
+	}
+	return buffer;
+}
+
+// Velocity varying linearly with position, so bilinear interpolation is exact (within float32)
+const linearVelocity = (lat: number, lon: number): [number, number] => [
+	0.020 + 0.0005 * (lat - 55),
+	0.010 + 0.0002 * (lon - 10)
+];
+
+/**
+ * Builds a 1°×1° geoid tile file with edge nodes included
+ */
+function buildGeoidTileBuffer(lat0: number, lon0: number, nodesPerSide: number, geoidAt: (lat: number, lon: number) => number): ArrayBuffer {
+	const step = 1 / (nodesPerSide - 1);
+	const buffer = new ArrayBuffer(GRID_FILE_HEADER_BYTES + nodesPerSide * nodesPerSide * 4);
+	const view = new DataView(buffer);
+	view.setUint32(0, GEOID_TILE_MAGIC, false);
+	view.setUint16(4, nodesPerSide, true);
+	view.setUint16(6, nodesPerSide, true);
+	view.setFloat64(8, lat0, true);
+	view.setFloat64(16, lon0, true);
+	view.setFloat64(24, step, true);
+	view.setFloat64(32, step, true);
+	for (let row = 0; row < nodesPerSide; row++) {
+		for (let column = 0; column < nodesPerSide; column++) {
+			const offset = GRID_FILE_HEADER_BYTES + (row * nodesPerSide + column) * 4;
+			view.setFloat32(offset, geoidAt(lat0 + row * step, lon0 + column * step), true);
+		}
+	}
+	return buffer;
+}
+
+function buildGeoidTile(lat0: number, lon0: number, nodesPerSide: number, geoidAt: (lat: number, lon: number) => number): BinaryGrid {
+	return parseBinaryGrid(buildGeoidTileBuffer(lat0, lon0, nodesPerSide, geoidAt), GEOID_TILE_MAGIC, 1)!;
+}
+
+/**
+ * Replaces fetch with a mock that answers each request with the next outcome:
+ * an ArrayBuffer (200), an HTTP status, or 'offline' for a network error (404 when none are left)
+ */
+function mockFetch(outcomes: Array<ArrayBuffer | number | 'offline'>): string[] {
+	const requested: string[] = [];
+	globalThis.fetch = ((url: string) => {
+		requested.push(url);
+		const outcome = outcomes.shift();
+		if (outcome === 'offline') {
+			return Promise.reject(new TypeError('Failed to fetch'));
+		}
+		if (outcome === undefined || typeof outcome === 'number') {
+			const status = outcome ?? 404;
+			return Promise.resolve({ status, ok: status >= 200 && status < 300 });
+		}
+		return Promise.resolve({ status: 200, ok: true, arrayBuffer: () => Promise.resolve(outcome) });
+	}) as unknown as typeof fetch;
+	return requested;
+}
+
+const flushPromises = (): Promise<void> => new Promise((resolve) => setTimeout(resolve, 0));
+
+const linearGeoid = (lat: number, lon: number): number => 20 + 0.5 * (lat - 55) + 0.8 * (lon - 10);
+
+describe('parseBinaryGrid Function', () => {
+	test('should decode header and values', () => {
+		const grid = parseBinaryGrid(buildGridBuffer(3, 4, 55, 10, 1, linearVelocity), VELOCITY_GRID_MAGIC, 2);
+		expect(grid).not.toBeNull();
+		expect(grid!.rows).toBe(3);
+		expect(grid!.columns).toBe(4);
+		expect(grid!.minLatitude).toBe(55);
+		expect(grid!.minLongitude).toBe(10);
+		expect(grid!.valuesPerNode).toBe(2);
+		expect(grid!.values.length).toBe(24);
+	});
+
+	test('should reject data with wrong magic', () => {
+		const buffer = buildGridBuffer(2, 2, 55, 10, 1, linearVelocity);
+		new DataView(buffer).setUint32(0, 0x12345678, false);
+		expect(parseBinaryGrid(buffer, VELOCITY_GRID_MAGIC, 2)).toBeNull();
+	});
+
+	test('should reject truncated data', () => {
+		const buffer = buildGridBuffer(3, 3, 55, 10, 1, linearVelocity);
+		expect(parseBinaryGrid(buffer.slice(0, buffer.byteLength - 4), VELOCITY_GRID_MAGIC, 2)).toBeNull();
+		expect(parseBinaryGrid(new ArrayBuffer(10), VELOCITY_GRID_MAGIC, 2)).toBeNull();
+	});
+
+	test('should reject degenerate grids', () => {
+		expect(parseBinaryGrid(buildGridBuffer(1, 3, 55, 10, 1, linearVelocity), VELOCITY_GRID_MAGIC, 2)).toBeNull();
+		expect(parseBinaryGrid(buildGridBuffer(3, 3, 55, 10, 0, linearVelocity), VELOCITY_GRID_MAGIC, 2)).toBeNull();
+	});
+});
+
+describe('sampleBinaryGrid Function', () => {
+	const grid = parseBinaryGrid(buildGridBuffer(15, 15, 55, 10, 1, linearVelocity), VELOCITY_GRID_MAGIC, 2)!;
+	const out = new Float64Array(2);
+
+	test('should return node values exactly at grid nodes', () => {
+		expect(sampleBinaryGrid(grid, 60, 15, out)).toBe(true);
+		expect(out[0]).toBeCloseTo(linearVelocity(60, 15)[0], 7);
+		expect(out[1]).toBeCloseTo(linearVelocity(60, 15)[1], 7);
+	});
+
+	test('should interpolate linearly inside a cell', () => {
+		expect(sampleBinaryGrid(grid, 59.33, 18.07, out)).toBe(true);
+		expect(out[0]).toBeCloseTo(linearVelocity(59.33, 18.07)[0], 7);
+		expect(out[1]).toBeCloseTo(linearVelocity(59.33, 18.07)[1], 7);
+	});
+
+	test('should handle the north-east corner of the grid', () => {
+		expect(sampleBinaryGrid(grid, 69, 24, out)).toBe(true);
+		expect(out[0]).toBeCloseTo(linearVelocity(69, 24)[0], 7);
+		expect(out[1]).toBeCloseTo(linearVelocity(69, 24)[1], 7);
+	});
+
+	test('should return false outside the grid', () => {
+		expect(sampleBinaryGrid(grid, 54.9, 15, out)).toBe(false);
+		expect(sampleBinaryGrid(grid, 60, 24.1, out)).toBe(false);
+		expect(sampleBinaryGrid(grid, Number.NaN, 15, out)).toBe(false);
+	});
+});
+
+describe('sampleDriftRate Function', () => {
+	const out = new Float64Array(2);
+
+	afterEach(() => {
+		velocityGrid = null;
+	});
+
+	test('should use the uniform plate velocity without a grid', () => {
+		sampleDriftRate(60, 15, out);
+		expect(out[0]).toBe(driftRate.north);
+		expect(out[1]).toBe(driftRate.east);
+	});
+
+	test('should convert grid velocity from m/year to m/ms', () => {
+		velocityGrid = parseBinaryGrid(buildGridBuffer(15, 15, 55, 10, 1, linearVelocity), VELOCITY_GRID_MAGIC, 2);
+		sampleDriftRate(60, 15, out);
+		expect(out[0] * MILLISECONDS_PER_YEAR).toBeCloseTo(linearVelocity(60, 15)[0], 7);
+		expect(out[1] * MILLISECONDS_PER_YEAR).toBeCloseTo(linearVelocity(60, 15)[1], 7);
+	});
+
+	test('should fall back to the uniform plate velocity outside the grid', () => {
+		velocityGrid = parseBinaryGrid(buildGridBuffer(3, 3, 55, 10, 1, linearVelocity), VELOCITY_GRID_MAGIC, 2);
+		sampleDriftRate(65, 20, out);
+		expect(out[0]).toBe(driftRate.north);
+		expect(out[1]).toBe(driftRate.east);
+	});
+});
+
+describe('calculateItrf2Etrs89Correction Function', () => {
+	const timestamp = Date.UTC(2025, 6, 1);
+	const elapsedMs = timestamp - ETRS89_EPOCH_MS;
+
+	afterEach(() => {
+		velocityGrid = null;
+	});
+
+	test('should report the uniform correction without a position', () => {
+		velocityGrid = parseBinaryGrid(buildGridBuffer(15, 15, 55, 10, 1, linearVelocity), VELOCITY_GRID_MAGIC, 2);
+		const correction = calculateItrf2Etrs89Correction(timestamp);
+		expect(correction.dn).toBe(driftRate.north * elapsedMs);
+		expect(correction.de).toBe(driftRate.east * elapsedMs);
+	});
+
+	test('should use the velocity grid for a position when it is loaded', () => {
+		velocityGrid = parseBinaryGrid(buildGridBuffer(15, 15, 55, 10, 1, linearVelocity), VELOCITY_GRID_MAGIC, 2);
+		const correction = calculateItrf2Etrs89Correction(timestamp, 60, 15);
+		const years = elapsedMs / MILLISECONDS_PER_YEAR;
+		expect(correction.dn).toBeCloseTo(linearVelocity(60, 15)[0] * years, 6);
+		expect(correction.de).toBeCloseTo(linearVelocity(60, 15)[1] * years, 6);
+	});
+
+	test('should report the uniform correction for a position before the grid has loaded', () => {
+		const correction = calculateItrf2Etrs89Correction(timestamp, 60, 15);
+		expect(correction.dn).toBe(driftRate.north * elapsedMs);
+		expect(correction.de).toBe(driftRate.east * elapsedMs);
+	});
+});
+
+describe('loadVelocityGrid Function', () => {
+	const originalFetch = globalThis.fetch;
+	let now = 0;
+	let dateSpy: ReturnType<typeof jest.spyOn>;
+	let warnSpy: ReturnType<typeof jest.spyOn>;
+
+	beforeEach(() => {
+		velocityGrid = null;
+		isVelocityGridRequested = false;
+		velocityGridRetryTime = 0;
+		now = 1760616000000;
+		dateSpy = jest.spyOn(Date, 'now').mockImplementation(() => now);
+		warnSpy = jest.spyOn(console, 'warn').mockImplementation(() => {});
+	});
+
+	afterEach(() => {
+		globalThis.fetch = originalFetch;
+		dateSpy.mockRestore();
+		warnSpy.mockRestore();
+		velocityGrid = null;
+	});
+
+	test('should install the grid once it has loaded', async () => {
+		const requested = mockFetch([buildGridBuffer(3, 3, 55, 10, 1, linearVelocity)]);
+		loadVelocityGrid();
+		loadVelocityGrid();
+		await flushPromises();
+		expect(requested).toEqual([VELOCITY_GRID_URL]);
+		expect(velocityGrid).not.toBeNull();
+	});
+
+	test('should not request a missing grid again', async () => {
+		const requested = mockFetch([404]);
+		loadVelocityGrid();
+		await flushPromises();
+		now += 10 * GRID_RETRY_DELAY_MS;
+		loadVelocityGrid();
+		expect(requested.length).toBe(1);
+		expect(velocityGrid).toBeNull();
+		expect(warnSpy.mock.calls.length).toBe(0);
+	});
+
+	test('should retry after a network error once the delay has passed', async () => {
+		const requested = mockFetch(['offline', buildGridBuffer(3, 3, 55, 10, 1, linearVelocity)]);
+		loadVelocityGrid();
+		await flushPromises();
+		expect(velocityGrid).toBeNull();
+
+		now += GRID_RETRY_DELAY_MS - 1;
+		loadVelocityGrid();
+		expect(requested.length).toBe(1);
+
+		now += 1;
+		loadVelocityGrid();
+		await flushPromises();
+		expect(requested.length).toBe(2);
+		expect(velocityGrid).not.toBeNull();
+	});
+
+	test('should treat server errors as temporary', async () => {
+		const requested = mockFetch([503, 503]);
+		loadVelocityGrid();
+		await flushPromises();
+		now += GRID_RETRY_DELAY_MS;
+		loadVelocityGrid();
+		await flushPromises();
+		expect(requested.length).toBe(2);
+	});
+});
+
+describe('calculateRh2000Height Function', () => {
+	const originalFetch = globalThis.fetch;
+	let requested: string[] = [];
+
+	beforeEach(() => {
+		geoidTileCache.clear();
+		unavailableGeoidTiles.clear();
+		requested = mockFetch([]);
+	});
+
+	afterEach(async () => {
+		await flushPromises();
+		globalThis.fetch = originalFetch;
+	});
+
+	test('should request the tile and return NaN when it is not loaded', () => {
+		expect(Number.isNaN(calculateRh2000Height(59.33, 18.07, 60))).toBe(true);
+		expect(requested).toEqual(['/data/geoid/swen17-59-18.bin']);
+	});
+
+	test('should subtract the interpolated geoid height', () => {
+		storeGeoidTile(getGeoidTileKey(59.5, 18.5), buildGeoidTile(59, 18, 41, linearGeoid));
+		const height = calculateRh2000Height(59.33, 18.07, 60);
+		expect(height).toBeCloseTo(60 - linearGeoid(59.33, 18.07), 4);
+		expect(requested).toEqual([]);
+	});
+
+	test('should interpolate on the north-east edge of a tile', () => {
+		storeGeoidTile(getGeoidTileKey(59.5, 18.5), buildGeoidTile(59, 18, 41, linearGeoid));
+		const height = calculateRh2000Height(59.9999999, 18.9999999, 50);
+		expect(height).toBeCloseTo(50 - linearGeoid(60, 19), 4);
+	});
+
+	test('should return NaN for missing altitude or invalid position', () => {
+		expect(Number.isNaN(calculateRh2000Height(59.33, 18.07, Number.NaN))).toBe(true);
+		expect(Number.isNaN(calculateRh2000Height(95, 18.07, 60))).toBe(true);
+		expect(requested).toEqual([]);
+	});
+});
+
+describe('loadGeoidTile Function', () => {
+	const originalFetch = globalThis.fetch;
+	let now = 0;
+	let dateSpy: ReturnType<typeof jest.spyOn>;
+	let warnSpy: ReturnType<typeof jest.spyOn>;
+
+	beforeEach(() => {
+		geoidTileCache.clear();
+		unavailableGeoidTiles.clear();
+		geoidTileRetryTimes.clear();
+		now = 1760616000000;
+		dateSpy = jest.spyOn(Date, 'now').mockImplementation(() => now);
+		warnSpy = jest.spyOn(console, 'warn').mockImplementation(() => {});
+	});
+
+	afterEach(() => {
+		globalThis.fetch = originalFetch;
+		dateSpy.mockRestore();
+		warnSpy.mockRestore();
+	});
+
+	test('should store a loaded tile for the next fix', async () => {
+		const requested = mockFetch([buildGeoidTileBuffer(59, 18, 3, linearGeoid)]);
+
+		loadGeoidTile(59.33, 18.07);
+		loadGeoidTile(59.5, 18.5);
+		await flushPromises();
+		expect(requested.length).toBe(1);
+		expect(calculateRh2000Height(59.33, 18.07, 60)).toBeCloseTo(60 - linearGeoid(59.33, 18.07), 4);
+	});
+
+	test('should not request a missing tile again', async () => {
+		const requested = mockFetch([404]);
+		loadGeoidTile(59.33, 18.07);
+		await flushPromises();
+		now += 10 * GRID_RETRY_DELAY_MS;
+		loadGeoidTile(59.33, 18.07);
+		expect(requested.length).toBe(1);
+		expect(warnSpy.mock.calls.length).toBe(0);
+	});
+
+	test('should retry a tile after a network error once the delay has passed', async () => {
+		const requested = mockFetch(['offline', 404]);
+		loadGeoidTile(59.33, 18.07);
+		await flushPromises();
+
+		now += GRID_RETRY_DELAY_MS - 1;
+		loadGeoidTile(59.33, 18.07);
+		expect(requested.length).toBe(1);
+
+		now += 1;
+		loadGeoidTile(59.33, 18.07);
+		await flushPromises();
+		expect(requested.length).toBe(2);
+	});
+
+	test('should keep requesting other tiles while one is waiting for a retry', async () => {
+		const requested = mockFetch(['offline', 404]);
+		loadGeoidTile(59.33, 18.07);
+		await flushPromises();
+		loadGeoidTile(59.33, 19.07);
+		await flushPromises();
+		expect(requested).toEqual(['/data/geoid/swen17-59-18.bin', '/data/geoid/swen17-59-19.bin']);
+	});
+});
+
+describe('Geoid tile LRU cache', () => {
+	beforeEach(() => {
+		geoidTileCache.clear();
+	});
+
+	test('should use distinct keys for neighbouring tiles', () => {
+		expect(getGeoidTileKey(59.5, 18.5)).not.toBe(getGeoidTileKey(59.5, 19.5));
+		expect(getGeoidTileKey(59.5, 18.5)).not.toBe(getGeoidTileKey(60.5, 18.5));
+		expect(getGeoidTileKey(59.1, 18.1)).toBe(getGeoidTileKey(59.9, 18.9));
+	});
+
+	test('should keep at most GEOID_TILE_CACHE_SIZE tiles', () => {
+		for (let lon = 10; lon < 10 + GEOID_TILE_CACHE_SIZE + 3; lon++) {
+			storeGeoidTile(getGeoidTileKey(60.5, lon + 0.5), buildGeoidTile(60, lon, 3, linearGeoid));
+		}
+		expect(geoidTileCache.size).toBe(GEOID_TILE_CACHE_SIZE);
+	});
+
+	test('should evict the least recently used tile', () => {
+		const keys = [10, 11, 12, 13].map((lon) => getGeoidTileKey(60.5, lon + 0.5));
+		keys.forEach((key, index) => storeGeoidTile(key, buildGeoidTile(60, 10 + index, 3, linearGeoid)));
+
+		// Use the oldest tile so that the second oldest becomes the eviction candidate
+		calculateRh2000Height(60.5, 10.5, 40);
+		storeGeoidTile(getGeoidTileKey(60.5, 14.5), buildGeoidTile(60, 14, 3, linearGeoid));
+
+		expect(geoidTileCache.has(keys[0])).toBe(true);
+		expect(geoidTileCache.has(keys[1])).toBe(false);
+	});
+});
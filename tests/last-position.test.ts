@@ -0,0 +1,237 @@
+/**
+ * Unit tests for the last known position snapshot
+ *
+ * Tests cover:
+ * - Compact serialization of the last rendered position
+ * - Round trip through serialize and parse, with the spread and count of an averaged position
+ * - Rejection of missing, corrupted or outdated stored data
+ * - Throttled saving, with the newest position saved when the page is hidden
+ */
+
+/**
+ * Snapshot functions from script.ts - redefined here for testing
+ *
+ * NOTE: These are duplicated from src/script.ts rather than imported.
+ * See tests/README.md for more details.
+ */
+interface FormattedPosition {
+	swerefN: string;
+	swerefE: string;
+	wgs84N: string;
+	wgs84E: string;
+	height: string;
+	showNotInSwedenWarning: boolean;
+}
+
+interface LastKnownPosition {
+	position: FormattedPosition;
+	accuracy: number;
+	timestamp: number;
+	averageCount: number;
+	averageSpread: number;
+}
+
+function serializeLastKnownPosition({ position, accuracy, timestamp, averageCount, averageSpread }: LastKnownPosition): string {
+	const values: (string | number)[] = [
+		position.swerefN,
+		position.swerefE,
+		position.wgs84N,
+		position.wgs84E,
+		position.height,
+		accuracy,
+		timestamp
+	];
+	if (averageCount > 0) {
+		values.push(averageCount, averageSpread);
+	}
+	return JSON.stringify(values);
+}
+
+function parseLastKnownPosition(json: string | null): LastKnownPosition | null {
+	if (!json) {
+		return null;
+	}
+
+	try {
+		const values: unknown = JSON.parse(json);
+		if (!Array.isArray(values) || (values.length !== 7 && values.length !== 9)) {
+			return null;
+		}
+		const [swerefN, swerefE, wgs84N, wgs84E, height, accuracy, timestamp, averageCount = 0, averageSpread = Number.NaN] = values;
+		if (![swerefN, swerefE, wgs84N, wgs84E, height].every((value) => typeof value === 'string') ||
+			!Number.isFinite(accuracy) || !Number.isFinite(timestamp)) {
+			return null;
+		}
+		if (values.length === 9 && (!Number.isInteger(averageCount) || averageCount < 1 || !Number.isFinite(averageSpread))) {
+			return null;
+		}
+		return {
+			position: { swerefN, swerefE, wgs84N, wgs84E, height, showNotInSwedenWarning: false },
+			accuracy,
+			timestamp,
+			averageCount,
+			averageSpread
+		};
+	} catch (error) {
+		return null;
+	}
+}
+
+const LAST_POSITION_STORE_INTERVAL_MS = 30000;
+
+// localStorage and the clock are replaced by stand-ins
+const storedItems: string[] = [];
+let now = 0;
+
+let unsavedLastPosition: LastKnownPosition | null = null;
+let lastPositionSavedAt = Number.NEGATIVE_INFINITY;
+
+function saveLastKnownPosition(): void {
+	if (unsavedLastPosition === null) {
+		return;
+	}
+	storedItems.push(serializeLastKnownPosition(unsavedLastPosition));
+	unsavedLastPosition = null;
+	lastPositionSavedAt = now;
+}
+
+function rememberLastKnownPosition(snapshot: LastKnownPosition): void {
+	unsavedLastPosition = snapshot;
+	if (now - lastPositionSavedAt >= LAST_POSITION_STORE_INTERVAL_MS) {
+		saveLastKnownPosition();
+	}
+}
+
+const SNAPSHOT: LastKnownPosition = {
+	position: {
+		swerefN: 'N 6580744',
+		swerefE: 'E  674572',
+		wgs84N: 'N 59,3293°',
+		wgs84E: 'E 18,0686°',
+		height: 'H  28 m',
+		showNotInSwedenWarning: false
+	},
+	accuracy: 4.2,
+	timestamp: 1760616000123,
+	averageCount: 0,
+	averageSpread: NaN
+};
+
+const AVERAGED_SNAPSHOT: LastKnownPosition = { ...SNAPSHOT, averageCount: 37, averageSpread: 0.6 };
+
+describe('serializeLastKnownPosition Function', () => {
+	test('stores the rendered strings, accuracy and timestamp as one flat array', () => {
+		expect(JSON.parse(serializeLastKnownPosition(SNAPSHOT))).toEqual([
+			'N 6580744', 'E  674572', 'N 59,3293°', 'E 18,0686°', 'H  28 m', 4.2, 1760616000123
+		]);
+	});
+
+	test('does not store the "not in Sweden" flag', () => {
+		const serialized = serializeLastKnownPosition({
+			...SNAPSHOT,
+			position: { ...SNAPSHOT.position, showNotInSwedenWarning: true }
+		});
+		expect(serialized).not.toContain('true');
+	});
+
+	test('stays compact', () => {
+		expect(serializeLastKnownPosition(SNAPSHOT).length).toBeLessThan(120);
+	});
+
+	test('appends the count and spread of an averaged position', () => {
+		expect(JSON.parse(serializeLastKnownPosition(AVERAGED_SNAPSHOT)).slice(5)).toEqual([4.2, 1760616000123, 37, 0.6]);
+	});
+});
+
+describe('parseLastKnownPosition Function', () => {
+	test('round-trips a serialized position', () => {
+		expect(parseLastKnownPosition(serializeLastKnownPosition(SNAPSHOT))).toEqual(SNAPSHOT);
+	});
+
+	test('round-trips an averaged position with its count and spread', () => {
+		expect(parseLastKnownPosition(serializeLastKnownPosition(AVERAGED_SNAPSHOT))).toEqual(AVERAGED_SNAPSHOT);
+	});
+
+	test('reads a position saved without averaging fields as not averaged', () => {
+		const restored = parseLastKnownPosition(JSON.stringify(['N', 'E', 'N', 'E', 'H', 4, 0]));
+		expect(restored?.averageCount).toBe(0);
+	});
+
+	test('returns null for an invalid average count or spread', () => {
+		expect(parseLastKnownPosition(JSON.stringify(['N', 'E', 'N', 'E', 'H', 4, 0, 0, 0.6]))).toBeNull();
+		expect(parseLastKnownPosition(JSON.stringify(['N', 'E', 'N', 'E', 'H', 4, 0, 2.5, 0.6]))).toBeNull();
+		expect(parseLastKnownPosition(JSON.stringify(['N', 'E', 'N', 'E', 'H', 4, 0, 37, null]))).toBeNull();
+	});
+
+	test('never restores the "not in Sweden" warning', () => {
+		const restored = parseLastKnownPosition(serializeLastKnownPosition(SNAPSHOT));
+		expect(restored?.position.showNotInSwedenWarning).toBe(false);
+	});
+
+	test('returns null when nothing is stored', () => {
+		expect(parseLastKnownPosition(null)).toBeNull();
+		expect(parseLastKnownPosition('')).toBeNull();
+	});
+
+	test('returns null for corrupted JSON', () => {
+		expect(parseLastKnownPosition('["N 6580744",')).toBeNull();
+	});
+
+	test('returns null for an array of the wrong length', () => {
+		expect(parseLastKnownPosition(JSON.stringify(['N', 'E', 'N', 'E', 'H', 4]))).toBeNull();
+	});
+
+	test('returns null for an object instead of an array', () => {
+		expect(parseLastKnownPosition(JSON.stringify({ swerefN: 'N' }))).toBeNull();
+	});
+
+	test('returns null when a coordinate is not a string', () => {
+		expect(parseLastKnownPosition(JSON.stringify([6580744, 'E', 'N', 'E', 'H', 4, 0]))).toBeNull();
+	});
+
+	test('returns null when accuracy or timestamp is not a finite number', () => {
+		expect(parseLastKnownPosition(JSON.stringify(['N', 'E', 'N', 'E', 'H', null, 0]))).toBeNull();
+		expect(parseLastKnownPosition(JSON.stringify(['N', 'E', 'N', 'E', 'H', 4, '0']))).toBeNull();
+	});
+});
+
+describe('Throttled saving of the last known position', () => {
+	const at = (timestamp: number): LastKnownPosition => ({ ...SNAPSHOT, timestamp });
+
+	beforeEach(() => {
+		storedItems.length = 0;
+		unsavedLastPosition = null;
+		lastPositionSavedAt = Number.NEGATIVE_INFINITY;
+		now = 1000;
+	});
+
+	test('saves the first position at once', () => {
+		rememberLastKnownPosition(at(1));
+		expect(storedItems.length).toBe(1);
+	});
+
+	test('writes at most once per interval while positions keep arriving', () => {
+		for (let second = 0; second < 60; second++) {
+			now = 1000 + second * 1000;
+			rememberLastKnownPosition(at(second));
+		}
+		expect(storedItems.length).toBe(2);
+		expect(parseLastKnownPosition(storedItems[1])?.timestamp).toBe(30);
+	});
+
+	test('saves the newest position when the page is hidden', () => {
+		rememberLastKnownPosition(at(1));
+		now += 1000;
+		rememberLastKnownPosition(at(2));
+		saveLastKnownPosition();
+		expect(storedItems.length).toBe(2);
+		expect(parseLastKnownPosition(storedItems[1])?.timestamp).toBe(2);
+	});
+
+	test('does not write again when nothing new has been rendered', () => {
+		rememberLastKnownPosition(at(1));
+		saveLastKnownPosition();
+		saveLastKnownPosition();
+		expect(storedItems.length).toBe(1);
+	});
+});
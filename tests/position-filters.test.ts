@@ -0,0 +1,593 @@
+/**
+ * Unit tests for the position filters
+ *
+ * Tests cover:
+ * - Gating of implausible fixes by timestamp order, implied speed beyond both accuracies and
+ *   accuracy-scaled innovation,
+ *   with a restart after repeated rejections such as a clock stepped backwards
+ * - Kalman filter initialization from the first fix
+ * - Smoothing of stationary jitter and the shrinking uncertainty
+ * - Tracking a constant velocity
+ * - Restart after long gaps and handling of out-of-order fixes
+ * - Fixed-size state updated in place
+ * - Weighted running mean and spread for point averaging, with outlier rejection and restart at a new point
+ */
+
+/**
+ * Filter functions from position-filters.ts - redefined here for testing
+ *
+ * NOTE: These are duplicated from src/position-filters.ts rather than imported.
+ * See tests/README.md for more details.
+ */
+type FixRejection = 'time' | 'velocity' | 'innovation';
+
+const ACCURACY_TO_SIGMA = 2.4477;
+const EARTH_RADIUS_METERS = 6371000;
+const GATE_MAX_SPEED_MS = 90;
+const GATE_MAX_ACCELERATION = 3;
+const GATE_INNOVATION_THRESHOLD = 18.42;
+const GATE_MAX_CONSECUTIVE_REJECTIONS = 5;
+const GATE_STATE_LENGTH = 6;
+const GATE_LATITUDE = 0;
+const GATE_LONGITUDE = 1;
+const GATE_ACCURACY = 2;
+const GATE_TIMESTAMP = 3;
+const GATE_SPEED = 4;
+const GATE_CONSECUTIVE_REJECTIONS = 5;
+const KALMAN_ACCELERATION_NOISE = 0.1;
+const KALMAN_INITIAL_VELOCITY_VARIANCE = 25;
+const KALMAN_MAX_GAP_MS = 300000;
+const KALMAN_STATE_LENGTH = 11;
+const KALMAN_NORTH = 0;
+const KALMAN_EAST = 5;
+const KALMAN_POSITION = 0;
+const KALMAN_VELOCITY = 1;
+const KALMAN_POSITION_VARIANCE = 2;
+const KALMAN_COVARIANCE = 3;
+const KALMAN_VELOCITY_VARIANCE = 4;
+const KALMAN_TIMESTAMP = 10;
+
+function approximateDistanceMeters(latitude1: number, longitude1: number, latitude2: number, longitude2: number): number {
+	const toRadians = Math.PI / 180;
+	const dNorth = (latitude2 - latitude1) * toRadians;
+	const dEast = (longitude2 - longitude1) * toRadians * Math.cos((latitude1 + latitude2) / 2 * toRadians);
+	return EARTH_RADIUS_METERS * Math.hypot(dNorth, dEast);
+}
+
+function createGateState(): Float64Array {
+	const state = new Float64Array(GATE_STATE_LENGTH);
+	resetGateState(state);
+	return state;
+}
+
+function resetGateState(state: Float64Array): void {
+	state.fill(0);
+	state[GATE_TIMESTAMP] = Number.NaN;
+}
+
+function gatePositionFix(
+	state: Float64Array,
+	latitude: number,
+	longitude: number,
+	accuracy: number,
+	speed: number | null,
+	timestamp: number
+): FixRejection | null {
+	const elapsedMs = timestamp - state[GATE_TIMESTAMP];
+	let rejection: FixRejection | null = null;
+	let impliedSpeed = 0;
+
+	if (!Number.isNaN(elapsedMs)) {
+		if (elapsedMs <= 0) {
+			rejection = 'time';
+		} else {
+			const dt = elapsedMs / 1000;
+			const distance = approximateDistanceMeters(state[GATE_LATITUDE], state[GATE_LONGITUDE], latitude, longitude);
+			const previousSigma = state[GATE_ACCURACY] / ACCURACY_TO_SIGMA;
+			const sigma = accuracy / ACCURACY_TO_SIGMA;
+			const excess = distance - state[GATE_SPEED] * dt - GATE_MAX_ACCELERATION * dt * dt / 2;
+			impliedSpeed = Math.max(0, distance - Math.hypot(state[GATE_ACCURACY], accuracy)) / dt;
+
+			if ((distance - state[GATE_ACCURACY] - accuracy) / dt > GATE_MAX_SPEED_MS) {
+				rejection = 'velocity';
+			} else if (excess > 0 && excess * excess > GATE_INNOVATION_THRESHOLD * (previousSigma * previousSigma + sigma * sigma)) {
+				rejection = 'innovation';
+			}
+		}
+
+		if (rejection !== null && state[GATE_CONSECUTIVE_REJECTIONS] < GATE_MAX_CONSECUTIVE_REJECTIONS) {
+			state[GATE_CONSECUTIVE_REJECTIONS]++;
+			return rejection;
+		}
+	}
+
+	state[GATE_SPEED] = rejection === null && !Number.isNaN(elapsedMs) ? Math.max(speed ?? 0, impliedSpeed) : speed ?? Number.NaN;
+	state[GATE_LATITUDE] = latitude;
+	state[GATE_LONGITUDE] = longitude;
+	state[GATE_ACCURACY] = accuracy;
+	state[GATE_TIMESTAMP] = timestamp;
+	state[GATE_CONSECUTIVE_REJECTIONS] = 0;
+	return null;
+}
+
+function createKalmanState(): Float64Array {
+	const state = new Float64Array(KALMAN_STATE_LENGTH);
+	resetKalmanState(state);
+	return state;
+}
+
+function resetKalmanState(state: Float64Array): void {
+	state.fill(0);
+	state[KALMAN_TIMESTAMP] = Number.NaN;
+}
+
+function initializeAxis(state: Float64Array, axis: number, measurement: number, variance: number): void {
+	state[axis + KALMAN_POSITION] = measurement;
+	state[axis + KALMAN_VELOCITY] = 0;
+	state[axis + KALMAN_POSITION_VARIANCE] = variance;
+	state[axis + KALMAN_COVARIANCE] = 0;
+	state[axis + KALMAN_VELOCITY_VARIANCE] = KALMAN_INITIAL_VELOCITY_VARIANCE;
+}
+
+function updateAxis(state: Float64Array, axis: number, measurement: number, variance: number, dt: number): void {
+	const q = KALMAN_ACCELERATION_NOISE;
+	let p00 = state[axis + KALMAN_POSITION_VARIANCE];
+	let p01 = state[axis + KALMAN_COVARIANCE];
+	let p11 = state[axis + KALMAN_VELOCITY_VARIANCE];
+
+	const position = state[axis + KALMAN_POSITION] + state[axis + KALMAN_VELOCITY] * dt;
+	p00 += dt * (2 * p01 + dt * p11) + q * dt * dt * dt / 3;
+	p01 += dt * p11 + q * dt * dt / 2;
+	p11 += q * dt;
+
+	const innovationVariance = p00 + variance;
+	const gainPosition = p00 / innovationVariance;
+	const gainVelocity = p01 / innovationVariance;
+	const innovation = measurement - position;
+
+	state[axis + KALMAN_POSITION] = position + gainPosition * innovation;
+	state[axis + KALMAN_VELOCITY] += gainVelocity * innovation;
+	state[axis + KALMAN_POSITION_VARIANCE] = (1 - gainPosition) * p00;
+	state[axis + KALMAN_COVARIANCE] = (1 - gainPosition) * p01;
+	state[axis + KALMAN_VELOCITY_VARIANCE] = p11 - gainVelocity * p01;
+}
+
+function updateKalmanState(state: Float64Array, northing: number, easting: number, accuracy: number, timestamp: number): void {
+	const sigma = Math.max(accuracy, 0.1) / ACCURACY_TO_SIGMA;
+	const variance = sigma * sigma;
+	const elapsedMs = timestamp - state[KALMAN_TIMESTAMP];
+
+	if (!(elapsedMs <= KALMAN_MAX_GAP_MS)) {
+		initializeAxis(state, KALMAN_NORTH, northing, variance);
+		initializeAxis(state, KALMAN_EAST, easting, variance);
+		state[KALMAN_TIMESTAMP] = timestamp;
+		return;
+	}
+
+	const dt = Math.max(elapsedMs, 0) / 1000;
+	updateAxis(state, KALMAN_NORTH, northing, variance, dt);
+	updateAxis(state, KALMAN_EAST, easting, variance, dt);
+	state[KALMAN_TIMESTAMP] = Math.max(timestamp, state[KALMAN_TIMESTAMP]);
+}
+
+function kalmanAccuracy(state: Float64Array): number {
+	const meanVariance = (state[KALMAN_NORTH + KALMAN_POSITION_VARIANCE] + state[KALMAN_EAST + KALMAN_POSITION_VARIANCE]) / 2;
+	return ACCURACY_TO_SIGMA * Math.sqrt(meanVariance);
+}
+
+const AVERAGE_OUTLIER_THRESHOLD = 13.82;
+const AVERAGE_MIN_SAMPLES_FOR_REJECTION = 5;
+const AVERAGE_MAX_CONSECUTIVE_REJECTIONS = 10;
+const AVERAGE_STATE_LENGTH = 8;
+const AVERAGE_WEIGHT = 0;
+const AVERAGE_NORTH = 1;
+const AVERAGE_EAST = 2;
+const AVERAGE_M2_NORTH = 3;
+const AVERAGE_M2_EAST = 4;
+const AVERAGE_COUNT = 5;
+const AVERAGE_REJECTED = 6;
+const AVERAGE_CONSECUTIVE_REJECTIONS = 7;
+
+function createAverageState(): Float64Array {
+	return new Float64Array(AVERAGE_STATE_LENGTH);
+}
+
+function resetAverageState(state: Float64Array): void {
+	state.fill(0);
+}
+
+function averageStandardDeviation(state: Float64Array): number {
+	if (state[AVERAGE_WEIGHT] === 0) {
+		return Number.NaN;
+	}
+	return Math.sqrt((state[AVERAGE_M2_NORTH] + state[AVERAGE_M2_EAST]) / (2 * state[AVERAGE_WEIGHT]));
+}
+
+function addAverageSample(state: Float64Array, northing: number, easting: number, accuracy: number): boolean {
+	const sigma = Math.max(accuracy, 0.1) / ACCURACY_TO_SIGMA;
+	let deltaNorth = northing - state[AVERAGE_NORTH];
+	let deltaEast = easting - state[AVERAGE_EAST];
+
+	if (state[AVERAGE_COUNT] >= AVERAGE_MIN_SAMPLES_FOR_REJECTION) {
+		const spread = averageStandardDeviation(state);
+		const normalizedDistance = (deltaNorth * deltaNorth + deltaEast * deltaEast) / (sigma * sigma + spread * spread);
+		if (normalizedDistance > AVERAGE_OUTLIER_THRESHOLD) {
+			if (state[AVERAGE_CONSECUTIVE_REJECTIONS] < AVERAGE_MAX_CONSECUTIVE_REJECTIONS) {
+				state[AVERAGE_CONSECUTIVE_REJECTIONS]++;
+				state[AVERAGE_REJECTED]++;
+				return false;
+			}
+
+			const rejected = state[AVERAGE_REJECTED];
+			state.fill(0);
+			state[AVERAGE_REJECTED] = rejected;
+			deltaNorth = northing;
+			deltaEast = easting;
+		}
+	}
+
+	const weight = 1 / (sigma * sigma);
+	state[AVERAGE_WEIGHT] += weight;
+	const ratio = weight / state[AVERAGE_WEIGHT];
+	state[AVERAGE_NORTH] += ratio * deltaNorth;
+	state[AVERAGE_EAST] += ratio * deltaEast;
+	state[AVERAGE_M2_NORTH] += weight * deltaNorth * (northing - state[AVERAGE_NORTH]);
+	state[AVERAGE_M2_EAST] += weight * deltaEast * (easting - state[AVERAGE_EAST]);
+	state[AVERAGE_COUNT]++;
+	state[AVERAGE_CONSECUTIVE_REJECTIONS] = 0;
+	return true;
+}
+
+const NORTHING = 6580822;
+const EASTING = 674032;
+
+/**
+ * Deterministic jitter of about ±3 m, like a stationary phone
+ */
+function jitter(index: number): number {
+	return 3 * Math.sin(index * 2.3) * Math.cos(index * 0.7);
+}
+
+const STOCKHOLM = { latitude: 59.3293, longitude: 18.0686 };
+// About one metre north in degrees of latitude
+const ONE_METER_LATITUDE = 1 / 111195;
+
+/**
+ * Feeds a fix the given number of metres north of Stockholm
+ */
+function gateFix(state: Float64Array, metersNorth: number, accuracy: number, timestamp: number, speed: number | null = null): FixRejection | null {
+	return gatePositionFix(state, STOCKHOLM.latitude + metersNorth * ONE_METER_LATITUDE, STOCKHOLM.longitude, accuracy, speed, timestamp);
+}
+
+describe('gatePositionFix Function', () => {
+	test('accepts the first fix', () => {
+		expect(gateFix(createGateState(), 0, 10, 1000)).toBeNull();
+	});
+
+	test('accepts stationary jitter within the accuracy', () => {
+		const state = createGateState();
+		for (let i = 0; i < 300; i++) {
+			expect(gateFix(state, jitter(i), 5, i * 1000)).toBeNull();
+		}
+	});
+
+	test('accepts walking and driving without reported speed', () => {
+		const walking = createGateState();
+		const driving = createGateState();
+		for (let i = 0; i < 60; i++) {
+			expect(gateFix(walking, 1.4 * i + jitter(i), 5, i * 1000)).toBeNull();
+			expect(gateFix(driving, 30 * i + jitter(i), 8, i * 1000)).toBeNull();
+		}
+	});
+
+	test('accepts accelerating from standstill to driving speed', () => {
+		const state = createGateState();
+		let position = 0;
+		for (let i = 1; i <= 10; i++) {
+			position += 2.5 * i;
+			expect(gateFix(state, position, 5, i * 1000, 2.5 * i)).toBeNull();
+		}
+	});
+
+	test('rejects a 150 m jump with a claimed accuracy under 20 m', () => {
+		const state = createGateState();
+		for (let i = 0; i < 10; i++) {
+			gateFix(state, jitter(i), 5, i * 1000);
+		}
+		expect(gateFix(state, 150, 15, 10000)).toBe('velocity');
+	});
+
+	test('rejects a smaller jump that is implausible given both accuracies', () => {
+		const state = createGateState();
+		for (let i = 0; i < 10; i++) {
+			gateFix(state, jitter(i), 4, i * 1000);
+		}
+		expect(gateFix(state, 45, 4, 10000)).toBe('innovation');
+	});
+
+	test('accepts the same jump when the fix admits a matching accuracy', () => {
+		const state = createGateState();
+		for (let i = 0; i < 10; i++) {
+			gateFix(state, jitter(i), 4, i * 1000);
+		}
+		expect(gateFix(state, 45, 60, 10000)).toBeNull();
+	});
+
+	test('keeps checking innovation after a coarse fix is followed by a precise one', () => {
+		const state = createGateState();
+		gateFix(state, 0, 500, 0);
+		expect(gateFix(state, 300, 5, 1000)).toBeNull();
+		expect(state[GATE_SPEED]).toBe(0);
+		expect(gateFix(state, 340, 4, 2000)).toBe('innovation');
+	});
+
+	test('does not take jitter within the accuracy as speed', () => {
+		const state = createGateState();
+		gateFix(state, 0, 15, 0);
+		for (let i = 1; i < 60; i++) {
+			expect(gateFix(state, 4 * jitter(i), 15, i * 1000)).toBeNull();
+			expect(state[GATE_SPEED]).toBeLessThan(1);
+		}
+	});
+
+	test('rejects fixes that are not newer than the last accepted one', () => {
+		const state = createGateState();
+		gateFix(state, 0, 5, 5000);
+		expect(gateFix(state, 0, 5, 5000)).toBe('time');
+		expect(gateFix(state, 0, 5, 4000)).toBe('time');
+	});
+
+	test('keeps the last accepted fix as reference after a rejection', () => {
+		const state = createGateState();
+		gateFix(state, 0, 5, 0);
+		gateFix(state, 500, 5, 1000);
+		expect(gateFix(state, 1, 5, 2000)).toBeNull();
+	});
+
+	test('starts over from a new position after repeated rejections', () => {
+		const state = createGateState();
+		gateFix(state, 0, 5, 0);
+		for (let i = 1; i <= GATE_MAX_CONSECUTIVE_REJECTIONS; i++) {
+			expect(gateFix(state, 500, 5, i * 1000)).not.toBeNull();
+		}
+		expect(gateFix(state, 500, 5, 6000)).toBeNull();
+		expect(gateFix(state, 501, 5, 7000)).toBeNull();
+	});
+
+	test('recovers when the device clock steps backwards', () => {
+		const state = createGateState();
+		const stepBack = 3600 * 1000;
+		for (let i = 0; i < 10; i++) {
+			gateFix(state, jitter(i), 5, stepBack + i * 1000);
+		}
+		for (let i = 0; i < GATE_MAX_CONSECUTIVE_REJECTIONS; i++) {
+			expect(gateFix(state, jitter(i), 5, i * 1000)).toBe('time');
+		}
+		expect(gateFix(state, 0, 5, GATE_MAX_CONSECUTIVE_REJECTIONS * 1000)).toBeNull();
+		for (let i = GATE_MAX_CONSECUTIVE_REJECTIONS + 1; i < 20; i++) {
+			expect(gateFix(state, jitter(i), 5, i * 1000)).toBeNull();
+		}
+	});
+
+	test('starts empty again after reset', () => {
+		const state = createGateState();
+		gateFix(state, 0, 5, 5000);
+		resetGateState(state);
+		expect(gateFix(state, 5000, 5, 1000)).toBeNull();
+	});
+});
+
+describe('createKalmanState Function', () => {
+	test('allocates a fixed-size, empty state', () => {
+		const state = createKalmanState();
+		expect(state.length).toBe(KALMAN_STATE_LENGTH);
+		expect(Number.isNaN(state[KALMAN_TIMESTAMP])).toBe(true);
+	});
+});
+
+describe('updateKalmanState Function', () => {
+	test('starts at the first fix with its accuracy and no velocity', () => {
+		const state = createKalmanState();
+		updateKalmanState(state, NORTHING, EASTING, 8, 1000);
+		expect(state[KALMAN_NORTH + KALMAN_POSITION]).toBe(NORTHING);
+		expect(state[KALMAN_EAST + KALMAN_POSITION]).toBe(EASTING);
+		expect(state[KALMAN_NORTH + KALMAN_VELOCITY]).toBe(0);
+		expect(kalmanAccuracy(state)).toBeCloseTo(8, 6);
+	});
+
+	test('updates the same array in place', () => {
+		const state = createKalmanState();
+		const buffer = state.buffer;
+		for (let i = 0; i < 10; i++) {
+			updateKalmanState(state, NORTHING + jitter(i), EASTING, 5, i * 1000);
+		}
+		expect(state.buffer).toBe(buffer);
+		expect(state.length).toBe(KALMAN_STATE_LENGTH);
+	});
+
+	test('smooths stationary jitter to well below the fix noise', () => {
+		const state = createKalmanState();
+		let worstRaw = 0;
+		for (let i = 0; i < 120; i++) {
+			updateKalmanState(state, NORTHING + jitter(i), EASTING - jitter(i + 50), 5, i * 1000);
+			worstRaw = Math.max(worstRaw, Math.abs(jitter(i)));
+		}
+		expect(worstRaw).toBeGreaterThan(2);
+		expect(Math.abs(state[KALMAN_NORTH + KALMAN_POSITION] - NORTHING)).toBeLessThan(1);
+		expect(Math.abs(state[KALMAN_EAST + KALMAN_POSITION] - EASTING)).toBeLessThan(1);
+	});
+
+	test('reports a smaller uncertainty than a single fix while stationary', () => {
+		const state = createKalmanState();
+		for (let i = 0; i < 60; i++) {
+			updateKalmanState(state, NORTHING + jitter(i), EASTING, 5, i * 1000);
+		}
+		expect(kalmanAccuracy(state)).toBeLessThan(5);
+		expect(kalmanAccuracy(state)).toBeGreaterThan(0);
+	});
+
+	test('tracks a constant walking velocity without lagging behind', () => {
+		const state = createKalmanState();
+		const speed = 1.5;
+		for (let i = 0; i <= 60; i++) {
+			updateKalmanState(state, NORTHING + speed * i + jitter(i), EASTING, 5, i * 1000);
+		}
+		expect(state[KALMAN_NORTH + KALMAN_VELOCITY]).toBeCloseTo(speed, 0);
+		expect(Math.abs(state[KALMAN_NORTH + KALMAN_POSITION] - (NORTHING + speed * 60))).toBeLessThan(2);
+	});
+
+	test('keeps the covariance positive definite', () => {
+		const state = createKalmanState();
+		for (let i = 0; i < 500; i++) {
+			updateKalmanState(state, NORTHING + jitter(i), EASTING, 3 + (i % 7), i * 1000);
+		}
+		const p00 = state[KALMAN_NORTH + KALMAN_POSITION_VARIANCE];
+		const p01 = state[KALMAN_NORTH + KALMAN_COVARIANCE];
+		const p11 = state[KALMAN_NORTH + KALMAN_VELOCITY_VARIANCE];
+		expect(p00).toBeGreaterThan(0);
+		expect(p11).toBeGreaterThan(0);
+		expect(p00 * p11 - p01 * p01).toBeGreaterThan(0);
+	});
+
+	test('starts over after a long gap', () => {
+		const state = createKalmanState();
+		updateKalmanState(state, NORTHING, EASTING, 5, 0);
+		updateKalmanState(state, NORTHING + 1000, EASTING, 5, KALMAN_MAX_GAP_MS + 1);
+		expect(state[KALMAN_NORTH + KALMAN_POSITION]).toBe(NORTHING + 1000);
+		expect(state[KALMAN_NORTH + KALMAN_VELOCITY]).toBe(0);
+	});
+
+	test('uses an out-of-order fix without predicting backwards', () => {
+		const state = createKalmanState();
+		updateKalmanState(state, NORTHING, EASTING, 5, 10000);
+		updateKalmanState(state, NORTHING + 2, EASTING, 5, 9000);
+		expect(state[KALMAN_TIMESTAMP]).toBe(10000);
+		expect(state[KALMAN_NORTH + KALMAN_POSITION]).toBeGreaterThan(NORTHING);
+		expect(state[KALMAN_NORTH + KALMAN_POSITION]).toBeLessThan(NORTHING + 2);
+	});
+
+	test('starts empty again after reset', () => {
+		const state = createKalmanState();
+		updateKalmanState(state, NORTHING, EASTING, 5, 0);
+		resetKalmanState(state);
+		updateKalmanState(state, NORTHING + 50, EASTING, 5, 1000);
+		expect(state[KALMAN_NORTH + KALMAN_POSITION]).toBe(NORTHING + 50);
+	});
+});
+
+describe('addAverageSample Function', () => {
+	test('starts at the first fix with no spread', () => {
+		const state = createAverageState();
+		expect(addAverageSample(state, NORTHING, EASTING, 5)).toBe(true);
+		expect(state[AVERAGE_NORTH]).toBe(NORTHING);
+		expect(state[AVERAGE_EAST]).toBe(EASTING);
+		expect(state[AVERAGE_COUNT]).toBe(1);
+		expect(averageStandardDeviation(state)).toBe(0);
+	});
+
+	test('reports no spread before the first fix', () => {
+		expect(Number.isNaN(averageStandardDeviation(createAverageState()))).toBe(true);
+	});
+
+	test('matches the arithmetic mean and spread for equal accuracies', () => {
+		const state = createAverageState();
+		const offsets = [-2, -1, 0, 1, 2];
+		offsets.forEach((offset) => addAverageSample(state, NORTHING + offset, EASTING - offset, 5));
+		expect(state[AVERAGE_NORTH]).toBeCloseTo(NORTHING, 9);
+		expect(state[AVERAGE_EAST]).toBeCloseTo(EASTING, 9);
+		// The population variance of -2..2 is 2 per axis
+		expect(averageStandardDeviation(state)).toBeCloseTo(Math.sqrt(2), 9);
+	});
+
+	test('weights fixes by 1/accuracy²', () => {
+		const state = createAverageState();
+		addAverageSample(state, NORTHING, EASTING, 2);
+		addAverageSample(state, NORTHING + 10, EASTING, 4);
+		// Weights 1/4 and 1/16 put the mean 1/5 of the way towards the less accurate fix
+		expect(state[AVERAGE_NORTH]).toBeCloseTo(NORTHING + 2, 9);
+	});
+
+	test('converges on the true point under long stationary jitter', () => {
+		const state = createAverageState();
+		for (let i = 0; i < 3600; i++) {
+			addAverageSample(state, NORTHING + jitter(i), EASTING + jitter(i + 1000), 5);
+		}
+		expect(Math.abs(state[AVERAGE_NORTH] - NORTHING)).toBeLessThan(0.1);
+		expect(Math.abs(state[AVERAGE_EAST] - EASTING)).toBeLessThan(0.1);
+		expect(state[AVERAGE_COUNT]).toBe(3600);
+	});
+
+	test('keeps the state at a fixed size however many fixes are added', () => {
+		const state = createAverageState();
+		for (let i = 0; i < 10000; i++) {
+			addAverageSample(state, NORTHING + jitter(i), EASTING, 5);
+		}
+		expect(state.length).toBe(AVERAGE_STATE_LENGTH);
+	});
+
+	test('rejects a wild fix once the mean is established', () => {
+		const state = createAverageState();
+		for (let i = 0; i < 10; i++) {
+			addAverageSample(state, NORTHING + jitter(i), EASTING, 5);
+		}
+		const before = state[AVERAGE_NORTH];
+		expect(addAverageSample(state, NORTHING + 150, EASTING, 8)).toBe(false);
+		expect(state[AVERAGE_NORTH]).toBe(before);
+		expect(state[AVERAGE_COUNT]).toBe(10);
+		expect(state[AVERAGE_REJECTED]).toBe(1);
+	});
+
+	test('accepts a fix within its own accuracy', () => {
+		const state = createAverageState();
+		for (let i = 0; i < 10; i++) {
+			addAverageSample(state, NORTHING, EASTING, 3);
+		}
+		expect(addAverageSample(state, NORTHING + 6, EASTING, 15)).toBe(true);
+	});
+
+	test('does not reject while the first fixes set the mean', () => {
+		const state = createAverageState();
+		addAverageSample(state, NORTHING, EASTING, 5);
+		expect(addAverageSample(state, NORTHING + 150, EASTING, 5)).toBe(true);
+	});
+
+	test('starts over at a new point after repeated rejections', () => {
+		const state = createAverageState();
+		for (let i = 0; i < 10; i++) {
+			addAverageSample(state, NORTHING + jitter(i), EASTING, 5);
+		}
+		for (let i = 0; i < AVERAGE_MAX_CONSECUTIVE_REJECTIONS; i++) {
+			expect(addAverageSample(state, NORTHING + 40, EASTING, 5)).toBe(false);
+		}
+		expect(addAverageSample(state, NORTHING + 40, EASTING, 5)).toBe(true);
+		expect(state[AVERAGE_NORTH]).toBe(NORTHING + 40);
+		expect(state[AVERAGE_COUNT]).toBe(1);
+		expect(averageStandardDeviation(state)).toBe(0);
+		expect(state[AVERAGE_REJECTED]).toBe(AVERAGE_MAX_CONSECUTIVE_REJECTIONS);
+
+		for (let i = 0; i < 10; i++) {
+			expect(addAverageSample(state, NORTHING + 40 + jitter(i), EASTING, 5)).toBe(true);
+		}
+	});
+
+	test('keeps the mean after occasional outliers between accepted fixes', () => {
+		const state = createAverageState();
+		for (let i = 0; i < 10; i++) {
+			addAverageSample(state, NORTHING + jitter(i), EASTING, 5);
+		}
+		for (let i = 0; i < 3 * AVERAGE_MAX_CONSECUTIVE_REJECTIONS; i++) {
+			addAverageSample(state, NORTHING + (i % 2 === 0 ? 150 : jitter(i)), EASTING, 5);
+		}
+		expect(Math.abs(state[AVERAGE_NORTH] - NORTHING)).toBeLessThan(3);
+		expect(state[AVERAGE_COUNT]).toBe(10 + 1.5 * AVERAGE_MAX_CONSECUTIVE_REJECTIONS);
+	});
+
+	test('starts empty again after reset', () => {
+		const state = createAverageState();
+		addAverageSample(state, NORTHING, EASTING, 5);
+		resetAverageState(state);
+		addAverageSample(state, NORTHING + 50, EASTING, 5);
+		expect(state[AVERAGE_NORTH]).toBe(NORTHING + 50);
+		expect(state[AVERAGE_COUNT]).toBe(1);
+	});
+});
@@ -0,0 +1,373 @@
+/**
+ * Unit tests for the streaming position pipeline
+ *
+ * Tests cover:
+ * - Running fixes through synchronous and asynchronous stages in order
+ * - Enabling and disabling stages independently
+ * - Per-stage timing and drop counters
+ * - Back-pressure: only the newest fix waits while a slow stage is busy
+ * - Reset while a fix is in progress
+ */
+
+/**
+ * Position stream from position-stream.ts - redefined here for testing
+ *
+ * NOTE: These are duplicated from src/position-stream.ts rather than imported.
+ * See tests/README.md for more details.
+ */
+type PositionStageResult<T> = T | null | Promise<T | null>;
+
+interface PositionStage<T> {
+	readonly name: string;
+	enabled: boolean;
+	process(sample: T): PositionStageResult<T>;
+}
+
+interface PositionStageStats {
+	name: string;
+	enabled: boolean;
+	processed: number;
+	dropped: number;
+	totalMs: number;
+	maxMs: number;
+}
+
+interface PositionStreamStats {
+	stages: PositionStageStats[];
+	completed: number;
+	superseded: number;
+}
+
+class PositionStream<T> {
+	private readonly stages: PositionStage<T>[];
+	private readonly stats: PositionStageStats[];
+	private readonly now: () => number;
+	private pending: T | null = null;
+	private busy = false;
+	private generation = 0;
+	private completed = 0;
+	private superseded = 0;
+
+	constructor(stages: PositionStage<T>[], now: () => number = () => performance.now()) {
+		this.stages = stages;
+		this.now = now;
+		this.stats = stages.map((stage) => ({
+			name: stage.name,
+			enabled: stage.enabled,
+			processed: 0,
+			dropped: 0,
+			totalMs: 0,
+			maxMs: 0
+		}));
+	}
+
+	push(sample: T): void {
+		if (this.busy) {
+			if (this.pending !== null) {
+				this.superseded++;
+			}
+			this.pending = sample;
+			return;
+		}
+		this.busy = true;
+		this.runFrom(0, sample, this.generation);
+	}
+
+	reset(): void {
+		this.generation++;
+		this.pending = null;
+		this.busy = false;
+	}
+
+	setEnabled(name: string, enabled: boolean): boolean {
+		const stage = this.stages.find((candidate) => candidate.name === name);
+		if (stage === undefined) {
+			return false;
+		}
+		stage.enabled = enabled;
+		return true;
+	}
+
+	getStats(): PositionStreamStats {
+		return {
+			stages: this.stats.map((stats, index) => ({ ...stats, enabled: this.stages[index].enabled })),
+			completed: this.completed,
+			superseded: this.superseded
+		};
+	}
+
+	private runFrom(startIndex: number, sample: T | null, generation: number): void {
+		let current = sample;
+		for (let index = startIndex; current !== null && index < this.stages.length; index++) {
+			const stage = this.stages[index];
+			if (!stage.enabled) {
+				continue;
+			}
+
+			const start = this.now();
+			let result: PositionStageResult<T>;
+			try {
+				result = stage.process(current);
+			} catch (error) {
+				console.error(`Positionssteget ${stage.name} misslyckades:`, error);
+				result = null;
+			}
+
+			if (result instanceof Promise) {
+				result.catch((error) => {
+					console.error(`Positionssteget ${stage.name} misslyckades:`, error);
+					return null;
+				}).then((value) => {
+					if (generation !== this.generation) {
+						return;
+					}
+					this.record(index, start, value);
+					this.runFrom(index + 1, value, generation);
+				});
+				return;
+			}
+
+			this.record(index, start, result);
+			current = result;
+		}
+
+		if (current !== null) {
+			this.completed++;
+		}
+		this.runNext();
+	}
+
+	private record(index: number, start: number, result: T | null): void {
+		const stats = this.stats[index];
+		const elapsedMs = this.now() - start;
+		stats.processed++;
+		stats.totalMs += elapsedMs;
+		stats.maxMs = Math.max(stats.maxMs, elapsedMs);
+		if (result === null) {
+			stats.dropped++;
+		}
+	}
+
+	private runNext(): void {
+		const next = this.pending;
+		this.pending = null;
+		if (next === null) {
+			this.busy = false;
+			return;
+		}
+		this.runFrom(0, next, this.generation);
+	}
+}
+
+/**
+ * Synchronous stage that records the samples it sees
+ */
+function recordingStage(name: string, seen: number[], accept: (sample: number) => boolean = () => true): PositionStage<number> {
+	return {
+		name,
+		enabled: true,
+		process: (sample) => {
+			seen.push(sample);
+			return accept(sample) ? sample : null;
+		}
+	};
+}
+
+/**
+ * Asynchronous stage that waits until the test resolves it, like the worker round trip
+ */
+function deferredStage(name: string): { stage: PositionStage<number>; started: number[]; resolveNext(): void } {
+	const waiting: Array<() => void> = [];
+	const started: number[] = [];
+	return {
+		stage: {
+			name,
+			enabled: true,
+			process: (sample) => new Promise((resolve) => {
+				started.push(sample);
+				waiting.push(() => resolve(sample));
+			})
+		},
+		started,
+		resolveNext: () => waiting.shift()?.()
+	};
+}
+
+const flushPromises = (): Promise<void> => new Promise((resolve) => setTimeout(resolve, 0));
+
+describe('PositionStream stage chain', () => {
+	test('runs synchronous stages in order within push', () => {
+		const order: string[] = [];
+		const stream = new PositionStream<number>(['filter', 'transform', 'render'].map((name) => ({
+			name,
+			enabled: true,
+			process: (sample: number) => {
+				order.push(name);
+				return sample;
+			}
+		})));
+		stream.push(1);
+		expect(order).toEqual(['filter', 'transform', 'render']);
+		expect(stream.getStats().completed).toBe(1);
+	});
+
+	test('passes the value returned by each stage on to the next', () => {
+		const seen: number[] = [];
+		const stream = new PositionStream<number>([
+			{ name: 'double', enabled: true, process: (sample) => sample * 2 },
+			recordingStage('render', seen)
+		]);
+		stream.push(21);
+		expect(seen).toEqual([42]);
+	});
+
+	test('stops a fix when a stage returns null and counts it as dropped', () => {
+		const rendered: number[] = [];
+		const stream = new PositionStream<number>([
+			recordingStage('filter', [], (sample) => sample > 0),
+			recordingStage('render', rendered)
+		]);
+		stream.push(-1);
+		stream.push(5);
+		expect(rendered).toEqual([5]);
+		expect(stream.getStats().stages[0].dropped).toBe(1);
+		expect(stream.getStats().completed).toBe(1);
+	});
+
+	test('drops a fix whose stage throws and keeps processing later fixes', () => {
+		const rendered: number[] = [];
+		const errorSpy = jest.spyOn(console, 'error').mockImplementation(() => {});
+		const stream = new PositionStream<number>([
+			{
+				name: 'transform',
+				enabled: true,
+				process: (sample) => {
+					if (sample === 2) {
+						throw new Error('boom');
+					}
+					return sample;
+				}
+			},
+			recordingStage('render', rendered)
+		]);
+		stream.push(1);
+		stream.push(2);
+		stream.push(3);
+		expect(rendered).toEqual([1, 3]);
+		errorSpy.mockRestore();
+	});
+});
+
+describe('PositionStream enabling stages', () => {
+	test('skips a disabled stage', () => {
+		const filtered: number[] = [];
+		const rendered: number[] = [];
+		const stream = new PositionStream<number>([recordingStage('filter', filtered), recordingStage('render', rendered)]);
+		expect(stream.setEnabled('filter', false)).toBe(true);
+		stream.push(1);
+		expect(filtered).toEqual([]);
+		expect(rendered).toEqual([1]);
+		expect(stream.getStats().stages[0].enabled).toBe(false);
+	});
+
+	test('runs a stage again once it is re-enabled', () => {
+		const filtered: number[] = [];
+		const stream = new PositionStream<number>([recordingStage('filter', filtered)]);
+		stream.setEnabled('filter', false);
+		stream.push(1);
+		stream.setEnabled('filter', true);
+		stream.push(2);
+		expect(filtered).toEqual([2]);
+	});
+
+	test('reports unknown stage names', () => {
+		const stream = new PositionStream<number>([recordingStage('render', [])]);
+		expect(stream.setEnabled('smooth', true)).toBe(false);
+	});
+});
+
+describe('PositionStream timing', () => {
+	test('accumulates time and the slowest call per stage', () => {
+		let clock = 0;
+		const stream = new PositionStream<number>([
+			{
+				name: 'transform',
+				enabled: true,
+				process: (sample) => {
+					clock += sample;
+					return sample;
+				}
+			}
+		], () => clock);
+		stream.push(2);
+		stream.push(5);
+		const [transform] = stream.getStats().stages;
+		expect(transform.processed).toBe(2);
+		expect(transform.totalMs).toBe(7);
+		expect(transform.maxMs).toBe(5);
+	});
+
+	test('includes the wait for an asynchronous stage', async () => {
+		let clock = 0;
+		const slow = deferredStage('transform');
+		const stream = new PositionStream<number>([slow.stage], () => clock);
+		stream.push(1);
+		clock = 40;
+		slow.resolveNext();
+		await flushPromises();
+		expect(stream.getStats().stages[0].totalMs).toBe(40);
+	});
+});
+
+describe('PositionStream back-pressure', () => {
+	test('holds a new fix until the slow stage is done', async () => {
+		const slow = deferredStage('transform');
+		const rendered: number[] = [];
+		const stream = new PositionStream<number>([slow.stage, recordingStage('render', rendered)]);
+		stream.push(1);
+		stream.push(2);
+		expect(slow.started).toEqual([1]);
+
+		slow.resolveNext();
+		await flushPromises();
+		expect(rendered).toEqual([1]);
+		expect(slow.started).toEqual([1, 2]);
+
+		slow.resolveNext();
+		await flushPromises();
+		expect(rendered).toEqual([1, 2]);
+	});
+
+	test('drops superseded fixes and processes only the newest', async () => {
+		const slow = deferredStage('transform');
+		const rendered: number[] = [];
+		const stream = new PositionStream<number>([slow.stage, recordingStage('render', rendered)]);
+		[1, 2, 3, 4].forEach((sample) => stream.push(sample));
+
+		slow.resolveNext();
+		await flushPromises();
+		slow.resolveNext();
+		await flushPromises();
+
+		expect(rendered).toEqual([1, 4]);
+		expect(stream.getStats().superseded).toBe(2);
+		expect(stream.getStats().completed).toBe(2);
+	});
+
+	test('ignores the result of a fix in progress after reset', async () => {
+		const slow = deferredStage('transform');
+		const rendered: number[] = [];
+		const stream = new PositionStream<number>([slow.stage, recordingStage('render', rendered)]);
+		stream.push(1);
+		stream.push(2);
+		stream.reset();
+
+		stream.push(3);
+		expect(slow.started).toEqual([1, 3]);
+		slow.resolveNext();
+		slow.resolveNext();
+		await flushPromises();
+
+		expect(rendered).toEqual([3]);
+	});
+});
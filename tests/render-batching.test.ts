@@ -0,0 +1,269 @@
+/**
+ * Unit tests for the batched, skip-unchanged rendering layer used by UIHelper
+ *
+ * Tests cover:
+ * - Coalescing of several updates into one requestAnimationFrame flush
+ * - Skipping writes when text or class state is unchanged
+ * - Reading back queued text before it has been rendered
+ * - Synchronous fallback without requestAnimationFrame
+ */
+
+/**
+ * Mock DOM element that counts writes
+ */
+class MockElement {
+	textWrites = 0;
+	classWrites = 0;
+	private _textContent: string | null = '';
+	private classes = new Set<string>();
+
+	get textContent(): string | null {
+		return this._textContent;
+	}
+
+	set textContent(value: string | null) {
+		this.textWrites++;
+		this._textContent = value;
+	}
+
+	classList = {
+		toggle: (className: string, force?: boolean): boolean => {
+			this.classWrites++;
+			const enabled = force ?? !this.classes.has(className);
+			if (enabled) {
+				this.classes.add(className);
+			} else {
+				this.classes.delete(className);
+			}
+			return enabled;
+		},
+		contains: (className: string): boolean => this.classes.has(className)
+	};
+}
+
+/**
+ * Manually driven requestAnimationFrame
+ */
+let frameCallbacks = new Map<number, FrameRequestCallback>();
+let nextFrameHandle = 1;
+
+function runFrame(): void {
+	const callbacks = frameCallbacks;
+	frameCallbacks = new Map();
+	callbacks.forEach((callback) => callback(0));
+}
+
+/**
+ * RenderBatcher from script.ts - redefined here for testing
+ *
+ * NOTE: This class is duplicated from src/script.ts rather than imported.
+ * See tests/README.md for more details.
+ */
+class RenderBatcher {
+	private renderedText = new Map<HTMLElement, string>();
+	private pendingText = new Map<HTMLElement, string>();
+	private renderedClasses = new Map<HTMLElement, Map<string, boolean>>();
+	private pendingClasses = new Map<HTMLElement, Map<string, boolean>>();
+	private frameHandle: number | null = null;
+
+	/**
+	 * Queues the text content of an element
+	 */
+	setText(element: HTMLElement | null, text: string): void {
+		if (!element) return;
+		this.pendingText.set(element, text);
+		this.scheduleFlush();
+	}
+
+	/**
+	 * Queues adding or removing a class on an element
+	 */
+	toggleClass(element: HTMLElement | null, className: string, enabled: boolean): void {
+		if (!element) return;
+		let classes = this.pendingClasses.get(element);
+		if (!classes) {
+			classes = new Map<string, boolean>();
+			this.pendingClasses.set(element, classes);
+		}
+		classes.set(className, enabled);
+		this.scheduleFlush();
+	}
+
+	/**
+	 * Gets the text an element shows after the next flush
+	 */
+	getText(element: HTMLElement | null): string {
+		if (!element) return '';
+		return this.pendingText.get(element) ?? this.renderedText.get(element) ?? element.textContent ?? '';
+	}
+
+	/**
+	 * Commits queued changes that differ from the rendered state
+	 */
+	flush(): void {
+		if (this.frameHandle !== null) {
+			cancelAnimationFrame(this.frameHandle);
+			this.frameHandle = null;
+		}
+
+		this.pendingText.forEach((text, element) => {
+			if (this.renderedText.get(element) !== text) {
+				element.textContent = text;
+				this.renderedText.set(element, text);
+			}
+		});
+		this.pendingText.clear();
+
+		this.pendingClasses.forEach((classes, element) => {
+			const rendered = this.renderedClasses.get(element) ?? new Map<string, boolean>();
+			this.renderedClasses.set(element, rendered);
+			classes.forEach((enabled, className) => {
+				if (rendered.get(className) !== enabled) {
+					element.classList.toggle(className, enabled);
+					rendered.set(className, enabled);
+				}
+			});
+		});
+		this.pendingClasses.clear();
+	}
+
+	private scheduleFlush(): void {
+		if (this.frameHandle !== null) return;
+		if (typeof requestAnimationFrame !== 'function') {
+			this.flush();
+			return;
+		}
+		this.frameHandle = requestAnimationFrame(() => {
+			this.frameHandle = null;
+			this.flush();
+		});
+	}
+}
+
+function asElement(element: MockElement): HTMLElement {
+	return element as unknown as HTMLElement;
+}
+
+describe('RenderBatcher', () => {
+	beforeEach(() => {
+		frameCallbacks = new Map();
+		nextFrameHandle = 1;
+		(global as any).requestAnimationFrame = (callback: FrameRequestCallback): number => {
+			const handle = nextFrameHandle++;
+			frameCallbacks.set(handle, callback);
+			return handle;
+		};
+		(global as any).cancelAnimationFrame = (handle: number): void => {
+			frameCallbacks.delete(handle);
+		};
+	});
+
+	afterEach(() => {
+		delete (global as any).requestAnimationFrame;
+		delete (global as any).cancelAnimationFrame;
+	});
+
+	describe('frame batching', () => {
+		test('should not write before the frame runs', () => {
+			const renderer = new RenderBatcher();
+			const element = new MockElement();
+			renderer.setText(asElement(element), 'N 6580824');
+			expect(element.textWrites).toBe(0);
+			runFrame();
+			expect(element.textContent).toBe('N 6580824');
+		});
+
+		test('should coalesce several updates into one write', () => {
+			const renderer = new RenderBatcher();
+			const element = new MockElement();
+			renderer.setText(asElement(element), '±4 m');
+			renderer.setText(asElement(element), '±3 m');
+			renderer.setText(asElement(element), '±2 m');
+			expect(frameCallbacks.size).toBe(1);
+			runFrame();
+			expect(element.textWrites).toBe(1);
+			expect(element.textContent).toBe('±2 m');
+		});
+
+		test('should flush immediately when requested and cancel the frame', () => {
+			const renderer = new RenderBatcher();
+			const element = new MockElement();
+			renderer.setText(asElement(element), '12:00:00');
+			renderer.flush();
+			expect(element.textContent).toBe('12:00:00');
+			expect(frameCallbacks.size).toBe(0);
+		});
+
+		test('should write synchronously without requestAnimationFrame', () => {
+			delete (global as any).requestAnimationFrame;
+			const renderer = new RenderBatcher();
+			const element = new MockElement();
+			renderer.setText(asElement(element), '12:00:01');
+			expect(element.textContent).toBe('12:00:01');
+		});
+	});
+
+	describe('skipping unchanged values', () => {
+		test('should not rewrite identical text', () => {
+			const renderer = new RenderBatcher();
+			const element = new MockElement();
+			renderer.setText(asElement(element), 'E  674648');
+			runFrame();
+			renderer.setText(asElement(element), 'E  674648');
+			runFrame();
+			expect(element.textWrites).toBe(1);
+		});
+
+		test('should skip a change that is reverted before the frame', () => {
+			const renderer = new RenderBatcher();
+			const element = new MockElement();
+			renderer.setText(asElement(element), '5 km/h');
+			runFrame();
+			renderer.setText(asElement(element), '6 km/h');
+			renderer.setText(asElement(element), '5 km/h');
+			runFrame();
+			expect(element.textWrites).toBe(1);
+		});
+
+		test('should only toggle classes whose state changes', () => {
+			const renderer = new RenderBatcher();
+			const element = new MockElement();
+			renderer.toggleClass(asElement(element), 'outofrange', true);
+			runFrame();
+			renderer.toggleClass(asElement(element), 'outofrange', true);
+			runFrame();
+			expect(element.classWrites).toBe(1);
+			expect(element.classList.contains('outofrange')).toBe(true);
+
+			renderer.toggleClass(asElement(element), 'outofrange', false);
+			runFrame();
+			expect(element.classWrites).toBe(2);
+			expect(element.classList.contains('outofrange')).toBe(false);
+		});
+
+		test('should ignore missing elements', () => {
+			const renderer = new RenderBatcher();
+			renderer.setText(null, 'text');
+			renderer.toggleClass(null, 'loading', true);
+			expect(frameCallbacks.size).toBe(0);
+			expect(renderer.getText(null)).toBe('');
+		});
+	});
+
+	describe('getText', () => {
+		test('should return queued text before it is rendered', () => {
+			const renderer = new RenderBatcher();
+			const element = new MockElement();
+			renderer.setText(asElement(element), 'N 6580824');
+			expect(renderer.getText(asElement(element))).toBe('N 6580824');
+			expect(element.textContent).toBe('');
+		});
+
+		test('should fall back to the element text before any update', () => {
+			const renderer = new RenderBatcher();
+			const element = new MockElement();
+			element.textContent = '– m/s';
+			expect(renderer.getText(asElement(element))).toBe('– m/s');
+		});
+	});
+});
@@ -52,9 +52,9 @@ declare var proj4: any;
 namespace TestConstants {
 	export const SWEDEN_BOUNDS = {
 		MIN_LATITUDE: 55,
-		MAX_LATITUDE: 69,
-		MIN_LONGITUDE: 10,
-		MAX_LONGITUDE: 24
+		MAX_LATITUDE: 69.1,
+		MIN_LONGITUDE: 10.9,
+		MAX_LONGITUDE: 24.2
 	} as const;
 
 	export const ACCURACY_THRESHOLD_METERS: number = 5;
@@ -95,10 +95,10 @@ interface SwerefCoordinates {
 const SWEREF99_PROJ_DEFINITION = '+proj=utm +zone=33 +ellps=GRS80 +towgs84=0,0,0,0,0,0,0 +units=m +no_defs +type=crs';
 
 /**
- * Checks if a position is within Swedish territory
+ * Bounding box test run before the Sweden border polygon
+ * The polygon itself is tested in tests/sweden-border.test.ts.
  */
-function isInSweden(pos: GeolocationPosition): boolean {
-	const { latitude, longitude } = pos.coords;
+function isWithinSwedenBounds(latitude: number, longitude: number): boolean {
 	return (
 		latitude >= TestConstants.SWEDEN_BOUNDS.MIN_LATITUDE &&
 		latitude <= TestConstants.SWEDEN_BOUNDS.MAX_LATITUDE &&
@@ -107,35 +107,43 @@ function isInSweden(pos: GeolocationPosition): boolean {
 	);
 }
 
+const ETRS89_EPOCH_MS: number = Date.UTC(TestConstants.ETRS89_EPOCH, 0, 1);
+const MILLISECONDS_PER_YEAR: number = 365.25 * 24 * 60 * 60 * 1000;
+
+interface DriftRate {
+	north: number;
+	east: number;
+}
+
 /**
- * Calculate ITRF to ETRS89 correction
+ * Calculate drift rate once (meters per millisecond)
  */
-function calculateItrf2Etrs89Correction(): Itrf2Etrs89Correction {
-	const now = new Date();
-	const yearStart = new Date(now.getFullYear(), 0, 1);
-	const yearEnd = new Date(now.getFullYear() + 1, 0, 1);
-	const yearFraction: number = (now.getTime() - yearStart.getTime()) / (yearEnd.getTime() - yearStart.getTime());
-	const currentEpoch: number = now.getFullYear() + yearFraction;
-	
-	const yearsSinceEtrs89: number = currentEpoch - TestConstants.ETRS89_EPOCH;
-	
+function calculateDriftRate(): DriftRate {
 	const azimuthRad: number = (TestConstants.PLATE_VELOCITY.AZIMUTH_DEGREES * Math.PI) / 180;
-	const northVelocity: number = TestConstants.PLATE_VELOCITY.METERS_PER_YEAR * Math.cos(azimuthRad);
-	const eastVelocity: number = TestConstants.PLATE_VELOCITY.METERS_PER_YEAR * Math.sin(azimuthRad);
-	
-	const totalNorthShift: number = northVelocity * yearsSinceEtrs89;
-	const totalEastShift: number = eastVelocity * yearsSinceEtrs89;
-	
+	const metersPerMs: number = TestConstants.PLATE_VELOCITY.METERS_PER_YEAR / MILLISECONDS_PER_YEAR;
+	return {
+		north: metersPerMs * Math.cos(azimuthRad),
+		east: metersPerMs * Math.sin(azimuthRad)
+	};
+}
+
+const driftRate: DriftRate = calculateDriftRate();
+
+/**
+ * Calculate ITRF to ETRS89 correction at the given observation epoch
+ */
+function calculateItrf2Etrs89Correction(timestamp: number = Date.now()): Itrf2Etrs89Correction {
+	const elapsedMs: number = timestamp - ETRS89_EPOCH_MS;
 	return {
-		dn: totalNorthShift,
-		de: totalEastShift
+		dn: driftRate.north * elapsedMs,
+		de: driftRate.east * elapsedMs
 	};
 }
 
 /**
  * Transforms WGS84 coordinates to SWEREF 99 TM
  */
-function wgs84_to_sweref99tm(lat: number, lon: number): SwerefCoordinates {
+function wgs84_to_sweref99tm(lat: number, lon: number, timestamp: number = Date.now()): SwerefCoordinates {
 	try {
 		if (typeof proj4 === 'undefined') {
 			console.warn("SWEREF 99 transformation not available - proj4 library not loaded");
@@ -150,7 +158,7 @@ function wgs84_to_sweref99tm(lat: number, lon: number): SwerefCoordinates {
 		let easting: number = result[0];
 		let northing: number = result[1];
 
-		const correction = calculateItrf2Etrs89Correction();
+		const correction = calculateItrf2Etrs89Correction(timestamp);
 		northing += correction.dn;
 		easting += correction.de;
 
@@ -185,12 +193,12 @@ function createMockPosition(latitude: number, longitude: number, accuracy: numbe
 describe('SWEDEN_BOUNDS Constants', () => {
 	test('should have correct latitude bounds for Sweden', () => {
 		expect(TestConstants.SWEDEN_BOUNDS.MIN_LATITUDE).toBe(55);
-		expect(TestConstants.SWEDEN_BOUNDS.MAX_LATITUDE).toBe(69);
+		expect(TestConstants.SWEDEN_BOUNDS.MAX_LATITUDE).toBe(69.1);
 	});
 
 	test('should have correct longitude bounds for Sweden', () => {
-		expect(TestConstants.SWEDEN_BOUNDS.MIN_LONGITUDE).toBe(10);
-		expect(TestConstants.SWEDEN_BOUNDS.MAX_LONGITUDE).toBe(24);
+		expect(TestConstants.SWEDEN_BOUNDS.MIN_LONGITUDE).toBe(10.9);
+		expect(TestConstants.SWEDEN_BOUNDS.MAX_LONGITUDE).toBe(24.2);
 	});
 
 	test('bounds should be internally consistent', () => {
@@ -211,98 +219,78 @@ describe('SWEDEN_BOUNDS Constants', () => {
 	});
 });
 
-describe('isInSweden Function', () => {
+describe('isWithinSwedenBounds Function', () => {
 	describe('typical Swedish locations', () => {
 		test('should return true for Stockholm (59.33°N, 18.07°E)', () => {
-			const position = createMockPosition(59.33, 18.07);
-			expect(isInSweden(position)).toBe(true);
+			expect(isWithinSwedenBounds(59.33, 18.07)).toBe(true);
 		});
 
 		test('should return true for Gothenburg (57.71°N, 11.97°E)', () => {
-			const position = createMockPosition(57.71, 11.97);
-			expect(isInSweden(position)).toBe(true);
+			expect(isWithinSwedenBounds(57.71, 11.97)).toBe(true);
 		});
 
 		test('should return true for Malmö (55.60°N, 13.00°E)', () => {
-			const position = createMockPosition(55.60, 13.00);
-			expect(isInSweden(position)).toBe(true);
+			expect(isWithinSwedenBounds(55.60, 13.00)).toBe(true);
 		});
 
 		test('should return true for Kiruna (67.86°N, 20.23°E)', () => {
-			const position = createMockPosition(67.86, 20.23);
-			expect(isInSweden(position)).toBe(true);
+			expect(isWithinSwedenBounds(67.86, 20.23)).toBe(true);
+		});
+
+		test('should return true for Treriksröset (69.06°N, 20.55°E)', () => {
+			expect(isWithinSwedenBounds(69.06, 20.55)).toBe(true);
 		});
 	});
 
 	describe('boundary cases', () => {
 		test('should return true for minimum latitude boundary', () => {
-			const position = createMockPosition(55.0, 15.0);
-			expect(isInSweden(position)).toBe(true);
+			expect(isWithinSwedenBounds(55.0, 15.0)).toBe(true);
 		});
 
 		test('should return true for maximum latitude boundary', () => {
-			const position = createMockPosition(69.0, 15.0);
-			expect(isInSweden(position)).toBe(true);
+			expect(isWithinSwedenBounds(69.1, 15.0)).toBe(true);
 		});
 
 		test('should return true for minimum longitude boundary', () => {
-			const position = createMockPosition(60.0, 10.0);
-			expect(isInSweden(position)).toBe(true);
+			expect(isWithinSwedenBounds(60.0, 10.9)).toBe(true);
 		});
 
 		test('should return true for maximum longitude boundary', () => {
-			const position = createMockPosition(60.0, 24.0);
-			expect(isInSweden(position)).toBe(true);
+			expect(isWithinSwedenBounds(60.0, 24.2)).toBe(true);
 		});
 
 		test('should return false for just below minimum latitude', () => {
-			const position = createMockPosition(54.99, 15.0);
-			expect(isInSweden(position)).toBe(false);
+			expect(isWithinSwedenBounds(54.99, 15.0)).toBe(false);
 		});
 
 		test('should return false for just above maximum latitude', () => {
-			const position = createMockPosition(69.01, 15.0);
-			expect(isInSweden(position)).toBe(false);
+			expect(isWithinSwedenBounds(69.11, 15.0)).toBe(false);
 		});
 
 		test('should return false for just below minimum longitude', () => {
-			const position = createMockPosition(60.0, 9.99);
-			expect(isInSweden(position)).toBe(false);
+			expect(isWithinSwedenBounds(60.0, 10.89)).toBe(false);
 		});
 
 		test('should return false for just above maximum longitude', () => {
-			const position = createMockPosition(60.0, 24.01);
-			expect(isInSweden(position)).toBe(false);
+			expect(isWithinSwedenBounds(60.0, 24.21)).toBe(false);
 		});
 	});
 
-	describe('locations outside Sweden', () => {
-		test('should return false for Copenhagen, Denmark (55.68°N, 12.57°E)', () => {
-			// Copenhagen is at the southern boundary, just outside
-			const position = createMockPosition(55.68, 12.57);
-			// This should be true as it's within bounds, but logically it's Denmark
-			// The bounds are approximate
-			expect(isInSweden(position)).toBe(true);
-		});
-
+	describe('locations outside the bounding box', () => {
 		test('should return false for Oslo, Norway (59.91°N, 10.75°E)', () => {
-			const position = createMockPosition(59.91, 10.75);
-			expect(isInSweden(position)).toBe(true); // Within bounds
+			expect(isWithinSwedenBounds(59.91, 10.75)).toBe(false);
 		});
 
 		test('should return false for Berlin, Germany (52.52°N, 13.40°E)', () => {
-			const position = createMockPosition(52.52, 13.40);
-			expect(isInSweden(position)).toBe(false);
+			expect(isWithinSwedenBounds(52.52, 13.40)).toBe(false);
 		});
 
 		test('should return false for London, UK (51.51°N, -0.13°E)', () => {
-			const position = createMockPosition(51.51, -0.13);
-			expect(isInSweden(position)).toBe(false);
+			expect(isWithinSwedenBounds(51.51, -0.13)).toBe(false);
 		});
 
 		test('should return false for New York, USA (40.71°N, -74.01°E)', () => {
-			const position = createMockPosition(40.71, -74.01);
-			expect(isInSweden(position)).toBe(false);
+			expect(isWithinSwedenBounds(40.71, -74.01)).toBe(false);
 		});
 	});
 });
@@ -502,6 +490,48 @@ describe('calculateItrf2Etrs89Correction Function', () => {
 		expect(Math.abs(correction1.dn - correction2.dn)).toBeLessThan(0.0001);
 		expect(Math.abs(correction1.de - correction2.de)).toBeLessThan(0.0001);
 	});
+
+	describe('observation epoch', () => {
+		test('should be zero at the ETRS89 epoch', () => {
+			const correction = calculateItrf2Etrs89Correction(ETRS89_EPOCH_MS);
+			expect(correction.dn).toBe(0);
+			expect(correction.de).toBe(0);
+		});
+
+		test('should equal the plate velocity after one year', () => {
+			const correction = calculateItrf2Etrs89Correction(ETRS89_EPOCH_MS + MILLISECONDS_PER_YEAR);
+			const total = Math.hypot(correction.dn, correction.de);
+			expect(total).toBeCloseTo(TestConstants.PLATE_VELOCITY.METERS_PER_YEAR, 12);
+		});
+
+		test('should match the decimal-year formula within 0.1 mm', () => {
+			const timestamp = new Date(2025, 9, 18, 12, 0, 0).getTime();
+			const yearStart = new Date(2025, 0, 1).getTime();
+			const yearEnd = new Date(2026, 0, 1).getTime();
+			const epoch = 2025 + (timestamp - yearStart) / (yearEnd - yearStart);
+			const azimuthRad = (25 * Math.PI) / 180;
+			const expectedNorth = 0.025 * Math.cos(azimuthRad) * (epoch - 1989);
+			const expectedEast = 0.025 * Math.sin(azimuthRad) * (epoch - 1989);
+
+			const correction = calculateItrf2Etrs89Correction(timestamp);
+			expect(Math.abs(correction.dn - expectedNorth)).toBeLessThan(0.0001);
+			expect(Math.abs(correction.de - expectedEast)).toBeLessThan(0.0001);
+		});
+
+		test('should grow across New Year instead of staying at the load-time value', () => {
+			const beforeNewYear = calculateItrf2Etrs89Correction(Date.UTC(2025, 11, 31, 23, 0, 0));
+			const afterOneWeek = calculateItrf2Etrs89Correction(Date.UTC(2026, 0, 7, 23, 0, 0));
+			expect(afterOneWeek.dn).toBeGreaterThan(beforeNewYear.dn);
+			expect(afterOneWeek.de).toBeGreaterThan(beforeNewYear.de);
+		});
+
+		test('should use the epoch of recorded points', () => {
+			const recorded = wgs84_to_sweref99tm(59.33, 18.07, Date.UTC(2015, 0, 1));
+			const current = wgs84_to_sweref99tm(59.33, 18.07, Date.UTC(2025, 0, 1));
+			const tenYearsNorth = 10 * 0.025 * Math.cos((25 * Math.PI) / 180);
+			expect(current.northing - recorded.northing).toBeCloseTo(tenYearsNorth, 2);
+		});
+	});
 });
 
 describe('wgs84_to_sweref99tm Function', () => {
@@ -636,8 +666,7 @@ describe('wgs84_to_sweref99tm Function', () => {
 describe('Integration Tests', () => {
 	describe('Sweden boundary validation with coordinate transformation', () => {
 		test('should transform and validate Stockholm', () => {
-			const position = createMockPosition(59.33, 18.07);
-			expect(isInSweden(position)).toBe(true);
+			expect(isWithinSwedenBounds(59.33, 18.07)).toBe(true);
 			
 			const sweref = wgs84_to_sweref99tm(59.33, 18.07);
 			expect(sweref.northing).toBeGreaterThan(0);
@@ -645,8 +674,7 @@ describe('Integration Tests', () => {
 		});
 
 		test('should validate boundaries before transformation', () => {
-			const invalidPosition = createMockPosition(40.71, -74.01); // New York
-			expect(isInSweden(invalidPosition)).toBe(false);
+			expect(isWithinSwedenBounds(40.71, -74.01)).toBe(false); // New York
 			
 			// Transformation should still work but coordinates might be invalid
 			const sweref = wgs84_to_sweref99tm(40.71, -74.01);
@@ -704,7 +732,7 @@ describe('Integration Tests', () => {
 			const position = createMockPosition(59.33, 18.07, 4, 0.5);
 			
 			// Validate Sweden
-			expect(isInSweden(position)).toBe(true);
+			expect(isWithinSwedenBounds(position.coords.latitude, position.coords.longitude)).toBe(true);
 			
 			// Validate accuracy
 			expect(position.coords.accuracy).toBeLessThan(TestConstants.ACCURACY_THRESHOLD_METERS);
@@ -0,0 +1,119 @@
+/**
+ * Unit tests for positions shared between tabs
+ *
+ * Tests cover:
+ * - Accepting well-formed positions broadcast by the leading tab
+ * - Accepting averaged positions with their spread and count
+ * - Rejecting malformed messages, e.g. from another version of the app
+ */
+
+/**
+ * Shared position functions from script.ts - redefined here for testing
+ *
+ * NOTE: These are duplicated from src/script.ts rather than imported.
+ * See tests/README.md for more details.
+ */
+interface FormattedPosition {
+	swerefN: string;
+	swerefE: string;
+	wgs84N: string;
+	wgs84E: string;
+	height: string;
+	showNotInSwedenWarning: boolean;
+}
+
+interface SharedPositionMessage {
+	type: 'position';
+	position: FormattedPosition;
+	accuracy: number;
+	speed: number | null;
+	timestamp: number;
+	averageCount: number;
+	averageSpread: number;
+}
+
+function isSharedPositionMessage(data: unknown): data is SharedPositionMessage {
+	if (typeof data !== 'object' || data === null) {
+		return false;
+	}
+	const message = data as Partial<SharedPositionMessage>;
+	const position = message.position;
+	return message.type === 'position' &&
+		typeof position === 'object' && position !== null &&
+		[position.swerefN, position.swerefE, position.wgs84N, position.wgs84E, position.height]
+			.every((value) => typeof value === 'string') &&
+		typeof position.showNotInSwedenWarning === 'boolean' &&
+		Number.isFinite(message.accuracy) &&
+		(message.speed === null || Number.isFinite(message.speed)) &&
+		Number.isFinite(message.timestamp) &&
+		typeof message.averageCount === 'number' && Number.isInteger(message.averageCount) && message.averageCount >= 0 &&
+		(message.averageCount === 0 || Number.isFinite(message.averageSpread));
+}
+
+const MESSAGE: SharedPositionMessage = {
+	type: 'position',
+	position: {
+		swerefN: 'N 6580744',
+		swerefE: 'E  674572',
+		wgs84N: 'N 59,3293°',
+		wgs84E: 'E 18,0686°',
+		height: 'H  28 m',
+		showNotInSwedenWarning: false
+	},
+	accuracy: 4.2,
+	speed: 1.1,
+	timestamp: 1760616000123,
+	averageCount: 0,
+	averageSpread: NaN
+};
+
+describe('isSharedPositionMessage Function', () => {
+	test('accepts a position broadcast by the leading tab', () => {
+		expect(isSharedPositionMessage(MESSAGE)).toBe(true);
+	});
+
+	test('accepts a position without speed', () => {
+		expect(isSharedPositionMessage({ ...MESSAGE, speed: null })).toBe(true);
+	});
+
+	test('accepts an averaged position with its spread and count', () => {
+		expect(isSharedPositionMessage({ ...MESSAGE, averageCount: 12, averageSpread: 0.8 })).toBe(true);
+	});
+
+	test('rejects an averaged position without a finite spread', () => {
+		expect(isSharedPositionMessage({ ...MESSAGE, averageCount: 12, averageSpread: NaN })).toBe(false);
+		expect(isSharedPositionMessage({ ...MESSAGE, averageCount: 12, averageSpread: undefined })).toBe(false);
+	});
+
+	test('rejects a missing, negative or fractional average count', () => {
+		expect(isSharedPositionMessage({ ...MESSAGE, averageCount: undefined })).toBe(false);
+		expect(isSharedPositionMessage({ ...MESSAGE, averageCount: -1 })).toBe(false);
+		expect(isSharedPositionMessage({ ...MESSAGE, averageCount: 1.5, averageSpread: 0.8 })).toBe(false);
+	});
+
+	test('rejects non-objects', () => {
+		expect(isSharedPositionMessage(null)).toBe(false);
+		expect(isSharedPositionMessage('position')).toBe(false);
+		expect(isSharedPositionMessage(42)).toBe(false);
+	});
+
+	test('rejects other message types', () => {
+		expect(isSharedPositionMessage({ ...MESSAGE, type: 'reset' })).toBe(false);
+	});
+
+	test('rejects a message without a formatted position', () => {
+		const { position, ...withoutPosition } = MESSAGE;
+		expect(isSharedPositionMessage(withoutPosition)).toBe(false);
+		expect(isSharedPositionMessage({ ...MESSAGE, position: null })).toBe(false);
+	});
+
+	test('rejects a position with numeric coordinates', () => {
+		expect(isSharedPositionMessage({ ...MESSAGE, position: { ...MESSAGE.position, swerefN: 6580744 } })).toBe(false);
+	});
+
+	test('rejects a missing or non-finite accuracy, speed or timestamp', () => {
+		expect(isSharedPositionMessage({ ...MESSAGE, accuracy: undefined })).toBe(false);
+		expect(isSharedPositionMessage({ ...MESSAGE, speed: NaN })).toBe(false);
+		expect(isSharedPositionMessage({ ...MESSAGE, timestamp: '1760616000123' })).toBe(false);
+	});
+});
@@ -0,0 +1,496 @@
+/**
+ * Unit tests for the Sweden border test (isInSweden)
+ *
+ * Tests cover:
+ * - Swedish locations near the land borders and on islands
+ * - Neighbouring countries inside the bounding box (Copenhagen, Oslo, Åland)
+ * - The grid index agreeing with a brute-force polygon test
+ * - Classification of grid cells as inside, outside or boundary
+ * - Hysteresis for the "not in Sweden" warning (updateSwedenPresence)
+ */
+
+/**
+ * Constants and functions from geodesy.ts and transform-pipeline.ts - redefined here for testing
+ *
+ * NOTE: These constants and functions are duplicated from src/geodesy.ts and
+ * src/transform-pipeline.ts rather than imported. See tests/README.md for more details.
+ */
+interface PolygonGridIndex {
+	minLatitude: number;
+	minLongitude: number;
+	cellSize: number;
+	rows: number;
+	columns: number;
+	cells: Uint8Array;
+	rowEdgeOffsets: Uint32Array;
+	rowEdges: Uint16Array;
+	vertices: Float64Array;
+}
+
+const SWEDEN_BOUNDS = {
+	MIN_LATITUDE: 55,
+	MAX_LATITUDE: 69.1,
+	MIN_LONGITUDE: 10.9,
+	MAX_LONGITUDE: 24.2
+} as const;
+
+const SWEDEN_BORDER_POLYGON: readonly number[] = [
+	// Riksgränsen mot Norge, från Treriksröset söderut
+	69.06, 20.55,
+	68.90, 20.20,
+	68.62, 19.95,
+	68.50, 19.00,
+	68.43, 18.12,
+	68.10, 18.05,
+	67.95, 17.30,
+	67.55, 16.35,
+	67.20, 16.40,
+	66.90, 16.05,
+	66.50, 15.50,
+	66.15, 15.00,
+	65.80, 14.55,
+	65.45, 14.45,
+	65.10, 14.30,
+	64.85, 13.70,
+	64.50, 14.10,
+	64.10, 13.30,
+	63.75, 12.45,
+	63.30, 12.10,
+	63.00, 12.05,
+	62.60, 12.10,
+	62.05, 12.15,
+	61.55, 12.45,
+	61.00, 12.35,
+	60.90, 12.25,
+	60.50, 12.55,
+	60.10, 12.45,
+	59.85, 11.85,
+	59.45, 11.75,
+	59.12, 11.45,
+	59.05, 11.10,
+	// Territorialhavet längs västkusten, Öresund och sydkusten
+	58.95, 10.90,
+	58.30, 11.05,
+	57.70, 11.45,
+	57.20, 11.75,
+	56.70, 12.15,
+	56.35, 12.35,
+	56.12, 12.50,
+	56.04, 12.66,
+	55.90, 12.73,
+	55.70, 12.85,
+	55.55, 12.87,
+	55.40, 12.72,
+	55.25, 12.75,
+	55.10, 13.20,
+	55.10, 14.00,
+	55.30, 14.45,
+	55.45, 14.75,
+	55.45, 15.30,
+	55.55, 15.50,
+	55.85, 16.10,
+	// Östersjön runt Öland och Gotland
+	56.20, 16.55,
+	56.60, 16.95,
+	57.00, 17.25,
+	57.40, 17.30,
+	56.85, 18.05,
+	56.85, 18.30,
+	57.20, 19.00,
+	57.70, 19.20,
+	58.00, 19.45,
+	58.45, 19.45,
+	58.80, 19.20,
+	59.30, 19.35,
+	59.80, 19.45,
+	// Ålands hav, Bottenhavet och Bottenviken (mittlinjen mot Finland)
+	60.30, 19.13,
+	60.60, 19.55,
+	61.30, 19.60,
+	62.20, 20.00,
+	62.90, 20.30,
+	63.30, 20.75,
+	63.55, 20.95,
+	63.90, 21.20,
+	64.40, 21.90,
+	64.90, 22.40,
+	65.30, 23.20,
+	65.60, 23.80,
+	// Riksgränsen mot Finland längs Torne- och Muonioälven
+	65.75, 24.17,
+	65.86, 24.15,
+	66.00, 23.92,
+	66.40, 23.68,
+	66.80, 23.90,
+	67.20, 23.60,
+	67.60, 23.55,
+	67.95, 23.65,
+	68.20, 23.15,
+	68.44, 22.52,
+	68.70, 21.70,
+	68.90, 21.00
+];
+
+const SWEDEN_BORDER_CELL_SIZE = 0.25;
+
+const POLYGON_CELL_OUTSIDE = 0;
+const POLYGON_CELL_INSIDE = 1;
+const POLYGON_CELL_BOUNDARY = 2;
+const SWEDEN_PRESENCE_HYSTERESIS_FIXES = 3;
+
+type SwedenPresence = 'unknown' | 'inside' | 'outside';
+
+interface SwedenPresenceState {
+	presence: SwedenPresence;
+	pendingFixes: number;
+}
+
+function isValidLatitude(latitude: number): boolean {
+	return Number.isFinite(latitude) && latitude >= -90 && latitude <= 90;
+}
+
+function isValidLongitude(longitude: number): boolean {
+	return Number.isFinite(longitude) && longitude >= -180 && longitude <= 180;
+}
+
+function isInsidePolygonRow(index: PolygonGridIndex, row: number, lat: number, lon: number): boolean {
+	const vertices = index.vertices;
+	const vertexCount = vertices.length / 2;
+	let inside = false;
+
+	for (let k = index.rowEdgeOffsets[row]; k < index.rowEdgeOffsets[row + 1]; k++) {
+		const i = index.rowEdges[k];
+		const j = i + 1 === vertexCount ? 0 : i + 1;
+		const lat1 = vertices[2 * i];
+		const lat2 = vertices[2 * j];
+		if ((lat1 > lat) !== (lat2 > lat)) {
+			const lon1 = vertices[2 * i + 1];
+			const crossingLon = lon1 + ((lat - lat1) * (vertices[2 * j + 1] - lon1)) / (lat2 - lat1);
+			if (lon < crossingLon) {
+				inside = !inside;
+			}
+		}
+	}
+	return inside;
+}
+
+function buildPolygonGridIndex(vertices: readonly number[], cellSize: number): PolygonGridIndex {
+	const coordinates = Float64Array.from(vertices);
+	const vertexCount = coordinates.length / 2;
+
+	let minLatitude = Infinity;
+	let maxLatitude = -Infinity;
+	let minLongitude = Infinity;
+	let maxLongitude = -Infinity;
+	for (let i = 0; i < vertexCount; i++) {
+		minLatitude = Math.min(minLatitude, coordinates[2 * i]);
+		maxLatitude = Math.max(maxLatitude, coordinates[2 * i]);
+		minLongitude = Math.min(minLongitude, coordinates[2 * i + 1]);
+		maxLongitude = Math.max(maxLongitude, coordinates[2 * i + 1]);
+	}
+
+	const rows = Math.max(1, Math.ceil((maxLatitude - minLatitude) / cellSize));
+	const columns = Math.max(1, Math.ceil((maxLongitude - minLongitude) / cellSize));
+	const cells = new Uint8Array(rows * columns);
+	const rowEdgeOffsets = new Uint32Array(rows + 1);
+	const rowEdgeList: number[] = [];
+
+	for (let row = 0; row < rows; row++) {
+		const southLatitude = minLatitude + row * cellSize;
+		const northLatitude = southLatitude + cellSize;
+		rowEdgeOffsets[row] = rowEdgeList.length;
+
+		for (let i = 0; i < vertexCount; i++) {
+			const j = i + 1 === vertexCount ? 0 : i + 1;
+			const lat1 = coordinates[2 * i];
+			const lon1 = coordinates[2 * i + 1];
+			const lat2 = coordinates[2 * j];
+			const lon2 = coordinates[2 * j + 1];
+			if (Math.max(lat1, lat2) < southLatitude || Math.min(lat1, lat2) > northLatitude) {
+				continue;
+			}
+			rowEdgeList.push(i);
+
+			let westLongitude = Math.min(lon1, lon2);
+			let eastLongitude = Math.max(lon1, lon2);
+			if (lat1 !== lat2) {
+				const t1 = Math.min(1, Math.max(0, (southLatitude - lat1) / (lat2 - lat1)));
+				const t2 = Math.min(1, Math.max(0, (northLatitude - lat1) / (lat2 - lat1)));
+				const clippedLon1 = lon1 + t1 * (lon2 - lon1);
+				const clippedLon2 = lon1 + t2 * (lon2 - lon1);
+				westLongitude = Math.min(clippedLon1, clippedLon2);
+				eastLongitude = Math.max(clippedLon1, clippedLon2);
+			}
+
+			const firstColumn = Math.max(0, Math.floor((westLongitude - minLongitude) / cellSize));
+			const lastColumn = Math.min(columns - 1, Math.floor((eastLongitude - minLongitude) / cellSize));
+			for (let column = firstColumn; column <= lastColumn; column++) {
+				cells[row * columns + column] = POLYGON_CELL_BOUNDARY;
+			}
+		}
+	}
+	rowEdgeOffsets[rows] = rowEdgeList.length;
+
+	const index: PolygonGridIndex = {
+		minLatitude,
+		minLongitude,
+		cellSize,
+		rows,
+		columns,
+		cells,
+		rowEdgeOffsets,
+		rowEdges: Uint16Array.from(rowEdgeList),
+		vertices: coordinates
+	};
+
+	for (let row = 0; row < rows; row++) {
+		const centreLatitude = minLatitude + (row + 0.5) * cellSize;
+		for (let column = 0; column < columns; column++) {
+			if (cells[row * columns + column] !== POLYGON_CELL_BOUNDARY) {
+				const centreLongitude = minLongitude + (column + 0.5) * cellSize;
+				cells[row * columns + column] = isInsidePolygonRow(index, row, centreLatitude, centreLongitude)
+					? POLYGON_CELL_INSIDE
+					: POLYGON_CELL_OUTSIDE;
+			}
+		}
+	}
+
+	return index;
+}
+
+function isInsidePolygonIndex(index: PolygonGridIndex, lat: number, lon: number): boolean {
+	const row = Math.floor((lat - index.minLatitude) / index.cellSize);
+	const column = Math.floor((lon - index.minLongitude) / index.cellSize);
+	if (row < 0 || row >= index.rows || column < 0 || column >= index.columns) {
+		return false;
+	}
+
+	const cell = index.cells[row * index.columns + column];
+	if (cell !== POLYGON_CELL_BOUNDARY) {
+		return cell === POLYGON_CELL_INSIDE;
+	}
+	return isInsidePolygonRow(index, row, lat, lon);
+}
+
+function isWithinSwedenBounds(latitude: number, longitude: number): boolean {
+	return (
+		latitude >= SWEDEN_BOUNDS.MIN_LATITUDE &&
+		latitude <= SWEDEN_BOUNDS.MAX_LATITUDE &&
+		longitude >= SWEDEN_BOUNDS.MIN_LONGITUDE &&
+		longitude <= SWEDEN_BOUNDS.MAX_LONGITUDE
+	);
+}
+
+const swedenBorderIndex: PolygonGridIndex = buildPolygonGridIndex(SWEDEN_BORDER_POLYGON, SWEDEN_BORDER_CELL_SIZE);
+
+function isInSweden(latitude: number, longitude: number): boolean {
+	if (!isValidLatitude(latitude) || !isValidLongitude(longitude)) {
+		return false;
+	}
+
+	return isWithinSwedenBounds(latitude, longitude) && isInsidePolygonIndex(swedenBorderIndex, latitude, longitude);
+}
+
+function updateSwedenPresence(state: SwedenPresenceState, isInside: boolean): boolean {
+	const observed: SwedenPresence = isInside ? 'inside' : 'outside';
+	if (state.presence === 'unknown') {
+		state.presence = observed;
+		state.pendingFixes = 0;
+		return observed === 'outside';
+	}
+
+	if (observed === state.presence) {
+		state.pendingFixes = 0;
+		return false;
+	}
+
+	state.pendingFixes++;
+	if (state.pendingFixes < SWEDEN_PRESENCE_HYSTERESIS_FIXES) {
+		return false;
+	}
+	state.presence = observed;
+	state.pendingFixes = 0;
+	return observed === 'outside';
+}
+
+/**
+ * Reference crossing-number test over every edge of the polygon
+ */
+function isInsidePolygonBruteForce(vertices: readonly number[], lat: number, lon: number): boolean {
+	const vertexCount = vertices.length / 2;
+	let inside = false;
+	for (let i = 0, j = vertexCount - 1; i < vertexCount; j = i++) {
+		const lat1 = vertices[2 * i];
+		const lat2 = vertices[2 * j];
+		if ((lat1 > lat) !== (lat2 > lat)) {
+			const crossingLon = vertices[2 * i + 1] + ((lat - lat1) * (vertices[2 * j + 1] - vertices[2 * i + 1])) / (lat2 - lat1);
+			if (lon < crossingLon) {
+				inside = !inside;
+			}
+		}
+	}
+	return inside;
+}
+
+describe('isInSweden Function', () => {
+	describe('Swedish locations', () => {
+		test.each([
+			['Stockholm', 59.33, 18.07],
+			['Gothenburg', 57.71, 11.97],
+			['Malmö', 55.60, 13.00],
+			['Kiruna', 67.86, 20.23],
+			['Visby', 57.64, 18.30],
+			['Luleå', 65.58, 22.15],
+			['Umeå', 63.83, 20.26],
+			['Strömstad', 58.94, 11.17],
+			['Helsingborg', 56.046, 12.694],
+			['Smygehuk', 55.34, 13.36],
+			['Karesuando', 68.44, 22.48],
+			['Abisko', 68.35, 18.83],
+			['Idre', 61.86, 12.72],
+			['Gotska Sandön', 58.37, 19.25]
+		])('should return true for %s', (_name, lat, lon) => {
+			expect(isInSweden(lat, lon)).toBe(true);
+		});
+
+		test('should return true near Treriksröset, north of the old 69°N box', () => {
+			expect(isInSweden(69.03, 20.58)).toBe(true);
+		});
+	});
+
+	describe('locations in neighbouring countries', () => {
+		test.each([
+			['Copenhagen, Denmark', 55.68, 12.57],
+			['Helsingør, Denmark', 56.036, 12.61],
+			['Bornholm, Denmark', 55.10, 14.90],
+			['Oslo, Norway', 59.91, 10.75],
+			['Halden, Norway', 59.12, 11.39],
+			['Narvik, Norway', 68.44, 17.43],
+			['Trysil, Norway', 61.31, 12.26],
+			['Mariehamn, Åland', 60.10, 19.94],
+			['Vaasa, Finland', 63.10, 21.62],
+			['Tornio, Finland', 65.87, 24.16],
+			['Kilpisjärvi, Finland', 69.05, 20.79],
+			['Turku, Finland', 60.45, 22.27],
+			['Riga, Latvia', 56.95, 24.10]
+		])('should return false for %s', (_name, lat, lon) => {
+			expect(isInSweden(lat, lon)).toBe(false);
+		});
+	});
+
+	describe('locations far from Sweden', () => {
+		test('should return false for Berlin, London and New York', () => {
+			expect(isInSweden(52.52, 13.40)).toBe(false);
+			expect(isInSweden(51.51, -0.13)).toBe(false);
+			expect(isInSweden(40.71, -74.01)).toBe(false);
+		});
+
+		test('should return false for invalid coordinates', () => {
+			expect(isInSweden(Number.NaN, 18.07)).toBe(false);
+			expect(isInSweden(59.33, Number.POSITIVE_INFINITY)).toBe(false);
+			expect(isInSweden(91, 18.07)).toBe(false);
+		});
+	});
+});
+
+describe('buildPolygonGridIndex Function', () => {
+	test('should contain every polygon vertex in the bounding box', () => {
+		for (let i = 0; i < SWEDEN_BORDER_POLYGON.length; i += 2) {
+			expect(isWithinSwedenBounds(SWEDEN_BORDER_POLYGON[i], SWEDEN_BORDER_POLYGON[i + 1])).toBe(true);
+		}
+	});
+
+	test('should agree with a brute-force polygon test', () => {
+		let mismatches = 0;
+		for (let lat = 54.9; lat <= 69.2; lat += 0.0173) {
+			for (let lon = 10.7; lon <= 24.4; lon += 0.0191) {
+				const expected = isInsidePolygonBruteForce(SWEDEN_BORDER_POLYGON, lat, lon);
+				if (isInsidePolygonIndex(swedenBorderIndex, lat, lon) !== expected) {
+					mismatches++;
+				}
+			}
+		}
+		expect(mismatches).toBe(0);
+	});
+
+	test('should answer most cells without edge tests', () => {
+		const boundaryCells = swedenBorderIndex.cells.filter((cell) => cell === POLYGON_CELL_BOUNDARY).length;
+		expect(boundaryCells).toBeLessThan(swedenBorderIndex.cells.length / 4);
+		expect(swedenBorderIndex.cells).toContain(POLYGON_CELL_INSIDE);
+		expect(swedenBorderIndex.cells).toContain(POLYGON_CELL_OUTSIDE);
+	});
+
+	test('should classify a unit square exactly', () => {
+		const square = buildPolygonGridIndex([0, 0, 0, 1, 1, 1, 1, 0], 0.25);
+		expect(square.rows).toBe(4);
+		expect(square.columns).toBe(4);
+		expect(isInsidePolygonIndex(square, 0.5, 0.5)).toBe(true);
+		expect(isInsidePolygonIndex(square, 0.01, 0.99)).toBe(true);
+		expect(isInsidePolygonIndex(square, 1.5, 0.5)).toBe(false);
+		expect(isInsidePolygonIndex(square, 0.5, -0.01)).toBe(false);
+	});
+
+	test('should mark cells crossed by a diagonal edge as boundary', () => {
+		const triangle = buildPolygonGridIndex([0, 0, 2, 2, 0, 2], 0.25);
+		for (let k = 0; k < 8; k++) {
+			expect(triangle.cells[k * triangle.columns + k]).toBe(POLYGON_CELL_BOUNDARY);
+		}
+		expect(triangle.cells[1 * triangle.columns + 5]).toBe(POLYGON_CELL_INSIDE);
+		expect(triangle.cells[5 * triangle.columns + 1]).toBe(POLYGON_CELL_OUTSIDE);
+		expect(isInsidePolygonIndex(triangle, 0.3, 0.31)).toBe(true);
+		expect(isInsidePolygonIndex(triangle, 0.31, 0.3)).toBe(false);
+	});
+});
+
+describe('updateSwedenPresence Function', () => {
+	function createState(): SwedenPresenceState {
+		return { presence: 'unknown', pendingFixes: 0 };
+	}
+
+	// Feeds a sequence of fixes and returns the fix indices that triggered a warning
+	function warningsFor(fixes: boolean[], state: SwedenPresenceState = createState()): number[] {
+		const warnings: number[] = [];
+		fixes.forEach((isInside, index) => {
+			if (updateSwedenPresence(state, isInside)) {
+				warnings.push(index);
+			}
+		});
+		return warnings;
+	}
+
+	test('should warn on the first fix outside Sweden', () => {
+		expect(warningsFor([false])).toEqual([0]);
+	});
+
+	test('should not warn on the first fix inside Sweden', () => {
+		expect(warningsFor([true])).toEqual([]);
+	});
+
+	test('should warn only once while staying outside', () => {
+		expect(warningsFor(new Array(30).fill(false))).toEqual([0]);
+	});
+
+	test('should warn once the exit has lasted SWEDEN_PRESENCE_HYSTERESIS_FIXES fixes', () => {
+		expect(warningsFor([true, true, false, false, false, false])).toEqual([4]);
+	});
+
+	test('should ignore short excursions across the border', () => {
+		expect(warningsFor([true, false, true, false, false, true, false, true])).toEqual([]);
+	});
+
+	test('should warn again after returning to Sweden and leaving again', () => {
+		expect(warningsFor([false, true, true, true, false, false, false])).toEqual([0, 6]);
+	});
+
+	test('should not warn again after a short return', () => {
+		expect(warningsFor([false, true, true, false, false])).toEqual([0]);
+	});
+
+	test('should warn immediately after the state is reset', () => {
+		const state = createState();
+		warningsFor([false], state);
+		state.presence = 'unknown';
+		state.pendingFixes = 0;
+		expect(warningsFor([false], state)).toEqual([0]);
+	});
+});
@@ -0,0 +1,293 @@
+/**
+ * Unit tests for the geolocation watch shared between tabs
+ *
+ * Tests cover:
+ * - One tab leads and runs the watch while the others follow
+ * - A hidden leader hands over to a tab that is opened later
+ * - Hidden tabs leave the queue for the lock and join it again when visible
+ * - Stopping releases the lock to the next waiting tab
+ */
+
+/**
+ * Leadership functions from script.ts - redefined here for testing
+ *
+ * NOTE: These are duplicated from src/script.ts rather than imported.
+ * See tests/README.md for more details. They are wrapped in createTab so that several
+ * tabs can share one lock manager; the watch, spinner and document are stand-ins.
+ */
+type GeolocationRole = 'stopped' | 'leader' | 'follower';
+
+const GEOLOCATION_LEADER_LOCK = 'sweref99-geolocation-leader';
+
+interface LockRequest {
+	callback: () => unknown;
+	resolve: (value: unknown) => void;
+	reject: (reason: unknown) => void;
+}
+
+/**
+ * Exclusive Web Locks for a single lock name, granted in request order
+ */
+class FakeLockManager {
+	private isHeld = false;
+	private readonly queue: LockRequest[] = [];
+
+	request(_name: string, options: { signal?: AbortSignal }, callback: () => unknown): Promise<unknown> {
+		return new Promise((resolve, reject) => {
+			const entry: LockRequest = { callback, resolve, reject };
+			options.signal?.addEventListener('abort', () => {
+				const index = this.queue.indexOf(entry);
+				if (index !== -1) {
+					this.queue.splice(index, 1);
+					reject(new DOMException('Lock request aborted', 'AbortError'));
+				}
+			});
+			this.queue.push(entry);
+			queueMicrotask(() => this.grant());
+		});
+	}
+
+	private grant(): void {
+		const entry = this.isHeld ? undefined : this.queue.shift();
+		if (entry === undefined) {
+			return;
+		}
+		this.isHeld = true;
+		Promise.resolve(entry.callback()).then((value) => {
+			this.isHeld = false;
+			entry.resolve(value);
+			this.grant();
+		});
+	}
+}
+
+function createTab(locks: FakeLockManager) {
+	const navigator = { locks };
+	const document = { hidden: false };
+	let isWatching = false;
+
+	let geolocationRole: GeolocationRole = 'stopped';
+	let leadershipRequest: AbortController | null = null;
+	let releaseLeadership: (() => void) | null = null;
+
+	function isTabCoordinationSupported(): boolean {
+		return true;
+	}
+
+	function startGeolocationWatch(): void {
+		isWatching = true;
+	}
+
+	function stopGeolocationWatch(): void {
+		isWatching = false;
+	}
+
+	function startPositioning(): void {
+		if (geolocationRole !== 'stopped') {
+			return;
+		}
+
+		geolocationRole = 'follower';
+		requestLeadership();
+	}
+
+	function requestLeadership(): void {
+		const request = new AbortController();
+		leadershipRequest = request;
+
+		navigator.locks.request(GEOLOCATION_LEADER_LOCK, { signal: request.signal }, () => {
+			leadershipRequest = null;
+			if (geolocationRole !== 'follower' || document.hidden) {
+				return;
+			}
+
+			geolocationRole = 'leader';
+			startGeolocationWatch();
+			return new Promise<void>((resolve) => {
+				releaseLeadership = resolve;
+			});
+		}).catch((error) => {
+			if (!(error instanceof DOMException && error.name === 'AbortError')) {
+				throw error;
+			}
+		});
+	}
+
+	function stepDownAsLeader(): void {
+		if (geolocationRole === 'leader') {
+			stopGeolocationWatch();
+		}
+		releaseLeadership?.();
+		releaseLeadership = null;
+	}
+
+	function stopPositioning(): void {
+		leadershipRequest?.abort();
+		leadershipRequest = null;
+		releaseLeadership?.();
+		releaseLeadership = null;
+		geolocationRole = 'stopped';
+		stopGeolocationWatch();
+	}
+
+	function updateLeadershipForVisibility(): void {
+		if (geolocationRole === 'stopped' || !isTabCoordinationSupported()) {
+			return;
+		}
+
+		if (document.hidden) {
+			leadershipRequest?.abort();
+			leadershipRequest = null;
+			stepDownAsLeader();
+			geolocationRole = 'follower';
+		} else if (geolocationRole === 'follower' && leadershipRequest === null) {
+			requestLeadership();
+		}
+	}
+
+	return {
+		get role(): GeolocationRole {
+			return geolocationRole;
+		},
+		get isWatching(): boolean {
+			return isWatching;
+		},
+		startPositioning,
+		stopPositioning,
+		setHidden(hidden: boolean): void {
+			document.hidden = hidden;
+			updateLeadershipForVisibility();
+		}
+	};
+}
+
+/**
+ * Lets granted and released locks settle
+ */
+async function flushPromises(): Promise<void> {
+	for (let i = 0; i < 10; i++) {
+		await Promise.resolve();
+	}
+}
+
+describe('Shared geolocation watch', () => {
+	let locks: FakeLockManager;
+
+	beforeEach(() => {
+		locks = new FakeLockManager();
+	});
+
+	test('the first tab leads and runs the watch', async () => {
+		const tab = createTab(locks);
+		tab.startPositioning();
+		await flushPromises();
+		expect(tab.role).toBe('leader');
+		expect(tab.isWatching).toBe(true);
+	});
+
+	test('a second visible tab follows without its own watch', async () => {
+		const first = createTab(locks);
+		const second = createTab(locks);
+		first.startPositioning();
+		await flushPromises();
+		second.startPositioning();
+		await flushPromises();
+		expect(first.role).toBe('leader');
+		expect(second.role).toBe('follower');
+		expect(second.isWatching).toBe(false);
+	});
+
+	test('a tab opened after the leader was hidden takes over the watch', async () => {
+		const first = createTab(locks);
+		first.startPositioning();
+		await flushPromises();
+		first.setHidden(true);
+		await flushPromises();
+
+		const second = createTab(locks);
+		second.startPositioning();
+		await flushPromises();
+		expect(second.role).toBe('leader');
+		expect(second.isWatching).toBe(true);
+		expect(first.role).toBe('follower');
+		expect(first.isWatching).toBe(false);
+	});
+
+	test('a hidden leader hands over to a tab that is already waiting', async () => {
+		const first = createTab(locks);
+		const second = createTab(locks);
+		first.startPositioning();
+		await flushPromises();
+		second.startPositioning();
+		await flushPromises();
+
+		first.setHidden(true);
+		await flushPromises();
+		expect(second.role).toBe('leader');
+		expect(first.isWatching).toBe(false);
+	});
+
+	test('a single tab pauses the watch while hidden and resumes it when visible', async () => {
+		const tab = createTab(locks);
+		tab.startPositioning();
+		await flushPromises();
+
+		tab.setHidden(true);
+		await flushPromises();
+		expect(tab.isWatching).toBe(false);
+
+		tab.setHidden(false);
+		await flushPromises();
+		expect(tab.role).toBe('leader');
+		expect(tab.isWatching).toBe(true);
+	});
+
+	test('a tab started while hidden waits until it is visible', async () => {
+		const tab = createTab(locks);
+		tab.setHidden(true);
+		tab.startPositioning();
+		await flushPromises();
+		expect(tab.isWatching).toBe(false);
+
+		tab.setHidden(false);
+		await flushPromises();
+		expect(tab.role).toBe('leader');
+	});
+
+	test('a hidden follower is skipped when the leader stops', async () => {
+		const first = createTab(locks);
+		const second = createTab(locks);
+		const third = createTab(locks);
+		first.startPositioning();
+		await flushPromises();
+		second.startPositioning();
+		await flushPromises();
+		second.setHidden(true);
+		third.startPositioning();
+		await flushPromises();
+
+		first.stopPositioning();
+		await flushPromises();
+		expect(third.role).toBe('leader');
+		expect(second.isWatching).toBe(false);
+	});
+
+	test('a former leader queues again when visible and leads after the other tab stops', async () => {
+		const first = createTab(locks);
+		first.startPositioning();
+		await flushPromises();
+		first.setHidden(true);
+		const second = createTab(locks);
+		second.startPositioning();
+		await flushPromises();
+
+		first.setHidden(false);
+		await flushPromises();
+		expect(first.role).toBe('follower');
+
+		second.stopPositioning();
+		await flushPromises();
+		expect(first.role).toBe('leader');
+		expect(first.isWatching).toBe(true);
+	});
+});
@@ -0,0 +1,309 @@
+/**
+ * Unit tests for the transform pipeline run by the transform worker
+ *
+ * Tests cover:
+ * - Packing a position into a transferable Float64Array fix
+ * - Formatting of SWEREF 99, WGS84 and RH 2000 strings returned to the main thread
+ * - "Not available" strings for a missing projection and an empty height when unavailable
+ * - The "not in Sweden" flag, reset and engine selection requests
+ */
+
+/**
+ * Protocol and pipeline from transform-protocol.ts and transform-pipeline.ts - redefined here for testing
+ *
+ * NOTE: These are duplicated from src/transform-protocol.ts and src/transform-pipeline.ts
+ * rather than imported. See tests/README.md for more details. The geodesy functions the
+ * pipeline calls are replaced by simple stand-ins; they are tested in their own files.
+ */
+type TransformEngine = 'native' | 'proj4';
+
+interface FormattedPosition {
+	swerefN: string;
+	swerefE: string;
+	wgs84N: string;
+	wgs84E: string;
+	height: string;
+	showNotInSwedenWarning: boolean;
+}
+
+type TransformRequest =
+	| { type: 'position'; fix: Float64Array }
+	| { type: 'configure'; engine: TransformEngine }
+	| { type: 'reset' }
+	| { type: 'stats' };
+
+type TransformResponse =
+	| { type: 'position'; position: FormattedPosition; northing: number; easting: number }
+	| { type: 'stats'; stats: { hits: number; misses: number; size: number } };
+
+type SwedenPresence = 'unknown' | 'inside' | 'outside';
+
+interface SwedenPresenceState {
+	presence: SwedenPresence;
+	pendingFixes: number;
+}
+
+const TRANSFORM_ENGINES: readonly TransformEngine[] = ['native', 'proj4'];
+const POSITION_FIX_LENGTH = 4;
+const FIX_LATITUDE = 0;
+const FIX_LONGITUDE = 1;
+const FIX_ALTITUDE = 2;
+const FIX_TIMESTAMP = 3;
+const SWEDEN_PRESENCE_HYSTERESIS_FIXES = 3;
+const NON_BREAKING_SPACE = '\u00A0';
+const NOT_AVAILABLE_TEXT = 'Ej\u00A0tillgängligt';
+const DECIMAL_SEPARATOR_PATTERN = /\./g;
+
+function formatProjectedCoordinate(prefix: 'N' | 'E', value: number, spacing: 1 | 2): string {
+	return `${prefix}${NON_BREAKING_SPACE.repeat(spacing)}${Math.round(value)}`;
+}
+
+function formatHeight(value: number): string {
+	return `H${NON_BREAKING_SPACE.repeat(2)}${Math.round(value)}${NON_BREAKING_SPACE}m`;
+}
+
+function formatWgs84Coordinate(prefix: 'N' | 'E', value: number): string {
+	return `${prefix}${NON_BREAKING_SPACE}${value.toString().replace(DECIMAL_SEPARATOR_PATTERN, ",")}°`;
+}
+
+// Stand-ins for geodesy.ts
+let transformEngine: TransformEngine = 'native';
+let projectedPosition = { northing: 6580822, easting: 674032 };
+let geoidHeight = 24;
+let velocityGridLoads = 0;
+
+function isInSweden(latitude: number, longitude: number): boolean {
+	return latitude >= 55 && latitude <= 69.1 && longitude >= 10.9 && longitude <= 24.2;
+}
+
+function wgs84_to_sweref99tm(_lat: number, _lon: number, _timestamp: number): { northing: number; easting: number } {
+	return projectedPosition;
+}
+
+function calculateRh2000Height(_lat: number, _lon: number, ellipsoidalHeight: number): number {
+	return Number.isFinite(ellipsoidalHeight) ? ellipsoidalHeight - geoidHeight : Number.NaN;
+}
+
+function loadVelocityGrid(): void {
+	velocityGridLoads++;
+}
+
+function setTransformEngine(engine: TransformEngine): void {
+	transformEngine = engine;
+}
+
+function getTransformCacheStats(): { hits: number; misses: number; size: number } {
+	return { hits: 0, misses: 0, size: 0 };
+}
+
+function packPositionFix(latitude: number, longitude: number, altitude: number | null, timestamp: number): Float64Array {
+	const fix = new Float64Array(POSITION_FIX_LENGTH);
+	fix[FIX_LATITUDE] = latitude;
+	fix[FIX_LONGITUDE] = longitude;
+	fix[FIX_ALTITUDE] = altitude === null ? Number.NaN : altitude;
+	fix[FIX_TIMESTAMP] = timestamp;
+	return fix;
+}
+
+const swedenPresenceState: SwedenPresenceState = { presence: 'unknown', pendingFixes: 0 };
+
+function updateSwedenPresence(state: SwedenPresenceState, isInside: boolean): boolean {
+	const observed: SwedenPresence = isInside ? 'inside' : 'outside';
+	if (state.presence === 'unknown') {
+		state.presence = observed;
+		state.pendingFixes = 0;
+		return observed === 'outside';
+	}
+
+	if (observed === state.presence) {
+		state.pendingFixes = 0;
+		return false;
+	}
+
+	state.pendingFixes++;
+	if (state.pendingFixes < SWEDEN_PRESENCE_HYSTERESIS_FIXES) {
+		return false;
+	}
+	state.presence = observed;
+	state.pendingFixes = 0;
+	return observed === 'outside';
+}
+
+function processPositionFix(fix: Float64Array): Extract<TransformResponse, { type: 'position' }> {
+	const latitude = fix[FIX_LATITUDE];
+	const longitude = fix[FIX_LONGITUDE];
+	const altitude = fix[FIX_ALTITUDE];
+
+	const showNotInSwedenWarning = updateSwedenPresence(swedenPresenceState, isInSweden(latitude, longitude));
+	const sweref = wgs84_to_sweref99tm(latitude, longitude, fix[FIX_TIMESTAMP]);
+	const height = calculateRh2000Height(latitude, longitude, altitude);
+
+	let swerefN: string = NOT_AVAILABLE_TEXT;
+	let swerefE: string = NOT_AVAILABLE_TEXT;
+	if (Number.isFinite(sweref.northing) && Number.isFinite(sweref.easting)) {
+		swerefN = formatProjectedCoordinate('N', sweref.northing, 1);
+		swerefE = formatProjectedCoordinate('E', sweref.easting, 2);
+	}
+
+	loadVelocityGrid();
+
+	return {
+		type: 'position',
+		position: {
+			swerefN,
+			swerefE,
+			wgs84N: formatWgs84Coordinate('N', latitude),
+			wgs84E: formatWgs84Coordinate('E', longitude),
+			height: Number.isFinite(height) ? formatHeight(height) : '',
+			showNotInSwedenWarning
+		},
+		northing: sweref.northing,
+		easting: sweref.easting
+	};
+}
+
+function handleTransformRequest(request: TransformRequest): TransformResponse | null {
+	switch (request.type) {
+		case 'position':
+			return processPositionFix(request.fix);
+		case 'configure':
+			if (TRANSFORM_ENGINES.includes(request.engine)) {
+				setTransformEngine(request.engine);
+			}
+			return null;
+		case 'reset':
+			swedenPresenceState.presence = 'unknown';
+			swedenPresenceState.pendingFixes = 0;
+			return null;
+		case 'stats':
+			return { type: 'stats', stats: getTransformCacheStats() };
+	}
+}
+
+function transformPosition(latitude: number, longitude: number, altitude: number | null = null): FormattedPosition {
+	const response = handleTransformRequest({ type: 'position', fix: packPositionFix(latitude, longitude, altitude, Date.UTC(2025, 0, 1)) });
+	if (response === null || response.type !== 'position') {
+		throw new Error('Expected a position response');
+	}
+	return response.position;
+}
+
+beforeEach(() => {
+	handleTransformRequest({ type: 'reset' });
+	projectedPosition = { northing: 6580822, easting: 674032 };
+	geoidHeight = 24;
+	velocityGridLoads = 0;
+});
+
+describe('packPositionFix Function', () => {
+	test('packs latitude, longitude, altitude and timestamp in order', () => {
+		const fix = packPositionFix(59.3293, 18.0686, 52.5, 1735689600000);
+		expect(Array.from(fix)).toEqual([59.3293, 18.0686, 52.5, 1735689600000]);
+	});
+
+	test('stores a missing altitude as NaN', () => {
+		expect(Number.isNaN(packPositionFix(59.3293, 18.0686, null, 0)[FIX_ALTITUDE])).toBe(true);
+	});
+
+	test('keeps millisecond timestamps exact', () => {
+		const timestamp = 1760616000123;
+		expect(packPositionFix(0, 0, null, timestamp)[FIX_TIMESTAMP]).toBe(timestamp);
+	});
+
+	test('owns a buffer of exactly one fix, so transferring it moves no other data', () => {
+		const fix = packPositionFix(59.3293, 18.0686, null, 0);
+		expect(fix.buffer.byteLength).toBe(POSITION_FIX_LENGTH * Float64Array.BYTES_PER_ELEMENT);
+	});
+});
+
+describe('Position requests', () => {
+	test('returns display-ready SWEREF 99 and WGS84 strings', () => {
+		const position = transformPosition(59.3293, 18.0686);
+		expect(position.swerefN).toBe('N 6580822');
+		expect(position.swerefE).toBe('E  674032');
+		expect(position.wgs84N).toBe('N 59,3293°');
+		expect(position.wgs84E).toBe('E 18,0686°');
+	});
+
+	test('returns the RH 2000 height when altitude and geoid are available', () => {
+		expect(transformPosition(59.3293, 18.0686, 52.4).height).toBe('H  28 m');
+	});
+
+	test('leaves the height empty without altitude, so the height row stays hidden', () => {
+		expect(transformPosition(59.3293, 18.0686).height).toBe('');
+	});
+
+	test('leaves the height empty until the geoid tile has loaded', () => {
+		geoidHeight = Number.NaN;
+		expect(transformPosition(59.3293, 18.0686, 52.4).height).toBe('');
+	});
+
+	test('reports SWEREF 99 as not available when the projection fails', () => {
+		projectedPosition = { northing: Number.NaN, easting: Number.NaN };
+		const position = transformPosition(59.3293, 18.0686);
+		expect(position.swerefN).toBe(NOT_AVAILABLE_TEXT);
+		expect(position.swerefE).toBe(NOT_AVAILABLE_TEXT);
+	});
+
+	test('returns only strings and a flag', () => {
+		const position = transformPosition(59.3293, 18.0686, 52.4);
+		Object.entries(position).forEach(([key, value]) => {
+			expect(typeof value).toBe(key === 'showNotInSwedenWarning' ? 'boolean' : 'string');
+		});
+	});
+
+	test('returns the projected SWEREF 99 TM metres for the smoothing stages', () => {
+		const response = handleTransformRequest({ type: 'position', fix: packPositionFix(59.3293, 18.0686, null, 0) });
+		if (response === null || response.type !== 'position') {
+			throw new Error('Expected a position response');
+		}
+		expect(response.northing).toBe(6580822);
+		expect(response.easting).toBe(674032);
+	});
+
+	test('starts loading the velocity grid after a fix', () => {
+		transformPosition(59.3293, 18.0686);
+		expect(velocityGridLoads).toBe(1);
+	});
+});
+
+describe('Not in Sweden flag', () => {
+	test('is set for a first fix outside Sweden', () => {
+		expect(transformPosition(52.52, 13.40).showNotInSwedenWarning).toBe(true);
+	});
+
+	test('is not set again for later fixes outside Sweden', () => {
+		transformPosition(52.52, 13.40);
+		expect(transformPosition(52.52, 13.41).showNotInSwedenWarning).toBe(false);
+	});
+
+	test('is set again after a reset', () => {
+		transformPosition(52.52, 13.40);
+		handleTransformRequest({ type: 'reset' });
+		expect(transformPosition(52.52, 13.40).showNotInSwedenWarning).toBe(true);
+	});
+
+	test('is not set for fixes inside Sweden', () => {
+		expect(transformPosition(59.3293, 18.0686).showNotInSwedenWarning).toBe(false);
+	});
+});
+
+describe('Configuration and diagnostics requests', () => {
+	afterEach(() => {
+		transformEngine = 'native';
+	});
+
+	test('configure selects a known engine without a response', () => {
+		expect(handleTransformRequest({ type: 'configure', engine: 'proj4' })).toBeNull();
+		expect(transformEngine).toBe('proj4');
+	});
+
+	test('configure ignores an unknown engine', () => {
+		handleTransformRequest({ type: 'configure', engine: 'bogus' as TransformEngine });
+		expect(transformEngine).toBe('native');
+	});
+
+	test('stats returns the projection cache counters', () => {
+		expect(handleTransformRequest({ type: 'stats' })).toEqual({ type: 'stats', stats: { hits: 0, misses: 0, size: 0 } });
+	});
+});
@@ -0,0 +1,220 @@
+/**
+ * Unit tests for the requests waiting on the transform worker
+ *
+ * Tests cover:
+ * - Responses are matched to transforms and stats requests in order
+ * - A failing worker rejects and forgets every waiting request
+ * - Requests after the failure are answered by the main-thread pipeline
+ * - A main-thread pipeline that cannot be loaded rejects its waiting requests
+ */
+
+/**
+ * Request bookkeeping from script.ts - redefined here for testing
+ *
+ * NOTE: These are duplicated from src/script.ts rather than imported.
+ * See tests/README.md for more details. The worker, the saved engine and the dynamic import of
+ * the pipeline are stand-ins; positions are posted as plain requests instead of packed fixes.
+ */
+type TransformRequest = { type: 'configure'; engine: string } | { type: 'position'; id: number } | { type: 'stats' };
+type PositionResponse = { type: 'position'; position: string };
+type TransformResponse = PositionResponse | { type: 'stats'; stats: { hits: number } };
+
+type Listener = (event: { data?: TransformResponse; message?: string; preventDefault(): void }) => void;
+
+/**
+ * Worker that records posted requests and lets the test answer or fail it
+ */
+class FakeWorker {
+	posted: TransformRequest[] = [];
+	isTerminated = false;
+	private listeners = new Map<string, Listener>();
+
+	addEventListener(type: string, listener: Listener): void {
+		this.listeners.set(type, listener);
+	}
+
+	postMessage(request: TransformRequest): void {
+		this.posted.push(request);
+	}
+
+	terminate(): void {
+		this.isTerminated = true;
+	}
+
+	respond(data: TransformResponse): void {
+		this.listeners.get('message')?.({ data, preventDefault: () => {} });
+	}
+
+	fail(message: string): void {
+		this.listeners.get('error')?.({ message, preventDefault: () => {} });
+	}
+}
+
+let worker: FakeWorker;
+let loadPipeline: () => Promise<(request: TransformRequest) => TransformResponse | null>;
+
+let transformWorker: FakeWorker | null = null;
+let mainThreadTransform: Promise<(request: TransformRequest) => TransformResponse | null> | null = null;
+const pendingTransforms: Array<{ resolve: (response: PositionResponse) => void; reject: (error: unknown) => void }> = [];
+const pendingStatsRequests: Array<{ resolve: (stats: { hits: number }) => void; reject: (error: unknown) => void }> = [];
+
+function startTransformWorker(): void {
+	transformWorker = worker;
+	transformWorker.addEventListener('message', (event) => {
+		handleTransformResponse(event.data as TransformResponse);
+	});
+	transformWorker.addEventListener('error', (event) => {
+		event.preventDefault();
+		transformWorker?.terminate();
+		transformWorker = null;
+		rejectPendingTransformRequests(new Error(`Transformeringsworkern misslyckades: ${event.message}`));
+		useMainThreadTransform();
+	});
+	postTransformRequest({ type: 'configure', engine: 'native' });
+}
+
+function useMainThreadTransform(): void {
+	if (mainThreadTransform !== null) {
+		return;
+	}
+
+	mainThreadTransform = loadPipeline();
+	mainThreadTransform.catch(() => {});
+
+	postTransformRequest({ type: 'configure', engine: 'native' });
+}
+
+function rejectPendingTransformRequests(error: unknown): void {
+	const transforms = pendingTransforms.splice(0);
+	const statsRequests = pendingStatsRequests.splice(0);
+	transforms.forEach(({ reject }) => reject(error));
+	statsRequests.forEach(({ reject }) => reject(error));
+}
+
+function postTransformRequest(request: TransformRequest): void {
+	if (transformWorker !== null) {
+		transformWorker.postMessage(request);
+		return;
+	}
+
+	mainThreadTransform?.then((handleRequest) => {
+		const response = handleRequest(request);
+		if (response !== null) {
+			handleTransformResponse(response);
+		}
+	}).catch((error) => {
+		rejectPendingTransformRequests(error);
+	});
+}
+
+function transformPosition(id: number): Promise<PositionResponse> {
+	return new Promise((resolve, reject) => {
+		pendingTransforms.push({ resolve, reject });
+		postTransformRequest({ type: 'position', id });
+	});
+}
+
+function handleTransformResponse(response: TransformResponse): void {
+	if (response.type === 'stats') {
+		pendingStatsRequests.shift()?.resolve(response.stats);
+		return;
+	}
+	pendingTransforms.shift()?.resolve(response);
+}
+
+function requestTransformCacheStats(): Promise<{ hits: number }> {
+	return new Promise((resolve, reject) => {
+		pendingStatsRequests.push({ resolve, reject });
+		postTransformRequest({ type: 'stats' });
+	});
+}
+
+/**
+ * Main-thread pipeline that answers a position with its id
+ */
+function handleRequestOnMainThread(request: TransformRequest): TransformResponse | null {
+	if (request.type === 'position') {
+		return { type: 'position', position: `main ${request.id}` };
+	}
+	return request.type === 'stats' ? { type: 'stats', stats: { hits: 7 } } : null;
+}
+
+/**
+ * Settles a promise into its value or error so the test can inspect either
+ */
+function settle<T>(promise: Promise<T>): Promise<{ value?: T; error?: unknown }> {
+	return promise.then((value) => ({ value }), (error: unknown) => ({ error }));
+}
+
+async function flushPromises(): Promise<void> {
+	for (let i = 0; i < 10; i++) {
+		await Promise.resolve();
+	}
+}
+
+describe('Requests waiting on the transform worker', () => {
+	beforeEach(() => {
+		worker = new FakeWorker();
+		loadPipeline = () => Promise.resolve(handleRequestOnMainThread);
+		transformWorker = null;
+		mainThreadTransform = null;
+		pendingTransforms.length = 0;
+		pendingStatsRequests.length = 0;
+		startTransformWorker();
+	});
+
+	test('should match responses to transforms and stats requests in order', async () => {
+		const first = transformPosition(1);
+		const stats = requestTransformCacheStats();
+		const second = transformPosition(2);
+		worker.respond({ type: 'position', position: 'a' });
+		worker.respond({ type: 'stats', stats: { hits: 3 } });
+		worker.respond({ type: 'position', position: 'b' });
+
+		expect((await first).position).toBe('a');
+		expect((await stats).hits).toBe(3);
+		expect((await second).position).toBe('b');
+	});
+
+	test('should reject every waiting transform and stats request when the worker fails', async () => {
+		const transforms = [settle(transformPosition(1)), settle(transformPosition(2))];
+		const stats = settle(requestTransformCacheStats());
+		worker.fail('boom');
+
+		for (const result of [...await Promise.all(transforms), await stats]) {
+			expect(result.error).toBeInstanceOf(Error);
+		}
+		expect(pendingTransforms.length).toBe(0);
+		expect(pendingStatsRequests.length).toBe(0);
+		expect(worker.isTerminated).toBe(true);
+	});
+
+	test('should answer requests after the failure on the main thread', async () => {
+		worker.fail('boom');
+		expect((await transformPosition(5)).position).toBe('main 5');
+		expect((await requestTransformCacheStats()).hits).toBe(7);
+		expect(worker.posted.some((request) => request.type === 'position')).toBe(false);
+	});
+
+	test('should not answer a rejected request with a later response', async () => {
+		const failed = settle(transformPosition(1));
+		worker.fail('boom');
+		const later = transformPosition(2);
+
+		expect((await failed).error).toBeInstanceOf(Error);
+		expect((await later).position).toBe('main 2');
+	});
+
+	test('should reject waiting requests when the main-thread pipeline cannot be loaded', async () => {
+		loadPipeline = () => Promise.reject(new Error('offline'));
+		worker.fail('boom');
+		const transform = settle(transformPosition(1));
+		const stats = settle(requestTransformCacheStats());
+		await flushPromises();
+
+		expect(((await transform).error as Error).message).toBe('offline');
+		expect(((await stats).error as Error).message).toBe('offline');
+		expect(pendingTransforms.length).toBe(0);
+		expect(pendingStatsRequests.length).toBe(0);
+	});
+});